@@ -57,6 +57,88 @@ class LeagueParticipant(db.Model):
     def __repr__(self):
         return f'<Participant L{self.league_id}-T{self.team_id}>'
 
+class SeasonStanding(db.Model):
+    """
+    [新增] 賽季戰績表 (例行賽 game_type=1)
+    每場正式比賽寫入時以增量 (+1) 更新，與比賽紀錄同一個交易；
+    可由 StandingsService.rebuild 從 schedules / matches 重建。
+    """
+    __tablename__ = 'season_standings'
+    __table_args__ = (
+        db.UniqueConstraint('season_id', 'team_id', name='uq_standings_season_team'),
+        db.Index('idx_standings_league', 'season_id', 'league_id', 'wins'),
+        {'comment': '賽季戰績表'}
+    )
+
+    id = db.Column(db.Integer, primary_key=True)
+    season_id = db.Column(db.Integer, db.ForeignKey('seasons.id'), nullable=False)
+    # 一隊每季只屬於一個聯賽；無分組 (如測試或過渡期資料) 時為 NULL
+    league_id = db.Column(db.Integer, db.ForeignKey('leagues.id'), nullable=True)
+    team_id = db.Column(db.Integer, db.ForeignKey('teams.id'), nullable=False)
+
+    wins = db.Column(db.Integer, default=0, nullable=False, comment='勝場')
+    losses = db.Column(db.Integer, default=0, nullable=False, comment='敗場')
+    home_games = db.Column(db.Integer, default=0, nullable=False, comment='已進行主場數')
+    away_games = db.Column(db.Integer, default=0, nullable=False, comment='已進行客場數')
+    points_for = db.Column(db.Integer, default=0, nullable=False, comment='總得分')
+    points_against = db.Column(db.Integer, default=0, nullable=False, comment='總失分')
+    # 連勝為正、連敗為負 (e.g. 3 = 三連勝, -2 = 二連敗)
+    streak = db.Column(db.Integer, default=0, nullable=False, comment='連勝/連敗')
+
+    updated_at = db.Column(db.DateTime, default=datetime.utcnow, onupdate=datetime.utcnow)
+
+    def __repr__(self):
+        return f'<Standing S{self.season_id}-T{self.team_id} {self.wins}-{self.losses}>'
+
+class SeasonStandingDay(db.Model):
+    """
+    [新增] 每日累計戰績 (例行賽)
+    每隊於有出賽的日子寫入一列「當日賽後」的累計勝敗；
+    第 N 天之前的戰績 = 該隊 day < N 的最後一列 (供賽程頁面顯示歷史戰績)。
+    """
+    __tablename__ = 'season_standing_days'
+    __table_args__ = (
+        db.UniqueConstraint('season_id', 'team_id', 'day', name='uq_standing_days_team_day'),
+        {'comment': '每日累計戰績'}
+    )
+
+    id = db.Column(db.Integer, primary_key=True)
+    season_id = db.Column(db.Integer, db.ForeignKey('seasons.id'), nullable=False)
+    team_id = db.Column(db.Integer, db.ForeignKey('teams.id'), nullable=False)
+    day = db.Column(db.Integer, nullable=False, comment='賽季第幾天')
+    wins = db.Column(db.Integer, default=0, nullable=False, comment='當日賽後累計勝場')
+    losses = db.Column(db.Integer, default=0, nullable=False, comment='當日賽後累計敗場')
+
+    def __repr__(self):
+        return f'<StandingDay S{self.season_id}-D{self.day}-T{self.team_id} {self.wins}-{self.losses}>'
+
+class PlayoffSeries(db.Model):
+    """
+    [新增] 季後賽系列賽狀態
+    建立系列賽賽程時寫入，每場季後賽完賽時記錄勝方 (results 依 game_number 排列)。
+    """
+    __tablename__ = 'playoff_series'
+    __table_args__ = (
+        db.UniqueConstraint('season_id', 'series_id', name='uq_playoff_series'),
+        {'comment': '季後賽系列賽狀態'}
+    )
+
+    id = db.Column(db.Integer, primary_key=True)
+    season_id = db.Column(db.Integer, db.ForeignKey('seasons.id'), nullable=False)
+    series_id = db.Column(db.String(32), nullable=False, comment='系列賽代碼 e.g. T0_R1_1')
+    # 高種子 (第 1 戰主隊) / 低種子
+    team_a_id = db.Column(db.Integer, db.ForeignKey('teams.id'), nullable=False)
+    team_b_id = db.Column(db.Integer, db.ForeignKey('teams.id'), nullable=False)
+    length = db.Column(db.Integer, nullable=True, comment='賽制場數 (BO3 / BO5)')
+    team_a_wins = db.Column(db.Integer, default=0, nullable=False)
+    team_b_wins = db.Column(db.Integer, default=0, nullable=False)
+    # 各戰勝方 team_id (索引 = game_number - 1，未完賽為 null)
+    results = db.Column(db.JSON, nullable=True, comment='各戰勝方')
+    winner_team_id = db.Column(db.Integer, db.ForeignKey('teams.id'), nullable=True, comment='系列賽勝方 (已分勝負時)')
+
+    def __repr__(self):
+        return f'<Series {self.series_id} {self.team_a_wins}-{self.team_b_wins}>'
+
 class Schedule(db.Model):
     """
     賽程表
@@ -26,7 +26,7 @@ class Team(db.Model):
     status = db.Column(db.String(20), default='BOT', comment='狀態')
     is_official = db.Column(db.Boolean, default=True, comment='是否為正式聯賽球隊')
     
-    # 戰績快取
+    # 本季戰績快取 (由 season_standings 同步，見 StandingsService)
     season_wins = db.Column(db.Integer, default=0, comment='本季勝場')
     season_losses = db.Column(db.Integer, default=0, comment='本季敗場')
     home_games_played = db.Column(db.Integer, default=0, comment='已進行主場數')
@@ -37,31 +37,5 @@ class Team(db.Model):
     contracts = db.relationship('Contract', backref='team', lazy='dynamic')
     scouting_records = db.relationship('ScoutingRecord', backref='team', lazy='dynamic', cascade="all, delete-orphan")
 
-    def update_season_stats(self):
-        """
-        [同步校正] 重新計算並更新賽季數據
-        """
-        from app.models.match import Match
-        
-        # 1. 計算出賽數
-        self.home_games_played = Match.query.filter_by(home_team_id=self.id).count()
-        self.away_games_played = Match.query.filter_by(away_team_id=self.id).count()
-        
-        # 2. 計算勝敗場
-        home_wins = Match.query.filter(
-            Match.home_team_id == self.id, 
-            Match.home_score > Match.away_score
-        ).count()
-        
-        away_wins = Match.query.filter(
-            Match.away_team_id == self.id, 
-            Match.away_score > Match.home_score
-        ).count()
-        
-        self.season_wins = home_wins + away_wins
-        
-        total_games = self.home_games_played + self.away_games_played
-        self.season_losses = total_games - self.season_wins
-
     def __repr__(self):
         return f'<Team {self.name}>'
@@ -1,9 +1,11 @@
 # app/routes/game.py
-from flask import Blueprint, jsonify, request
+from flask import Blueprint, jsonify, request, url_for
 # [修正] Team 定義在 app.models.team
 from app.models.team import Team 
-from app.services.match_engine.core import MatchEngine
 from app.services.match_engine.service import DBToEngineAdapter
+from app.services.odds_service import OddsService
+from app.services.simulation_pool import SimulationJobs, PoolBusyError, JOB_PENDING, run_match_job
+from app.models.tactics import TeamTactics
 from app.utils.game_config_loader import GameConfigLoader
 import dataclasses
 
@@ -12,8 +14,10 @@ game_bp = Blueprint('game', __name__, url_prefix='/api/game')
 @game_bp.route('/simulate', methods=['POST'])
 def simulate_match():
     """
-    執行單場比賽模擬
+    提交單場比賽模擬 (非同步)
     Payload: { "home_team_id": 1, "away_team_id": 2 }
+    回傳 202 { "job_id": ..., "status_url": ... }，以 GET /api/game/jobs/<job_id> 取得結果。
+    進行中的任務已達上限時回傳 429 (附 Retry-After)。
     """
     data = request.get_json()
     home_id = data.get('home_team_id')
@@ -30,41 +34,93 @@ def simulate_match():
     home_engine = DBToEngineAdapter.convert_team(home_db)
     away_engine = DBToEngineAdapter.convert_team(away_db)
 
-    # 3. 載入設定
-    config = GameConfigLoader.load()
-
-    # 4. 執行模擬
+    # 3. 提交任務 (Config 由 Worker 預先載入)
     import time
     game_id = f"SIM_{int(time.time())}"
-    
-    engine = MatchEngine(home_engine, away_engine, config, game_id=game_id)
-    result = engine.simulate()
-
-    # 5. 回傳結果
-    response = {
-        "game_id": result.game_id,
-        "home_team": home_db.name,
-        "away_team": away_db.name,
-        "home_score": result.home_score,
-        "away_score": result.away_score,
-        "is_ot": result.is_ot,
-        "pace": result.pace,
-        "logs": result.pbp_log,
-        "box_score": []
+    meta = {"home_team": home_db.name, "away_team": away_db.name,
+            "home_team_id": home_id, "away_team_id": away_id}
+    settings = GameConfigLoader.get('simulation_jobs', {})
+
+    try:
+        job_id = SimulationJobs.submit(run_match_job, home_engine, away_engine, game_id, meta, settings=settings)
+    except PoolBusyError as e:
+        response = jsonify({'error': str(e)})
+        response.headers['Retry-After'] = str(settings.get('retry_after', 2))
+        return response, 429
+
+    return jsonify({
+        "job_id": job_id,
+        "status": JOB_PENDING,
+        "status_url": url_for('game.simulation_job', job_id=job_id)
+    }), 202
+
+
+@game_bp.route('/jobs/<job_id>', methods=['GET'])
+def simulation_job(job_id):
+    """
+    查詢模擬任務
+    Query: ?wait=秒數 (選填，最多等待至 simulation_jobs.max_wait 秒直到完成)
+    status = pending / done (附 result) / failed (附 error)
+    """
+    settings = GameConfigLoader.get('simulation_jobs', {})
+    wait = min(request.args.get('wait', 0, type=float) or 0.0, settings.get('max_wait', 30))
+
+    info = SimulationJobs.status(job_id, wait=max(0.0, wait))
+    if info is None:
+        return jsonify({'error': '找不到任務 (可能已過期)'}), 404
+    return jsonify(info)
+
+
+@game_bp.route('/odds', methods=['POST'])
+def match_odds():
+    """
+    [New] 勝率預測 (多場 score_only 模擬，結果快取)
+    Payload: {
+        "home_team_id": 1, "away_team_id": 2,
+        "home_tactics": {"roster_list": [...]},  (選填，預設讀取球隊目前的戰術設定)
+        "away_tactics": {"roster_list": [...]},  (選填)
+        "simulations": 1000                      (選填，預設見 game_config.yaml odds_service)
     }
-    
-    for p in home_engine.roster + away_engine.roster:
-        if p.seconds_played > 0:
-            response['box_score'].append({
-                "id": p.id,
-                "name": p.name,
-                "team_id": home_id if p in home_engine.roster else away_id,
-                "pts": p.stat_pts,
-                "reb": p.stat_reb,
-                "ast": p.stat_ast,
-                "stl": p.stat_stl,
-                "blk": p.stat_blk,
-                "min": round(p.seconds_played / 60, 1)
-            })
-
-    return jsonify(response)
+    命中快取時直接回傳 200 (預測結果)；否則提交非同步任務並回傳 202 { "job_id": ..., "status_url": ... }，
+    以 GET /api/game/jobs/<job_id> 取得結果。進行中的任務已達上限時回傳 429 (附 Retry-After)。
+    """
+    data = request.get_json() or {}
+    home_id = data.get('home_team_id')
+    away_id = data.get('away_team_id')
+
+    if not home_id or not away_id:
+        return jsonify({'error': '需要提供主客隊 ID'}), 400
+
+    def parse_tactics(key):
+        raw = data.get(key)
+        if not raw:
+            return None
+        roster_list = raw.get('roster_list') if isinstance(raw, dict) else None
+        if not isinstance(roster_list, list):
+            raise ValueError(f"{key}.roster_list 必須為球員 ID 列表")
+        # 僅供本次預測使用，不寫入資料庫
+        return TeamTactics(roster_list=[int(pid) for pid in roster_list])
+
+    try:
+        home_tactics = parse_tactics('home_tactics')
+        away_tactics = parse_tactics('away_tactics')
+        simulations = int(data['simulations']) if data.get('simulations') else None
+    except (TypeError, ValueError) as e:
+        return jsonify({'error': str(e)}), 400
+
+    settings = GameConfigLoader.get('simulation_jobs', {})
+    try:
+        odds, job_id = OddsService.submit_odds(home_id, away_id, home_tactics, away_tactics, simulations,
+                                               job_settings=settings)
+    except PoolBusyError as e:
+        response = jsonify({'error': str(e)})
+        response.headers['Retry-After'] = str(settings.get('retry_after', 2))
+        return response, 429
+
+    if odds is not None:
+        return jsonify(odds)
+    return jsonify({
+        "job_id": job_id,
+        "status": JOB_PENDING,
+        "status_url": url_for('game.simulation_job', job_id=job_id)
+    }), 202
@@ -6,7 +6,9 @@ from app.models.team import Team
 from app.models.user import User
 from app.models.player import Player
 from app.models.tactics import TeamTactics
+from app.models.league import Season
 from app.services.match_engine.service import DBToEngineAdapter
+from app.services.standings_service import StandingsService
 from app.utils.game_config_loader import GameConfigLoader
 
 team_bp = Blueprint('team', __name__, url_prefix='/api/team')
@@ -25,15 +27,22 @@ def get_team_dashboard(team_id):
     # 2. 計算球員人數
     player_count = team.players.count()
     
-    # 3. 計算排名 (簡易版：依勝場數 > 聲望 排序)
-    # 實際專案應有 League Table，此處使用即時查詢模擬
-    # 查詢有多少隊伍的 (wins, reputation) 比我高
-    better_teams = Team.query.filter(
-        (Team.season_wins > team.season_wins) | 
-        ((Team.season_wins == team.season_wins) & (Team.reputation > team.reputation))
-    ).count()
-    rank = better_teams + 1
-    total_teams = Team.query.count()
+    # 3. 計算排名 (依勝場數 > 聲望 排序)
+    # 讀取本季戰績表，於所屬聯賽內排名
+    season = Season.query.filter_by(is_active=True).first()
+    standing = StandingsService.get(season.id, team.id) if season else None
+    if standing:
+        rank, total_teams = StandingsService.rank_of(standing)
+        season_wins, season_losses = standing.wins, standing.losses
+    else:
+        # 本季未參賽 (非正式球隊)：依戰績快取於全體球隊中排名
+        better_teams = Team.query.filter(
+            (Team.season_wins > team.season_wins) | 
+            ((Team.season_wins == team.season_wins) & (Team.reputation > team.reputation))
+        ).count()
+        rank = better_teams + 1
+        total_teams = Team.query.count()
+        season_wins, season_losses = team.season_wins, team.season_losses
     
     return jsonify({
         'id': team.id,
@@ -45,8 +54,8 @@ def get_team_dashboard(team_id):
         'scout_chances': team.scout_chances,
         'player_count': player_count,
         'roster_limit': roster_limit,
-        'season_wins': team.season_wins,
-        'season_losses': team.season_losses,
+        'season_wins': season_wins,
+        'season_losses': season_losses,
         'rank': rank,
         'total_teams': total_teams,
         'owner': team.owner.username
@@ -5,20 +5,27 @@ import heapq
 import os
 import sys
 import time
-from concurrent.futures import ProcessPoolExecutor, as_completed
+from concurrent.futures import ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
 from datetime import datetime
-from sqlalchemy import or_, and_, func, desc
+from sqlalchemy import or_, and_, func, desc, select, text
 from app import db
 from app.models.league import Season, Schedule, League, LeagueParticipant
 from app.models.team import Team
 from app.models.user import User
 from app.models.match import Match, MatchTeamStat, MatchPlayerStat
 from app.models.tactics import TeamTactics
-from app.services.match_engine.core import MatchEngine
-from app.services.match_engine.service import DBToEngineAdapter
+from app.services.match_engine.service import TeamBatchLoader
+from app.services.match_engine.utils.rng import derive_seed
+from app.services.simulation_pool import SimulationPool, run_league_game
+from app.services.standings_service import StandingsService
 from app.services.team_creator import TeamCreator
 from app.services.player_generator import PlayerGenerator
 from app.utils.game_config_loader import GameConfigLoader
+from app.utils.query_counter import QueryCounter
+
+# 多列 INSERT 後 lastrowid 為「第一列」ID 的資料庫 (LAST_INSERT_ID 語意)；其他資料庫 (如 SQLite) 為最後一列
+LAST_INSERT_ID_FIRST = frozenset({'mysql', 'mariadb'})
 
 # =====================================================
 # 獨立 Worker 函數 (必須放在 Class 外部以支援 Multiprocessing)
@@ -54,11 +61,14 @@ def _calculate_penalty_static(schedule, team_ids, penalty_weights):
         total_score += _get_streak_score_static(current_streak, penalty_weights)
     return total_score
 
-def run_simulation_batch(batch_iterations, base_schedule, team_ids, penalty_weights, elite_pool_size):
+def run_simulation_batch(batch_iterations, base_schedule, team_ids, penalty_weights, elite_pool_size, seed=None):
     """
     多進程 Worker 執行的任務
+    [New] seed: 該批次專屬的亂數種子 (由主程序依 run seed 與批次編號衍生)，
+          批次結果只取決於 seed，與分配到哪個 Worker 無關。
     回傳: 該 Batch 找到的前 N 個最佳解 (List of (-score, indices))
     """
+    rand = random.Random(seed)
     local_elite_pool = [] # Min-Heap 存 (-score, indices)
     day_indices = list(range(len(base_schedule)))
     
@@ -66,7 +76,7 @@ def run_simulation_batch(batch_iterations, base_schedule, team_ids, penalty_weig
     # 但為了避免影響原始數據 (雖然是傳值)，這裡我們在 loop 內 shuffle
     
     for _ in range(batch_iterations):
-        random.shuffle(day_indices)
+        rand.shuffle(day_indices)
         current_schedule_view = [base_schedule[i] for i in day_indices]
         score = _calculate_penalty_static(current_schedule_view, team_ids, penalty_weights)
         
@@ -114,10 +124,8 @@ class LeagueService:
             season_id = current_season.id
 
             # === 執行接管 (Takeover) ===
-            # A. 繼承戰績與排名數據
-            new_team.season_wins = target_bot.season_wins
-            new_team.season_losses = target_bot.season_losses
-            new_team.reputation = 0 # 重置聲望 (新經營者)
+            # A. 重置聲望 (新經營者)；戰績於 F 由本季戰績表繼承
+            new_team.reputation = 0
             
             # B. 繼承席位 (更新 Schedule) - [Fix] 加上 season_id 限制
             Schedule.query.filter_by(season_id=season_id, home_team_id=target_bot.id).update({'home_team_id': new_team.id})
@@ -145,13 +153,10 @@ class LeagueService:
             # 舊 BOT 降級為非正式並重置
             target_bot.is_official = False
             target_bot.status = 'BOT' 
-            target_bot.season_wins = 0
-            target_bot.season_losses = 0
             
-            # F. 強制同步數據
+            # F. 繼承戰績 (本季戰績列改屬接手球隊，舊 BOT 歸零)
             db.session.flush()
-            new_team.update_season_stats()
-            target_bot.update_season_stats()
+            StandingsService.transfer(season_id, target_bot, new_team)
             
         else:
             print(f"🆕 [聯盟] 球隊 {new_team.name} 加入過渡聯賽 (Provisional)")
@@ -352,6 +357,7 @@ class LeagueService:
                     start_reputation=team.reputation
                 )
                 db.session.add(participant)
+                StandingsService.create_row(season.id, new_league.id, team.id)
             
             current_idx += teams_per_tier
             print(f"   ✅ {league_name} 分組完成 ({len(tier_teams)} 隊)")
@@ -407,6 +413,12 @@ class LeagueService:
         total_iterations = sched_config.get('iterations', 100000)
         elite_pool_size = sched_config.get('elite_pool_size', 1000)
         penalty_weights = GameConfigLoader.get('league_system.schedule.optimization.penalty_weights')
+
+        # [New] 可重現的亂數種子: 各批次種子由 (run_seed, 聯賽, 批次編號) 衍生
+        run_seed = sched_config.get('seed')
+        if run_seed is None:
+            run_seed = random.SystemRandom().getrandbits(63)
+        print(f"🎲 [賽程] 亂數種子: {run_seed}")
         
         # 設定並行參數
         cpu_count = os.cpu_count() or 4
@@ -437,7 +449,7 @@ class LeagueService:
 
             with ProcessPoolExecutor(max_workers=cpu_count) as executor:
                 futures = []
-                for _ in range(num_batches):
+                for batch_no in range(num_batches):
                     # 提交任務給 Worker
                     futures.append(executor.submit(
                         run_simulation_batch, 
@@ -445,11 +457,13 @@ class LeagueService:
                         base_schedule, 
                         team_ids, 
                         penalty_weights, 
-                        elite_pool_size
+                        elite_pool_size,
+                        derive_seed(run_seed, league.id, batch_no)
                     ))
                 
                 # 處理結果與進度顯示
-                for f in as_completed(futures):
+                # [New] 依提交順序合併 (而非完成順序)，同分時的取捨才不受 Worker 排程影響
+                for f in futures:
                     try:
                         local_pool = f.result()
                         completed_iterations += batch_size
@@ -486,7 +500,7 @@ class LeagueService:
             print() # 換行
             
             # 3. 決策階段
-            selected_entry = random.choice(global_elite_pool)
+            selected_entry = random.Random(derive_seed(run_seed, league.id, 'select')).choice(global_elite_pool)
             final_score = -selected_entry[0]
             final_indices = selected_entry[1]
             best_schedule = [base_schedule[i] for i in final_indices]
@@ -628,15 +642,10 @@ class LeagueService:
             # 依據輪次執行
             if round_num == 1:
                 # R1: 取前 16 名 (Seed 1 vs 16, 2 vs 15...)
-                participants = LeagueParticipant.query.filter_by(league_id=league.id).all()
+                # 排序邏輯: 勝場 > 聲望 (讀取本季戰績表，單次查詢)
+                ranked_teams = StandingsService.ranked(season.id, league.id)
                 
-                # 排序邏輯: 勝場 > 聲望
-                ranked_teams = sorted(participants, key=lambda p: (
-                    Team.query.get(p.team_id).season_wins, 
-                    Team.query.get(p.team_id).reputation
-                ), reverse=True)
-                
-                seeds = [p.team_id for p in ranked_teams[:16]]
+                seeds = [s.team_id for s in ranked_teams[:16]]
                 if len(seeds) < 16:
                     print(f"⚠️ [季後賽] {league.name} 隊伍不足 16 隊，跳過。")
                     continue
@@ -738,6 +747,9 @@ class LeagueService:
                     game_number=game_num
                 )
                 db.session.add(sched)
+            
+            # 系列賽狀態 (賽程頁面的系列賽比分由此讀取)
+            StandingsService.create_series(season.id, series_id, home_id, away_id, length)
         
         print(f"   ✅ 已建立 {series_prefix} 賽程 ({len(matchups)} 組)")
 
@@ -862,6 +874,11 @@ class LeagueService:
         """
         [19:00] 比賽執行作業
         修正: 加入讀取 TeamTactics 戰術設定，確保引擎使用正確的輪替陣容。
+        [Optimization] 三段式流程:
+          1. 準備 (主執行緒): 讀取球隊與戰術，轉換為引擎物件
+          2. 模擬 (常駐進程池，Worker 預先載入 Config): 所有比賽平行模擬
+          3. 寫入 (主執行緒): 依賽程順序寫回資料庫，每場以 SAVEPOINT 隔離
+        任一場在任何階段失敗只會略過該場 (維持 PUBLISHED)，不影響其他場次。
         """
         season = LeagueService.get_current_season()
         
@@ -877,117 +894,284 @@ class LeagueService:
 
         print(f"🏀 [聯盟] 開始模擬 {len(games)} 場比賽...")
         
-        config = GameConfigLoader.load()
-        
+        match_seed = GameConfigLoader.get('league_system.match_seed')
+        t_start = time.time()
+
+        # 1. 準備: 批次載入當日所有球隊 / 戰術 / 球員 / 合約 (固定查詢數)，再轉換為引擎物件
+        batch = TeamBatchLoader.load(
+            [g.home_team_id for g in games] + [g.away_team_id for g in games]
+        )
+        prepared = []
         for game in games:
             try:
-                home = Team.query.get(game.home_team_id)
-                away = Team.query.get(game.away_team_id)
-                
-                # 1. 讀取戰術設定 (Tactics)
-                # 這裡假設每個球隊只有一個主要的戰術設定，或者取第一個
-                home_tactics = TeamTactics.query.filter_by(team_id=home.id).first()
-                away_tactics = TeamTactics.query.filter_by(team_id=away.id).first()
+                home = batch.teams[game.home_team_id]
+                away = batch.teams[game.away_team_id]
                 
-                # 2. 轉換為引擎物件 (傳入戰術)
-                # DBToEngineAdapter 需要根據 tactics.roster_list 來決定誰是先發、誰是替補
-                home_engine = DBToEngineAdapter.convert_team(home, tactics=home_tactics)
-                away_engine = DBToEngineAdapter.convert_team(away, tactics=away_tactics)
-                
-                engine = MatchEngine(home_engine, away_engine, config, game_id=f"S{season.season_number}D{season.current_day}G{game.id}")
-                result = engine.simulate()
-                
-                match_record = Match(
-                    season_id=season.id,
-                    home_team_id=home.id,
-                    away_team_id=away.id,
-                    home_score=result.home_score,
-                    away_score=result.away_score,
-                    is_ot=result.is_ot,
-                    pace=result.pace,
-                    pbp_logs=result.pbp_log
+                # 轉換為引擎物件 (依戰術 roster_list 決定登錄名單)
+                home_engine = batch.convert_team(home.id)
+                away_engine = batch.convert_team(away.id)
+                game_id = f"S{season.season_number}D{season.current_day}G{game.id}"
+                prepared.append((game, home, away, home_engine, away_engine, game_id))
+            except Exception as e:
+                print(f"❌ 準備比賽 {game.id} 時發生錯誤: {e}")
+        t_prepared = time.time()
+
+        # 2. 模擬: 平行執行
+        outcomes = LeagueService._simulate_games(
+            [(h, a, gid) for _, _, _, h, a, gid in prepared], match_seed
+        )
+        t_simulated = time.time()
+
+        # 3. 寫入: 依賽程順序分段批次寫入 (每段一次 commit)
+        done = []
+        for (game, home, away, _, _, _), outcome in zip(prepared, outcomes):
+            if isinstance(outcome, Exception):
+                print(f"❌ 模擬比賽 {game.id} 時發生錯誤: {outcome}")
+                continue
+            result, home_engine, away_engine = outcome
+            done.append((game, home, away, result, home_engine, away_engine))
+
+        chunk = max(1, GameConfigLoader.get('league_system.match_execution.commit_chunk', 50))
+        finished = 0
+        with QueryCounter(db.engine) as qc:
+            for i in range(0, len(done), chunk):
+                finished += LeagueService._store_games(season, done[i:i + chunk])
+                db.session.commit()
+        t_end = time.time()
+        print(f"✅ [聯盟] 第 {season.current_day} 天模擬完成 ({finished}/{len(games)} 場)，"
+              f"耗時 {t_end - t_start:.1f}s (準備 {t_prepared - t_start:.1f}s / "
+              f"模擬 {t_simulated - t_prepared:.1f}s / 寫入 {t_end - t_simulated:.1f}s，{qc.count} 條 SQL)")
+
+    @staticmethod
+    def _simulate_games(matchups, run_seed, workers=None):
+        """
+        模擬多場比賽，回傳與 matchups 同順序的列表: 成功為 (結果, 賽後主隊, 賽後客隊)，失敗為該場的例外物件。
+        workers (None = simulation_pool.workers) <= 1 時於目前進程依序執行；否則送入常駐進程池 (SimulationPool)。
+        """
+        pool = SimulationPool.get(workers)
+        outcomes = []
+        if pool is None:
+            for home, away, game_id in matchups:
+                try:
+                    outcomes.append(run_league_game(home, away, game_id, run_seed))
+                except Exception as e:
+                    outcomes.append(e)
+            return outcomes
+
+        futures = [pool.submit(run_league_game, home, away, game_id, run_seed) for home, away, game_id in matchups]
+        for f in futures:
+            try:
+                outcomes.append(f.result())
+            except Exception as e:
+                outcomes.append(e)
+        # Worker 異常終止時進程池無法再使用，關閉後下次呼叫會重新建立
+        if any(isinstance(o, BrokenProcessPool) for o in outcomes):
+            SimulationPool.shutdown()
+        return outcomes
+
+    @staticmethod
+    def _store_games(season, entries):
+        """
+        [Optimization] 批次寫入多場比賽結果，回傳成功寫入的場數。
+        entries: [(game, home, away, result, home_engine, away_engine), ...] (依賽程順序)
+        比賽主表以一次多列 INSERT 取得所有 Match ID (支援 RETURNING 時直接回傳；否則由 lastrowid、筆數與步距推得並回查比對)，
+        球隊與球員數據各以一次 executemany 寫入，戰績列一次載入後於記憶體累加，每日累計戰績一次寫入。
+        批次寫入失敗時回退為逐場寫入 (每場一個 SAVEPOINT)，單場失敗不影響同批其他比賽。
+        """
+        if not entries:
+            return 0
+        try:
+            with db.session.begin_nested():
+                match_ids = LeagueService._insert_matches(
+                    [LeagueService._match_row(season, game, home, away, result)
+                     for game, home, away, result, _, _ in entries]
                 )
-                db.session.add(match_record)
-                db.session.flush()
-                
-                # 儲存球隊數據
-                for is_home_team, team_id, stats_source in [
-                    (True, home.id, result), 
-                    (False, away.id, result)
-                ]:
-                    team_stat = MatchTeamStat(
-                        match_id=match_record.id,
-                        team_id=team_id,
-                        is_home=is_home_team,
-                        possessions=stats_source.home_possessions if is_home_team else stats_source.away_possessions,
-                        avg_seconds_per_poss=stats_source.home_avg_seconds_per_poss if is_home_team else stats_source.away_avg_seconds_per_poss,
-                        fb_made=stats_source.home_fb_made if is_home_team else stats_source.away_fb_made,
-                        fb_attempt=stats_source.home_fb_attempt if is_home_team else stats_source.away_fb_attempt,
-                        violation_8s=stats_source.home_violation_8s if is_home_team else stats_source.away_violation_8s,
-                        violation_24s=stats_source.home_violation_24s if is_home_team else stats_source.away_violation_24s,
-                        possession_history=stats_source.home_possession_history if is_home_team else stats_source.away_possession_history
-                    )
-                    db.session.add(team_stat)
+                team_rows, player_rows = [], []
+                for match_id, (game, home, away, result, home_engine, away_engine) in zip(match_ids, entries):
+                    team_rows.extend(LeagueService._team_stat_rows(match_id, home, away, result))
+                    player_rows.extend(LeagueService._player_stat_rows(match_id, home, away, home_engine, away_engine))
+                db.session.execute(MatchTeamStat.__table__.insert(), team_rows)
+                db.session.execute(MatchPlayerStat.__table__.insert(), player_rows)
 
-                # 儲存球員數據
-                for engine_team, db_team_id in [(home_engine, home.id), (away_engine, away.id)]:
-                    for p in engine_team.roster:
-                        p_stat = MatchPlayerStat(
-                            match_id=match_record.id,
-                            team_id=db_team_id,
-                            player_id=int(p.id),
-                            grade=p.grade,
-                            position=p.position,
-                            role=p.role,
-                            seconds_played=p.seconds_played,
-                            is_starter=p.is_starter, 
-                            is_played=p.is_played, 
-                            pts=p.stat_pts,
-                            reb=p.stat_reb,
-                            ast=p.stat_ast,
-                            stl=p.stat_stl,
-                            blk=p.stat_blk,
-                            tov=p.stat_tov,
-                            fouls=p.fouls,
-                            plus_minus=p.stat_plus_minus,
-                            fgm=p.stat_fgm,
-                            fga=p.stat_fga,
-                            m3pm=p.stat_3pm,
-                            m3pa=p.stat_3pa,
-                            ftm=p.stat_ftm,
-                            fta=p.stat_fta,
-                            orb=p.stat_orb,
-                            drb=p.stat_drb,
-                            fb_made=p.stat_fb_made,
-                            fb_attempt=p.stat_fb_attempt,
-                            remaining_stamina=p.current_stamina,
-                            is_fouled_out=p.is_fouled_out
-                        )
-                        db.session.add(p_stat)
+                # 同批正式比賽的戰績列、季後賽的系列賽狀態各一次載入
+                standings = StandingsService.load(season.id, [
+                    t.id for game, home, away, _, _, _ in entries if game.game_type == 1 for t in (home, away)
+                ])
+                series = StandingsService.load_series(season.id, [
+                    game for game, _, _, _, _, _ in entries if game.game_type == 3
+                ])
+                played = {}
+                for match_id, (game, home, away, result, _, _) in zip(match_ids, entries):
+                    LeagueService._finish_game(game, home, away, result, match_id, standings, series)
+                    if game.game_type == 1:
+                        played.setdefault(game.day, set()).update((home.id, away.id))
+                for day, team_ids in played.items():
+                    StandingsService.write_daily(season.id, day, [standings[t] for t in team_ids])
+                db.session.flush()
+            return len(entries)
+        except Exception as e:
+            print(f"⚠️ [聯盟] 批次寫入失敗，改為逐場寫入: {e}")
 
-                game.status = 'FINISHED'
-                game.match_id = match_record.id
-                
-                db.session.flush() 
-                
-                # 只有正式比賽才更新戰績與聲望
-                if game.game_type == 1:
-                    home.update_season_stats()
-                    away.update_season_stats()
-                    LeagueService._update_reputation(home, away, result.home_score, result.away_score, is_playoff=False)
-                elif game.game_type == 3:
-                    # 季後賽聲望
-                    LeagueService._update_reputation(home, away, result.home_score, result.away_score, is_playoff=True)
-                
+        stored = 0
+        for entry in entries:
+            try:
+                with db.session.begin_nested():
+                    LeagueService._store_game_result(season, *entry)
+                stored += 1
             except Exception as e:
-                print(f"❌ 模擬比賽 {game.id} 時發生錯誤: {e}")
+                print(f"❌ 寫入比賽 {entry[0].id} 時發生錯誤: {e}")
                 import traceback
                 traceback.print_exc()
-                db.session.rollback()
-                continue
-        
-        db.session.commit()
-        print(f"✅ [聯盟] 第 {season.current_day} 天模擬完成。")
+        return stored
+
+    @staticmethod
+    def _insert_matches(rows):
+        """寫入比賽主表並依輸入順序回傳 Match ID (一條多列 INSERT)"""
+        table = Match.__table__
+        dialect = db.engine.dialect
+        if dialect.insert_returning:
+            # 多列 INSERT ... RETURNING: 自動遞增 ID 依 VALUES 順序遞增配發，排序後即對應輸入順序
+            # (不使用 sort_by_parameter_order: 資料表沒有 sentinel 欄位時 SQLAlchemy 會退回逐列 INSERT)
+            stmt = table.insert().returning(table.c.id)
+            return sorted(db.session.execute(stmt, rows).scalars())
+        # 不支援 RETURNING 的資料庫 (如 MySQL): 單條多列 INSERT ... VALUES (...), (...)，
+        # 由 lastrowid、筆數與自動遞增步距 (auto_increment_increment，多主複寫時可能 != 1) 推得全部 ID。
+        # MySQL 的 LAST_INSERT_ID() 為第一列的 ID，SQLite 等為最後一列。
+        # 推得的 ID 寫入關聯數據前先回查比對 (一次 SELECT)；不符時拋出例外，由呼叫端回退為逐場寫入。
+        result = db.session.execute(table.insert().values(rows))
+        if result.rowcount != len(rows):
+            raise RuntimeError(f"比賽主表寫入筆數不符 ({result.rowcount}/{len(rows)})")
+        step = 1
+        if dialect.name in LAST_INSERT_ID_FIRST:
+            step = int(db.session.execute(text("SELECT @@auto_increment_increment")).scalar() or 1)
+            first = result.lastrowid
+        else:
+            first = result.lastrowid - (len(rows) - 1) * step
+        ids = [first + i * step for i in range(len(rows))]
+
+        keys = ('season_id', 'home_team_id', 'away_team_id', 'home_score', 'away_score')
+        stored = {row[0]: tuple(row[1:]) for row in db.session.execute(
+            select(table.c.id, *(table.c[k] for k in keys)).where(table.c.id.in_(ids))
+        )}
+        if any(stored.get(match_id) != tuple(row[k] for k in keys) for match_id, row in zip(ids, rows)):
+            raise RuntimeError("比賽主表 ID 與寫入資料不符 (自動遞增 ID 不連續)")
+        return ids
+
+    @staticmethod
+    def _store_game_result(season, game, home, away, result, home_engine, away_engine):
+        """逐場寫入單場比賽結果 (比賽主表、球隊與球員數據)，並更新賽程狀態、戰績與聲望"""
+        match_record = Match(**LeagueService._match_row(season, game, home, away, result))
+        db.session.add(match_record)
+        db.session.flush()
+
+        db.session.add_all(MatchTeamStat(**row) for row in LeagueService._team_stat_rows(match_record.id, home, away, result))
+        db.session.add_all(MatchPlayerStat(**row) for row in LeagueService._player_stat_rows(match_record.id, home, away, home_engine, away_engine))
+        LeagueService._finish_game(game, home, away, result, match_record.id)
+        db.session.flush()
+
+    @staticmethod
+    def _finish_game(game, home, away, result, match_id, standings=None, series=None):
+        """
+        更新賽程狀態；正式比賽更新戰績與聲望、季後賽更新系列賽狀態與聲望 (需在比賽主表寫入後呼叫)
+        standings: 預先載入的本季戰績列 (StandingsService.load)；未傳入時載入兩隊，並寫入兩隊當日累計戰績
+        series: 預先載入的系列賽狀態 (StandingsService.load_series)；未傳入時載入該系列賽
+        """
+        game.status = 'FINISHED'
+        game.match_id = match_id
+
+        # 只有正式比賽才更新戰績與聲望
+        if game.game_type == 1:
+            # [Optimization] 戰績以增量更新 (取代每場對 matches 全表的 COUNT 重算)
+            single = standings is None
+            if single:
+                standings = StandingsService.load(game.season_id, [home.id, away.id])
+            StandingsService.record_game(standings, home, away, result.home_score, result.away_score)
+            if single:
+                StandingsService.write_daily(game.season_id, game.day, [standings[home.id], standings[away.id]])
+            LeagueService._update_reputation(home, away, result.home_score, result.away_score, is_playoff=False)
+        elif game.game_type == 3:
+            if game.series_id:
+                if series is None:
+                    series = StandingsService.load_series(game.season_id, [game])
+                winner_id = home.id if result.home_score > result.away_score else away.id
+                StandingsService.record_series_game(series, game, winner_id)
+            # 季後賽聲望
+            LeagueService._update_reputation(home, away, result.home_score, result.away_score, is_playoff=True)
+
+    @staticmethod
+    def _match_row(season, game, home, away, result):
+        """比賽主表欄位"""
+        return dict(
+            season_id=season.id,
+            home_team_id=home.id,
+            away_team_id=away.id,
+            home_score=result.home_score,
+            away_score=result.away_score,
+            is_ot=result.is_ot,
+            pace=result.pace,
+            pbp_logs=result.pbp_log
+        )
+
+    @staticmethod
+    def _team_stat_rows(match_id, home, away, result):
+        """球隊數據 (主隊、客隊各一列)"""
+        rows = []
+        for is_home_team, team_id, stats_source in [
+            (True, home.id, result), 
+            (False, away.id, result)
+        ]:
+            rows.append(dict(
+                match_id=match_id,
+                team_id=team_id,
+                is_home=is_home_team,
+                possessions=stats_source.home_possessions if is_home_team else stats_source.away_possessions,
+                avg_seconds_per_poss=stats_source.home_avg_seconds_per_poss if is_home_team else stats_source.away_avg_seconds_per_poss,
+                fb_made=stats_source.home_fb_made if is_home_team else stats_source.away_fb_made,
+                fb_attempt=stats_source.home_fb_attempt if is_home_team else stats_source.away_fb_attempt,
+                violation_8s=stats_source.home_violation_8s if is_home_team else stats_source.away_violation_8s,
+                violation_24s=stats_source.home_violation_24s if is_home_team else stats_source.away_violation_24s,
+                possession_history=stats_source.home_possession_history if is_home_team else stats_source.away_possession_history
+            ))
+        return rows
+
+    @staticmethod
+    def _player_stat_rows(match_id, home, away, home_engine, away_engine):
+        """球員數據 (兩隊登錄名單每人一列)"""
+        rows = []
+        for engine_team, db_team_id in [(home_engine, home.id), (away_engine, away.id)]:
+            for p in engine_team.roster:
+                rows.append(dict(
+                    match_id=match_id,
+                    team_id=db_team_id,
+                    player_id=int(p.id),
+                    grade=p.grade,
+                    position=p.position,
+                    role=p.role,
+                    seconds_played=p.seconds_played,
+                    is_starter=p.is_starter, 
+                    is_played=p.is_played, 
+                    pts=p.stat_pts,
+                    reb=p.stat_reb,
+                    ast=p.stat_ast,
+                    stl=p.stat_stl,
+                    blk=p.stat_blk,
+                    tov=p.stat_tov,
+                    fouls=p.fouls,
+                    plus_minus=p.stat_plus_minus,
+                    fgm=p.stat_fgm,
+                    fga=p.stat_fga,
+                    m3pm=p.stat_3pm,
+                    m3pa=p.stat_3pa,
+                    ftm=p.stat_ftm,
+                    fta=p.stat_fta,
+                    orb=p.stat_orb,
+                    drb=p.stat_drb,
+                    fb_made=p.stat_fb_made,
+                    fb_attempt=p.stat_fb_attempt,
+                    remaining_stamina=p.current_stamina,
+                    is_fouled_out=p.is_fouled_out
+                ))
+        return rows
 
     @staticmethod
     def _update_reputation(home, away, home_score, away_score, is_playoff=False):
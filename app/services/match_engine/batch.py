@@ -0,0 +1,716 @@
+# app/services/match_engine/batch.py
+
+from dataclasses import dataclass
+from typing import Dict, List, Optional, Sequence, Tuple
+
+import numpy as np
+
+from .core import MatchEngine, MODE_SCORE_ONLY
+from .plan import EnginePlan
+from .structures import EngineTeam, MatchResult
+from .utils.pbp import LOG_OFF
+
+# [New] 向量化批次比賽引擎 (Lockstep Batch Engine)
+# 以 NumPy Struct-of-Arrays 同步模擬 N 場比賽: 每一步 (step) 所有仍在進行的比賽各跑一個回合，
+# 後場 / 快攻 / 前場 (封阻、抄截) / 投籃 / 籃板 / 罰球皆以遮罩陣列運算一次處理。
+# 規則與 MatchEngine(mode='score_only') 相同 (同一份 game_config.yaml、同一個 EnginePlan)，
+# 隨機數改由 numpy Generator 產生，因此與 MatchEngine 為「統計等價」而非逐場相同。
+# 犯滿離場與關鍵時刻調度屬於罕見事件，逐場以 Python 處理；常規換人以向量化處理。
+#
+# 賽前準備會就地重設並修改球員物件 (reset_for_game + 身高修正)，陣列於每場準備完成後立即複製，
+# 因此同一組球隊物件可重複出現在多場比賽中 (賽後物件停留在最後一場的賽前狀態)。
+# seed: 同時決定賽前準備 (上場時間分配，依 (seed, game_id) 衍生串流) 與回合模擬的 numpy Generator。
+# 依賴: numpy (僅批次模擬使用，網站服務不需要)
+
+POSITIONS = ("C", "PF", "SF", "SG", "PG")
+_POS_INDEX = {p: i for i, p in enumerate(POSITIONS)}
+_NO_POS = len(POSITIONS) # 不在 5 個位置內 (pos_scores 視為 0)
+
+
+@dataclass(slots=True)
+class BatchResult:
+    """
+    批次模擬結果 (每個欄位為長度 N 的陣列，索引對應輸入場次)
+    欄位語意與 MatchResult 的團隊層級欄位相同。
+    """
+    game_ids: List[str]
+    home_score: np.ndarray
+    away_score: np.ndarray
+    is_ot: np.ndarray
+    total_quarters: np.ndarray
+    pace: np.ndarray
+    home_possessions: np.ndarray
+    away_possessions: np.ndarray
+    home_possession_seconds: np.ndarray
+    away_possession_seconds: np.ndarray
+    home_fb_made: np.ndarray
+    home_fb_attempt: np.ndarray
+    away_fb_made: np.ndarray
+    away_fb_attempt: np.ndarray
+    home_violation_8s: np.ndarray
+    home_violation_24s: np.ndarray
+    away_violation_8s: np.ndarray
+    away_violation_24s: np.ndarray
+
+    def __len__(self) -> int:
+        return len(self.game_ids)
+
+    def to_match_results(self, home_ids: Sequence[str], away_ids: Sequence[str]) -> List[MatchResult]:
+        """轉為 MatchResult 列表 (無轉播紀錄與回合歷史)，方便沿用既有的分析流程"""
+        results = []
+        for i, gid in enumerate(self.game_ids):
+            hp, ap = int(self.home_possessions[i]), int(self.away_possessions[i])
+            results.append(MatchResult(
+                game_id=gid,
+                home_team_id=home_ids[i],
+                away_team_id=away_ids[i],
+                home_score=int(self.home_score[i]),
+                away_score=int(self.away_score[i]),
+                is_ot=bool(self.is_ot[i]),
+                total_quarters=int(self.total_quarters[i]),
+                pbp_log=[],
+                pace=float(self.pace[i]),
+                home_possessions=hp,
+                away_possessions=ap,
+                home_avg_seconds_per_poss=float(self.home_possession_seconds[i]) / hp if hp > 0 else 0.0,
+                away_avg_seconds_per_poss=float(self.away_possession_seconds[i]) / ap if ap > 0 else 0.0,
+                home_fb_made=int(self.home_fb_made[i]),
+                home_fb_attempt=int(self.home_fb_attempt[i]),
+                away_fb_made=int(self.away_fb_made[i]),
+                away_fb_attempt=int(self.away_fb_attempt[i]),
+                home_violation_8s=int(self.home_violation_8s[i]),
+                home_violation_24s=int(self.home_violation_24s[i]),
+                away_violation_8s=int(self.away_violation_8s[i]),
+                away_violation_24s=int(self.away_violation_24s[i]),
+            ))
+        return results
+
+
+class BatchMatchEngine:
+    """
+    [New] 批次比賽引擎
+    用法:
+        engine = BatchMatchEngine([(home_a, away_a), (home_b, away_b), ...], config, seed=42)
+        result = engine.simulate()
+
+    games 可為相同或不同的對戰組合；內部依 chunk_size 分批建立陣列以控制記憶體。
+    """
+
+    def __init__(self, games: Sequence[Tuple[EngineTeam, EngineTeam]], config: Dict,
+                 game_ids: Optional[Sequence[str]] = None, seed: Optional[int] = None,
+                 chunk_size: int = 2000):
+        self.games = list(games)
+        self.config = config
+        self.plan = EnginePlan.from_config(config)
+        self.game_ids = list(game_ids) if game_ids is not None else [f"BATCH_G{i:06d}" for i in range(len(self.games))]
+        if len(self.game_ids) != len(self.games):
+            raise ValueError("game_ids length must match games")
+        self.seed = seed
+        self.rng = np.random.default_rng(seed)
+        self.chunk_size = max(1, int(chunk_size))
+        self._build_columns()
+
+    # =========================================================================
+    # Setup
+    # =========================================================================
+
+    def _build_columns(self):
+        """挑出模擬會用到的公式，對應到陣列欄位"""
+        plan = self.plan
+        bp, fbp, fp, sp, ap = plan.backcourt, plan.fastbreak, plan.frontcourt, plan.shooting, plan.attribution
+        used = [
+            plan.jump_ball,
+            bp.off_sum, bp.def_sum, bp.speed, bp.team_speed,
+            fbp.runner_selection, fbp.chaser_selection, fbp.off_power, fbp.def_power, fbp.foul_off_iq, fbp.foul_def_iq,
+            fp.time_reduction, fp.speed, fp.spacing_off, fp.spacing_def, fp.block_trigger_off, fp.block_trigger_def,
+            fp.block_power_off, fp.block_power_def, fp.steal_off, fp.steal_def,
+            sp.range_attr, sp.off_total, sp.bonus_3pt, sp.def_total, sp.skill_bonus, sp.foul_off_iq, sp.foul_def_iq,
+            sp.rebound_off, sp.rebound_def, sp.ft_bonus,
+            ap.shot_base, ap.shot_3pt_bonus,
+        ]
+        self.formula_index = sorted({f.index for f in used})
+        self.col = {idx: c for c, idx in enumerate(self.formula_index)}
+
+    def _c(self, formula) -> int:
+        return self.col[formula.index]
+
+    def _load_chunk(self, games: Sequence[Tuple[EngineTeam, EngineTeam]], ids: Sequence[str]):
+        """逐場執行 MatchEngine 的賽前準備，並轉為陣列"""
+        G = len(games)
+        R = max(len(t.roster) for pair in games for t in pair)
+        C = len(self.formula_index)
+        ap = self.plan.attribution
+        fidx = self.formula_index
+
+        self.G, self.R = G, R
+        self.valid = np.zeros((G, 2, R), dtype=bool)
+        self.raw = np.zeros((G, 2, R, C))
+        self.hgt = np.zeros((G, 2, R, C))
+        self.drain = np.zeros((G, 2, R))
+        self.recover = np.zeros((G, 2, R))
+        self.cur = np.full((G, 2, R), 100.0)
+        self.coeff = np.ones((G, 2, R))
+        self.played = np.zeros((G, 2, R))
+        self.target = np.zeros((G, 2, R))
+        self.fouls = np.zeros((G, 2, R), dtype=np.int64)
+        self.fouled = np.zeros((G, 2, R), dtype=bool)
+        self.pos = np.full((G, 2, R), _NO_POS, dtype=np.int64)
+        self.pos_scores = np.zeros((G, 2, R, len(POSITIONS) + 1))
+        self.shot_mult = np.ones((G, 2, R))
+        self.bench_seq = np.zeros((G, 2, R), dtype=np.int64)
+        self.seq_counter = np.zeros((G, 2), dtype=np.int64)
+        self.court = np.zeros((G, 2, 5), dtype=np.int64)
+        self.on_court = np.zeros((G, 2, R), dtype=bool)
+        self.best5 = np.full((G, 2, 5), -1, dtype=np.int64)
+
+        prep = None # [Optimization] 同一個引擎物件以 reset 逐場執行賽前準備
+        for g, (home, away) in enumerate(games):
+            if prep is None:
+                prep = MatchEngine(home, away, self.config, game_id=ids[g], log_level=LOG_OFF, mode=MODE_SCORE_ONLY, run_seed=self.seed)
+            else:
+                prep.reset(home, away, game_id=ids[g], run_seed=self.seed)
+            for s, team in enumerate((home, away)):
+                slot = {id(p): r for r, p in enumerate(team.roster)}
+                for r, p in enumerate(team.roster):
+                    self.valid[g, s, r] = True
+                    self.raw[g, s, r] = [p.formula_raw[i] for i in fidx]
+                    self.hgt[g, s, r] = [p.formula_height[i] for i in fidx]
+                    self.drain[g, s, r] = p.stamina_drain
+                    self.recover[g, s, r] = p.stamina_recover
+                    self.cur[g, s, r] = p.current_stamina
+                    self.coeff[g, s, r] = p.stamina_coeff
+                    self.target[g, s, r] = p.target_seconds
+                    self.pos[g, s, r] = _POS_INDEX.get(p.position, _NO_POS)
+                    self.pos_scores[g, s, r, :len(POSITIONS)] = [p.pos_scores.get(pos, 0) for pos in POSITIONS]
+                    self.bench_seq[g, s, r] = p.bench_seq
+                    if p.role == 'Star': self.shot_mult[g, s, r] = ap.shot_star_bonus
+                    elif p.role == 'Starter': self.shot_mult[g, s, r] = ap.shot_starter_bonus
+                self.seq_counter[g, s] = team.bench_seq
+                self.court[g, s] = [slot[id(p)] for p in team.on_court]
+                self.on_court[g, s, self.court[g, s]] = True
+                self.best5[g, s] = [slot[id(p)] if p is not None else -1 for p in team.best_five]
+
+        # 比賽狀態
+        self.quarter = np.ones(G, dtype=np.int64)
+        self.time_rem = np.full(G, float(self.plan.quarter_length))
+        self.clock = np.zeros(G)
+        self.possession = np.zeros(G, dtype=np.int64)
+        self.new_poss = np.ones(G, dtype=bool)
+        self.keep = np.zeros(G, dtype=bool)
+        self.opening = np.ones(G, dtype=bool)
+        self.active = np.ones(G, dtype=bool)
+        self.in_clutch = np.zeros(G, dtype=bool)
+        self.enforce_due = np.zeros((G, 2), dtype=bool)
+
+        # 團隊統計
+        self.score = np.zeros((G, 2), dtype=np.int64)
+        self.poss = np.zeros((G, 2), dtype=np.int64)
+        self.poss_sec = np.zeros((G, 2))
+        self.fb_made = np.zeros((G, 2), dtype=np.int64)
+        self.fb_att = np.zeros((G, 2), dtype=np.int64)
+        self.v8 = np.zeros((G, 2), dtype=np.int64)
+        self.v24 = np.zeros((G, 2), dtype=np.int64)
+
+    # =========================================================================
+    # Simulation
+    # =========================================================================
+
+    def simulate(self) -> BatchResult:
+        parts = []
+        for start in range(0, len(self.games), self.chunk_size):
+            end = start + self.chunk_size
+            self._load_chunk(self.games[start:end], self.game_ids[start:end])
+            parts.append(self._simulate_chunk())
+
+        def cat(key):
+            return np.concatenate([p[key] for p in parts]) if parts else np.zeros(0)
+
+        return BatchResult(
+            game_ids=list(self.game_ids),
+            home_score=cat('home_score'), away_score=cat('away_score'),
+            is_ot=cat('is_ot'), total_quarters=cat('total_quarters'), pace=cat('pace'),
+            home_possessions=cat('home_possessions'), away_possessions=cat('away_possessions'),
+            home_possession_seconds=cat('home_possession_seconds'), away_possession_seconds=cat('away_possession_seconds'),
+            home_fb_made=cat('home_fb_made'), home_fb_attempt=cat('home_fb_attempt'),
+            away_fb_made=cat('away_fb_made'), away_fb_attempt=cat('away_fb_attempt'),
+            home_violation_8s=cat('home_violation_8s'), home_violation_24s=cat('home_violation_24s'),
+            away_violation_8s=cat('away_violation_8s'), away_violation_24s=cat('away_violation_24s'),
+        )
+
+    def _simulate_chunk(self) -> Dict[str, np.ndarray]:
+        # 1. 跳球 (決定第 1、4 節球權；第 2、3 節由落敗方發球)
+        all_games = np.arange(self.G)
+        self.jb_winner = self._jump_ball(all_games)
+        self.possession[:] = self.jb_winner
+
+        # 2. 同步推進: 每一步所有進行中的比賽各模擬一個回合
+        while True:
+            act = np.nonzero(self.active)[0]
+            if len(act) == 0: break
+            self._check_substitutions(act)
+            self._simulate_possession(act)
+            self._handle_quarter_end(act)
+
+        total_minutes = self.clock / 60.0
+        total_poss = self.poss.sum(axis=1)
+        pace = np.where(total_minutes > 0, (total_poss / 2.0) * (48.0 / np.maximum(total_minutes, 1e-9)), 0.0)
+        return {
+            'home_score': self.score[:, 0].copy(), 'away_score': self.score[:, 1].copy(),
+            'is_ot': self.quarter > 4, 'total_quarters': self.quarter.copy(), 'pace': pace,
+            'home_possessions': self.poss[:, 0].copy(), 'away_possessions': self.poss[:, 1].copy(),
+            'home_possession_seconds': self.poss_sec[:, 0].copy(), 'away_possession_seconds': self.poss_sec[:, 1].copy(),
+            'home_fb_made': self.fb_made[:, 0].copy(), 'home_fb_attempt': self.fb_att[:, 0].copy(),
+            'away_fb_made': self.fb_made[:, 1].copy(), 'away_fb_attempt': self.fb_att[:, 1].copy(),
+            'home_violation_8s': self.v8[:, 0].copy(), 'home_violation_24s': self.v24[:, 0].copy(),
+            'away_violation_8s': self.v8[:, 1].copy(), 'away_violation_24s': self.v24[:, 1].copy(),
+        }
+
+    # --- 共用工具 ---------------------------------------------------------------
+
+    def _uniform(self, lo, hi, n: int) -> np.ndarray:
+        return lo + (hi - lo) * self.rng.random(n)
+
+    def _court_values(self, act: np.ndarray):
+        """場上 10 人的公式值 (n, 2, 5, C) 以及 5 人 / 後場 3 人總和"""
+        g = act[:, None, None]
+        s = np.arange(2)[None, :, None]
+        ci = self.court[act]
+        val = self.raw[g, s, ci] * self.coeff[g, s, ci][..., None] + self.hgt[g, s, ci]
+        return val, val.sum(axis=2), val[:, :, :3].sum(axis=2)
+
+    def _update_coeff(self, idx):
+        """[Spec 2.2] 體力修正係數"""
+        st = self.plan.stamina
+        cur = self.cur[idx]
+        self.coeff[idx] = np.where(cur >= st.nerf_threshold, 1.0,
+                                   np.where(cur > 1.0, 1.0 - (st.nerf_threshold - cur) * 0.01, st.min_multiplier))
+
+    def _jump_ball(self, games: np.ndarray) -> np.ndarray:
+        """(Spec 1.5) 跳球，回傳勝方 side"""
+        val, _, _ = self._court_values(games)
+        c = self._c(self.plan.jump_ball)
+        n = len(games)
+        score = np.zeros((n, 2))
+        for s in range(2):
+            ci = self.court[games, s]
+            is_c = self.pos[games[:, None], s, ci] == _POS_INDEX['C']
+            best = np.argmax(self.pos_scores[games[:, None], s, ci, _POS_INDEX['C']], axis=1)
+            k = np.where(is_c.any(axis=1), np.argmax(is_c, axis=1), best)
+            score[:, s] = val[np.arange(n), s, k, c]
+        total = score.sum(axis=1)
+        total = np.where(total == 0, 1.0, total)
+        return np.where(self.rng.random(n) < score[:, 0] / total, 0, 1)
+
+    def _pick_shooter(self, val, ar, side, is_3pt, games) -> np.ndarray:
+        """[Spec 6.1] 依權重決定出手者 (回傳場上位置 0~4)"""
+        ap = self.plan.attribution
+        w = val[ar, side, :, self._c(ap.shot_base)]
+        w = w + np.where(is_3pt[:, None], val[ar, side, :, self._c(ap.shot_3pt_bonus)], 0.0)
+        w = w * self.shot_mult[games[:, None], side[:, None], self.court[games, side]]
+        total = w.sum(axis=1)
+        r = self.rng.random(len(ar)) * total
+        k = np.minimum((np.cumsum(w, axis=1) < r[:, None]).sum(axis=1), 4)
+        return np.where(total == 0, 0, k)
+
+    def _free_throws(self, games, side, ft_value, count) -> np.ndarray:
+        """罰球 (count 次)，回傳命中數並計入比分"""
+        sp = self.plan.shooting
+        n = len(games)
+        base = self._uniform(sp.ft_base_min, sp.ft_base_max, n)
+        prob = np.clip(base + ft_value * sp.ft_attr_coeff, 0.01, 0.99)
+        made = ((self.rng.random((n, 3)) < prob[:, None]) & (np.arange(3)[None, :] < count[:, None])).sum(axis=1)
+        self.score[games, side] += made
+        return made
+
+    def _add_fouls(self, games, side, roster_idx):
+        """記錄犯規並處理犯滿離場"""
+        self.fouls[games, side, roster_idx] += 1
+        out = self.fouls[games, side, roster_idx] >= self.plan.substitution.foul_limit
+        for g, s, r in zip(games[out], side[out], roster_idx[out]):
+            self._foul_out(int(g), int(s), int(r))
+        return out.any()
+
+    # --- 換人 -------------------------------------------------------------------
+
+    def _execute_sub(self, g: int, s: int, p_out: int, p_in: int):
+        row = list(self.court[g, s])
+        row.remove(p_out)
+        row.append(p_in)
+        self.court[g, s] = row
+        self.on_court[g, s, p_out] = False
+        self.on_court[g, s, p_in] = True
+        self.bench_seq[g, s, p_out] = self.seq_counter[g, s]
+        self.seq_counter[g, s] += 1
+
+    def _check_substitutions(self, act: np.ndarray):
+        """換人檢查: 關鍵時刻強制 Best 5，否則常規體力/時間換人"""
+        sub = self.plan.substitution
+        is_clutch = (self.quarter[act] >= 4) & (self.time_rem[act] <= sub.clutch_threshold)
+        changed = is_clutch != self.in_clutch[act]
+        self.enforce_due[act[changed]] = True
+        self.in_clutch[act] = is_clutch
+
+        clutch = act[is_clutch]
+        if len(clutch):
+            for g, s in zip(*np.nonzero(self.enforce_due[clutch])):
+                self._enforce_best_lineup(int(clutch[g]), int(s))
+            self.enforce_due[clutch] = False
+        self._auto_substitution(act[~is_clutch])
+
+    def _auto_substitution(self, games: np.ndarray):
+        """[Spec 2.5] 常規換人 (向量化): 依場上順序逐一處理需要換下的球員"""
+        if len(games) == 0: return
+        thr = self.plan.substitution.fatigue_threshold
+        g3 = games[:, None, None]
+        s3 = np.arange(2)[None, :, None]
+        ci = self.court[games]
+        reason = (self.cur[g3, s3, ci] < thr) | (self.played[g3, s3, ci] > self.target[g3, s3, ci] + 60.0)
+        if not reason.any(): return
+        out_ids = np.where(reason, ci, -1)
+
+        for k in range(5):
+            gi, si = np.nonzero(out_ids[:, :, k] >= 0)
+            if len(gi) == 0: continue
+            g = games[gi]
+            p_out = out_ids[gi, si, k]
+            # 候選: 板凳、未犯滿、體力高於被換下者、尚未打滿目標時間
+            cand = (self.valid[g, si] & ~self.on_court[g, si] & ~self.fouled[g, si]
+                    & (self.cur[g, si] > self.cur[g, si, p_out][:, None])
+                    & (self.played[g, si] < self.target[g, si]))
+            has = cand.any(axis=1)
+            if not has.any(): continue
+            score = self.pos_scores[g, si, :, self.pos[g, si, p_out]]
+            score = np.where(cand, score, -np.inf)
+            tie = cand & (score == score.max(axis=1)[:, None])
+            p_in = np.argmin(np.where(tie, self.bench_seq[g, si], np.iinfo(np.int64).max), axis=1)
+            for gg, ss, po, pi in zip(g[has], si[has], p_out[has], p_in[has]):
+                self._execute_sub(int(gg), int(ss), int(po), int(pi))
+
+    def _enforce_best_lineup(self, g: int, s: int):
+        """[Spec 2.5 Revised] 關鍵時刻強制 Best 5 (同 SubstitutionSystem.enforce_best_lineup)"""
+        target = [int(p) for p in self.best5[g, s]]
+        if min(target) < 0: return
+        fouled = self.fouled[g, s]
+        locked = {p for p in target if not fouled[p]}
+        roster = np.nonzero(self.valid[g, s])[0]
+        for i, p in enumerate(target):
+            if fouled[p]:
+                cands = [r for r in roster if not fouled[r] and r not in locked]
+                if cands:
+                    cands.sort(key=lambda r: self.pos_scores[g, s, r, i], reverse=True)
+                    target[i] = int(cands[0])
+                    locked.add(target[i])
+        court = [int(p) for p in self.court[g, s]]
+        players_in = [p for p in target if p not in court]
+        players_out = [p for p in court if p not in target]
+        for p_in, p_out in zip(players_in, players_out):
+            self._execute_sub(g, s, p_out, p_in)
+            self.pos[g, s, p_in] = target.index(p_in)
+
+    def _foul_out(self, g: int, s: int, r: int):
+        """犯滿離場: 時間重分配 + 尋找替補 (同 MatchEngine._check_and_handle_foul_out)"""
+        self.fouled[g, s, r] = True
+        self.enforce_due[g, s] = True
+        court = [int(p) for p in self.court[g, s]]
+        on_court = r in court
+        if on_court: court.remove(r)
+
+        remaining = max(0.0, self.target[g, s, r] - self.played[g, s, r])
+        self.target[g, s, r] = self.played[g, s, r]
+
+        bench = [int(p) for p in np.nonzero(self.valid[g, s] & ~self.on_court[g, s])[0]]
+        bench.sort(key=lambda p: self.bench_seq[g, s, p])
+        if remaining > 0:
+            valid_players = [p for p in court + bench if not self.fouled[g, s, p]]
+            if valid_players:
+                slots = []
+                for i in range(len(POSITIONS)):
+                    slots.extend(sorted(valid_players, key=lambda p: self.pos_scores[g, s, p, i], reverse=True)[:3])
+                for p in slots:
+                    self.target[g, s, p] += remaining / len(slots)
+
+        candidates = [p for p in bench if not self.fouled[g, s, p]]
+        if not on_court: return
+        if not candidates:
+            self.court[g, s] = court + [r] # 板凳無可用之兵: 原球員回到場上 (排在最後)
+            return
+
+        target_pos = int(self.pos[g, s, r])
+        pos_cands = [p for p in candidates if self.pos_scores[g, s, p, target_pos] > 0]
+        if pos_cands:
+            sub = max(pos_cands, key=lambda p: self.pos_scores[g, s, p, target_pos])
+        else:
+            sub = max(candidates, key=lambda p: self.pos_scores[g, s, p, :len(POSITIONS)].sum())
+        self._execute_sub(g, s, r, sub)
+        self.pos[g, s, sub] = target_pos
+
+    # --- 回合 -------------------------------------------------------------------
+
+    def _simulate_possession(self, act: np.ndarray):
+        plan = self.plan
+        bp, fbp, fp, sp = plan.backcourt, plan.fastbreak, plan.frontcourt, plan.shooting
+        c = self._c
+        rand = self.rng.random
+        n = len(act)
+        ar = np.arange(n)
+        o = self.possession[act]
+        d = 1 - o
+        is_oreb = self.keep[act]
+
+        # 新球權計數 (Pace)
+        newp = self.new_poss[act]
+        self.poss[act[newp], o[newp]] += 1
+
+        val, s5, s3 = self._court_values(act)
+
+        # ============================================================
+        # Phase 1: Backcourt
+        # ============================================================
+        off_sum = s3[ar, o, c(bp.off_sum)]
+        def_sum = s3[ar, d, c(bp.def_sum)]
+        base = self._uniform(bp.time_base_min, bp.time_base_max, n)
+        spd_off = s3[ar, o, c(bp.speed)]
+        spd_def = s3[ar, d, c(bp.speed)]
+        avg_off = np.where(spd_off > 0, spd_off / 3.0, 50.0)
+        avg_def = np.where(spd_def > 0, spd_def / 3.0, 50.0)
+        disc_off = rand(n) * avg_off * bp.speed_discount_coeff
+        disc_def = rand(n) * avg_def * bp.speed_discount_coeff * bp.speed_discount_coeff_def
+        bc_time = np.maximum(bp.min_time_limit, base + (def_sum - off_sum) * bp.time_coeff - disc_off + disc_def)
+        bc_time = np.where(self.opening[act], bp.opening_seconds, bc_time)
+
+        viol8 = bc_time > bp.violation_threshold
+        bc_time = np.where(viol8, 8.0, bc_time)
+        self.v8[act[viol8], o[viol8]] += 1
+
+        steal_prob = bp.steal_base_prob + (def_sum - off_sum) * bp.steal_bonus_coeff
+        steal = ~viol8 & (bc_time > bp.steal_threshold) & (rand(n) < steal_prob)
+        off_team_spd = s5[ar, o, c(bp.team_speed)]
+        def_team_spd = s5[ar, d, c(bp.team_speed)]
+        ratio = np.where(off_team_spd > 0, (def_team_spd - off_team_spd) / np.where(off_team_spd > 0, off_team_spd, 1.0), 0.0)
+        transition = rand(n) < bp.transition_base_prob + ratio
+        steal_fb = steal & transition
+        steal_fc = steal & ~transition
+        self.poss[act[steal], d[steal]] += 1 # 抄截方發動反擊，記錄球權
+
+        fb_try = ~viol8 & ~steal & (bc_time < bp.fastbreak_threshold) & (rand(n) < bp.fastbreak_trigger_prob)
+
+        elapsed = bc_time.copy()
+        keep = np.zeros(n, dtype=bool)
+        done = viol8.copy()
+
+        # ============================================================
+        # Fastbreak (後場快攻 / 抄截快攻)
+        # ============================================================
+        fbm = fb_try | steal_fb
+        fb_continue = np.zeros(n, dtype=bool)
+        if fbm.any():
+            fi = ar[fbm]
+            fo = np.where(steal_fb[fi], d[fi], o[fi])
+            fd = 1 - fo
+            m = len(fi)
+            runner = np.argmax(val[fi, fo, :, c(fbp.runner_selection)], axis=1)
+            chaser = np.argmax(val[fi, fd, :, c(fbp.chaser_selection)], axis=1)
+            base_rate = self._uniform(fbp.base_success_min, fbp.base_success_max, m)
+            diff_mod = (val[fi, fo, runner, c(fbp.off_power)] - val[fi, fd, chaser, c(fbp.def_power)]) * fbp.stat_diff_coeff
+            success = rand(m) < np.minimum(1.0, base_rate + diff_mod)
+            self.fb_att[act[fi], fo] += 1
+            self.fb_made[act[fi], fo] += success
+            iq_diff = val[fi, fo, runner, c(fbp.foul_off_iq)] - val[fi, fd, chaser, c(fbp.foul_def_iq)]
+            foul = rand(m) < np.maximum(0.001, fbp.foul_base_prob + iq_diff * fbp.foul_iq_coeff)
+
+            self.score[act[fi[success]], fo[success]] += 2
+            ft_value = val[fi, fo, runner, c(sp.ft_bonus)]
+            fouled_out = False
+            if foul.any():
+                g_f = act[fi[foul]]
+                chaser_r = self.court[g_f, fd[foul], chaser[foul]]
+                fouled_out = self._add_fouls(g_f, fd[foul], chaser_r)
+                self._free_throws(g_f, fo[foul], ft_value[foul], np.where(success[foul], 1, 2))
+
+            stopped = ~success & ~foul
+            # 抄截快攻: 原進攻方拿回球權 (記錄新球權)，回合結束
+            sfb = steal_fb[fi]
+            self.poss[act[fi[sfb]], o[fi[sfb]]] += 1
+            keep[fi[sfb]] = True
+            done[fi[sfb]] = True
+            # 後場快攻: 失敗則回合結束；得分/犯規則繼續進入前場 (與 MatchEngine 流程相同)
+            done[fi[~sfb & stopped]] = True
+            fb_continue[fi[~sfb & ~stopped]] = True
+            if fouled_out:
+                val, s5, s3 = self._court_values(act)
+
+        # ============================================================
+        # Phase 2: Frontcourt
+        # ============================================================
+        fcm = (~done & ~steal & ~fb_try) | fb_continue | steal_fc
+        shooting = np.zeros(n, dtype=bool)
+        fo_all = np.where(steal_fc, d, o)
+        quality = np.zeros(n)
+        spacing = np.zeros(n)
+        if fcm.any():
+            fi = ar[fcm]
+            fo = fo_all[fi]
+            fd = 1 - fo
+            m = len(fi)
+            oreb = is_oreb[fi] & ~steal_fc[fi]
+            elapsed_bc = bc_time[fi]
+
+            reduction = (s5[fi, fo, c(fp.time_reduction)] / 1000.0) * 0.5
+            min_t = np.maximum(4.0, 4.0 - reduction)
+            max_t = np.where(oreb, 14.0, np.maximum(min_t + 1.0, 24.0 - elapsed_bc))
+            min_t = np.where(oreb, np.minimum(min_t, 13.0), min_t)
+            fc_time = min_t + (max_t - min_t) * rand(m)
+            spd_o = s5[fi, fo, c(fp.speed)]
+            spd_d = s5[fi, fd, c(fp.speed)]
+            avg_o = np.where(spd_o > 0, spd_o / 5.0, 50.0)
+            avg_d = np.where(spd_d > 0, spd_d / 5.0, 50.0)
+            fc_time = fc_time - rand(m) * avg_o * fp.speed_discount_coeff + rand(m) * avg_d * fp.speed_discount_coeff
+            fc_time = np.maximum(fp.absolute_min_time, fc_time)
+
+            v24 = (elapsed_bc + fc_time) > fp.violation_threshold
+            fc_time = np.where(v24, 24.0, fc_time)
+            self.v24[act[fi[v24]], fo[v24]] += 1
+
+            q = np.where(fc_time < 7.0, (7.0 - fc_time) * 0.01, 0.0)
+            off_sp = s5[fi, fo, c(fp.spacing_off)]
+            def_sp = s5[fi, fd, c(fp.spacing_def)]
+            def_sp = np.where(def_sp == 0, 1.0, def_sp)
+            sp_bonus = np.clip((off_sp - def_sp) / def_sp + self._uniform(-0.1, 0.1, m), -1.0, 1.0)
+
+            # 封阻判定
+            blocked = np.zeros(m, dtype=bool)
+            block_try = ~v24 & (sp_bonus <= 0.5)
+            attr_mod = (s5[fi, fd, c(fp.block_trigger_def)] - s5[fi, fo, c(fp.block_trigger_off)]) * 0.0001
+            attempt = np.maximum(0.0, fp.block_base_prob + attr_mod + np.where(sp_bonus < 0, fp.block_spacing_penalty_prob, 0.0))
+            attempt_hit = block_try & (rand(m) < attempt)
+            if attempt_hit.any():
+                bi = np.nonzero(attempt_hit)[0]
+                b_act = act[fi[bi]]
+                k = self._pick_shooter(val, fi[bi], fo[bi], np.zeros(len(bi), dtype=bool), b_act)
+                shooter_pos = self.pos[b_act, fo[bi], self.court[b_act, fo[bi], k]]
+                def_pos = self.pos[b_act[:, None], fd[bi][:, None], self.court[b_act, fd[bi]]]
+                match = def_pos == shooter_pos[:, None]
+                kb = np.where(match.any(axis=1), np.argmax(match, axis=1), 0)
+                p_off = val[fi[bi], fo[bi], k, c(fp.block_power_off)]
+                p_def = val[fi[bi], fd[bi], kb, c(fp.block_power_def)]
+                tot = p_off + p_def
+                succ = np.where(tot > 0, p_def / np.where(tot > 0, tot, 1.0), 0.5)
+                blocked[bi] = rand(len(bi)) < succ
+
+            # 抄截判定
+            steal_val = s5[fi, fd, c(fp.steal_def)] - s5[fi, fo, c(fp.steal_off)]
+            fc_steal = ~v24 & ~blocked & (rand(m) < np.maximum(0.001, fp.steal_base_prob + steal_val * fp.steal_stat_diff_coeff))
+
+            turnover = v24 | blocked | fc_steal
+            elapsed[fi] = elapsed_bc + fc_time
+            sfc = steal_fc[fi]
+            # 抄截轉換後失誤: 原進攻方拿回球權
+            lost = turnover & sfc
+            self.poss[act[fi[lost]], o[fi[lost]]] += 1
+            keep[fi[lost]] = True
+            shooting[fi[~turnover]] = True
+            quality[fi] = q
+            spacing[fi] = sp_bonus
+
+        # ============================================================
+        # Phase 3: Shooting
+        # ============================================================
+        if shooting.any():
+            si = ar[shooting]
+            so = fo_all[si]
+            sd = 1 - so
+            m = len(si)
+            g_s = act[si]
+
+            range_sum = s5[si, so, c(sp.range_attr)]
+            range_sum = np.where(range_sum == 0, 1.0, range_sum)
+            is_3pt = rand(m) > 1.0 / (range_sum / 100.0)
+            points = np.where(is_3pt, 3, 2)
+            k = self._pick_shooter(val, si, so, is_3pt, g_s)
+
+            off_total = s5[si, so, c(sp.off_total)] + np.where(is_3pt, s5[si, so, c(sp.bonus_3pt)] * (sp.multiplier_3pt - 1.0), 0.0)
+            def_total = s5[si, sd, c(sp.def_total)]
+            def_total = np.where(def_total == 0, 1.0, def_total)
+            skill_mult = 1.0 + val[si, so, k, c(sp.skill_bonus)] / sp.skill_bonus_divisor
+            base_rate = np.where(is_3pt, sp.base_rate_3pt, sp.base_rate_2pt)
+            rate = (base_rate + (off_total - def_total) / def_total) * skill_mult \
+                * (1.0 + spacing[si] * sp.spacing_weight) * (1.0 + quality[si])
+            hit = rand(m) < np.clip(rate, 0.01, 0.99)
+
+            off_iq = s5[si, so, c(sp.foul_off_iq)]
+            def_iq = s5[si, sd, c(sp.foul_def_iq)]
+            def_iq = np.where(def_iq == 0, 1.0, def_iq)
+            foul = rand(m) < np.maximum(0.01, (off_iq - def_iq) / def_iq)
+
+            self.score[g_s[hit], so[hit]] += points[hit]
+            if foul.any():
+                fouler_k = self.rng.integers(0, 5, size=int(foul.sum()))
+                fouler_r = self.court[g_s[foul], sd[foul], fouler_k]
+                ft_value = val[si[foul], so[foul], k[foul], c(sp.ft_bonus)]
+                ft_count = np.where(hit[foul], 1, np.where(is_3pt[foul], 3, 2))
+                self._free_throws(g_s[foul], so[foul], ft_value, ft_count)
+                self._add_fouls(g_s[foul], sd[foul], fouler_r)
+
+            # 籃板
+            reb = ~hit & ~foul
+            off_reb = s5[si, so, c(sp.rebound_off)]
+            def_reb = s5[si, sd, c(sp.rebound_def)]
+            denom = off_reb + def_reb
+            dr_prob = 0.10 + def_reb / np.where(denom == 0, 1.0, denom)
+            shoot_keep = reb & ~(rand(m) < dr_prob)
+
+            # 抄截轉換後的投籃: 球權方向反轉
+            keep[si] = np.where(steal_fc[si], ~shoot_keep, shoot_keep)
+
+        # ============================================================
+        # 回合結算: 時間、體力、球權
+        # ============================================================
+        self.poss_sec[act, o] += elapsed
+        self.time_rem[act] -= elapsed
+        self.clock[act] += elapsed
+
+        oc = self.on_court[act]
+        rate = np.where(oc, -self.drain[act], self.recover[act])
+        self.cur[act] = np.clip(self.cur[act] + (rate / 60.0) * elapsed[:, None, None], 1.0, 100.0)
+        self.played[act] += np.where(oc, elapsed[:, None, None], 0.0)
+        self._update_coeff(act)
+
+        self.possession[act] = np.where(keep, o, d)
+        self.new_poss[act] = ~keep
+        self.keep[act] = keep
+        self.opening[act] = False
+
+    def _apply_rest(self, games: np.ndarray, minutes: float):
+        """[Spec 2.4] 節間/中場休息恢復"""
+        if len(games) == 0: return
+        self.cur[games] = np.clip(self.cur[games] + (self.recover[games] / 60.0) * (minutes * 60.0), 1.0, 100.0)
+        self._update_coeff(games)
+
+    def _handle_quarter_end(self, act: np.ndarray):
+        """節次結束: 休息、下一節球權、延長賽判定"""
+        ended = act[self.time_rem[act] <= 0]
+        if len(ended) == 0: return
+        st = self.plan.stamina
+        q = self.quarter[ended]
+        tied = self.score[ended, 0] == self.score[ended, 1]
+
+        self._apply_rest(ended[q == 2], st.halftime_minutes)
+        self._apply_rest(ended[(q == 1) | (q == 3)], st.quarter_break_minutes)
+        self._apply_rest(ended[(q >= 4) & tied], st.quarter_break_minutes)
+
+        regular = ended[q < 4]
+        next_q = self.quarter[regular] + 1
+        winner = self.jb_winner[regular]
+        self.quarter[regular] = next_q
+        self.time_rem[regular] = float(self.plan.quarter_length)
+        self.possession[regular] = np.where(next_q == 4, winner, 1 - winner)
+
+        ot = ended[(q >= 4) & tied]
+        if len(ot):
+            self.quarter[ot] += 1
+            self.time_rem[ot] = float(self.plan.ot_length)
+            self.possession[ot] = self._jump_ball(ot)
+
+        self.active[ended[(q >= 4) & ~tied]] = False
+        self.new_poss[ended] = True
+        self.keep[ended] = False
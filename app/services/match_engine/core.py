@@ -1,15 +1,32 @@
 # app/services/match_engine/core.py
 
-from typing import Dict, List, Optional, Tuple, Union
+from typing import Dict, Iterator, List, Optional, Tuple
 import math
+import pickle
+import zlib
 
-from .structures import EngineTeam, EnginePlayer, MatchState, MatchResult
+from .structures import (EngineTeam, EnginePlayer, MatchState, MatchResult, MatchEvent,
+                         EVENT_POSSESSION, EVENT_PERIOD_END, EVENT_FINAL, PHASE_PREGAME, PHASE_LIVE, PHASE_BREAK)
+from .plan import EnginePlan
 from .utils.calculator import Calculator
-from .utils.rng import rng
+from .utils.rng import RNG, rng as shared_rng
+from .utils.pbp import PbpBuffer, PbpEvent, PbpFormatter, LOG_LEVELS, LOG_OFF, LOG_TEXT, STRIDE
+from .utils.profiler import EngineProfiler
+from .layout import TeamMatrix, LAYOUTS, LAYOUT_OBJECTS, LAYOUT_ARRAYS
 from .systems.stamina import StaminaSystem
 from .systems.substitution import SubstitutionSystem
 from .systems.attribution import AttributionSystem
 
+# [Optimization] 模擬模式
+# full       : 完整模擬 (含 Box Score 歸屬、+/-、回合歷史、轉播)
+# score_only : 僅保留影響比分的機率判定，略過不回饋結果的歸屬工作 (Monte Carlo / 平衡調校用)
+MODE_FULL = 'full'
+MODE_SCORE_ONLY = 'score_only'
+MODES = (MODE_FULL, MODE_SCORE_ONLY)
+
+# [New] 快照格式版本 (MatchState / EngineTeam 欄位變動時遞增)
+SNAPSHOT_FORMAT = 1
+
 class MatchEngine:
     """
     ASBL 比賽引擎核心 (Level 4 - Phase 2 Final)
@@ -23,38 +40,182 @@ class MatchEngine:
     [Update 2026-01-16]
     - 新增: 正負值 (+/-) 統計
     - 新增: 回合時間 (Possession Time) 記錄
+
+    [Optimization] Config 於建構時編譯為 EnginePlan (跨場次快取)，
+    各階段直接讀取已解析的公式與參數，不再於每回合走訪 Config。
+
+    [Optimization] 轉播紀錄改為結構化事件 (PbpBuffer)，熱迴圈中不組字串；
+    log_level: 'off' 不記錄 / 'events' 僅事件 / 'text' 賽後轉為文字 (預設，與舊版輸出相同)。
+
+    [Optimization] mode='score_only': 所有影響比分的機率 (含出手者、犯規者、犯滿換人) 與完整模式相同，
+    但不抽選助攻者/籃板者/抄截者，不累計個人 Box Score、+/-、回合歷史，也不記錄轉播 (強制 log_level='off')。
+    比分、延長賽、Pace、快攻與違例等團隊數據仍有效。
+
+    [New] 隨機數串流注入: 傳入 rng (RNG 實例) 或 run_seed 時，整場比賽 (含賽前上場時間分配)
+    只使用這個獨立串流；run_seed 會與 game_id 衍生出該場專屬的 seed，可單獨重播任何一場。
+    兩者皆未傳入時沿用全域共用的 rng (舊版行為)。
+
+    [Optimization] 物件重複使用: engine.reset(home, away, game_id) 以同一個引擎進行下一場比賽，
+    球隊/球員物件經 reset_for_game() 就地還原，大量模擬時不必每場重建。
+
+    [New] iter_events(): 逐回合產生 MatchEvent (比分、時間、節次、陣容變動與新增轉播事件)，
+    可在回合之間暫停；simulate() 與其共用同一個回合產生器，一次跑完並回傳 MatchResult。
+
+    [New] snapshot() / MatchEngine.restore(blob, config): 於回合之間將整場比賽狀態 (含亂數串流位置)
+    存為壓縮二進位資料，可於其他進程續跑 (斷點續跑 / 分散後續節次 / 由 Q4 分岔的 What-if)。
+
+    [New] layout='arrays': 球隊公式總和改由 Struct-of-Arrays 矩陣計算 (見 layout.py，需要 numpy)，
+    結果與預設的 layout='objects' 逐位元一致。
+
+    [New] profiler=EngineProfiler(): 記錄各階段 (後場/前場/快攻/投籃/罰球/換人/體力/轉播) 的自身時間
+    與事件數，可跨場次累計 (見 utils/profiler.py)；未傳入時不產生任何額外開銷。
     """
 
-    def __init__(self, home_team: EngineTeam, away_team: EngineTeam, config: Dict, game_id: str = "SIM_GAME"):
-        self.home_team = home_team
-        self.away_team = away_team
+    def __init__(self, home_team: EngineTeam, away_team: EngineTeam, config: Dict, game_id: str = "SIM_GAME",
+                 log_level: str = LOG_TEXT, mode: str = MODE_FULL, rng: Optional[RNG] = None, run_seed=None,
+                 layout: str = LAYOUT_OBJECTS, profiler: Optional[EngineProfiler] = None):
+        self._configure(config, log_level, mode, layout)
+        # [New] 分段計時: 以計時包裝取代各階段方法 (僅此實例)，未傳入時引擎不受任何影響
+        self.profiler = profiler
+        if profiler is not None:
+            profiler.attach(self)
+        self.reset(home_team, away_team, game_id, rng=rng, run_seed=run_seed)
+
+    def _configure(self, config: Dict, log_level: str, mode: str, layout: str):
+        """引擎層級設定 (跨場次不變): Config / Plan / 模式 / 佈局"""
+        if log_level not in LOG_LEVELS:
+            raise ValueError(f"Unknown log_level: {log_level} (expected one of {LOG_LEVELS})")
+        if mode not in MODES:
+            raise ValueError(f"Unknown mode: {mode} (expected one of {MODES})")
+        if layout not in LAYOUTS:
+            raise ValueError(f"Unknown layout: {layout} (expected one of {LAYOUTS})")
+        self.layout = layout
+
         self.config = config
-        self.game_id = game_id
         
-        # 1. 初始化比賽狀態
-        general_config = config.get('match_engine', {}).get('general', {})
-        self.quarter_length = general_config.get('quarter_length', 720)
-        self.ot_length = general_config.get('ot_length', 300)
+        # [Optimization] 取得編譯後的引擎計畫 (同版本 Config 只編譯一次)
+        self.plan = EnginePlan.from_config(config)
         
-        # [修正] 讀取換人相關參數 (犯規上限 & 關鍵時刻閾值)
-        sub_config = general_config.get('substitution', {})
-        self.foul_limit = sub_config.get('foul_limit', 6)
-        self.clutch_threshold = sub_config.get('clutch_time_threshold', 120.0)
+        # 1. 初始化比賽參數
+        self.quarter_length = self.plan.quarter_length
+        self.ot_length = self.plan.ot_length
         
+        # [修正] 讀取換人相關參數 (犯規上限 & 關鍵時刻閾值)
+        self.foul_limit = self.plan.substitution.foul_limit
+        self.clutch_threshold = self.plan.substitution.clutch_threshold
+
+        # 轉播與模擬模式 (score_only 強制不記錄轉播)
+        self.mode = mode
+        self.score_only = (mode == MODE_SCORE_ONLY)
+        if self.score_only:
+            log_level = LOG_OFF
+        self.log_level = log_level
+
+    def reset(self, home_team: EngineTeam, away_team: EngineTeam, game_id: str = "SIM_GAME",
+              rng: Optional[RNG] = None, run_seed=None):
+        """
+        [Optimization] 以同一個引擎物件準備下一場比賽 (沿用 Config / Plan / 模式設定)。
+        兩隊 (可為上一場用過的同一物件) 會先 reset_for_game() 還原為賽前狀態，再執行賽前準備。
+        上一場的 MatchResult 仍有效，但其 Box Score 讀取的是球員物件，需在 reset 前取出。
+        """
+        self.home_team = home_team
+        self.away_team = away_team
+        self.game_id = game_id
+        if rng is None:
+            rng = RNG.for_game(run_seed, game_id) if run_seed is not None else shared_rng
+        self.rng = rng
+
         self.state = MatchState(time_remaining=float(self.quarter_length))
         
         # 2. 執行賽前準備
         self._initialize_match()
         
-        # 3. 初始化 PBP Logs
-        self.pbp_logs = []
+        # 3. 初始化 PBP 事件緩衝區 (文字於賽後依需求產生)
+        self.pbp: Optional[PbpBuffer] = None if self.log_level == LOG_OFF else PbpBuffer()
+        self.pbp_logs: List[str] = []
+
+    # =========================================================================
+    # [New] Snapshot / Restore
+    # =========================================================================
+
+    def snapshot(self) -> bytes:
+        """
+        [New] 將目前的比賽狀態序列化為壓縮後的二進位資料 (pickle + zlib)。
+        內容: MatchState (含流程進度)、兩隊完整狀態 (場上/板凳順序、體力、犯規、統計、快取)、
+        亂數串流位置與轉播緩衝區。可在任一回合之間 (如 iter_events 的事件之間、節間) 呼叫。
+        Config 不寫入快照，僅記錄 EnginePlan 版本，restore 時需提供相同內容的 Config。
+        """
+        payload = {
+            'format': SNAPSHOT_FORMAT,
+            'plan_version': self.plan.version,
+            'log_level': self.log_level,
+            'mode': self.mode,
+            'layout': self.layout,
+            'game_id': self.game_id,
+            'state': self.state,
+            'teams': (self.home_team, self.away_team),
+            'rng_state': self.rng.getstate(),
+            'pbp': self.pbp,
+            'pbp_logs': self.pbp_logs,
+        }
+        return zlib.compress(pickle.dumps(payload, protocol=pickle.HIGHEST_PROTOCOL))
+
+    @classmethod
+    def restore(cls, blob: bytes, config: Dict, rng: Optional[RNG] = None, log_level: Optional[str] = None,
+                profiler: Optional[EngineProfiler] = None) -> 'MatchEngine':
+        """
+        [New] 由 snapshot() 的資料建立引擎，之後呼叫 simulate() / iter_events() 從中斷處繼續。
+        未傳入 rng 時以快照中的串流位置建立獨立串流，續跑結果與未中斷的比賽逐位元一致；
+        傳入其他 rng 則可由同一個時間點分岔出不同的後續發展 (What-if)。
+        log_level: 覆寫快照時的轉播等級 (例如分岔模擬以 'off' 略過轉播)。
+        profiler: 掛載於還原後的引擎 (快照不含原引擎的 profiler)。
+        """
+        payload = pickle.loads(zlib.decompress(blob))
+        if payload.get('format') != SNAPSHOT_FORMAT:
+            raise ValueError(f"Unsupported snapshot format: {payload.get('format')}")
+
+        engine = cls.__new__(cls)
+        engine._configure(config, log_level or payload['log_level'], payload['mode'], payload['layout'])
+        if engine.plan.version != payload['plan_version']:
+            raise ValueError("Snapshot was taken with a different match engine config")
+
+        engine.home_team, engine.away_team = payload['teams']
+        engine.game_id = payload['game_id']
+        engine.state = payload['state']
+        engine.rng = rng if rng is not None else RNG.from_state(payload['rng_state'])
+        if engine.log_level == LOG_OFF:
+            engine.pbp = None
+        else:
+            engine.pbp = payload['pbp'] if payload['pbp'] is not None else PbpBuffer()
+        engine.pbp_logs = payload['pbp_logs']
+        engine.profiler = profiler
+        if profiler is not None:
+            profiler.attach(engine)
+        return engine
 
     def _initialize_match(self):
         """賽前準備流程"""
+        # [Optimization] 就地還原兩隊為賽前狀態 (重複使用的物件撤銷上一場的身高修正與統計)
+        self.home_team.reset_for_game()
+        self.away_team.reset_for_game()
+
+        # [Optimization] 轉播事件以編號引用球隊與球員
+        self.home_team.slot, self.away_team.slot = 0, 1
+        for i, player in enumerate(self.home_team.roster + self.away_team.roster):
+            player.slot = i
+
         # [新增] Spec v2.1 Section 1.5 賽前身高修正 (必須在體力與評分計算前執行)
         self._apply_height_correction(self.home_team)
         self._apply_height_correction(self.away_team)
 
+        # [Optimization] 身高修正後屬性即固定，建立球員的公式總和快取
+        for team in [self.home_team, self.away_team]:
+            for player in team.roster:
+                Calculator.build_formula_cache(player, self.plan)
+                StaminaSystem.prepare_player(player, self.plan)
+            if self.layout == LAYOUT_ARRAYS:
+                team.matrix = TeamMatrix(team) # [New] 陣列佈局: 公式快取攤平為矩陣
+
         for team in [self.home_team, self.away_team]:
             self._calculate_all_positional_scores(team)
             self._determine_best_five(team)
@@ -67,10 +228,8 @@ class MatchEngine:
         [Spec v2.1 Section 1.5] 身高屬性修正 (Initial Height Correction)
         針對特定屬性進行基於身高的物理修正，此為永久性修正。
         """
-        hc_config = self.config.get('match_engine', {}).get('height_correction', {})
-        bonus_h = hc_config.get('bonus_threshold', 190)
-        nerf_h = hc_config.get('nerf_threshold', 210)
-        affected_attrs = hc_config.get('affected_attrs', {})
+        bonus_h = self.plan.height_bonus_threshold
+        nerf_h = self.plan.height_nerf_threshold
 
         for player in team.roster:
             h = getattr(player, 'height', 195)
@@ -83,9 +242,7 @@ class MatchEngine:
                 continue
 
             # 應用修正
-            for _, rule in affected_attrs.items():
-                keys = rule.get('keys', [])
-                coeff = rule.get('coeff', 0.0)
+            for keys, coeff in self.plan.height_affected:
                 multiplier = 1.0 + (factor * coeff)
                 
                 for key in keys:
@@ -98,16 +255,12 @@ class MatchEngine:
 
     def _calculate_all_positional_scores(self, team: EngineTeam):
         """[Spec 1.1] 計算位置評分"""
-        scoring_rules = self.config.get('match_engine', {}).get('positional_scoring', {})
-        attr_pools = self.config.get('match_engine', {}).get('attr_pools', {})
-        positions = ["C", "PF", "SF", "SG", "PG"]
+        scoring_rules = self.plan.positional_scoring
 
         for player in team.roster:
-            player.pos_scores = {}
-            for pos in positions:
-                rule_attrs = scoring_rules.get(pos, [])
-                score = Calculator.get_player_attr_sum(player, rule_attrs, attr_pools)
-                player.pos_scores[pos] = score
+            pos_scores = player.pos_scores # [Optimization] reset_for_game 已清空，沿用同一個 dict
+            for pos, formula in scoring_rules.items():
+                pos_scores[pos] = Calculator.formula_sum(player, formula)
 
     def _determine_best_five(self, team: EngineTeam):
         """[Spec 1.1] 標記最強陣容"""
@@ -139,15 +292,15 @@ class MatchEngine:
 
     def _distribute_team_minutes(self, team: EngineTeam):
         """[Spec 1.4 & 2.6] 上場時間分配"""
-        min_config = self.config.get('minutes_distribution', {})
-        total_minutes = min_config.get('total_minutes', 240)
-        role_config = min_config.get('roles', {})
+        total_minutes = self.plan.total_minutes
+        role_config = self.plan.minutes_roles
+        role_default = self.plan.minutes_default
 
         total_base = 0.0
         active_players = []
         for player in team.roster:
-            role_data = role_config.get(player.role, role_config.get('Bench'))
-            total_base += role_data.get('base', 0)
+            base, _, _ = role_config.get(player.role, role_default)
+            total_base += base
             active_players.append(player)
 
         remaining_time = max(0, total_minutes - total_base)
@@ -155,10 +308,8 @@ class MatchEngine:
         total_weight = 0.0
         player_weights = {}
         for player in active_players:
-            role_data = role_config.get(player.role, role_config.get('Bench'))
-            min_w = role_data.get('min_w', 0)
-            max_w = role_data.get('max_w', 10)
-            w = rng.get_float(float(min_w), float(max_w))
+            _, min_w, max_w = role_config.get(player.role, role_default)
+            w = self.rng.get_float(min_w, max_w)
             player_weights[player.id] = w
             total_weight += w
 
@@ -166,8 +317,7 @@ class MatchEngine:
         allocated_sum = 0.0
 
         for i, player in enumerate(active_players):
-            role_data = role_config.get(player.role, role_config.get('Bench'))
-            base = role_data.get('base', 0)
+            base, _, _ = role_config.get(player.role, role_default)
             raw = base + (player_weights[player.id] * unit_value)
             final = math.floor(raw * 10) / 10.0
             
@@ -214,17 +364,15 @@ class MatchEngine:
                     remaining.remove(best_p)
 
         team.on_court = [p for p in starters if p]
+        team.lineup_epoch += 1 # [Optimization] 先發陣容確立，使團隊加總快取失效
         
         # 標記先發球員
         for p in team.on_court:
             p.is_starter = True
 
         team.bench = [p for p in team.roster if p.id not in taken_ids]
-
-    def _resolve_formula(self, formula: Union[str, List[str]], attr_pools: Dict) -> List[str]:
-        if isinstance(formula, str):
-            return attr_pools.get(formula, [])
-        return formula
+        SubstitutionSystem.build_bench_index(team)
+        team.next_sub_check_at = 0.0
 
     # =========================================================================
     # Simulation Loop
@@ -233,42 +381,110 @@ class MatchEngine:
     def simulate(self) -> MatchResult:
         """
         [Spec v1.8] 執行整場模擬
+        [New] 與 iter_events 共用同一個回合產生器 (_play)，一次跑完且不建立事件物件。
         """
-        # 1. 跳球
-        jb_winner = self._jump_ball()
-        jb_loser = self.home_team.id if jb_winner == self.away_team.id else self.away_team.id
-        
-        # 2. 節次球權
-        q_possessions = {1: jb_winner, 2: jb_loser, 3: jb_loser, 4: jb_winner}
-
-        # 3. 正規賽
-        for q in range(1, 5):
-            self.state.quarter = q
-            self.state.time_remaining = float(self.quarter_length)
-            self.state.possession = q_possessions[q]
-            self.pbp_logs.append(f"=== Q{q} Start (Possession: {self.state.possession}) ===")
-            self._simulate_quarter()
-
-        # 4. 延長賽
-        while self.home_team.score == self.away_team.score:
-            self.state.quarter += 1
-            self.state.time_remaining = float(self.ot_length)
-            ot_winner = self._jump_ball()
-            self.state.possession = ot_winner
-            self.pbp_logs.append(f"=== OT{self.state.quarter-4} Start ===")
-            self._simulate_quarter()
+        for _ in self._play():
+            pass
+        return self._finish()
 
+    def iter_events(self, keep_pbp: bool = True) -> Iterator[MatchEvent]:
+        """
+        [New] 逐回合模擬並產生 MatchEvent (串流轉播 / 逐步分析)。
+        產生器在每個回合之間暫停，消費端可隨時停止讀取；最後一個事件為 EVENT_FINAL (附 MatchResult)，
+        同一個 MatchResult 也作為產生器的回傳值。
+        keep_pbp=False: 每次產生事件後即清空轉播緩衝區，記憶體不隨比賽進行而增加
+                        (此時 MatchResult 的 pbp_log / pbp_events 不含已串流的事件)。
+        """
+        home, away = self.home_team, self.away_team
+        state = self.state
+        offset = 0
+        lineups = (None, None)
+
+        def make_event(kind: str, offense: str = "", elapsed: float = 0.0) -> MatchEvent:
+            nonlocal offset, lineups
+            pbp = []
+            if self.pbp is not None:
+                data = self.pbp.data
+                pbp = [tuple(data[i:i + STRIDE]) for i in range(offset, len(data), STRIDE)]
+                if keep_pbp:
+                    offset = len(data)
+                else:
+                    del data[:]
+            current = (tuple(p.id for p in home.on_court), tuple(p.id for p in away.on_court))
+            changed = current != lineups
+            lineups = current
+            return MatchEvent(kind, state.quarter, state.time_remaining, state.game_time_elapsed,
+                              home.score, away.score, offense, elapsed, current[0], current[1], changed, pbp)
+
+        for kind, off_team, elapsed in self._play():
+            yield make_event(kind, off_team.id if off_team is not None else "", elapsed)
+
+        result = self._finish()
+        event = make_event(EVENT_FINAL)
+        event.result = result
+        yield event
+        return result
+
+    def _play(self) -> Iterator[Tuple[str, Optional[EngineTeam], float]]:
+        """
+        [New] 比賽主流程產生器: 每個回合結束後產生 (EVENT_POSSESSION, 進攻方, 耗時)，
+        每節結束 (含休息) 後產生 (EVENT_PERIOD_END, None, 0.0)。
+        流程進度全部讀寫 MatchState，由快照還原的比賽會從中斷處繼續。
+        """
+        state = self.state
+
+        # 1. 跳球
+        if state.phase == PHASE_PREGAME:
+            state.jump_ball_winner = self._jump_ball()
+            state.quarter = 0
+            state.phase = PHASE_BREAK
+
+        while True:
+            if state.phase == PHASE_BREAK:
+                q = state.quarter + 1
+                if q <= 4:
+                    # 2. 正規賽 (節次球權: Q1/Q4 跳球勝方, Q2/Q3 跳球負方)
+                    jb_winner = state.jump_ball_winner
+                    jb_loser = self.home_team.id if jb_winner == self.away_team.id else self.away_team.id
+                    state.quarter = q
+                    state.time_remaining = float(self.quarter_length)
+                    state.possession = jb_winner if q in (1, 4) else jb_loser
+                    self._log(PbpEvent.QUARTER_START, self._team_by_id(state.possession).slot)
+                elif self.home_team.score == self.away_team.score:
+                    # 3. 延長賽
+                    state.quarter = q
+                    state.time_remaining = float(self.ot_length)
+                    state.possession = self._jump_ball()
+                    self._log(PbpEvent.OT_START)
+                else:
+                    return
+                state.is_opening = (q == 1)
+                state.is_new_possession = True
+                state.keep = False
+                state.phase = PHASE_LIVE
+
+            yield from self._simulate_quarter()
+            state.phase = PHASE_BREAK
+            yield EVENT_PERIOD_END, None, 0.0
+
+    def _finish(self) -> MatchResult:
+        """賽後回填與結果輸出"""
         self.state.is_over = True
 
         # --- 回填邏輯 ---
         for team in [self.home_team, self.away_team]:
             for p in team.roster:
+                StaminaSystem.settle(p, self.state.game_time_elapsed, self.plan) # [Optimization] 結算延遲體力
                 p.stat_remaining_stamina = p.current_stamina
                 # 自動標記出賽：只要上場秒數 > 0 即視為出賽
                 if p.seconds_played > 0:
                     p.is_played = True
         # ------------------
         
+        # [Optimization] 轉播文字僅在 log_level='text' 時於賽後一次產生
+        if self.log_level == LOG_TEXT:
+            self.pbp_logs = self._render_pbp()
+
         # 5. 計算 Pace (Possessions per 48 min)
         total_possessions = self.home_team.stat_possessions + self.away_team.stat_possessions
         total_minutes = self.state.game_time_elapsed / 60.0
@@ -306,14 +522,26 @@ class MatchEngine:
             home_violation_8s=self.home_team.stat_violation_8s,
             home_violation_24s=self.home_team.stat_violation_24s,
             away_violation_8s=self.away_team.stat_violation_8s,
-            away_violation_24s=self.away_team.stat_violation_24s
+            away_violation_24s=self.away_team.stat_violation_24s,
             # =========== [FIX END] ========================
+            pbp_events=self.pbp
         )
 
+    def _render_pbp(self) -> List[str]:
+        """將轉播事件緩衝區轉為文字"""
+        return PbpFormatter.render(self.pbp, self.home_team, self.away_team)
+
+    def _log(self, code: int, team: int = -1, p1: int = -1, p2: int = -1, p3: int = -1, value: float = 0.0):
+        """[Optimization] 寫入一筆轉播事件 (log_level='off' 時略過)"""
+        if self.pbp is not None:
+            self.pbp.add(code, self.state.quarter, self.state.time_remaining, team, p1, p2, p3, value)
+
+    def _team_by_id(self, team_id: str) -> EngineTeam:
+        return self.home_team if team_id == self.home_team.id else self.away_team
+
     def _jump_ball(self) -> str:
         """(Spec 1.5) 跳球"""
-        jb_config = self.config.get('match_engine', {}).get('jump_ball', {})
-        attrs = jb_config.get('participant_formula', ['height', 'ath_jump', 'talent_offiq'])
+        formula = self.plan.jump_ball
         
         def get_jumper(team):
             c = [p for p in team.on_court if p.position == 'C']
@@ -322,119 +550,158 @@ class MatchEngine:
         h_jumper = get_jumper(self.home_team)
         a_jumper = get_jumper(self.away_team)
         
-        h_score = Calculator.get_player_attr_sum(h_jumper, attrs)
-        a_score = Calculator.get_player_attr_sum(a_jumper, attrs)
+        h_score = Calculator.formula_sum(h_jumper, formula)
+        a_score = Calculator.formula_sum(a_jumper, formula)
         total = h_score + a_score or 1
         
-        if rng.decision(h_score / total):
-            self.pbp_logs.append(f"Jump Ball: {self.home_team.name} wins")
+        if self.rng.decision(h_score / total):
+            self._log(PbpEvent.JUMP_BALL, self.home_team.slot)
             return self.home_team.id
         else:
-            self.pbp_logs.append(f"Jump Ball: {self.away_team.name} wins")
+            self._log(PbpEvent.JUMP_BALL, self.away_team.slot)
             return self.away_team.id
 
     def _simulate_quarter(self):
         """
         模擬單節比賽流程
         [Phase 2] 加入 Possession 記錄邏輯
+        [New] 產生器: 每個回合結束後暫停一次 (見 _play)
         """
-        is_opening = (self.state.quarter == 1)
-        
-        # 標記是否為新的一波球權 (節次開始或攻守交換後)
-        is_new_possession = True 
-        is_oreb = False 
-        keep = False
+        # [New] 標記 (該節第一球 / 新的一波球權 / 進攻籃板) 存於 MatchState，於節次開始時由 _play 設定
+        state = self.state
 
-        while self.state.time_remaining > 0:
+        while state.time_remaining > 0:
             self._check_substitutions()
             
             # 1. 確定當前進攻方
-            if self.state.possession == self.home_team.id:
-                off_team, def_team = self.home_team, self.away_team
-            else:
-                off_team, def_team = self.away_team, self.home_team
+            off_team = self.home_team if state.possession == self.home_team.id else self.away_team
             
             # 2. 若是新球權，記錄之 (Pace Calculation)
-            if is_new_possession:
+            if state.is_new_possession:
                 AttributionSystem.record_possession(off_team)
-                is_new_possession = False
+                state.is_new_possession = False
 
             # 3. 執行回合
-            is_oreb = keep if 'keep' in locals() else False 
-            elapsed, desc, keep = self._simulate_possession(is_opening, is_oreb)
+            elapsed, event, keep = self._simulate_possession(state.is_opening, state.keep)
+            state.keep = keep
             
             # [New] 記錄回合消耗時間
             # 將該次進攻所花費的時間，歸屬給進攻方
-            AttributionSystem.record_possession_time(off_team, elapsed)
+            if self.score_only:
+                off_team.stat_possession_seconds += elapsed # 僅累計總時間 (平均回合時間)
+            else:
+                AttributionSystem.record_possession_time(off_team, elapsed)
             
+            possession_start = self.state.game_time_elapsed
             self.state.time_remaining -= elapsed
             self.state.game_time_elapsed += elapsed
+            now = self.state.game_time_elapsed
             
             # Update Stamina & Time
-            for team in [self.home_team, self.away_team]:
-                for p in team.on_court:
-                    p.seconds_played += elapsed
-                    StaminaSystem.update_stamina(p, elapsed, True, self.config)
-                for p in team.bench:
-                    StaminaSystem.update_stamina(p, elapsed, False, self.config)
+            self._update_stamina(elapsed, possession_start, now)
             
-            self.pbp_logs.append(f"[{self.state.quarter}Q {self.state.time_remaining:.1f}] {desc}")
+            if self.pbp is not None and event is not None:
+                self._log(*event)
+
             
             # 4. 攻守交換判定
             if not keep:
                 # 交換球權
-                self.state.possession = self.away_team.id if self.state.possession == self.home_team.id else self.home_team.id
-                is_new_possession = True # 下一回合為新球權
+                state.possession = self.away_team.id if state.possession == self.home_team.id else self.home_team.id
+                state.is_new_possession = True # 下一回合為新球權
             else:
                 # 進攻籃板，維持球權 (不計為新 Possession)
-                is_new_possession = False
+                state.is_new_possession = False
             
-            is_opening = False
+            state.is_opening = False
+
+            # [New] 回合之間的暫停點 (iter_events / snapshot): 此時流程進度已完整寫回 MatchState
+            yield EVENT_POSSESSION, off_team, elapsed
         
         # 讀取時間設定
-        gen_config = self.config.get('match_engine', {}).get('general', {})
-        halftime_min = gen_config.get('stamina_recovery_halftime', 20.0)
-        quarter_break_min = gen_config.get('stamina_recovery_quarter', 2.0)
+        halftime_min = self.plan.stamina.halftime_minutes
+        quarter_break_min = self.plan.stamina.quarter_break_minutes
         
         if self.state.quarter == 2:
             # 中場休息 (Q2 結束)
-            self.pbp_logs.append(f"=== Halftime Break ({halftime_min} mins) ===")
-            StaminaSystem.apply_rest(self.home_team.roster, halftime_min, self.config)
-            StaminaSystem.apply_rest(self.away_team.roster, halftime_min, self.config)
+            self._log(PbpEvent.HALFTIME, value=halftime_min)
+            StaminaSystem.apply_rest(self.home_team.roster, halftime_min, self.plan, self.state.game_time_elapsed)
+            StaminaSystem.apply_rest(self.away_team.roster, halftime_min, self.plan, self.state.game_time_elapsed)
             
         elif self.state.quarter in [1, 3]:
             # 節間休息 (Q1, Q3 結束)
-            self.pbp_logs.append(f"=== Quarter Break ({quarter_break_min} mins) ===")
-            StaminaSystem.apply_rest(self.home_team.roster, quarter_break_min, self.config)
-            StaminaSystem.apply_rest(self.away_team.roster, quarter_break_min, self.config)
+            self._log(PbpEvent.QUARTER_BREAK, value=quarter_break_min)
+            StaminaSystem.apply_rest(self.home_team.roster, quarter_break_min, self.plan, self.state.game_time_elapsed)
+            StaminaSystem.apply_rest(self.away_team.roster, quarter_break_min, self.plan, self.state.game_time_elapsed)
 
         # 3. 延長賽前休息 (Q4 結束平手, 或 OT 結束平手)
         # 邏輯: 若現在是 Q4 或 OT (Q>=4)，且分數平手，代表即將進入下一節，需要休息
         elif self.state.quarter >= 4 and self.home_team.score == self.away_team.score:
-            self.pbp_logs.append(f"=== Overtime Break ({quarter_break_min} mins) ===")
-            StaminaSystem.apply_rest(self.home_team.roster, quarter_break_min, self.config)
-            StaminaSystem.apply_rest(self.away_team.roster, quarter_break_min, self.config)
+            self._log(PbpEvent.OT_BREAK, value=quarter_break_min)
+            StaminaSystem.apply_rest(self.home_team.roster, quarter_break_min, self.plan, self.state.game_time_elapsed)
+            StaminaSystem.apply_rest(self.away_team.roster, quarter_break_min, self.plan, self.state.game_time_elapsed)
+
+        # [Optimization] 休息後全員體力係數可能變動，使團隊加總快取失效
+        self.home_team.lineup_epoch += 1
+        self.away_team.lineup_epoch += 1
+
+    def _update_stamina(self, elapsed: float, possession_start: float, now: float):
+        """
+        回合結束後更新上場時間與體力
+        [Optimization] 延遲結算: 只結算場上球員 (其係數下一回合會用到)，板凳恢復留待需要時補算。
+        與原邏輯相同，本回合的消耗/恢復以「回合結束時」的場上名單為準。
+        """
+        for team in [self.home_team, self.away_team]:
+            for p in team.on_court:
+                p.seconds_played += elapsed
+                if not p.stamina_on_court:
+                    # 本回合上場: 先以板凳恢復結算至回合開始
+                    StaminaSystem.settle(p, possession_start, self.plan)
+                    p.stamina_on_court = True
+                # [Optimization] 場上球員係數變動時，使團隊加總快取失效
+                if StaminaSystem.settle(p, now, self.plan):
+                    team.lineup_epoch += 1
+            for p in team.bench:
+                if p.stamina_on_court:
+                    # 本回合下場: 場上消耗結算至回合開始，之後以恢復計算
+                    StaminaSystem.settle(p, possession_start, self.plan)
+                    p.stamina_on_court = False
 
     def _check_substitutions(self):
         """換人檢查"""
         # 判斷是否為關鍵時刻 (Q4 或 OT 的最後 2 分鐘)
         is_clutch = (self.state.quarter >= 4 and self.state.time_remaining <= self.clutch_threshold)
+        now = self.state.game_time_elapsed
+
+        # [Optimization] 事件驅動: 只有在預測時間到達、犯滿離場 (next_sub_check_at 歸零)
+        # 或進出關鍵時刻時才執行檢查，其餘回合直接略過。
+        if is_clutch != self.state.in_clutch:
+            self.state.in_clutch = is_clutch
+            self.home_team.next_sub_check_at = 0.0
+            self.away_team.next_sub_check_at = 0.0
         
         if is_clutch:
             #  關鍵時刻：強制執行 Best 5 調度
             for team in [self.home_team, self.away_team]:
-                logs = SubstitutionSystem.enforce_best_lineup(team, self.config)
-                self.pbp_logs.extend(logs)
+                if now < team.next_sub_check_at: continue
+                # [Optimization] 板凳球員可能被換上，先結算其延遲體力
+                for p in team.bench:
+                    StaminaSystem.settle(p, now, self.plan)
+                logs = SubstitutionSystem.enforce_best_lineup(team, self.plan)
+                for ev in logs: self._log(*ev)
+                # 調度結果只會因犯滿離場而改變，在此之前無須再檢查
+                team.next_sub_check_at = float('inf')
             return # 執行完強制調度後，依然不進行常規體力檢查
         
         # 非關鍵時刻：執行常規換人檢查 (體力/時間)
         for team in [self.home_team, self.away_team]:
+            if now < team.next_sub_check_at: continue
             logs = SubstitutionSystem.check_auto_substitution(
-                team, self.state.quarter, self.state.time_remaining, self.config
+                team, self.state.quarter, self.state.time_remaining, self.plan, now
             )
-            self.pbp_logs.extend(logs)
+            for ev in logs: self._log(*ev)
 
-    def _simulate_possession(self, is_opening: bool, is_oreb: bool = False) -> Tuple[float, str, bool]:
+    def _simulate_possession(self, is_opening: bool, is_oreb: bool = False) -> Tuple[float, Optional[Tuple], bool]:
         """
         單一回合模擬
         更新 v2.4: 支援後場抄截後的「即時攻守交換」(Instant Transition)
@@ -539,105 +806,91 @@ class MatchEngine:
         (Spec 3) 後場階段
         更新 v2.3: 實作速度總和判定的攻守轉換
         """
-        bc_config = self.config.get('match_engine', {}).get('backcourt', {})
-        params = bc_config.get('params', {})
-        formulas = bc_config.get('formulas', {})
-        attr_pools = self.config.get('match_engine', {}).get('attr_pools', {})
+        bp = self.plan.backcourt
 
         # Calc Time
-        off_sum = Calculator.get_team_attr_sum(off_team.on_court[:3], self._resolve_formula(formulas.get('off_sum', []), attr_pools), attr_pools)
-        def_sum = Calculator.get_team_attr_sum(def_team.on_court[:3], self._resolve_formula(formulas.get('def_sum', []), attr_pools), attr_pools)
-        
+        off_sum = Calculator.backcourt_sum(off_team, bp.off_sum)
+        def_sum = Calculator.backcourt_sum(def_team, bp.def_sum)
+
         if is_opening:
-            final_time = params.get('opening_seconds', 2.0)
+            final_time = bp.opening_seconds
         else:
-            base = rng.get_float(params.get('time_base_min', 1.0), params.get('time_base_max', 8.0))
-            diff_mod = (def_sum - off_sum) * params.get('time_coeff', 0.008)
-            
+            base = self.rng.get_float(bp.time_base_min, bp.time_base_max)
+            diff_mod = (def_sum - off_sum) * bp.time_coeff
+
             # [New v2.4] 速度折扣
-            spd_formula = formulas.get('backcourt_speed', ['ath_speed'])
-            spd_sum_off = Calculator.get_team_attr_sum(off_team.on_court[:3], spd_formula, attr_pools)
+            spd_sum_off = Calculator.backcourt_sum(off_team, bp.speed)
             avg_spd_off = spd_sum_off / 3.0 if spd_sum_off > 0 else 50.0
-            spd_sum_def = Calculator.get_team_attr_sum(def_team.on_court[:3], spd_formula, attr_pools)
+            spd_sum_def = Calculator.backcourt_sum(def_team, bp.speed)
             avg_spd_def = spd_sum_def / 3.0 if spd_sum_def > 0 else 50.0
-            
-            discount_coeff = params.get('speed_discount_coeff', 0.1)
-            discount_coeff_def = params.get('speed_discount_coeff_def', 0.5)
-            discount_off = rng.get_float(0.0, avg_spd_off * discount_coeff)
-            discount_def = rng.get_float(0.0, avg_spd_def * discount_coeff) * discount_coeff_def
-            
+
+            discount_off = self.rng.get_float(0.0, avg_spd_off * bp.speed_discount_coeff)
+            discount_def = self.rng.get_float(0.0, avg_spd_def * bp.speed_discount_coeff) * bp.speed_discount_coeff_def
+
             final_time = base + diff_mod - discount_off + discount_def
-            
+
             # 物理下限
-            min_limit = params.get('min_time_limit', 0.5)
-            final_time = max(min_limit, final_time)
+            final_time = max(bp.min_time_limit, final_time)
 
         # 2. 8秒違例判定 (修改記錄方法)
-        if final_time > params.get('violation_threshold', 8.0):
+        if final_time > bp.violation_threshold:
             # [Modified] 改用專屬的 8秒違例記錄方法
             AttributionSystem.record_8sec_violation(off_team)
             final_time = 8.0
-            return final_time, 'turnover', f"{off_team.name} 8-sec Violation"
-        
+            return final_time, 'turnover', (PbpEvent.VIOLATION_8S, off_team.slot)
+
         # [Modified] 抄截判定
-        if final_time > params.get('steal_threshold', 3.0):
-            prob = params.get('steal_base_prob', 0.01) + (def_sum - off_sum) * params.get('steal_bonus_coeff', 0.001)
-            
-            if rng.decision(prob):
-                stealer = AttributionSystem.determine_stealer(def_team, self.config)
-                AttributionSystem.record_steal(stealer, off_team)
-                
+        if final_time > bp.steal_threshold:
+            prob = bp.steal_base_prob + (def_sum - off_sum) * bp.steal_bonus_coeff
+
+            if self.rng.decision(prob):
+                if not self.score_only:
+                    stealer = AttributionSystem.determine_stealer(def_team, self.plan, self.rng)
+                    AttributionSystem.record_steal(stealer, off_team)
+
                 # [New v2.4] 攻守轉換判定 (Transition Decision)
                 # 1. 計算雙方全隊速度總和
-                spd_formula = formulas.get('team_speed_sum', ['ath_speed'])
-                off_spd_sum = Calculator.get_team_attr_sum(off_team.on_court, spd_formula, attr_pools)
-                def_spd_sum = Calculator.get_team_attr_sum(def_team.on_court, spd_formula, attr_pools)
-                
+                off_spd_sum = Calculator.lineup_sum(off_team, bp.team_speed)
+                def_spd_sum = Calculator.lineup_sum(def_team, bp.team_speed)
+
                 # 2. 計算轉換機率
                 # 公式: 50% + (守方總和 - 攻方總和) / 攻方總和
-                base_prob = params.get('transition_base_prob', 0.50)
                 ratio = 0.0
                 if off_spd_sum > 0:
                     ratio = (def_spd_sum - off_spd_sum) / off_spd_sum
-                
-                transition_prob = base_prob + ratio
-                
+
+                transition_prob = bp.transition_base_prob + ratio
+
                 # 3. 判定分支
-                if rng.decision(transition_prob):
+                if self.rng.decision(transition_prob):
                     # 觸發快攻
-                    return final_time, 'steal_fastbreak', f"{def_team.name} Steal & Fastbreak"
+                    return final_time, 'steal_fastbreak', None
                 else:
                     # 觸發陣地戰 (直接進前場)
-                    return final_time, 'steal_frontcourt', f"{def_team.name} Steal & Transition"
+                    return final_time, 'steal_frontcourt', None
 
         # 快攻判定：需同時滿足「時間門檻」與「機率檢定」
         # 1. 檢查時間是否夠快
-        if final_time < params.get('fastbreak_threshold', 1.0):
-            # 2. 取得觸發機率 (預設 0.5)
-            fb_prob = params.get('fastbreak_trigger_prob', 0.5)
-            
-            # 3. 進行機率骰子 (rng.random() 會回傳 0.0 ~ 1.0 之間的浮點數)
-            if rng.decision(fb_prob):
+        if final_time < bp.fastbreak_threshold:
+            # 2. 進行機率骰子 (觸發機率預設 0.5)
+            if self.rng.decision(bp.fastbreak_trigger_prob):
                 return self._run_fastbreak(off_team, def_team, final_time)
-        
-        return final_time, 'frontcourt', "Advance"
+
+        return final_time, 'frontcourt', None
 
     def _run_frontcourt(self, off_team: EngineTeam, def_team: EngineTeam, elapsed_bc: float, is_oreb: bool = False):
         """(Spec 4) 前場階段 [Update v2.4 速度折扣 & 24秒違例]"""
-        # 1. 讀取設定檔參數
-        fc_config = self.config.get('match_engine', {}).get('frontcourt', {})
-        params = fc_config.get('params', {})
-        formulas = fc_config.get('formulas', {})
-        attr_pools = self.config.get('match_engine', {}).get('attr_pools', {})
-        
+        # 1. 讀取編譯後的前場設定
+        fp = self.plan.frontcourt
+
         ctx = {'quality': 0.0, 'spacing': 0.0}
-        
+
         # 2. 時間計算 (Time Calculation)
         # 計算基於智商與傳導的時間縮減量
-        red_attr = Calculator.get_team_attr_sum(off_team.on_court, self._resolve_formula(formulas.get('time_reduction', []), attr_pools), attr_pools)
+        red_attr = Calculator.lineup_sum(off_team, fp.time_reduction)
         reduction = (red_attr / 1000.0) * 0.5
         min_time = max(4.0, 4.0 - reduction)
-        
+
         # 計算本回合剩餘可用的進攻時間上限 (24秒 - 後場已用時間)
         # 確保上限至少比下限大 1.0 秒，避免隨機錯誤
         # 修改時間上限邏輯
@@ -645,212 +898,180 @@ class MatchEngine:
             # 進攻籃板：上限固定 14 秒 (且不受後場時間影響，因為沒回後場)
             max_time = 14.0
             # 下限也要確保合理
-            min_time = min(min_time, 13.0) 
+            min_time = min(min_time, 13.0)
         else:
             # 一般進攻：24 - 後場時間
             max_time = max(min_time + 1.0, 24.0 - elapsed_bc)
-        
+
         # 初步隨機產生花費時間
-        elapsed = rng.get_float(min_time, max_time)
-        
+        elapsed = self.rng.get_float(min_time, max_time)
+
         # [New v2.4] 速度折扣 (Speed Discount)
         # 計算進攻方場上 5 人的速度總和
-        spd_formula = formulas.get('frontcourt_speed', ['ath_speed'])
-        spd_sum_off = Calculator.get_team_attr_sum(off_team.on_court, spd_formula, attr_pools)
+        spd_sum_off = Calculator.lineup_sum(off_team, fp.speed)
         avg_spd_off = spd_sum_off / 5.0 if spd_sum_off > 0 else 50.0
-        spd_sum_def = Calculator.get_team_attr_sum(def_team.on_court, spd_formula, attr_pools)
+        spd_sum_def = Calculator.lineup_sum(def_team, fp.speed)
         avg_spd_def = spd_sum_def / 5.0 if spd_sum_def > 0 else 50.0
-        
+
         # 計算折扣秒數 (速度越快，花費時間越少)
-        discount_coeff = params.get('speed_discount_coeff', 0.1)
-        discount_off = rng.get_float(0.0, avg_spd_off * discount_coeff)
-        discount_def = rng.get_float(0.0, avg_spd_def * discount_coeff)
-        
+        discount_off = self.rng.get_float(0.0, avg_spd_off * fp.speed_discount_coeff)
+        discount_def = self.rng.get_float(0.0, avg_spd_def * fp.speed_discount_coeff)
+
         # 應用折扣
         elapsed -= discount_off
         elapsed += discount_def
-        
+
         # 確保物理時間下限 (不能低於 1.0 秒)
-        abs_min = params.get('absolute_min_time', 1.0)
-        elapsed = max(abs_min, elapsed)
-        
+        elapsed = max(fp.absolute_min_time, elapsed)
+
         # 3. 24秒違例判定 (24-Sec Violation)
         # 若 (後場時間 + 前場時間) 超過 24 秒，則判定違例
-        violation_limit = params.get('violation_threshold', 24.0)
-        if (elapsed_bc + elapsed) > violation_limit:
+        if (elapsed_bc + elapsed) > fp.violation_threshold:
             AttributionSystem.record_24sec_violation(off_team)
             elapsed = 24.0
-            return elapsed, 'turnover', f"{off_team.name} 24秒進攻違例", ctx
+            return elapsed, 'turnover', (PbpEvent.VIOLATION_24S, off_team.slot), ctx
 
         # 4. 計算出手品質 (Quality)
         # 時間花費越少，品質越高 (代表跑出空檔或流暢配合)
-        if elapsed < 7.0: 
+        if elapsed < 7.0:
             ctx['quality'] = (7.0 - elapsed) * 0.01
-        
+
         # 5. 空間與跑位判定 (Spacing)
-        off_sp = Calculator.get_team_attr_sum(off_team.on_court, self._resolve_formula(formulas.get('spacing_off', []), attr_pools), attr_pools)
-        def_sp = Calculator.get_team_attr_sum(def_team.on_court, self._resolve_formula(formulas.get('spacing_def', []), attr_pools), attr_pools) or 1
-        
+        off_sp = Calculator.lineup_sum(off_team, fp.spacing_off)
+        def_sp = Calculator.lineup_sum(def_team, fp.spacing_def) or 1
+
         # 計算空間加成 (-1.0 ~ 1.0)
-        sp_bonus = max(-1.0, min(1.0, (off_sp - def_sp)/def_sp + rng.get_float(-0.1, 0.1)))
+        sp_bonus = max(-1.0, min(1.0, (off_sp - def_sp)/def_sp + self.rng.get_float(-0.1, 0.1)))
         ctx['spacing'] = sp_bonus
 
         # 6. 封阻判定 (Block - Spec 4.3)
         # 若空間擁擠 (sp_bonus <= 0.5)，封阻機率提升
         if sp_bonus <= 0.5:
-            # --- Config Loading ---
-            blk_config = fc_config.get('block', {})
-            blk_params = blk_config.get('params', {})
-            blk_formulas = blk_config.get('formulas', {})
-
             # --- 階段一：觸發判定 (Attempt Check) ---
-            trigger_off_keys = self._resolve_formula(blk_formulas.get('trigger_off', ['off_move']), attr_pools)
-            trigger_def_keys = self._resolve_formula(blk_formulas.get('trigger_def', ['def_contest', 'talent_defiq']), attr_pools)
-            
             # 計算團隊觸發值 (Team Sum)
-            trig_off_val = Calculator.get_team_attr_sum(off_team.on_court, trigger_off_keys, attr_pools)
-            trig_def_val = Calculator.get_team_attr_sum(def_team.on_court, trigger_def_keys, attr_pools)
-            
+            trig_off_val = Calculator.lineup_sum(off_team, fp.block_trigger_off)
+            trig_def_val = Calculator.lineup_sum(def_team, fp.block_trigger_def)
+
             # 計算機率
-            # 基礎機率 1%
-            base_prob = blk_params.get('base_prob', 0.01)
             # 屬性修正: (防守 - 進攻) * 0.0001 (每100點差值+1%)
             attr_mod = (trig_def_val - trig_off_val) * 0.0001
             # 空間懲罰: 空間擁擠時大幅提升封蓋率
-            spacing_penalty = blk_params.get('spacing_penalty_prob', 0.05) if sp_bonus < 0 else 0.0
-            
-            attempt_prob = max(0.0, base_prob + attr_mod + spacing_penalty)
-            
-            if rng.decision(attempt_prob):
+            spacing_penalty = fp.block_spacing_penalty_prob if sp_bonus < 0 else 0.0
+
+            attempt_prob = max(0.0, fp.block_base_prob + attr_mod + spacing_penalty)
+
+            if self.rng.decision(attempt_prob):
                 # --- 階段二：對抗判定 (Success Check) ---
-                
+
                 # 1. 決定角色
                 # 預測出手者 (Shooter)
-                shooter = AttributionSystem.determine_shooter(off_team, False, self.config)
+                shooter = AttributionSystem.determine_shooter(off_team, False, self.plan, self.rng)
                 # 決定對位防守者 (Blocker) - 依據 Spec 6.6 封蓋歸屬規則
                 blocker = AttributionSystem.get_position_matchup(shooter, def_team)
-                
+
                 # 2. 計算對抗能力 (Power)
-                power_off_keys = self._resolve_formula(blk_formulas.get('power_off', ['ath_strength', 'ath_jump', 'talent_offiq', 'height']), attr_pools)
-                power_def_keys = self._resolve_formula(blk_formulas.get('power_def', ['ath_strength', 'ath_jump', 'def_contest', 'talent_defiq', 'height']), attr_pools)
-                
-                p_off = Calculator.get_player_attr_sum(shooter, power_off_keys, attr_pools)
-                p_def = Calculator.get_player_attr_sum(blocker, power_def_keys, attr_pools)
-                
+                p_off = Calculator.formula_sum(shooter, fp.block_power_off)
+                p_def = Calculator.formula_sum(blocker, fp.block_power_def)
+
                 # 3. 計算成功率
                 # Spec: Ratio = Off / Def. 數值越低防守優勢越大.
                 # 轉換為機率: Def / (Off + Def)
                 # 若 Off=500, Def=500 -> 50% 機率蓋掉
                 success_prob = p_def / (p_off + p_def) if (p_off + p_def) > 0 else 0.5
-                
-                if rng.decision(success_prob):
+
+                if self.rng.decision(success_prob):
                     # 封蓋成功 -> 失誤
-                    AttributionSystem.record_block(blocker, shooter)
-                    return elapsed, 'turnover', f"{def_team.name} {blocker.name} 封阻成功 (Block {shooter.name})", ctx
+                    if not self.score_only:
+                        AttributionSystem.record_block(blocker, shooter)
+                    return elapsed, 'turnover', (PbpEvent.BLOCK, def_team.slot, blocker.slot, shooter.slot), ctx
                 else:
                     # 封蓋失敗 -> 進攻方強行出手 (繼續流程)
                     # 可以在 ctx 中標記 'contested'，影響後續命中率或犯規率 (Optional)
                     ctx['is_contested'] = True
 
         # 7. 抄截判定 (Steal - Spec 4.4 Full Implementation)
-        # 讀取設定
-        stl_config = fc_config.get('steal', {})
-        stl_params = stl_config.get('params', {})
-        stl_formulas = stl_config.get('formulas', {})
-
-        # 1. 解析屬性公式 (Spec: Off_Ball vs Def_Steal)
-        # 預設值對應 YAML: off_dribble+off_handle+off_pass+off_iq-height
-        off_keys = self._resolve_formula(stl_formulas.get('off_attr', []), attr_pools)
-        # 預設值對應 YAML: speed+def_disrupt+def_iq-height
-        def_keys = self._resolve_formula(stl_formulas.get('def_attr', []), attr_pools)
-
-        # 2. 計算團隊屬性總和
+        # 1. 計算團隊屬性總和 (Spec: Off_Ball vs Def_Steal)
         # 這裡使用團隊總和來代表當下防守壓迫力與進攻穩定度
-        off_val = Calculator.get_team_attr_sum(off_team.on_court, off_keys, attr_pools)
-        def_val = Calculator.get_team_attr_sum(def_team.on_court, def_keys, attr_pools)
+        off_val = Calculator.lineup_sum(off_team, fp.steal_off)
+        def_val = Calculator.lineup_sum(def_team, fp.steal_def)
 
-        # 3. 計算最終機率
-        base_prob = stl_params.get('base_prob', 0.01)       # 基礎 1%
-        coeff = stl_params.get('stat_diff_coeff', 0.001)    # 係數 0.1%
-        
+        # 2. 計算最終機率
         # 公式: 1% + (Def_Steal - Off_Ball) * 係數
-        final_prob = max(0.001, base_prob + (def_val - off_val) * coeff)
+        final_prob = max(0.001, fp.steal_base_prob + (def_val - off_val) * fp.steal_stat_diff_coeff)
 
-        if rng.decision(final_prob):
+        if self.rng.decision(final_prob):
+            if self.score_only:
+                return elapsed, 'turnover', None, ctx
             # 決定抄截者 (Spec 6.5)
-            stealer = AttributionSystem.determine_stealer(def_team, self.config)
+            stealer = AttributionSystem.determine_stealer(def_team, self.plan, self.rng)
             # 記錄抄截與失誤 (Spec 6.7)
             AttributionSystem.record_steal(stealer, off_team)
-            return elapsed, 'turnover', f"{def_team.name} {stealer.name} 前場抄截", ctx
+            return elapsed, 'turnover', (PbpEvent.STEAL, def_team.slot, stealer.slot), ctx
 
         # 8. 進入投籃階段
-        return elapsed, 'shooting', "投籃出手", ctx
+        return elapsed, 'shooting', None, ctx
 
-    def _run_fastbreak(self, off_team: EngineTeam, def_team: EngineTeam, elapsed: float) -> Tuple[float, str, str]:
+    def _run_fastbreak(self, off_team: EngineTeam, def_team: EngineTeam, elapsed: float) -> Tuple[float, str, Tuple]:
         """
         (Spec 3.5) 快攻判定 (Fastbreak)
         依據規格書 v2.4 完整實作：參與者篩選 -> 成功率計算 -> 犯規判定 -> 四種結果結算
         """
-        fb_config = self.config.get('match_engine', {}).get('backcourt', {}).get('fastbreak', {})
-        params = fb_config.get('params', {})
-        formulas = fb_config.get('formulas', {})
-        attr_pools = self.config.get('match_engine', {}).get('attr_pools', {})
-        
+        fbp = self.plan.fastbreak
+
         # 1. 參與者篩選 (Participants)
         # 進攻者 (Runner): 取場上 (速度 + 運球) 最高者
-        runner_keys = self._resolve_formula(formulas.get('runner_selection', ['ath_speed', 'off_dribble']), attr_pools)
-        runner = max(off_team.on_court, key=lambda p: Calculator.get_player_attr_sum(p, runner_keys, attr_pools))
-        
+        runner = max(off_team.on_court, key=lambda p: Calculator.formula_sum(p, fbp.runner_selection))
+
         # 防守者 (Chaser): 取場上 (速度 + 防守智商) 最高者
-        chaser_keys = self._resolve_formula(formulas.get('chaser_selection', ['ath_speed', 'talent_defiq']), attr_pools)
-        chaser = max(def_team.on_court, key=lambda p: Calculator.get_player_attr_sum(p, chaser_keys, attr_pools))
-        
+        chaser = max(def_team.on_court, key=lambda p: Calculator.formula_sum(p, fbp.chaser_selection))
+
         # 2. 進球成功率 (Success Rate)
         # 基礎成功率: 隨機 0.3 ~ 1.0
-        base_rate = rng.get_float(params.get('base_success_min', 0.3), params.get('base_success_max', 1.0))
-        
+        base_rate = self.rng.get_float(fbp.base_success_min, fbp.base_success_max)
+
         # 屬性修正: (Off_Stat - Def_Stat) * 0.5%
-        off_power = Calculator.get_player_attr_sum(runner, self._resolve_formula(formulas.get('off_power', []), attr_pools), attr_pools)
-        def_power = Calculator.get_player_attr_sum(chaser, self._resolve_formula(formulas.get('def_power', []), attr_pools), attr_pools)
-        diff_mod = (off_power - def_power) * params.get('stat_diff_coeff', 0.005)
-        
+        off_power = Calculator.formula_sum(runner, fbp.off_power)
+        def_power = Calculator.formula_sum(chaser, fbp.def_power)
+        diff_mod = (off_power - def_power) * fbp.stat_diff_coeff
+
         final_success_rate = min(1.0, base_rate + diff_mod)
-        is_success = rng.decision(final_success_rate)
-        
+        is_success = self.rng.decision(final_success_rate)
+
         # [Phase 2] 記錄快攻事件 (無論結果如何都記錄嘗試)
         AttributionSystem.record_fastbreak_event(off_team, runner, is_success)
 
         # 3. 犯規判定 (Foul Check)
         # 核心屬性: 進攻智商 vs 防守智商
-        off_iq = Calculator.get_player_attr_sum(runner, self._resolve_formula(formulas.get('foul_off_iq', ['talent_offiq']), attr_pools), attr_pools)
-        def_iq = Calculator.get_player_attr_sum(chaser, self._resolve_formula(formulas.get('foul_def_iq', ['talent_defiq']), attr_pools), attr_pools)
-        
+        off_iq = Calculator.formula_sum(runner, fbp.foul_off_iq)
+        def_iq = Calculator.formula_sum(chaser, fbp.foul_def_iq)
+
         # 犯規機率: 1% + (Off_IQ - Def_IQ) * 1%
-        foul_base = params.get('foul_base_prob', 0.01)
-        foul_coeff = params.get('foul_iq_coeff', 0.01)
-        foul_prob = max(0.001, foul_base + (off_iq - def_iq) * foul_coeff)
-        
-        is_foul = rng.decision(foul_prob)
+        foul_prob = max(0.001, fbp.foul_base_prob + (off_iq - def_iq) * fbp.foul_iq_coeff)
+
+        is_foul = self.rng.decision(foul_prob)
 
         # 4. 最終結果結算 (Outcome)
-        log_desc = ""
+        log_event = None
         res_type = ""
 
         if is_success:
             # --- 情況 A & B: 快攻進球 ---
-            AttributionSystem.record_score(off_team, runner, 2, False)
-            AttributionSystem.update_plus_minus(off_team, def_team, 2)
-            
+            if self.score_only:
+                off_team.score += 2
+            else:
+                AttributionSystem.record_score(off_team, runner, 2, False)
+                AttributionSystem.update_plus_minus(off_team, def_team, 2)
+
             if is_foul:
                 # [情況 B] 進算加罰 (And-1)
                 AttributionSystem.record_foul(chaser)
                 self._check_and_handle_foul_out(def_team, chaser)
                 made = self._run_free_throw(off_team, def_team, runner, 1)
-                log_desc = f"{off_team.name} {runner.name} 快攻進算加罰 (And-1, FT {made}/1)"
+                log_event = (PbpEvent.FB_AND_ONE, off_team.slot, runner.slot, -1, -1, made)
                 res_type = 'score'
             else:
                 # [情況 A] 快攻得分
-                log_desc = f"{off_team.name} {runner.name} 快攻得分"
+                log_event = (PbpEvent.FB_SCORE, off_team.slot, runner.slot)
                 res_type = 'score'
         else:
             # --- 情況 C & D: 快攻失敗 ---
@@ -859,121 +1080,122 @@ class MatchEngine:
                 AttributionSystem.record_foul(chaser)
                 self._check_and_handle_foul_out(def_team, chaser)
                 made = self._run_free_throw(off_team, def_team, runner, 2)
-                log_desc = f"{off_team.name} {runner.name} 快攻遭犯規 (FT {made}/2)"
+                log_event = (PbpEvent.FB_FOULED, off_team.slot, runner.slot, -1, -1, made)
                 # 雖然沒進球，但有罰球產出，視同得分流程結束，回傳 score 類型以觸發攻守交換
-                res_type = 'score' 
+                res_type = 'score'
             else:
                 # [情況 D] 防守成功 (視為失誤/被擋下)
                 # 歸屬防守籃板給追防者 (或可視為火鍋，此處依 Spec 簡化為防守成功)
-                AttributionSystem.record_rebound(chaser, False)
-                log_desc = f"{off_team.name} {runner.name} 快攻失敗 (被 {chaser.name} 擋下)"
+                if not self.score_only:
+                    AttributionSystem.record_rebound(chaser, False)
+                log_event = (PbpEvent.FB_STOPPED, off_team.slot, runner.slot, chaser.slot)
                 res_type = 'turnover'
 
-        return elapsed, res_type, log_desc
+        return elapsed, res_type, log_event
 
-    def _run_shooting(self, off_team: EngineTeam, def_team: EngineTeam, ctx: Dict) -> Tuple[str, bool]:
+    def _run_shooting(self, off_team: EngineTeam, def_team: EngineTeam, ctx: Dict) -> Tuple[Tuple, bool]:
         """
         [Spec 5] 投籃結算
         """
-        sht_config = self.config.get('match_engine', {}).get('shooting', {})
-        params = sht_config.get('params', {})
-        formulas = sht_config.get('formulas', {})
-        attr_pools = self.config.get('match_engine', {}).get('attr_pools', {})
+        sp = self.plan.shooting
 
         # 1. Type (決定是 2分 或 3分)
         # 這部分涉及隨機判定，保留在 Core 中
-        range_sum = Calculator.get_team_attr_sum(off_team.on_court, self._resolve_formula(formulas.get('range_attr', []), attr_pools), attr_pools) or 1
+        range_sum = Calculator.lineup_sum(off_team, sp.range_attr) or 1
         threshold = 1.0 / (range_sum / 100.0)
-        is_3pt = rng.get_float(0.0, 1.0) > threshold
+        is_3pt = self.rng.get_float(0.0, 1.0) > threshold
         points = 3 if is_3pt else 2
 
         # 2. Shooter (決定出手者)
-        shooter = AttributionSystem.determine_shooter(off_team, is_3pt, self.config)
+        shooter = AttributionSystem.determine_shooter(off_team, is_3pt, self.plan, self.rng)
 
         # 3. Hit Rate (命中率計算) - [Refactored] 完全呼叫 Calculator
         hit_rate = Calculator.calculate_shooting_rate(
-          off_players=off_team.on_court,  # 進攻全隊 (用於對抗)
-          def_players=def_team.on_court,  # 防守全隊 (用於對抗)
+          off_team=off_team,              # 進攻全隊 (用於對抗)
+          def_team=def_team,              # 防守全隊 (用於對抗)
           shooter=shooter,                # 出手者 (用於技巧加成)
-          config=self.config,
+          plan=self.plan,
           spacing_factor=ctx.get('spacing', 0.0),
           quality_bonus=ctx.get('quality', 0.0),
           is_3pt=is_3pt
         )
-        
-        is_hit = rng.decision(hit_rate)
+
+        is_hit = self.rng.decision(hit_rate)
 
         # 4. Foul (犯規判定)
-        off_iq = Calculator.get_team_attr_sum(off_team.on_court, self._resolve_formula(formulas.get('foul_off_iq', []), attr_pools), attr_pools)
-        def_iq = Calculator.get_team_attr_sum(def_team.on_court, self._resolve_formula(formulas.get('foul_def_iq', []), attr_pools), attr_pools) or 1
+        off_iq = Calculator.lineup_sum(off_team, sp.foul_off_iq)
+        def_iq = Calculator.lineup_sum(def_team, sp.foul_def_iq) or 1
         foul_prob = max(0.01, (off_iq - def_iq) / def_iq)
-        is_foul = rng.decision(foul_prob)
-        
-        log = ""
+        is_foul = self.rng.decision(foul_prob)
+
+        log = None
         keep = False
 
         if is_hit:
-            AttributionSystem.record_score(off_team, shooter, points, is_3pt)
-            # [New] 更新 +/-
-            AttributionSystem.update_plus_minus(off_team, def_team, points)
-            
-            log = f"{off_team.name} {shooter.name} {points}pt Good"
-            
-            # Assist
-            ast_config = sht_config.get('assist', {})
-            ast_formulas = ast_config.get('formulas', {})
-            team_stat = Calculator.get_team_attr_sum(off_team.on_court, self._resolve_formula(ast_formulas.get('team_stat', []), attr_pools), attr_pools)
-            luck_stat = Calculator.get_team_attr_sum(off_team.on_court, self._resolve_formula(ast_formulas.get('luck_stat', []), attr_pools), attr_pools) or 1
-            
-            ast_prob = (team_stat / (1.0/luck_stat)) * params.get('assist_prob_coeff', 0.1)
-            
-            if rng.decision(ast_prob):
-                passer = AttributionSystem.determine_assist_provider(off_team, shooter, self.config)
-                if passer:
-                    AttributionSystem.record_assist(passer)
-                    log += f" (Ast {passer.name})"
-            
+            passer_slot = -1
+
+            if self.score_only:
+                # 助攻不影響比分，略過 (含其兩次隨機抽選)
+                off_team.score += points
+            else:
+                AttributionSystem.record_score(off_team, shooter, points, is_3pt)
+                # [New] 更新 +/-
+                AttributionSystem.update_plus_minus(off_team, def_team, points)
+
+                # Assist
+                team_stat = Calculator.lineup_sum(off_team, sp.assist_team_stat)
+                luck_stat = Calculator.lineup_sum(off_team, sp.assist_luck_stat) or 1
+
+                ast_prob = (team_stat / (1.0/luck_stat)) * sp.assist_prob_coeff
+
+                if self.rng.decision(ast_prob):
+                    passer = AttributionSystem.determine_assist_provider(off_team, shooter, self.plan, self.rng)
+                    if passer:
+                        AttributionSystem.record_assist(passer)
+                        passer_slot = passer.slot
+
             if is_foul:
-                fouler = rng.choice(def_team.on_court)
+                fouler = self.rng.choice(def_team.on_court)
                 AttributionSystem.record_foul(fouler)
                 # [Update] 傳入 def_team 以計算 +/-
                 self._run_free_throw(off_team, def_team, shooter, 1)
-                log += " (And-1)"
                 # [新增] 檢查是否犯滿離場
                 self._check_and_handle_foul_out(def_team, fouler)
+
+            # 轉播事件: value = 分數 + 10 * (And-1)
+            log = (PbpEvent.SHOT_MADE, off_team.slot, shooter.slot, passer_slot, -1, points + (10 if is_foul else 0))
         else:
-            AttributionSystem.record_attempt(shooter, is_3pt)
-            log = f"{off_team.name} {shooter.name} {points}pt Miss"
-            
+            if not self.score_only:
+                AttributionSystem.record_attempt(shooter, is_3pt)
+
             if is_foul:
-                fouler = rng.choice(def_team.on_court)
+                fouler = self.rng.choice(def_team.on_court)
                 AttributionSystem.record_foul(fouler)
                 ft_count = 3 if is_3pt else 2
                 # [Update] 傳入 def_team 以計算 +/-
                 made = self._run_free_throw(off_team, def_team, shooter, ft_count)
-                log += f" (Foul {made}/{ft_count})"
+                log = (PbpEvent.SHOT_MISS_FOULED, off_team.slot, shooter.slot, -1, -1, points + 10 * made)
                 # [新增] 檢查是否犯滿離場
                 self._check_and_handle_foul_out(def_team, fouler)
             else:
                 # Rebound
-                reb_config = sht_config.get('rebound', {})
-                reb_formulas = reb_config.get('formulas', {})
-                
-                off_reb_attr = Calculator.get_team_attr_sum(off_team.on_court, self._resolve_formula(reb_formulas.get('off_attr', []), attr_pools), attr_pools)
-                def_reb_attr = Calculator.get_team_attr_sum(def_team.on_court, self._resolve_formula(reb_formulas.get('def_attr', []), attr_pools), attr_pools)
-                
+                off_reb_attr = Calculator.lineup_sum(off_team, sp.rebound_off)
+                def_reb_attr = Calculator.lineup_sum(def_team, sp.rebound_def)
+
                 dr_prob = 0.10 + (def_reb_attr / (off_reb_attr + def_reb_attr or 1))
-                
-                if rng.decision(dr_prob):
-                    rebounder = AttributionSystem.determine_rebounder(off_team, def_team, True, self.config)
-                    AttributionSystem.record_rebound(rebounder, False)
-                    log += f" (Reb {rebounder.name})"
+
+                if self.rng.decision(dr_prob):
                     keep = False
+                    if self.score_only: return log, keep # 籃板歸屬不影響比分
+                    rebounder = AttributionSystem.determine_rebounder(off_team, def_team, True, self.plan, self.rng)
+                    AttributionSystem.record_rebound(rebounder, False)
+                    log = (PbpEvent.SHOT_MISS_DREB, off_team.slot, shooter.slot, rebounder.slot, -1, points)
                 else:
-                    rebounder = AttributionSystem.determine_rebounder(off_team, def_team, False, self.config)
-                    AttributionSystem.record_rebound(rebounder, True)
-                    log += f" (Off Reb {rebounder.name})"
                     keep = True
+                    if self.score_only: return log, keep
+                    rebounder = AttributionSystem.determine_rebounder(off_team, def_team, False, self.plan, self.rng)
+                    AttributionSystem.record_rebound(rebounder, True)
+                    log = (PbpEvent.SHOT_MISS_OREB, off_team.slot, shooter.slot, rebounder.slot, -1, points)
 
         return log, keep
 
@@ -982,24 +1204,23 @@ class MatchEngine:
         [Update] 新增 def_team 參數以支援 +/- 計算
         """
         made = 0
-        ft_config = self.config.get('match_engine', {}).get('shooting', {}).get('ft', {})
-        params = ft_config.get('params', {})
-        formulas = ft_config.get('formulas', {})
-        attr_pools = self.config.get('match_engine', {}).get('attr_pools', {})
-        
-        base = rng.get_float(params.get('base_min', 0.40), params.get('base_max', 0.95))
-        bonus_formula = self._resolve_formula(formulas.get('bonus_attrs', ['talent_luck', 'shot_touch']), attr_pools)
-        attr_sum = Calculator.get_player_attr_sum(shooter, bonus_formula, attr_pools)
-        
-        prob = min(0.99, max(0.01, base + attr_sum * params.get('attr_coeff', 0.0001)))
+        sp = self.plan.shooting
+
+        base = self.rng.get_float(sp.ft_base_min, sp.ft_base_max)
+        attr_sum = Calculator.formula_sum(shooter, sp.ft_bonus)
+
+        prob = min(0.99, max(0.01, base + attr_sum * sp.ft_attr_coeff))
 
         for _ in range(count):
-            if rng.decision(prob):
+            if self.rng.decision(prob):
+                made += 1
+                if self.score_only:
+                    team.score += 1
+                    continue
                 AttributionSystem.record_free_throw(team, shooter, True)
                 # [New] 更新 +/-
                 AttributionSystem.update_plus_minus(team, def_team, 1)
-                made += 1
-            else:
+            elif not self.score_only:
                 AttributionSystem.record_free_throw(team, shooter, False)
         return made
     def _check_and_handle_foul_out(self, team: EngineTeam, player: EnginePlayer):
@@ -1016,11 +1237,13 @@ class MatchEngine:
         
         if current_fouls >= self.foul_limit:
             player.is_fouled_out = True 
-            self.pbp_logs.append(f"{team.name} {player.name} Fouled Out ({current_fouls})")
+            team.next_sub_check_at = 0.0 # [Optimization] 陣容與目標時間變動，下回合立即重新檢查
+            self._log(PbpEvent.FOUL_OUT, team.slot, player.slot, value=current_fouls)
             
             # 1. 從場上移除
             if player in team.on_court:
                 team.on_court.remove(player)
+                team.lineup_epoch += 1 # [Optimization] 場上陣容變動，使團隊加總快取失效
             
             # =================================================================
             # [新增邏輯] 時間重新分配 (Redistribute Minutes)
@@ -1067,7 +1290,8 @@ class MatchEngine:
                 # 極端保護：若板凳全犯滿，強制讓原球員繼續打以防 Crash，並記錄警告
                 # 注意：雖然前面把時間分配掉了，但為了不讓程式崩潰，還是得讓他上
                 team.on_court.append(player)
-                self.pbp_logs.append(f"WARNING: No available subs for {team.name}, {player.name} stays on court.")
+                team.lineup_epoch += 1
+                self._log(PbpEvent.FOUL_OUT_NO_SUB, team.slot, player.slot)
                 return
 
             # 3. 挑選最佳替補 (優先同位置，其次最高分)
@@ -1081,11 +1305,13 @@ class MatchEngine:
                 sub = max(candidates, key=lambda p: sum(p.pos_scores.values()))
             
             # 4. 執行替換
-            team.bench.remove(sub)
+            SubstitutionSystem.bench_remove(team, sub)
+            StaminaSystem.settle(sub, self.state.game_time_elapsed, self.plan) # [Optimization] 結算至回合開始
             sub.position = target_pos # 繼承位置
             team.on_court.append(sub)
+            team.lineup_epoch += 1
             
             # 將犯滿球員移至板凳
-            team.bench.append(player)
+            SubstitutionSystem.bench_add(team, player)
             
-            self.pbp_logs.append(f"Substitution: {sub.name} replaces {player.name} (Foul Out)")
+            self._log(PbpEvent.FOUL_OUT_SUB, team.slot, sub.slot, player.slot)
@@ -0,0 +1,70 @@
+# app/services/match_engine/layout.py
+from operator import attrgetter
+from typing import Tuple
+
+try:
+    import numpy as np
+except ImportError: # numpy 為選用套件 (僅 layout='arrays' 使用)
+    np = None
+
+from .structures import EngineTeam
+
+# [New] 球隊資料佈局 (Team Layout)
+# objects: 預設。球隊加總由 5 個 EnginePlayer 物件逐一讀取 formula_raw / stamina_coeff 後相加 (依公式延遲計算)。
+# arrays : Struct-of-Arrays。開賽時把全隊的公式快取攤平成連續的 float64 矩陣 (roster_size x 公式數)，
+#          欄位即 EnginePlan.formulas 的 index (由 game_config.yaml 的屬性列表編譯而來)。
+#          陣容以列索引向量表示；lineup_epoch 變動時以一次「列子集 x 體力係數向量 + 身高項」求出所有公式的
+#          場上 5 人與後場 3 人總和。兩種佈局共用同一組引擎 API (Calculator.lineup_sum / backcourt_sum)。
+# 逐列累加順序與 team_formula_sum 相同，兩種佈局的比賽結果逐位元一致。
+# 個人統計仍寫在 EnginePlayer 上 (AttributionSystem 的 record_* 為兩種佈局共用)，
+# 賽後以 box_score_matrix() 一次複製為整數矩陣。
+LAYOUT_OBJECTS = 'objects'
+LAYOUT_ARRAYS = 'arrays'
+LAYOUTS = (LAYOUT_OBJECTS, LAYOUT_ARRAYS)
+
+# Box Score 矩陣欄位 (順序即輸出欄位順序)
+BOX_FIELDS: Tuple[str, ...] = (
+    'stat_pts', 'stat_reb', 'stat_ast', 'stat_stl', 'stat_blk', 'stat_tov', 'fouls', 'stat_plus_minus',
+    'stat_fgm', 'stat_fga', 'stat_3pm', 'stat_3pa', 'stat_ftm', 'stat_fta', 'stat_orb', 'stat_drb',
+    'stat_fb_made', 'stat_fb_attempt',
+)
+_get_box = attrgetter(*BOX_FIELDS)
+
+
+class TeamMatrix:
+    """
+    陣列佈局的球隊公式矩陣 (掛在 EngineTeam.matrix)
+    raw / height: (roster_size, 公式數)，對應每位球員的 formula_raw / formula_height
+    lineup / backcourt: 目前 lineup_epoch 下所有公式的場上總和 (Python float list，依公式 index 讀取)
+    """
+    __slots__ = ('raw', 'height', 'base', 'epoch', 'lineup', 'backcourt')
+
+    def __init__(self, team: EngineTeam):
+        if np is None:
+            raise ImportError("layout='arrays' 需要 numpy 套件 (pip install numpy)")
+        # 需在 Calculator.build_formula_cache 與球員 slot 編號之後建立
+        self.raw = np.array([p.formula_raw for p in team.roster], dtype=np.float64)
+        self.height = np.array([p.formula_height for p in team.roster], dtype=np.float64)
+        self.base = team.roster[0].slot if team.roster else 0
+        self.epoch = -1
+        self.lineup = []
+        self.backcourt = []
+
+    def refresh(self, team: EngineTeam):
+        """依目前 on_court (列索引向量) 與體力係數重算所有公式的場上總和"""
+        on_court = team.on_court
+        base = self.base
+        rows = np.fromiter((p.slot - base for p in on_court), dtype=np.intp, count=len(on_court))
+        coeff = np.fromiter((p.stamina_coeff for p in on_court), dtype=np.float64, count=len(on_court))
+        values = self.raw[rows] * coeff[:, None] + self.height[rows]
+        # 沿第 0 軸逐列累加，順序與 team_formula_sum 的逐人相加相同
+        self.lineup = values.sum(axis=0).tolist()
+        self.backcourt = values[:3].sum(axis=0).tolist()
+        self.epoch = team.lineup_epoch
+
+
+def box_score_matrix(team: EngineTeam):
+    """將全隊 Box Score 一次複製為 (roster_size, len(BOX_FIELDS)) 的 int64 矩陣 (兩種佈局皆可使用)"""
+    if np is None:
+        raise ImportError("box_score_matrix 需要 numpy 套件 (pip install numpy)")
+    return np.array([_get_box(p) for p in team.roster], dtype=np.int64).reshape(len(team.roster), len(BOX_FIELDS))
@@ -0,0 +1,501 @@
+# app/services/match_engine/plan.py
+
+import hashlib
+import json
+from dataclasses import dataclass, fields
+from typing import ClassVar, Dict, List, Optional, Tuple, Union
+
+from .structures import EnginePlayer
+
+# [Optimization] 編譯後的引擎計畫 (Engine Plan)
+# 原本每個回合都要走訪 self.config.get('match_engine', {}).get(...) 鏈、
+# 透過 _resolve_formula 重新解析 attr_pools，再由 Calculator 以 hasattr/getattr 遞迴展開。
+# 這些工作與比賽進程無關，屬於純粹的重複開銷。
+# 此模組在「每個 Config 版本」只編譯一次：
+#   - 每條公式展開為扁平的 Tuple[(屬性名稱, 是否為負, 是否為身高), ...]
+#   - 每個參數預先取出為具型別的欄位
+# 所有 _run_* 階段、Calculator 與 AttributionSystem 皆直接讀取此物件。
+
+# EnginePlayer 上可參與公式計算的欄位 (等同舊版 hasattr 判定)
+_PLAYER_FIELDS = frozenset(f.name for f in fields(EnginePlayer))
+
+# 公式項目: (屬性名稱, 是否為負號, 是否為身高 [不乘體力係數])
+FormulaTerm = Tuple[str, bool, bool]
+
+
+@dataclass(frozen=True, slots=True)
+class Formula:
+    """
+    編譯後的屬性公式。
+    terms 的順序與原始 Config 展開後的順序完全一致，確保浮點數累加結果不變。
+    index 為此公式在 EnginePlan.formulas 中的位置 (對應 EnginePlayer.formula_raw 的欄位)，
+    相同內容的公式共用同一個 index。
+    """
+    terms: Tuple[FormulaTerm, ...] = ()
+    index: int = -1
+
+    @property
+    def attrs(self) -> Tuple[str, ...]:
+        return tuple(t[0] for t in self.terms)
+
+
+@dataclass(frozen=True, slots=True)
+class StaminaPlan:
+    """[Spec 2] 體力系統參數"""
+    drain_coeff: float
+    nerf_threshold: float
+    min_multiplier: float
+    age_threshold: float
+    age_decay_rate: float
+    stamina_attr: str
+    health_attr: str
+    halftime_minutes: float
+    quarter_break_minutes: float
+
+
+@dataclass(frozen=True, slots=True)
+class SubstitutionPlan:
+    """[Spec 2.5 & 2.6] 換人規則參數"""
+    foul_limit: int
+    fatigue_threshold: float
+    clutch_threshold: float
+    redistribution_positions: Tuple[str, ...]
+    redistribution_top_k: int
+
+
+@dataclass(frozen=True, slots=True)
+class BackcourtPlan:
+    """[Spec 3] 後場階段"""
+    off_sum: Formula
+    def_sum: Formula
+    speed: Formula
+    team_speed: Formula
+    time_base_min: float
+    time_base_max: float
+    time_coeff: float
+    opening_seconds: float
+    speed_discount_coeff: float
+    speed_discount_coeff_def: float
+    min_time_limit: float
+    violation_threshold: float
+    steal_threshold: float
+    steal_base_prob: float
+    steal_bonus_coeff: float
+    transition_base_prob: float
+    fastbreak_threshold: float
+    fastbreak_trigger_prob: float
+
+
+@dataclass(frozen=True, slots=True)
+class FastbreakPlan:
+    """[Spec 3.5] 快攻判定"""
+    runner_selection: Formula
+    chaser_selection: Formula
+    off_power: Formula
+    def_power: Formula
+    foul_off_iq: Formula
+    foul_def_iq: Formula
+    base_success_min: float
+    base_success_max: float
+    stat_diff_coeff: float
+    foul_base_prob: float
+    foul_iq_coeff: float
+
+
+@dataclass(frozen=True, slots=True)
+class FrontcourtPlan:
+    """[Spec 4] 前場階段 (含封蓋與抄截)"""
+    time_reduction: Formula
+    speed: Formula
+    spacing_off: Formula
+    spacing_def: Formula
+    speed_discount_coeff: float
+    absolute_min_time: float
+    violation_threshold: float
+    block_trigger_off: Formula
+    block_trigger_def: Formula
+    block_power_off: Formula
+    block_power_def: Formula
+    block_base_prob: float
+    block_spacing_penalty_prob: float
+    steal_off: Formula
+    steal_def: Formula
+    steal_base_prob: float
+    steal_stat_diff_coeff: float
+
+
+@dataclass(frozen=True, slots=True)
+class ShootingPlan:
+    """[Spec 5] 投籃、籃板、罰球與助攻"""
+    range_attr: Formula
+    off_total: Formula
+    bonus_3pt: Formula
+    def_total: Formula
+    skill_bonus: Formula
+    foul_off_iq: Formula
+    foul_def_iq: Formula
+    base_rate_2pt: float
+    base_rate_3pt: float
+    multiplier_3pt: float
+    skill_bonus_divisor: float
+    spacing_weight: float
+    assist_prob_coeff: float
+    assist_team_stat: Formula
+    assist_luck_stat: Formula
+    rebound_off: Formula
+    rebound_def: Formula
+    ft_base_min: float
+    ft_base_max: float
+    ft_attr_coeff: float
+    ft_bonus: Formula
+
+
+@dataclass(frozen=True, slots=True)
+class AttributionPlan:
+    """[Spec 6] 數據歸屬權重"""
+    shot_base: Formula
+    shot_3pt_bonus: Formula
+    rebound_base: Formula
+    rebound_bonus: Formula
+    rebound_iq_off: Formula
+    rebound_iq_def: Formula
+    assist_weight: Formula
+    steal_weight: Formula
+    shot_star_bonus: float
+    shot_starter_bonus: float
+    rebound_height_weight: float
+    assist_position_order: Dict[str, int]
+
+
+@dataclass(frozen=True, slots=True)
+class EnginePlan:
+    """
+    比賽引擎編譯計畫 (Engine Plan)
+    由 EnginePlan.from_config(config) 取得，同一份 Config 內容只會編譯一次並跨場次共用。
+    """
+    version: str
+    quarter_length: float
+    ot_length: float
+
+    jump_ball: Formula
+    positional_scoring: Dict[str, Formula]
+
+    # [Spec v2.1 Section 1.5] 身高修正: ((keys), coeff)
+    height_bonus_threshold: float
+    height_nerf_threshold: float
+    height_affected: Tuple[Tuple[Tuple[str, ...], float], ...]
+
+    # [Spec 1.4] 上場時間分配: role -> (base, min_w, max_w)
+    total_minutes: float
+    minutes_roles: Dict[str, Tuple[float, float, float]]
+    minutes_default: Tuple[float, float, float]
+
+    # [Optimization] 所有已編譯公式 (依 index 排列)，用於建立球員的屬性總和快取
+    formulas: Tuple[Formula, ...]
+
+    stamina: StaminaPlan
+    substitution: SubstitutionPlan
+    backcourt: BackcourtPlan
+    fastbreak: FastbreakPlan
+    frontcourt: FrontcourtPlan
+    shooting: ShootingPlan
+    attribution: AttributionPlan
+
+    # 編譯快取: version -> EnginePlan
+    _cache: ClassVar[Dict[str, 'EnginePlan']] = {}
+
+    @classmethod
+    def from_config(cls, config: Dict) -> 'EnginePlan':
+        """
+        取得 Config 對應的編譯計畫。
+        以 match_engine 與 minutes_distribution 區段內容計算版本號，內容不變即直接回傳快取。
+        多執行緒同時編譯同一版本時以 setdefault 保留先寫入的計畫，所有執行緒共用同一個實例。
+        """
+        version = cls.config_version(config)
+        plan = cls._cache.get(version)
+        if plan is None:
+            plan = cls._cache.setdefault(version, _compile(config, version))
+        return plan
+
+    @staticmethod
+    def config_version(config: Dict) -> str:
+        """計算 Config 中與比賽引擎相關區段的版本指紋"""
+        payload = {
+            'match_engine': config.get('match_engine', {}),
+            'minutes_distribution': config.get('minutes_distribution', {}),
+        }
+        raw = json.dumps(payload, sort_keys=True, default=str, ensure_ascii=False)
+        return hashlib.md5(raw.encode('utf-8')).hexdigest()
+
+
+# =============================================================================
+# Compiler
+# =============================================================================
+
+def compile_formula(
+    attrs: Union[str, List[str], None],
+    attr_pools: Optional[Dict[str, List[str]]] = None,
+    signed: bool = True,
+    registry: Optional[Dict[Tuple[FormulaTerm, ...], Formula]] = None,
+) -> Formula:
+    """
+    將屬性列表編譯為扁平公式。
+    規則與 Calculator.get_player_attr_sum 相同:
+      1. 支援 '-attr' 負號語法 (signed=False 時視為不存在的屬性，對應 AttributionSystem 舊邏輯)
+      2. 球員本身的屬性優先，其次才遞迴展開 attr_pools
+      3. 未知名稱忽略 (貢獻 0)
+    字串形式的 attrs 視為 pool 名稱。
+    傳入 registry 時，內容相同的公式會共用同一個物件並取得連續的 index。
+    """
+    if isinstance(attrs, str):
+        attrs = (attr_pools or {}).get(attrs, [])
+    terms: List[FormulaTerm] = []
+    _expand(attrs or [], attr_pools, signed, False, terms)
+    key = tuple(terms)
+
+    if registry is None:
+        return Formula(terms=key)
+
+    formula = registry.get(key)
+    if formula is None:
+        formula = Formula(terms=key, index=len(registry))
+        registry[key] = formula
+    return formula
+
+
+def _expand(attrs, attr_pools, signed: bool, negate: bool, out: List[FormulaTerm]):
+    for attr in attrs:
+        is_negative = False
+        clean_attr = attr
+        if signed and attr.startswith('-'):
+            is_negative = True
+            clean_attr = attr[1:]
+
+        if clean_attr in _PLAYER_FIELDS:
+            out.append((clean_attr, is_negative != negate, clean_attr == 'height'))
+        elif attr_pools and clean_attr in attr_pools:
+            _expand(attr_pools[clean_attr], attr_pools, signed, is_negative != negate, out)
+
+
+def _f(section: Dict, key: str, default: float) -> float:
+    return float(section.get(key, default))
+
+
+def _compile(config: Dict, version: str) -> EnginePlan:
+    me = config.get('match_engine', {})
+    pools = me.get('attr_pools', {})
+    registry: Dict[Tuple[FormulaTerm, ...], Formula] = {}
+
+    def compile_formula_(attrs, attr_pools=pools, signed=True) -> Formula:
+        return compile_formula(attrs, attr_pools, signed, registry)
+
+    general = me.get('general', {})
+    sub = general.get('substitution', {})
+    redis = sub.get('redistribution', {})
+
+    # --- 身高修正 ---
+    hc = me.get('height_correction', {})
+    height_affected = tuple(
+        (tuple(rule.get('keys', [])), float(rule.get('coeff', 0.0)))
+        for rule in hc.get('affected_attrs', {}).values()
+    )
+
+    # --- 上場時間 ---
+    md = config.get('minutes_distribution', {})
+    role_config = md.get('roles', {})
+
+    def _role(data: Optional[Dict]) -> Tuple[float, float, float]:
+        data = data or {}
+        return (_f(data, 'base', 0), _f(data, 'min_w', 0), _f(data, 'max_w', 10))
+
+    minutes_roles = {role: _role(data) for role, data in role_config.items()}
+
+    # --- 體力 ---
+    ss = me.get('stamina_system', {})
+    drain_attrs = ss.get('drain_attrs', ['ath_stamina', 'talent_health'])
+    stamina = StaminaPlan(
+        drain_coeff=_f(general, 'stamina_drain_coeff', 3.0),
+        nerf_threshold=_f(general, 'stamina_nerf_threshold', 80.0),
+        min_multiplier=_f(general, 'stamina_min_multiplier', 0.21),
+        age_threshold=_f(ss, 'age_threshold', 20),
+        age_decay_rate=_f(ss, 'age_decay_rate', 0.01),
+        stamina_attr=drain_attrs[0],
+        health_attr=drain_attrs[1],
+        halftime_minutes=_f(general, 'stamina_recovery_halftime', 20.0),
+        quarter_break_minutes=_f(general, 'stamina_recovery_quarter', 2.0),
+    )
+
+    substitution = SubstitutionPlan(
+        foul_limit=sub.get('foul_limit', 6),
+        fatigue_threshold=_f(sub, 'stamina_threshold', 80.0),
+        clutch_threshold=_f(sub, 'clutch_time_threshold', 120.0),
+        redistribution_positions=tuple(redis.get('positions', ["C", "PF", "SF", "SG", "PG"])),
+        redistribution_top_k=redis.get('top_k', 3),
+    )
+
+    # --- 後場 ---
+    bc = me.get('backcourt', {})
+    bc_p = bc.get('params', {})
+    bc_f = bc.get('formulas', {})
+    backcourt = BackcourtPlan(
+        off_sum=compile_formula_(bc_f.get('off_sum', []), pools),
+        def_sum=compile_formula_(bc_f.get('def_sum', []), pools),
+        speed=compile_formula_(bc_f.get('backcourt_speed', ['ath_speed']), pools),
+        team_speed=compile_formula_(bc_f.get('team_speed_sum', ['ath_speed']), pools),
+        time_base_min=_f(bc_p, 'time_base_min', 1.0),
+        time_base_max=_f(bc_p, 'time_base_max', 8.0),
+        time_coeff=_f(bc_p, 'time_coeff', 0.008),
+        opening_seconds=_f(bc_p, 'opening_seconds', 2.0),
+        speed_discount_coeff=_f(bc_p, 'speed_discount_coeff', 0.1),
+        speed_discount_coeff_def=_f(bc_p, 'speed_discount_coeff_def', 0.5),
+        min_time_limit=_f(bc_p, 'min_time_limit', 0.5),
+        violation_threshold=_f(bc_p, 'violation_threshold', 8.0),
+        steal_threshold=_f(bc_p, 'steal_threshold', 3.0),
+        steal_base_prob=_f(bc_p, 'steal_base_prob', 0.01),
+        steal_bonus_coeff=_f(bc_p, 'steal_bonus_coeff', 0.001),
+        transition_base_prob=_f(bc_p, 'transition_base_prob', 0.50),
+        fastbreak_threshold=_f(bc_p, 'fastbreak_threshold', 1.0),
+        fastbreak_trigger_prob=_f(bc_p, 'fastbreak_trigger_prob', 0.5),
+    )
+
+    # --- 快攻 ---
+    fb = bc.get('fastbreak', {})
+    fb_p = fb.get('params', {})
+    fb_f = fb.get('formulas', {})
+    fastbreak = FastbreakPlan(
+        runner_selection=compile_formula_(fb_f.get('runner_selection', ['ath_speed', 'off_dribble']), pools),
+        chaser_selection=compile_formula_(fb_f.get('chaser_selection', ['ath_speed', 'talent_defiq']), pools),
+        off_power=compile_formula_(fb_f.get('off_power', []), pools),
+        def_power=compile_formula_(fb_f.get('def_power', []), pools),
+        foul_off_iq=compile_formula_(fb_f.get('foul_off_iq', ['talent_offiq']), pools),
+        foul_def_iq=compile_formula_(fb_f.get('foul_def_iq', ['talent_defiq']), pools),
+        base_success_min=_f(fb_p, 'base_success_min', 0.3),
+        base_success_max=_f(fb_p, 'base_success_max', 1.0),
+        stat_diff_coeff=_f(fb_p, 'stat_diff_coeff', 0.005),
+        foul_base_prob=_f(fb_p, 'foul_base_prob', 0.01),
+        foul_iq_coeff=_f(fb_p, 'foul_iq_coeff', 0.01),
+    )
+
+    # --- 前場 ---
+    fc = me.get('frontcourt', {})
+    fc_p = fc.get('params', {})
+    fc_f = fc.get('formulas', {})
+    blk = fc.get('block', {})
+    blk_p = blk.get('params', {})
+    blk_f = blk.get('formulas', {})
+    stl = fc.get('steal', {})
+    stl_p = stl.get('params', {})
+    stl_f = stl.get('formulas', {})
+    frontcourt = FrontcourtPlan(
+        time_reduction=compile_formula_(fc_f.get('time_reduction', []), pools),
+        speed=compile_formula_(fc_f.get('frontcourt_speed', ['ath_speed']), pools),
+        spacing_off=compile_formula_(fc_f.get('spacing_off', []), pools),
+        spacing_def=compile_formula_(fc_f.get('spacing_def', []), pools),
+        speed_discount_coeff=_f(fc_p, 'speed_discount_coeff', 0.1),
+        absolute_min_time=_f(fc_p, 'absolute_min_time', 1.0),
+        violation_threshold=_f(fc_p, 'violation_threshold', 24.0),
+        block_trigger_off=compile_formula_(blk_f.get('trigger_off', ['off_move']), pools),
+        block_trigger_def=compile_formula_(blk_f.get('trigger_def', ['def_contest', 'talent_defiq']), pools),
+        block_power_off=compile_formula_(blk_f.get('power_off', ['ath_strength', 'ath_jump', 'talent_offiq', 'height']), pools),
+        block_power_def=compile_formula_(blk_f.get('power_def', ['ath_strength', 'ath_jump', 'def_contest', 'talent_defiq', 'height']), pools),
+        block_base_prob=_f(blk_p, 'base_prob', 0.01),
+        block_spacing_penalty_prob=_f(blk_p, 'spacing_penalty_prob', 0.05),
+        steal_off=compile_formula_(stl_f.get('off_attr', []), pools),
+        steal_def=compile_formula_(stl_f.get('def_attr', []), pools),
+        steal_base_prob=_f(stl_p, 'base_prob', 0.01),
+        steal_stat_diff_coeff=_f(stl_p, 'stat_diff_coeff', 0.001),
+    )
+
+    # --- 投籃 ---
+    sh = me.get('shooting', {})
+    sh_p = sh.get('params', {})
+    sh_f = sh.get('formulas', {})
+    ast_f = sh.get('assist', {}).get('formulas', {})
+    reb_f = sh.get('rebound', {}).get('formulas', {})
+    ft = sh.get('ft', {})
+    ft_p = ft.get('params', {})
+    ft_f = ft.get('formulas', {})
+    shooting = ShootingPlan(
+        range_attr=compile_formula_(sh_f.get('range_attr', []), pools),
+        off_total=compile_formula_(sh_f.get('off_total', 'off_13'), pools),
+        bonus_3pt=compile_formula_(sh_f.get('bonus_3pt_attrs', []), pools),
+        def_total=compile_formula_(sh_f.get('def_total', 'def_12'), pools),
+        skill_bonus=compile_formula_(sh_f.get('skill_bonus_attrs', ['shot_accuracy', 'shot_range', 'off_move']), pools),
+        foul_off_iq=compile_formula_(sh_f.get('foul_off_iq', []), pools),
+        foul_def_iq=compile_formula_(sh_f.get('foul_def_iq', []), pools),
+        base_rate_2pt=_f(sh_p, 'base_rate_2pt', 0.40),
+        base_rate_3pt=_f(sh_p, 'base_rate_3pt', 0.20),
+        multiplier_3pt=_f(sh_p, 'multiplier_3pt', 2.0),
+        skill_bonus_divisor=_f(sh_p, 'skill_bonus_divisor', 800.0),
+        spacing_weight=_f(sh_p, 'spacing_weight', 0.1),
+        assist_prob_coeff=_f(sh_p, 'assist_prob_coeff', 0.1),
+        assist_team_stat=compile_formula_(ast_f.get('team_stat', []), pools),
+        assist_luck_stat=compile_formula_(ast_f.get('luck_stat', []), pools),
+        rebound_off=compile_formula_(reb_f.get('off_attr', []), pools),
+        rebound_def=compile_formula_(reb_f.get('def_attr', []), pools),
+        ft_base_min=_f(ft_p, 'base_min', 0.40),
+        ft_base_max=_f(ft_p, 'base_max', 0.95),
+        ft_attr_coeff=_f(ft_p, 'attr_coeff', 0.0001),
+        ft_bonus=compile_formula_(ft_f.get('bonus_attrs', ['talent_luck', 'shot_touch']), pools),
+    )
+
+    # --- 數據歸屬 ---
+    # 舊版 AttributionSystem 以 getattr(player, attr, 0.0) 累加，不展開巢狀 pool 也不處理負號
+    at = me.get('attribution', {})
+    at_p = at.get('params', {})
+    at_f = at.get('formulas', {})
+
+    def _attr_formula(key: str) -> Formula:
+        val = at_f.get(key)
+        if isinstance(val, str):
+            val = pools.get(val, [])
+        elif not isinstance(val, list):
+            val = []
+        return compile_formula_(val, None, signed=False)
+
+    attribution = AttributionPlan(
+        shot_base=_attr_formula('shot_weight_base'),
+        shot_3pt_bonus=_attr_formula('shot_3pt_bonus'),
+        rebound_base=_attr_formula('rebound_base'),
+        rebound_bonus=_attr_formula('rebound_bonus'),
+        rebound_iq_off=_attr_formula('rebound_iq_off'),
+        rebound_iq_def=_attr_formula('rebound_iq_def'),
+        assist_weight=_attr_formula('assist_weight'),
+        steal_weight=_attr_formula('steal_weight'),
+        shot_star_bonus=_f(at_p, 'shot_star_bonus', 1.5),
+        shot_starter_bonus=_f(at_p, 'shot_starter_bonus', 1.2),
+        rebound_height_weight=_f(at_p, 'rebound_height_weight', 1.5),
+        assist_position_order={pos: idx for idx, pos in enumerate(substitution.redistribution_positions)},
+    )
+
+    scoring_rules = me.get('positional_scoring', {})
+    jb = me.get('jump_ball', {})
+
+    # 舊版跳球計算未傳入 attr_pools
+    jump_ball = compile_formula_(jb.get('participant_formula', ['height', 'ath_jump', 'talent_offiq']), None)
+    positional_scoring = {
+        pos: compile_formula_(scoring_rules.get(pos, []), pools)
+        for pos in ["C", "PF", "SF", "SG", "PG"]
+    }
+
+    return EnginePlan(
+        version=version,
+        quarter_length=_f(general, 'quarter_length', 720),
+        ot_length=_f(general, 'ot_length', 300),
+        jump_ball=jump_ball,
+        positional_scoring=positional_scoring,
+        height_bonus_threshold=_f(hc, 'bonus_threshold', 190),
+        height_nerf_threshold=_f(hc, 'nerf_threshold', 210),
+        height_affected=height_affected,
+        total_minutes=_f(md, 'total_minutes', 240),
+        minutes_roles=minutes_roles,
+        minutes_default=_role(role_config.get('Bench')),
+        formulas=tuple(sorted(registry.values(), key=lambda f: f.index)),
+        stamina=stamina,
+        substitution=substitution,
+        backcourt=backcourt,
+        fastbreak=fastbreak,
+        frontcourt=frontcourt,
+        shooting=shooting,
+        attribution=attribution,
+    )
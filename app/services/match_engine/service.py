@@ -3,19 +3,82 @@
 # 修正: 
 # 1. convert_team 新增 tactics 參數以解決 TypeError
 # 2. 根據 tactics.roster_list 過濾出賽名單
+# 3. [Optimization] TeamBatchLoader: 一次載入多隊的球隊 / 戰術 / 球員 / 合約 (固定 4 次 IN 查詢)
 
+from dataclasses import dataclass, field
+from typing import Dict, Iterable, List, Optional
+
+from sqlalchemy.orm import selectinload
+
+from app.models.contract import Contract
 from app.models.player import Player
 from app.models.team import Team
 from app.models.tactics import TeamTactics
 from app.services.match_engine.structures import EngineTeam, EnginePlayer
 
+# convert_player 未傳入 contract 時改讀 db_player.contract 關聯
+_UNSET = object()
+
+
+@dataclass(slots=True)
+class TeamBatch:
+    """批次載入結果 (皆以 ID 索引)"""
+    teams: Dict[int, Team] = field(default_factory=dict)
+    tactics: Dict[int, TeamTactics] = field(default_factory=dict)    # team_id -> 戰術
+    players: Dict[int, List[Player]] = field(default_factory=dict)   # team_id -> 球員 (依 ID 排序)
+    contracts: Dict[int, Contract] = field(default_factory=dict)     # player_id -> 合約
+
+    def convert_team(self, team_id: int) -> EngineTeam:
+        """以批次資料轉換單一球隊 (不再查詢資料庫)"""
+        return DBToEngineAdapter.convert_team(
+            self.teams[team_id],
+            tactics=self.tactics.get(team_id),
+            players=self.players.get(team_id, []),
+            contracts=self.contracts,
+        )
+
+
+class TeamBatchLoader:
+    """
+    [Optimization] 批次載入器
+    逐隊呼叫 convert_team 時，每隊需要 Team / TeamTactics 各一次查詢，
+    db_team.players (dynamic 關聯) 再一次，每名球員的 db_player.contract 又各一次 (N+1)。
+    此處以 IN 查詢一次取回所有球隊、戰術、球員，合約以 selectinload 預先載入，
+    總查詢數固定為 4 次，與球隊數、球員數無關。
+    """
+
+    @staticmethod
+    def load(team_ids: Iterable[int]) -> TeamBatch:
+        ids = sorted({int(t) for t in team_ids})
+        batch = TeamBatch()
+        if not ids:
+            return batch
+
+        batch.teams = {t.id: t for t in Team.query.filter(Team.id.in_(ids)).all()}
+        batch.tactics = {t.team_id: t for t in TeamTactics.query.filter(TeamTactics.team_id.in_(ids)).all()}
+
+        players = (Player.query
+                   .filter(Player.team_id.in_(ids))
+                   .options(selectinload(Player.contract))
+                   .order_by(Player.id)
+                   .all())
+        for p in players:
+            batch.players.setdefault(p.team_id, []).append(p)
+            if p.contract is not None:
+                batch.contracts[p.id] = p.contract
+        return batch
+
+
 class DBToEngineAdapter:
     """
     負責將資料庫模型 (SQLAlchemy Models) 轉換為 比賽引擎模型 (Dataclasses)
     """
     
     @staticmethod
-    def convert_player(db_player: Player) -> EnginePlayer:
+    def convert_player(db_player: Player, contract: Optional[Contract] = _UNSET) -> EnginePlayer:
+        """
+        contract: 預先載入的合約 (TeamBatchLoader)；未傳入時讀取 db_player.contract 關聯
+        """
         # 解析 JSON stats
         stats = db_player.detailed_stats or {}
         phy = stats.get('physical', {})
@@ -25,8 +88,10 @@ class DBToEngineAdapter:
 
         # 嘗試從 contract 獲取角色，若無則預設 Bench
         role = 'Bench'
-        if db_player.contract:
-            role = db_player.contract.role
+        if contract is _UNSET:
+            contract = db_player.contract
+        if contract:
+            role = contract.role
 
         # [修正] 直接讀取資料庫中的等級，不再重新推導
         grade = db_player.grade if db_player.grade else "G"
@@ -72,14 +137,22 @@ class DBToEngineAdapter:
         )
 
     @staticmethod
-    def convert_team(db_team: Team, tactics: TeamTactics = None) -> EngineTeam:
+    def convert_team(db_team: Team, tactics: TeamTactics = None,
+                     players: Optional[List[Player]] = None, contracts: Optional[Dict[int, Contract]] = None) -> EngineTeam:
         """
         將 DB Team 轉換為 EngineTeam
         :param db_team: 資料庫球隊物件
         :param tactics: (Optional) 戰術設定，用於決定登錄名單
+        :param players: (Optional) 預先載入的球員列表，未傳入時查詢 db_team.players
+        :param contracts: (Optional) 預先載入的合約 (player_id -> Contract)，需與 players 一併傳入
         """
         # 1. 先轉換所有球員
-        all_players = [DBToEngineAdapter.convert_player(p) for p in db_team.players]
+        if players is None:
+            players = db_team.players.order_by(Player.id).all()
+        if contracts is None:
+            all_players = [DBToEngineAdapter.convert_player(p) for p in players]
+        else:
+            all_players = [DBToEngineAdapter.convert_player(p, contracts.get(p.id)) for p in players]
         
         final_roster = all_players
 
@@ -1,7 +1,10 @@
 # app/services/match_engine/structures.py
 
-from dataclasses import dataclass, field
-from typing import List, Dict, Optional, Any
+from dataclasses import dataclass, field, fields, MISSING
+from typing import List, Dict, Optional, Any, Tuple, TYPE_CHECKING
+
+if TYPE_CHECKING:
+    from .utils.pbp import PbpBuffer
 
 # [Optimization] 使用 slots=True
 # 原理：Python 預設使用 __dict__ 字典儲存物件屬性，這會消耗大量記憶體。
@@ -9,7 +12,10 @@ from typing import List, Dict, Optional, Any
 # 效益：記憶體佔用減少約 40-50%，屬性存取速度提升約 20%。
 # 對於 1 億場模擬 (涉及數十億次屬性讀取) 至關重要。
 
-@dataclass(slots=True)
+# [Optimization] eq=False: 球員以物件身分 (identity) 比較。
+# 換人時的 `in` / list.remove 原本會觸發 dataclass 逐欄位 __eq__，成本極高；
+# 球員 id 唯一，兩者語意相同。
+@dataclass(slots=True, eq=False)
 class EnginePlayer:
     """
     比賽引擎專用球員物件 (Level 4 - Phase 2 Ready)
@@ -29,6 +35,11 @@ class EnginePlayer:
     # --- 2. 體力系統 (Spec 2) ---
     current_stamina: float = 100.0
     stamina_coeff: float = 1.0  # 當前能力修正係數 (體力低於 80 開始衰退)
+    # [Optimization] 延遲結算 (Lazy Settle): 速率於開賽時固定，體力僅在需要時補算
+    stamina_drain: float = 0.0      # 場上每分鐘消耗量
+    stamina_recover: float = 0.0    # 板凳每分鐘恢復量
+    stamina_clock: float = 0.0      # 上次結算時的比賽時間 (game_time_elapsed)
+    stamina_on_court: bool = False  # 自上次結算起是否在場上
     
     # --- 3. 上場時間管理 (Spec 1.4 & 2.6) ---
     target_seconds: float = 0.0 # 目標上場秒數 (由 Minutes Distribution 計算)
@@ -36,6 +47,8 @@ class EnginePlayer:
     is_fouled_out: bool = False # 是否犯滿離場
     is_starter: bool = False    # 是否為先發球員 (用於數據統計)
     is_played: bool = False    # 是否為出賽球員 (用於數據統計)
+    bench_seq: int = 0          # [Optimization] 進入板凳的順序 (板凳排序索引的同分判定)
+    slot: int = -1              # [Optimization] 場次內球員編號 (主隊 roster 在前)，供轉播事件引用
     
     # --- 4. 屬性緩存 (Spec 2.3) ---
     # 為了效能，我們將 DB 中的巢狀結構 (physical.strength) 展平為單層屬性。
@@ -66,6 +79,16 @@ class EnginePlayer:
     
     # 屬性總和 (用於 Phase 2 驗證 "能力與表現相關性")
     attr_sum: int = 0
+
+    # [Optimization] 賽前原始值樣板 (Frozen Template)
+    # 首次 reset_for_game 時凍結位置、體力與 20 項能力值 (身高修正前)，之後每場以樣板就地還原，
+    # 球員物件可跨場重複使用，不必每場重建。能力值於比賽外變動 (如訓練) 後需呼叫 freeze_template()。
+    template: Optional[Tuple] = field(default=None, repr=False)
+
+    # [Optimization] 公式原始總和快取 (索引對應 EnginePlan.formulas)
+    # 於身高修正後建立；公式值 = formula_raw[i] * stamina_coeff + formula_height[i]
+    formula_raw: List[float] = field(default_factory=list)
+    formula_height: List[float] = field(default_factory=list)
     
     # --- 5. 位置評分緩存 (Spec 1.1) ---
     # 儲存該球員在 5 個位置的適性分數，避免重複計算
@@ -105,6 +128,47 @@ class EnginePlayer:
     # 記錄比賽結束時的剩餘體力，用於分析體力消耗與上場時間的關係
     stat_remaining_stamina: float = 0.0
 
+    def freeze_template(self):
+        """[Optimization] 以目前的位置、體力與能力值建立樣板 (須在身高修正前呼叫)"""
+        self.template = tuple([getattr(self, name) for name in PLAYER_TEMPLATE_FIELDS])
+
+    def reset_for_game(self):
+        """
+        [Optimization] 就地重設為賽前狀態 (取代每場重建 EnginePlayer)
+        1. 由樣板還原能力值 (撤銷上一場的身高修正) 與位置、體力
+        2. 上場時間、體力結算狀態與所有統計數據歸零
+        3. 公式快取與位置評分就地清空 (沿用原本的 list / dict)
+        首次呼叫時僅凍結樣板，全新建立的球員狀態不變。
+        """
+        template = self.template
+        if template is None:
+            self.freeze_template()
+        else:
+            for name, value in zip(PLAYER_TEMPLATE_FIELDS, template):
+                setattr(self, name, value)
+        for name, value in _PLAYER_GAME_DEFAULTS:
+            setattr(self, name, value)
+        self.formula_raw.clear()
+        self.formula_height.clear()
+        self.pos_scores.clear()
+
+# [Optimization] reset_for_game 使用的欄位清單
+# PLAYER_TEMPLATE_FIELDS: 由樣板還原的賽前輸入 (身高修正會改寫能力值；位置於排定先發/換人時改寫)
+# _PLAYER_GAME_DEFAULTS : 其餘有預設值的比賽狀態欄位 (體力結算、上場時間、統計數據) 與其預設值
+PLAYER_TEMPLATE_FIELDS = (
+    'position', 'current_stamina',
+    'ath_stamina', 'ath_strength', 'ath_speed', 'ath_jump', 'talent_health',
+    'shot_touch', 'shot_release', 'talent_offiq', 'talent_defiq', 'talent_luck',
+    'shot_accuracy', 'shot_range', 'off_pass', 'off_dribble', 'off_handle', 'off_move',
+    'def_rebound', 'def_boxout', 'def_contest', 'def_disrupt',
+)
+_PLAYER_GAME_DEFAULTS = tuple(
+    (f.name, f.default) for f in fields(EnginePlayer)
+    if f.default is not MISSING
+    and f.name not in PLAYER_TEMPLATE_FIELDS
+    and f.name not in ('training_points', 'attr_sum', 'template')
+)
+
 @dataclass(slots=True)
 class EngineTeam:
     """
@@ -118,6 +182,7 @@ class EngineTeam:
     on_court: List[EnginePlayer] = field(default_factory=list) # 場上 5 人
     bench: List[EnginePlayer] = field(default_factory=list)    # 板凳球員
     best_five: List[Optional[EnginePlayer]] = field(default_factory=list) # 最強 5 人
+    slot: int = 0 # [Optimization] 場次內球隊編號 (0: 主隊, 1: 客隊)，供轉播事件引用
     
     # 團隊統計 (Spec 7.3)
     score: int = 0
@@ -134,6 +199,59 @@ class EngineTeam:
     stat_fb_made: int = 0     # 團隊快攻進球
     stat_fb_attempt: int = 0  # 團隊快攻嘗試
 
+    # [Optimization] 場上陣容版本 (Lineup Epoch) 與團隊加總快取
+    # 換人或場上球員體力係數變動時 lineup_epoch + 1；
+    # agg_cache 以公式 index 為 key (負數 key 代表後場 3 人)，版本不符時整批失效。
+    lineup_epoch: int = 0
+    agg_epoch: int = -1
+    agg_cache: Dict[int, float] = field(default_factory=dict)
+
+    # [Optimization] 數據歸屬抽選表快取 (AttributionSystem)，與 agg_cache 共用 lineup_epoch 失效規則
+    # key: ('shot', is_3pt) / ('reb', is_defensive) / ('ast', shooter.id) / ('stl',)
+    pick_epoch: int = -1
+    pick_cache: Dict[Any, Tuple] = field(default_factory=dict)
+
+    # [New] 陣列佈局 (layout='arrays') 的公式矩陣 (layout.TeamMatrix)；None 表示物件佈局
+    matrix: Optional[Any] = field(default=None, repr=False)
+
+    # [Optimization] 事件驅動換人排程
+    # next_sub_check_at: 下次需要執行換人檢查的比賽時間 (game_time_elapsed)
+    # bench_index: 各位置依 pos_scores 預先排序的板凳名單 (-score, bench_seq, player)
+    next_sub_check_at: float = 0.0
+    bench_seq: int = 0
+    bench_index: Dict[str, List[Any]] = field(default_factory=dict)
+
+    def reset_for_game(self):
+        """
+        [Optimization] 就地重設球隊與全體球員為賽前狀態，供同一物件跨場重複使用。
+        陣容與快取容器就地清空；回合時間歷史會隨 MatchResult 輸出，因此改為新的 list。
+        """
+        for p in self.roster:
+            p.reset_for_game()
+        self.on_court.clear()
+        self.bench.clear()
+        self.best_five.clear()
+        self.slot = 0
+        self.score = 0
+        self.stat_tov = 0
+        self.stat_violation_8s = 0
+        self.stat_violation_24s = 0
+        self.stat_possessions = 0
+        self.stat_possession_seconds = 0.0
+        if self.stat_possession_history:
+            self.stat_possession_history = []
+        self.stat_fb_made = 0
+        self.stat_fb_attempt = 0
+        self.lineup_epoch = 0
+        self.agg_epoch = -1
+        self.agg_cache.clear()
+        self.pick_epoch = -1
+        self.pick_cache.clear()
+        self.matrix = None
+        self.next_sub_check_at = 0.0
+        self.bench_seq = 0
+        self.bench_index.clear()
+
 @dataclass(slots=True)
 class MatchState:
     """
@@ -144,6 +262,20 @@ class MatchState:
     game_time_elapsed: float = 0.0
     possession: str = "" # 當前擁有球權的球隊 ID
     is_over: bool = False
+
+    # [New] 比賽流程進度 (原為 simulate / _simulate_quarter 的區域變數)
+    # 全部存於此處，使比賽可在任一回合之間快照 (MatchEngine.snapshot) 並於其他進程續跑。
+    phase: int = 0                 # PHASE_PREGAME / PHASE_LIVE / PHASE_BREAK
+    jump_ball_winner: str = ""     # 開賽跳球勝方 (決定各節球權)
+    is_opening: bool = False       # 下一回合是否為該節第一球
+    is_new_possession: bool = True # 下一回合是否為新的一波球權 (攻守交換後)
+    keep: bool = False             # 上一回合是否取得進攻籃板 (維持球權)
+    in_clutch: bool = False        # [Optimization] 上一次換人檢查時是否處於關鍵時刻
+
+# [New] MatchState.phase
+PHASE_PREGAME = 0 # 尚未跳球
+PHASE_LIVE = 1    # 節次進行中 (回合迴圈)
+PHASE_BREAK = 2   # 節次結束且已休息，下一節尚未開始
   
 @dataclass(slots=True)
 class MatchResult:
@@ -183,4 +315,34 @@ class MatchResult:
     home_violation_8s: int = 0
     home_violation_24s: int = 0
     away_violation_8s: int = 0
-    away_violation_24s: int = 0
\ No newline at end of file
+    away_violation_24s: int = 0
+
+    # [Optimization] 結構化轉播事件 (log_level 為 events / text 時提供)
+    pbp_events: Optional['PbpBuffer'] = None
+
+# [New] 即時比賽事件 (MatchEngine.iter_events 逐回合產生)
+# possession: 每個回合結束後 / period_end: 每節 (含延長賽) 結束並完成休息後 / final: 比賽結束 (附 MatchResult)
+EVENT_POSSESSION = 'possession'
+EVENT_PERIOD_END = 'period_end'
+EVENT_FINAL = 'final'
+
+@dataclass(slots=True)
+class MatchEvent:
+    """
+    即時比賽事件 (串流轉播 / 逐步分析用)
+    pbp 為自上一個事件以來新增的轉播事件 (PbpBuffer 的 8 欄 tuple，可用 PbpFormatter.format_event 轉為文字)，
+    log_level='off' 時為空列表。
+    """
+    kind: str             # EVENT_POSSESSION / EVENT_PERIOD_END / EVENT_FINAL
+    quarter: int
+    clock: float          # 該節剩餘秒數
+    game_time: float      # 比賽已進行秒數
+    home_score: int
+    away_score: int
+    offense: str = ""     # 該回合進攻方 ID (僅 possession)
+    elapsed: float = 0.0  # 該回合耗時 (秒)
+    home_on_court: Tuple[str, ...] = ()
+    away_on_court: Tuple[str, ...] = ()
+    lineup_changed: bool = False # 場上陣容自上一個事件以來是否變動
+    pbp: List[Tuple[float, ...]] = field(default_factory=list)
+    result: Optional[MatchResult] = None # 僅 final
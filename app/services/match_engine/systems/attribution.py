@@ -1,8 +1,13 @@
 # app/services/match_engine/systems/attribution.py
 
-from typing import List, Optional, Tuple, Dict
+from bisect import bisect_left
+from typing import List, Optional, Tuple, Dict, TYPE_CHECKING
 from ..structures import EnginePlayer, EngineTeam
-from ..utils.rng import rng
+from ..utils.calculator import Calculator
+from ..utils.rng import RNG, rng as shared_rng
+
+if TYPE_CHECKING:
+    from ..plan import EnginePlan
 
 class AttributionSystem:
     """
@@ -12,64 +17,90 @@ class AttributionSystem:
     [Phase 2 Updates]
     - Added record_possession for Pace calculation.
     - Added record_fastbreak_event for Fastbreak Efficiency analysis.
+
+    [Optimization] determine_* 改讀編譯後的 EnginePlan.attribution，不再每次解析 Config。
+    [New] determine_* 接受 rng 參數 (MatchEngine 傳入該場比賽的串流)，預設為全域共用的 rng。
     """
 
+    # =========================================================================
+    # [Optimization] 累積權重表 (Cumulative-Weight Tables)
+    # 權重只取決於場上 5 人與其體力係數，兩者變動時 lineup_epoch 皆會 + 1。
+    # 因此每支隊伍依 lineup_epoch 快取「排序後球員 + 累積機率」表，
+    # 陣容不變時每次抽選只需一個亂數 + bisect，不再重算 formula_sum 與排序。
+    # 累積值以與原逐項迴圈相同的順序與公式累加，抽選結果與亂數消耗皆逐位元一致。
+    # 表格式: (players, cum, zero_pick, monotone)
+    #   zero_pick: 總權重為 0 時的固定結果 (None 表示正常抽選)
+    #   monotone : 累積值非遞減 (權重皆非負) 才能使用 bisect，否則退回線性搜尋
+    # =========================================================================
+
     @staticmethod
-    def _get_val(player: EnginePlayer, attr_name: str) -> float:
-        """取得經體力修正後的屬性值"""
-        val = getattr(player, attr_name, 0.0)
-        if attr_name == 'height': return val
-        return val * player.stamina_coeff
+    def _pick_cache(team: EngineTeam) -> Dict:
+        """取得隊伍的抽選表快取 (陣容或體力變動後自動清空)"""
+        cache = team.pick_cache
+        if team.pick_epoch != team.lineup_epoch:
+            cache.clear()
+            team.pick_epoch = team.lineup_epoch
+        return cache
 
     @staticmethod
-    def _get_attrs_from_config(config: Dict, key: str) -> List[str]:
-        """
-        Helper: 解析 Config 中的屬性列表引用
-        """
-        me_config = config.get('match_engine', {})
-        attr_pools = me_config.get('attr_pools', {})
-        
-        # 嘗試從 attribution.formulas 讀取 key
-        formulas = me_config.get('attribution', {}).get('formulas', {})
-        val = formulas.get(key)
-        
-        if isinstance(val, list):
-            return val
-        elif isinstance(val, str):
-            # 若是字串，代表引用 attr_pools
-            return attr_pools.get(val, [])
-        return []
+    def _build_prob_table(weights: List[Tuple[EnginePlayer, float]], total_weight: float, zero_pick: EnginePlayer) -> Tuple:
+        """建立累積機率表 (r <= 累積機率者中選)"""
+        players = [p for p, _ in weights]
+        if total_weight == 0:
+            return players, [], zero_pick, True
+        cum = []
+        current_prob = 0.0
+        for _, w in weights:
+            current_prob += w / total_weight
+            cum.append(current_prob)
+        monotone = all(a <= b for a, b in zip(cum, cum[1:]))
+        return players, cum, None, monotone
+
+    @staticmethod
+    def _draw(table: Tuple, r: float) -> EnginePlayer:
+        """以亂數 r 查表: 回傳第一個累積值 >= r 的球員，皆不符時回傳最後一位"""
+        players, cum, zero_pick, monotone = table
+        if zero_pick is not None: return zero_pick
+        if monotone:
+            i = bisect_left(cum, r)
+        else:
+            i = next((k for k, c in enumerate(cum) if r <= c), len(cum))
+        return players[i] if i < len(players) else players[-1]
 
     @staticmethod
-    def determine_shooter(team: EngineTeam, is_3pt_attempt: bool, config: Dict) -> EnginePlayer:
+    def determine_shooter(team: EngineTeam, is_3pt_attempt: bool, plan: 'EnginePlan', rng: RNG = shared_rng) -> EnginePlayer:
         """
         [Spec 6.1] 決定投籃出手者
+        [Optimization] 讀取累積權重表，陣容不變時只需一次 bisect。
         """
+        cache = AttributionSystem._pick_cache(team)
+        key = ('shot', is_3pt_attempt)
+        table = cache.get(key)
+        if table is None:
+            table = cache[key] = AttributionSystem._build_shooter_table(team, is_3pt_attempt, plan)
+        return AttributionSystem._draw(table, rng.get_float(0.0, 1.0))
+
+    @staticmethod
+    def _build_shooter_table(team: EngineTeam, is_3pt_attempt: bool, plan: 'EnginePlan') -> Tuple:
         candidates = team.on_court
         weights = []
         total_weight = 0.0
         
-        me_config = config.get('match_engine', {})
-        attr_params = me_config.get('attribution', {}).get('params', {})
-
-        # 1. 讀取屬性列表
-        base_attrs = AttributionSystem._get_attrs_from_config(config, 'shot_weight_base')
-        bonus_3pt_attrs = AttributionSystem._get_attrs_from_config(config, 'shot_3pt_bonus')
-        
-        # 2. 讀取加成係數
-        star_bonus = attr_params.get('shot_star_bonus', 1.5)
-        starter_bonus = attr_params.get('shot_starter_bonus', 1.2)
+        # [Optimization] 直接讀取編譯後的屬性列表與加成係數
+        ap = plan.attribution
+        star_bonus = ap.shot_star_bonus
+        starter_bonus = ap.shot_starter_bonus
 
         for p in candidates:
             # 基礎權重
-            w = sum(AttributionSystem._get_val(p, a) for a in base_attrs)
+            w = Calculator.formula_sum(p, ap.shot_base)
 
             # 3分球特殊加成
             if is_3pt_attempt:
-                w += sum(AttributionSystem._get_val(p, a) for a in bonus_3pt_attrs)
+                w += Calculator.formula_sum(p, ap.shot_3pt_bonus)
 
             # 戰術加成
-            role = getattr(p, 'role', 'Bench')
+            role = p.role
             if role == 'Star': w *= star_bonus
             elif role == 'Starter': w *= starter_bonus
             
@@ -77,127 +108,121 @@ class AttributionSystem:
             total_weight += w
 
         # 分配邏輯: 權重佔比最小者優先 (Spec 6.1)
-        # 註：此處維持原邏輯，若需優化可改為累積機率
         weights.sort(key=lambda x: x[1])
-        r = rng.get_float(0.0, 1.0)
-        current_prob = 0.0
-        
-        if total_weight == 0: return candidates[0]
-
-        for p, w in weights:
-            prob = w / total_weight
-            current_prob += prob
-            if r <= current_prob: return p
-        return weights[-1][0]
+        return AttributionSystem._build_prob_table(weights, total_weight, candidates[0])
 
     @staticmethod
-    def determine_rebounder(off_team: EngineTeam, def_team: EngineTeam, is_defensive: bool, config: Dict) -> EnginePlayer:
+    def determine_rebounder(off_team: EngineTeam, def_team: EngineTeam, is_defensive: bool, plan: 'EnginePlan', rng: RNG = shared_rng) -> EnginePlayer:
         """
         [Spec 6.3] 決定籃板球歸屬
+        [Optimization] 讀取搶籃板隊伍的累積權重表。
         """
-        candidates = def_team.on_court if is_defensive else off_team.on_court
+        team = def_team if is_defensive else off_team
+        cache = AttributionSystem._pick_cache(team)
+        key = ('reb', is_defensive)
+        table = cache.get(key)
+        if table is None:
+            table = cache[key] = AttributionSystem._build_rebounder_table(team, is_defensive, plan)
+        return AttributionSystem._draw(table, rng.get_float(0.0, 1.0))
+
+    @staticmethod
+    def _build_rebounder_table(team: EngineTeam, is_defensive: bool, plan: 'EnginePlan') -> Tuple:
+        candidates = team.on_court
         weights = []
         total_weight = 0.0
         
-        me_config = config.get('match_engine', {})
-        attr_params = me_config.get('attribution', {}).get('params', {})
-        
-        # 讀取參數
-        base_attrs = AttributionSystem._get_attrs_from_config(config, 'rebound_base')
-        bonus_attrs = AttributionSystem._get_attrs_from_config(config, 'rebound_bonus')
-        iq_off_attrs = AttributionSystem._get_attrs_from_config(config, 'rebound_iq_off')
-        iq_def_attrs = AttributionSystem._get_attrs_from_config(config, 'rebound_iq_def')
-        
-        height_weight = attr_params.get('rebound_height_weight', 1.5)
+        ap = plan.attribution
+        height_weight = ap.rebound_height_weight
+        iq_formula = ap.rebound_iq_def if is_defensive else ap.rebound_iq_off
 
         for p in candidates:
             # 通用屬性
-            w = sum(AttributionSystem._get_val(p, a) for a in base_attrs)
+            w = Calculator.formula_sum(p, ap.rebound_base)
             
             # 加權屬性 (包含身高)
-            w += sum(AttributionSystem._get_val(p, a) for a in bonus_attrs) * height_weight
-            w += AttributionSystem._get_val(p, 'height') * height_weight
+            w += Calculator.formula_sum(p, ap.rebound_bonus) * height_weight
+            w += p.height * height_weight
 
             # 智商屬性
-            if is_defensive:
-                w += sum(AttributionSystem._get_val(p, a) for a in iq_def_attrs)
-            else:
-                w += sum(AttributionSystem._get_val(p, a) for a in iq_off_attrs)
+            w += Calculator.formula_sum(p, iq_formula)
             
             weights.append((p, w))
             total_weight += w
 
         weights.sort(key=lambda x: x[1])
-        r = rng.get_float(0.0, 1.0)
-        current_prob = 0.0
-        
-        if total_weight == 0: return candidates[0]
-
-        for p, w in weights:
-            prob = w / total_weight
-            current_prob += prob
-            if r <= current_prob: return p
-        return weights[-1][0]
+        return AttributionSystem._build_prob_table(weights, total_weight, candidates[0])
 
     @staticmethod
-    def determine_assist_provider(off_team: EngineTeam, shooter: EnginePlayer, config: Dict) -> Optional[EnginePlayer]:
+    def determine_assist_provider(off_team: EngineTeam, shooter: EnginePlayer, plan: 'EnginePlan', rng: RNG = shared_rng) -> Optional[EnginePlayer]:
         """
         [Spec 6.4] 決定助攻者
+        [Optimization] 依出手者快取累積權重表 (每個陣容最多 5 張)。
         """
+        cache = AttributionSystem._pick_cache(off_team)
+        key = ('ast', shooter.id)
+        table = cache.get(key)
+        if table is None:
+            table = cache[key] = AttributionSystem._build_assist_table(off_team, shooter, plan)
+        if not table[0]: return None
+        return AttributionSystem._draw(table, rng.get_float(0.0, 1.0))
+
+    @staticmethod
+    def _build_assist_table(off_team: EngineTeam, shooter: EnginePlayer, plan: 'EnginePlan') -> Tuple:
         candidates = [p for p in off_team.on_court if p.id != shooter.id]
-        if not candidates: return None
+        if not candidates: return [], [], None, True
 
         weights = []
         total_weight = 0.0
         
         # 讀取權重屬性
-        assist_attrs = AttributionSystem._get_attrs_from_config(config, 'assist_weight')
+        ap = plan.attribution
 
         for p in candidates:
-            w = sum(AttributionSystem._get_val(p, a) for a in assist_attrs)
+            w = Calculator.formula_sum(p, ap.assist_weight)
             weights.append((p, w))
             total_weight += w
         
         # 判定順序: C -> PF -> SF -> SG -> PG
-        pos_order_list = config.get('match_engine', {}).get('general', {}).get('substitution', {}).get('redistribution', {}).get('positions', ["C", "PF", "SF", "SG", "PG"])
-        pos_order_map = {pos: idx for idx, pos in enumerate(pos_order_list)}
+        pos_order_map = ap.assist_position_order
         
         weights.sort(key=lambda x: pos_order_map.get(x[0].position, -1))
-
-        r = rng.get_float(0.0, 1.0)
-        current_prob = 0.0
-        
-        if total_weight == 0: return candidates[-1]
-
-        for p, w in weights:
-            prob = w / total_weight
-            current_prob += prob
-            if r <= current_prob: return p
-        return weights[-1][0]
+        return AttributionSystem._build_prob_table(weights, total_weight, candidates[-1])
 
     @staticmethod
-    def determine_stealer(def_team: EngineTeam, config: Dict) -> EnginePlayer:
+    def determine_stealer(def_team: EngineTeam, plan: 'EnginePlan', rng: RNG = shared_rng) -> EnginePlayer:
         """
         [Spec 6.5] 決定抄截者
+        [Optimization] 讀取累積權重表 (不排序，累積值為權重絕對值)。
         """
+        cache = AttributionSystem._pick_cache(def_team)
+        table = cache.get('stl')
+        if table is None:
+            table = cache['stl'] = AttributionSystem._build_stealer_table(def_team, plan)
+        players, cum, total_weight, monotone = table
+        r = rng.get_float(0.0, 1.0) * total_weight
+        if monotone:
+            i = bisect_left(cum, r)
+        else:
+            i = next((k for k, c in enumerate(cum) if c >= r), len(cum))
+        return players[i] if i < len(players) else players[-1]
+
+    @staticmethod
+    def _build_stealer_table(def_team: EngineTeam, plan: 'EnginePlan') -> Tuple:
+        """回傳 (players, cum, total_weight, monotone)"""
         candidates = def_team.on_court
-        weights = []
-        total_weight = 0.0
-        
-        steal_attrs = AttributionSystem._get_attrs_from_config(config, 'steal_weight')
+        steal_formula = plan.attribution.steal_weight
 
+        players = list(candidates)
+        cum = []
+        total_weight = 0.0
+        upto = 0.0
         for p in candidates:
-            w = sum(AttributionSystem._get_val(p, a) for a in steal_attrs)
-            weights.append((p, w))
+            w = Calculator.formula_sum(p, steal_formula)
             total_weight += w
-        
-        r = rng.get_float(0.0, 1.0) * total_weight
-        upto = 0.0
-        for p, w in weights:
-            if upto + w >= r: return p
+            cum.append(upto + w)
             upto += w
-      
-        return candidates[-1]
+        monotone = all(a <= b for a, b in zip(cum, cum[1:]))
+        return players, cum, total_weight, monotone
 
     # =========================================================================
     # Recording Methods (Aligned with MatchEngine Core)
@@ -1,26 +1,26 @@
 # app/services/match_engine/systems/stamina.py
 
-from typing import Dict, List
+from typing import List, Tuple, TYPE_CHECKING
 from ..structures import EnginePlayer
 
+if TYPE_CHECKING:
+    from ..plan import EnginePlan, StaminaPlan
+
 class StaminaSystem:
     """
     體力系統 (Level 3) - Config Driven
-    完全依賴傳入的 config 字典進行計算，不寫死任何係數。
+    完全依賴 Config 編譯後的 EnginePlan 進行計算，不寫死任何係數。
     對應 Spec v1.5 Section 2 & v2.1 (Rest Updates)
     """
 
     @staticmethod
-    def update_stamina(player: EnginePlayer, seconds: float, is_on_court: bool, config: Dict):
+    def _rates_per_minute(player: EnginePlayer, sp: 'StaminaPlan') -> Tuple[float, float]:
         """
-        更新球員體力 (消耗或恢復)。
+        計算球員每分鐘的 (場上消耗量, 板凳恢復量)。
+        兩者只取決於年齡與屬性，整場比賽固定不變。
         """
-        # 1. 讀取設定參數
-        me_config = config.get('match_engine', {})
-        gen_config = me_config.get('general', {})
-        sys_config = me_config.get('stamina_system', {})
-        age_threshold = sys_config.get('age_threshold', 20)
-        age_decay_rate = sys_config.get('age_decay_rate', 0.01)
+        age_threshold = sp.age_threshold
+        age_decay_rate = sp.age_decay_rate
 
         # 計算年齡因子
         age_factor = 1.0
@@ -28,41 +28,33 @@ class StaminaSystem:
             # (Age - 20) * 1%
             age_factor = 1.0 + (player.age - age_threshold) * age_decay_rate
         
-        # 取得屬性名稱
-        drain_attrs = sys_config.get('drain_attrs', ['ath_stamina', 'talent_health'])
-        
-        # 取得係數
-        drain_coeff = gen_config.get('stamina_drain_coeff', 3.0)
-        
-        # 2. 取得球員屬性並轉為百分比 (0.01 ~ 0.99)
-        stamina_val = getattr(player, drain_attrs[0], 50)
-        health_val = getattr(player, drain_attrs[1], 50)
+        # 取得球員屬性並轉為百分比 (0.01 ~ 0.99)
+        stamina_val = getattr(player, sp.stamina_attr, 50)
+        health_val = getattr(player, sp.health_attr, 50)
         
         stamina_pct = max(0.01, min(0.99, stamina_val / 100.0))
         health_pct = max(0.01, min(0.99, health_val / 100.0))
 
-        change_per_minute = 0.0
+        # [Spec 2.3] 消耗公式
+        # 消耗量/分 = Coeff * [1 + (1 - 體能%)] + (1 - 健康%)
+        drain_per_min = sp.drain_coeff * ((1.0 + (1.0 - stamina_pct)) + (1.0 - health_pct))
+        drain_per_min *= age_factor # <--- 乘上年齡因子
 
-        if is_on_court:
-            # [Spec 2.3] 消耗公式
-            # 消耗量/分 = Coeff * [1 + (1 - 體能%)] + (1 - 健康%)
-            drain_per_min = drain_coeff * ((1.0 + (1.0 - stamina_pct)) + (1.0 - health_pct))
-            drain_per_min *= age_factor # <--- 乘上年齡因子
-            change_per_minute = -drain_per_min
-        else:
-            # [Spec 2.4] 恢復公式
-            # 恢復量/分 = 1.0 + (體能%) - (1 - 健康%)
-            recover_factor = 1.0 
-            if player.age > age_threshold:
-                recover_factor = 1.0 - (player.age - age_threshold) * age_decay_rate
-            
-            base_recover = 1.0 
-            recover_per_min = (base_recover + stamina_pct - (1.0 - health_pct)) * recover_factor # <--- 乘上恢復衰退
-            change_per_minute = recover_per_min
-
-        # 3. 應用變更
-        change = (change_per_minute / 60.0) * seconds
-        new_val = player.current_stamina + change
+        # [Spec 2.4] 恢復公式
+        # 恢復量/分 = 1.0 + (體能%) - (1 - 健康%)
+        recover_factor = 1.0 
+        if player.age > age_threshold:
+            recover_factor = 1.0 - (player.age - age_threshold) * age_decay_rate
+        
+        base_recover = 1.0 
+        recover_per_min = (base_recover + stamina_pct - (1.0 - health_pct)) * recover_factor # <--- 乘上恢復衰退
+
+        return drain_per_min, recover_per_min
+
+    @staticmethod
+    def _apply_change(player: EnginePlayer, change_per_minute: float, seconds: float):
+        """套用體力變化並限制於 1 ~ 100"""
+        new_val = player.current_stamina + (change_per_minute / 60.0) * seconds
         
         # 限制範圍
         if new_val > 100.0: new_val = 100.0
@@ -70,36 +62,82 @@ class StaminaSystem:
         
         player.current_stamina = new_val
 
-        # 4. 更新修正係數
-        StaminaSystem._update_coefficient(player, gen_config)
+    @staticmethod
+    def update_stamina(player: EnginePlayer, seconds: float, is_on_court: bool, plan: 'EnginePlan') -> bool:
+        """
+        更新球員體力 (消耗或恢復)。
+        [Optimization] 參數改由編譯後的 EnginePlan.stamina 提供。
+        [Optimization] 回傳體力修正係數 (stamina_coeff) 是否變動，供呼叫端使團隊加總快取失效。
+        註：MatchEngine 已改用 prepare_player / settle 的延遲結算，此為單次立即更新介面。
+        """
+        sp = plan.stamina
+        drain_per_min, recover_per_min = StaminaSystem._rates_per_minute(player, sp)
+        change_per_minute = -drain_per_min if is_on_court else recover_per_min
+        StaminaSystem._apply_change(player, change_per_minute, seconds)
+
+        # 更新修正係數
+        return StaminaSystem._update_coefficient(player, sp)
+
+    @staticmethod
+    def prepare_player(player: EnginePlayer, plan: 'EnginePlan'):
+        """
+        [Optimization] 賽前預先計算每分鐘消耗/恢復率，並重設延遲結算狀態。
+        之後體力以 (current_stamina, stamina_clock, stamina_on_court) 表示，
+        僅在需要時 (settle) 以封閉解一次補算，板凳恢復中的球員每回合零成本。
+        """
+        player.stamina_drain, player.stamina_recover = StaminaSystem._rates_per_minute(player, plan.stamina)
+        player.stamina_clock = 0.0
+        player.stamina_on_court = False
+
+    @staticmethod
+    def settle(player: EnginePlayer, now: float, plan: 'EnginePlan') -> bool:
+        """
+        [Optimization] 將體力結算至比賽時間 now (game_time_elapsed)。
+        同一區段內變化率固定且單調，一次套用並限制 1 ~ 100，與逐回合累加結果一致。
+        回傳體力修正係數是否變動。
+        """
+        seconds = now - player.stamina_clock
+        if seconds > 0:
+            change_per_minute = -player.stamina_drain if player.stamina_on_court else player.stamina_recover
+            StaminaSystem._apply_change(player, change_per_minute, seconds)
+            player.stamina_clock = now
+        return StaminaSystem._update_coefficient(player, plan.stamina)
 
     @staticmethod
-    def _update_coefficient(player: EnginePlayer, gen_config: Dict):
+    def _update_coefficient(player: EnginePlayer, sp: 'StaminaPlan') -> bool:
         """
         [Spec 2.2] 能力值動態修正
+        回傳係數是否變動。
         """
-        threshold = gen_config.get('stamina_nerf_threshold', 80.0)
-        min_multiplier = gen_config.get('stamina_min_multiplier', 0.21)
+        threshold = sp.nerf_threshold
         
         current = player.current_stamina
 
         if current >= threshold:
-            player.stamina_coeff = 1.0
+            coeff = 1.0
         elif current > 1.0:
             # 線性衰退
             penalty = (threshold - current) * 0.01
-            player.stamina_coeff = 1.0 - penalty
+            coeff = 1.0 - penalty
         else:
             # 極限狀態
-            player.stamina_coeff = min_multiplier
+            coeff = sp.min_multiplier
+
+        if coeff == player.stamina_coeff:
+            return False
+        player.stamina_coeff = coeff
+        return True
 
     @staticmethod
-    def apply_rest(team_players: List[EnginePlayer], minutes: float, config: Dict):
+    def apply_rest(team_players: List[EnginePlayer], minutes: float, plan: 'EnginePlan', now: float):
         """
         [Spec 2.4 New] 應用休息時間 (中場或節間)
-        邏輯：將休息時間視為「在板凳上休息」，調用 update_stamina 進行恢復。
+        邏輯：將休息時間視為「在板凳上休息」進行恢復。
+        [Optimization] 先結算至比賽時間 now，再直接加上休息恢復量 (休息不佔比賽時間)。
         """
         seconds = minutes * 60.0
         for player in team_players:
-            # 強制視為下場休息 (is_on_court=False)
-            StaminaSystem.update_stamina(player, seconds, False, config)
\ No newline at end of file
+            StaminaSystem.settle(player, now, plan)
+            # 強制視為下場休息 (使用板凳恢復率)
+            StaminaSystem._apply_change(player, player.stamina_recover, seconds)
+            StaminaSystem._update_coefficient(player, plan.stamina)
@@ -1,25 +1,41 @@
 # app/services/match_engine/systems/substitution.py
 
-from typing import List, Optional, Dict, Set
+from bisect import bisect_left, insort
+from typing import List, Optional, Set, Tuple, TYPE_CHECKING
 from ..structures import EngineTeam, EnginePlayer
+from ..utils.pbp import PbpEvent
+from .stamina import StaminaSystem
+
+if TYPE_CHECKING:
+    from ..plan import EnginePlan
+
+# [Optimization] 預測換人時間點的提前量 (秒)，吸收浮點累加誤差，確保只會提早、不會延後檢查
+SUB_CHECK_EPSILON = 1e-3
+BENCH_POSITIONS = ("C", "PF", "SF", "SG", "PG")
 
 class SubstitutionSystem:
     """
     換人系統 (Level 3) - Config Driven
     對應 Spec v1.5 Section 2.5 & 2.6
     修正: 統一使用秒 (seconds) 進行時間比較。
+
+    [Optimization] 事件驅動排程:
+    體力線性消耗、上場時間隨比賽時間累加，因此可預測場上球員何時觸發換人條件，
+    記錄於 team.next_sub_check_at；板凳名單依各位置 pos_scores 預先排序並增量維護。
     """
 
     @staticmethod
-    def check_auto_substitution(team: EngineTeam, quarter: int, time_remaining: float, config: Dict) -> List[str]:
+    def check_auto_substitution(team: EngineTeam, quarter: int, time_remaining: float, plan: 'EnginePlan', now: float) -> List[Tuple]:
         """
         [Spec 2.5] 常規換人檢查
+        [Optimization] 回傳轉播事件 (PbpEvent.SUB, team, p_in, p_out, -1, reason)，由 Core 寫入事件緩衝區。
+        [Optimization] 場上球員體力已於回合結束時結算；僅在確定要換人時，
+        才將板凳球員的延遲體力結算至比賽時間 now。
         """
         logs = []
         
-        # 讀取 Config
-        sub_config = config.get('match_engine', {}).get('general', {}).get('substitution', {})
-        fatigue_threshold = sub_config.get('stamina_threshold', 80.0)
+        # 讀取編譯後的換人門檻
+        fatigue_threshold = plan.substitution.fatigue_threshold
         
         to_sub_out = []
         
@@ -27,92 +43,116 @@ class SubstitutionSystem:
             reason = None
             # 條件 1: 體力過低
             if player.current_stamina < fatigue_threshold:
-                reason = "體力低"
+                reason = 0 # 體力低
             
             # 條件 2: 時間已到 (容許 1 分鐘緩衝)
             elif (player.seconds_played > player.target_seconds + 60.0):
-                reason = "時間到"
+                reason = 1 # 時間到
 
-            if reason:
+            if reason is not None:
                 to_sub_out.append((player, reason))
         
+        if to_sub_out:
+            for p in team.bench:
+                StaminaSystem.settle(p, now, plan)
+
         for p_out, reason in to_sub_out:
             p_in = SubstitutionSystem._pick_bench_player(team, p_out.position, p_out.current_stamina)
             
             if p_in:
                 SubstitutionSystem.execute_sub(team, p_out, p_in)
-                logs.append(f"{team.name} 換人: {p_in.name} 替換 {p_out.name} ({reason})")
+                logs.append((PbpEvent.SUB, team.slot, p_in.slot, p_out.slot, -1, reason))
+
+        SubstitutionSystem.schedule_next_check(team, plan, now)
         
         return logs
 
     @staticmethod
-    def handle_fouled_out(team: EngineTeam, fouled_player: EnginePlayer, config: Dict) -> str:
+    def schedule_next_check(team: EngineTeam, plan: 'EnginePlan', now: float):
         """
-        [Spec 2.6] 處理犯滿離場與時間重分配
+        [Optimization] 預測下一次可能觸發常規換人的比賽時間。
+        - 體力: 場上體力以 stamina_drain 線性下降，求跌破 fatigue_threshold 的時間
+        - 時間: seconds_played 與比賽時間同步增加，求超過 target_seconds + 60 的時間
+        若場上已有人符合條件 (板凳暫無可用替補)，則維持每回合檢查。
         """
-        fouled_player.is_fouled_out = True
-        
-        # 計算剩餘時間 [Fix] 使用 seconds
-        remaining_seconds = max(0.0, fouled_player.target_seconds - fouled_player.seconds_played)
-        fouled_player.target_seconds = fouled_player.seconds_played 
-        
-        # 時間重分配
-        if remaining_seconds > 0:
-            # 讀取重分配設定
-            redis_config = config.get('match_engine', {}).get('general', {}).get('substitution', {}).get('redistribution', {})
-            SubstitutionSystem._redistribute_minutes(team, remaining_seconds, redis_config)
-
-        # 強制換人
-        p_in = SubstitutionSystem._pick_best_available(team, fouled_player.position)
-        
-        if p_in:
-            SubstitutionSystem.execute_sub(team, fouled_player, p_in)
-            return f"{fouled_player.name} 犯滿離場(剩餘{remaining_seconds:.1f}分已分配)，由 {p_in.name} 接替"
-        else:
-            return f"{fouled_player.name} 犯滿離場，板凳無可用之兵！"
+        fatigue_threshold = plan.substitution.fatigue_threshold
+        due = float('inf')
 
-    @staticmethod
-    def _redistribute_minutes(team: EngineTeam, minutes: float, redis_config: Dict):
-        """
-        [Spec 2.6] 分配邏輯
-        """
-        # 從 Config 讀取順序與數量
-        positions_order = redis_config.get('positions', ["C", "PF", "SF", "SG", "PG"])
-        top_k = redis_config.get('top_k', 3)
-        
-        all_players = team.on_court + team.bench
-        targets = []
-        
-        for pos in positions_order:
-            valid_players = [p for p in all_players if not p.is_fouled_out]
-            # 排序依據該位置分數
-            valid_players.sort(key=lambda p: p.pos_scores.get(pos, 0), reverse=True)
-            targets.extend(valid_players[:top_k])
-        
-        # 分配時間 (總份數 = 位置數 * Top_K)
-        total_slots = len(positions_order) * top_k
-        if total_slots > 0:
-            unit_time = minutes / float(total_slots)
-            for p in targets:
-                p.target_seconds += unit_time
+        for p in team.on_court:
+            time_left = p.target_seconds + 60.0 - p.seconds_played
+            if p.current_stamina < fatigue_threshold or time_left < 0:
+                team.next_sub_check_at = now
+                return
+
+            if p.stamina_drain > 0:
+                stamina_left = (p.current_stamina - fatigue_threshold) * 60.0 / p.stamina_drain
+                if stamina_left < time_left: time_left = stamina_left
+            if time_left < due: due = time_left
+
+        team.next_sub_check_at = now + due - SUB_CHECK_EPSILON
 
     @staticmethod
     def execute_sub(team: EngineTeam, p_out: EnginePlayer, p_in: EnginePlayer):
         """執行換人"""
         if p_out in team.on_court:
             team.on_court.remove(p_out)
-            team.bench.append(p_out)
+            SubstitutionSystem.bench_add(team, p_out)
         
         if p_in in team.bench:
-            team.bench.remove(p_in)
+            SubstitutionSystem.bench_remove(team, p_in)
             team.on_court.append(p_in)
         elif p_in not in team.on_court:
             # 防呆: 如果 p_in 既不在 bench 也不在 on_court (理論上不應發生)
             team.on_court.append(p_in)
 
+        # [Optimization] 場上陣容變動，使團隊加總快取失效
+        team.lineup_epoch += 1
+
+    @staticmethod
+    def build_bench_index(team: EngineTeam):
+        """
+        [Optimization] 依目前 team.bench 順序建立各位置的板凳排序索引。
+        排序鍵 (-pos_score, bench_seq) 等同於對板凳名單做「分數由高至低的穩定排序」。
+        """
+        team.bench_seq = 0
+        team.bench_index = {pos: [] for pos in BENCH_POSITIONS}
+        for p in team.bench:
+            SubstitutionSystem._index_add(team, p)
+
+    @staticmethod
+    def _index_add(team: EngineTeam, player: EnginePlayer):
+        player.bench_seq = team.bench_seq
+        team.bench_seq += 1
+        for pos, order in team.bench_index.items():
+            insort(order, (-player.pos_scores.get(pos, 0), player.bench_seq, player))
+
+    @staticmethod
+    def bench_add(team: EngineTeam, player: EnginePlayer):
+        """[Optimization] 球員下場 (加入板凳尾端)，同步更新排序索引"""
+        team.bench.append(player)
+        SubstitutionSystem._index_add(team, player)
+
+    @staticmethod
+    def bench_remove(team: EngineTeam, player: EnginePlayer):
+        """[Optimization] 球員離開板凳，同步更新排序索引"""
+        team.bench.remove(player)
+        for pos, order in team.bench_index.items():
+            i = bisect_left(order, (-player.pos_scores.get(pos, 0), player.bench_seq))
+            del order[i]
+
     @staticmethod
     def _pick_bench_player(team: EngineTeam, target_position: str, current_stamina_threshold: float) -> Optional[EnginePlayer]:
         """常規替補選擇"""
+        order = team.bench_index.get(target_position)
+        if order is not None:
+            # [Optimization] 預先排序索引: 第一位符合條件者即為最佳人選
+            for _, _, p in order:
+                if (not p.is_fouled_out
+                        and p.current_stamina > current_stamina_threshold
+                        and p.seconds_played < p.target_seconds):
+                    return p
+            return None
+
         candidates = [
             p for p in team.bench 
             if not p.is_fouled_out 
@@ -124,15 +164,7 @@ class SubstitutionSystem:
         return candidates[0]
 
     @staticmethod
-    def _pick_best_available(team: EngineTeam, target_position: str) -> Optional[EnginePlayer]:
-        """緊急替補選擇"""
-        candidates = [p for p in team.bench if not p.is_fouled_out]
-        if not candidates: return None
-        candidates.sort(key=lambda p: p.pos_scores.get(target_position, 0), reverse=True)
-        return candidates[0]
-    
-    @staticmethod
-    def enforce_best_lineup(team: EngineTeam, config: Dict) -> List[str]:
+    def enforce_best_lineup(team: EngineTeam, plan: 'EnginePlan') -> List[Tuple]:
         """
         [Spec 2.5 Revised] 關鍵時刻強制調度 (Clutch Override)
         邏輯：
@@ -140,6 +172,7 @@ class SubstitutionSystem:
         2. 若 Best 5 有人犯滿，則依據該位置評分順序，選出下一位可用球員遞補。
         3. 確保遞補者不是「其他位置的 Best 5 成員」(避免挖東牆補西牆)。
         4. 強制換人。
+        [Optimization] 回傳轉播事件 (PbpEvent.CLUTCH_SUB, team, p_in, p_out, -1, 位置 index)。
         """
         logs = []
         
@@ -200,6 +233,6 @@ class SubstitutionSystem:
             idx = target_lineup.index(p_in)
             p_in.position = positions_order[idx]
             
-            logs.append(f"{team.name} 關鍵時刻調度: {p_in.name} ({p_in.position}) 替換 {p_out.name}")
+            logs.append((PbpEvent.CLUTCH_SUB, team.slot, p_in.slot, p_out.slot, -1, idx))
         
         return logs
\ No newline at end of file
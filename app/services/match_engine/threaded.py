@@ -0,0 +1,79 @@
+# app/services/match_engine/threaded.py
+import copy
+import os
+import sys
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any, Dict, List, Optional, Sequence, Tuple
+
+from .core import MatchEngine, MODE_SCORE_ONLY
+from .plan import EnginePlan
+from .structures import EngineTeam, MatchResult
+from .utils.pbp import LOG_OFF
+from .utils.rng import RNG
+
+# [New] 多執行緒批次模擬 (Thread-Pool Runner, 支援 free-threaded / no-GIL 版 Python)
+# 進程池需要把球隊與 Config pickle 到每個 Worker，且每個進程各自持有一份編譯後的 Config 與球隊資料。
+# 在 free-threaded 版 (python3.13t) 下，執行緒可以真正平行執行，所有執行緒共用:
+#   - 同一份 Config dict 與 EnginePlan (唯讀，於主執行緒預先編譯)
+#   - 呼叫端傳入的球隊物件作為範本 (唯讀，不會被修改)
+# 每個執行緒各自持有: 一個 MatchEngine (以 reset 逐場重複使用)、球隊範本的私有副本、每場專屬的 RNG 串流。
+# 第 i 場使用 RNG.for_game(run_seed, i)，結果與執行緒數量、排程順序無關，
+# 且與 simulation_pool.run_matchup_chunk (進程池) 在相同 seed 下逐場一致。
+# 在一般 (有 GIL) 版本下仍可正確執行，但純 Python 的模擬無法平行加速。
+
+
+def gil_enabled() -> bool:
+    """目前的直譯器是否啟用 GIL (3.13 以前的版本一律為 True)"""
+    check = getattr(sys, '_is_gil_enabled', None)
+    return True if check is None else check()
+
+
+class _ThreadState(threading.local):
+    """執行緒私有的引擎與球隊副本 (範本 id -> 副本)"""
+    def __init__(self):
+        self.engine: Optional[MatchEngine] = None
+        self.teams: Dict[int, EngineTeam] = {}
+
+
+def simulate_games_threaded(matchups: Sequence[Tuple[EngineTeam, EngineTeam]], config: Dict, run_seed: Any,
+                            workers: Optional[int] = None, mode: str = MODE_SCORE_ONLY,
+                            chunk_size: int = 25) -> List[MatchResult]:
+    """
+    以執行緒池模擬多場比賽，回傳依輸入順序排列的 MatchResult。
+    matchups: (主隊, 客隊) 列表，同一組球隊物件可重複出現 (各執行緒使用私有副本)
+    workers: 執行緒數 (None = CPU 核心數)
+    """
+    # 預先編譯，各執行緒直接讀取快取 (EnginePlan 為 frozen dataclass)
+    EnginePlan.from_config(config)
+    workers = workers or os.cpu_count() or 1
+    state = _ThreadState()
+
+    def local_team(template: EngineTeam) -> EngineTeam:
+        team = state.teams.get(id(template))
+        if team is None:
+            team = state.teams[id(template)] = copy.deepcopy(template)
+        return team
+
+    def run_chunk(indices: range) -> List[MatchResult]:
+        results = []
+        for i in indices:
+            home_tpl, away_tpl = matchups[i]
+            home, away = local_team(home_tpl), local_team(away_tpl)
+            game_id = f"THREAD_{i}"
+            game_rng = RNG.for_game(run_seed, i)
+            if state.engine is None:
+                state.engine = MatchEngine(home, away, config, game_id=game_id, log_level=LOG_OFF, mode=mode, rng=game_rng)
+            else:
+                state.engine.reset(home, away, game_id=game_id, rng=game_rng)
+            results.append(state.engine.simulate())
+        return results
+
+    n = len(matchups)
+    chunks = [range(i, min(i + chunk_size, n)) for i in range(0, n, max(1, chunk_size))]
+    if workers <= 1:
+        parts = [run_chunk(c) for c in chunks]
+    else:
+        with ThreadPoolExecutor(max_workers=workers, thread_name_prefix="match-engine") as pool:
+            parts = list(pool.map(run_chunk, chunks))
+    return [r for part in parts for r in part]
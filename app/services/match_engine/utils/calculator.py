@@ -1,7 +1,10 @@
 # app/services/match_engine/utils/calculator.py
 
-from typing import List, Dict, Optional, Union
-from ..structures import EnginePlayer
+from typing import List, Dict, Optional, Tuple, Union, TYPE_CHECKING
+from ..structures import EnginePlayer, EngineTeam
+
+if TYPE_CHECKING:
+    from ..plan import EnginePlan, Formula
 
 class Calculator:
     """
@@ -12,6 +15,8 @@ class Calculator:
     3. 投籃公式正確讀取 spacing_weight。
     4. 同步 Spec v2.2 技巧加成 (Skill Bonus) 邏輯。
     5. calculate_shooting_rate 支援 3分球特殊邏輯 (Multiplier & Base Rate)。
+    6. [Optimization] 新增 formula_sum / team_formula_sum，直接計算預先編譯的 Formula (見 plan.py)。
+    7. [Optimization] 利用體力係數的線性特性，以球員層級的原始總和快取取代逐項走訪。
     """
 
     @staticmethod
@@ -30,10 +35,17 @@ class Calculator:
             player: 球員物件
             attrs: 屬性名稱列表 (可包含 pool key)
             attr_pools: 屬性池字典 (用於遞迴展開 pool key)
+
+        [Optimization] 體力係數為線性修正，因此總和 = (非身高原始總和 x 係數) + 身高項。
+        依此順序累加，與 EnginePlayer.formula_raw / formula_height 快取逐位元一致。
         """
-        total = 0.0
-        coeff = player.stamina_coeff
+        acc = [0.0, 0.0] # [非身高原始總和, 身高項總和]
+        Calculator._accumulate_attrs(player, attrs, attr_pools, False, acc)
+        return acc[0] * player.stamina_coeff + acc[1]
 
+    @staticmethod
+    def _accumulate_attrs(player: EnginePlayer, attrs: List[str], attr_pools: Optional[Dict[str, List[str]]], negate: bool, acc: List[float]):
+        """Helper: 依序累加屬性 (pool key 遞迴展開至同一組累加器)"""
         for attr in attrs:
             is_negative = False
             clean_attr = attr
@@ -47,38 +59,126 @@ class Calculator:
             if hasattr(player, clean_attr):
                 val = getattr(player, clean_attr)
                 
-                # 體力修正: 只有數值型屬性才乘係數 (height 不乘)
-                if clean_attr != 'height':
-                    val *= coeff
+                # 體力修正: 只有數值型屬性才乘係數 (height 不乘)，故分開累加
+                slot = 1 if clean_attr == 'height' else 0
                 
-                if is_negative:
-                    total -= val
+                if is_negative != negate:
+                    acc[slot] -= val
                 else:
-                    total += val
+                    acc[slot] += val
             
             # 2. 若球員無此屬性，檢查是否為 Pool Key (遞迴展開)
             elif attr_pools and clean_attr in attr_pools:
-                # 遞迴呼叫: 傳入 pool 定義的列表
-                sub_total = Calculator.get_player_attr_sum(player, attr_pools[clean_attr], attr_pools)
-                
-                if is_negative:
-                    total -= sub_total
-                else:
-                    total += sub_total
-        
-        return total
+                Calculator._accumulate_attrs(player, attr_pools[clean_attr], attr_pools, is_negative != negate, acc)
 
     @staticmethod
     def get_team_attr_sum(players: List[EnginePlayer], attrs: List[str], attr_pools: Optional[Dict[str, List[str]]] = None) -> float:
         """計算一組球員的屬性總和"""
         return sum(Calculator.get_player_attr_sum(p, attrs, attr_pools) for p in players)
 
+    @staticmethod
+    def formula_parts(player: EnginePlayer, formula: 'Formula') -> Tuple[float, float]:
+        """
+        [Optimization] 走訪已編譯公式，回傳 (非身高原始總和, 身高項總和)。
+        此為快取的建立來源，亦是驗證快取正確性的基準路徑。
+        """
+        raw = 0.0
+        height = 0.0
+
+        for attr, is_negative, is_height in formula.terms:
+            val = getattr(player, attr)
+            if is_height:
+                if is_negative: height -= val
+                else: height += val
+            else:
+                if is_negative: raw -= val
+                else: raw += val
+
+        return raw, height
+
+    @staticmethod
+    def build_formula_cache(player: EnginePlayer, plan: 'EnginePlan'):
+        """
+        [Optimization] 預先計算球員在所有公式上的原始總和。
+        必須在身高修正 (_apply_height_correction) 之後呼叫；比賽中屬性不再變動，
+        之後每次查詢只剩一次乘法與一次加法。
+        """
+        # 就地寫入既有 list (reset_for_game 後為空)，重複使用的球員不再配置新 list
+        raw_sums = player.formula_raw
+        height_sums = player.formula_height
+        raw_sums.clear()
+        height_sums.clear()
+        for formula in plan.formulas:
+            raw, height = Calculator.formula_parts(player, formula)
+            raw_sums.append(raw)
+            height_sums.append(height)
+
+    @staticmethod
+    def formula_sum(player: EnginePlayer, formula: 'Formula') -> float:
+        """
+        [Optimization] 讀取快取計算公式總和: raw x 體力係數 + 身高項。
+        需先呼叫 build_formula_cache。
+        """
+        idx = formula.index
+        return player.formula_raw[idx] * player.stamina_coeff + player.formula_height[idx]
+
+    @staticmethod
+    def team_formula_sum(players: List[EnginePlayer], formula: 'Formula') -> float:
+        """[Optimization] 計算一組球員的已編譯公式總和"""
+        idx = formula.index
+        return sum(p.formula_raw[idx] * p.stamina_coeff + p.formula_height[idx] for p in players)
+
+    @staticmethod
+    def lineup_sum(team: EngineTeam, formula: 'Formula') -> float:
+        """
+        [Optimization] 場上 5 人的公式總和 (讀取 Lineup Epoch 快取)。
+        快取於換人 (SubstitutionSystem.execute_sub) 或場上體力係數變動時失效，
+        失效後以當下 on_court 順序重新加總，與 team_formula_sum 結果一致。
+        [New] 陣列佈局 (team.matrix) 於失效時一次重算所有公式的總和。
+        """
+        matrix = team.matrix
+        if matrix is not None:
+            if matrix.epoch != team.lineup_epoch:
+                matrix.refresh(team)
+            return matrix.lineup[formula.index]
+
+        cache = team.agg_cache
+        if team.agg_epoch != team.lineup_epoch:
+            cache.clear()
+            team.agg_epoch = team.lineup_epoch
+
+        idx = formula.index
+        val = cache.get(idx)
+        if val is None:
+            val = cache[idx] = Calculator.team_formula_sum(team.on_court, formula)
+        return val
+
+    @staticmethod
+    def backcourt_sum(team: EngineTeam, formula: 'Formula') -> float:
+        """[Optimization] 場上前 3 人 (後場推進) 的公式總和，快取規則同 lineup_sum"""
+        matrix = team.matrix
+        if matrix is not None:
+            if matrix.epoch != team.lineup_epoch:
+                matrix.refresh(team)
+            return matrix.backcourt[formula.index]
+
+        cache = team.agg_cache
+        if team.agg_epoch != team.lineup_epoch:
+            cache.clear()
+            team.agg_epoch = team.lineup_epoch
+
+        key = -1 - formula.index
+        val = cache.get(key)
+        if val is None:
+            val = cache[key] = Calculator.team_formula_sum(team.on_court[:3], formula)
+        return val
+
     @staticmethod
     def calculate_shooting_rate(
-        off_players: List[EnginePlayer], # [Fix] 改為傳入進攻全隊
-        def_players: List[EnginePlayer],
+        off_team: EngineTeam,            # [Fix] 改為傳入進攻全隊 (讀取場上加總快取)
+        def_team: EngineTeam,
         shooter: EnginePlayer,           # [Fix] 新增參數：出手者 (用於技巧加成)
-        config: Dict,
+        plan: 'EnginePlan',
         spacing_factor: float = 0.0,
         quality_bonus: float = 0.0,
         is_3pt: bool = False
@@ -88,43 +188,33 @@ class Calculator:
         邏輯:
           - 對抗 (Off_Total vs Def_Total): 使用 Team Sum vs Team Sum
           - 技巧 (Skill Bonus): 使用 Shooter Individual Stats
+        [Optimization] 改為讀取編譯後的 EnginePlan.shooting，不再每次導航 Config。
         """
-        # 1. 導航 Config
-        me_config = config.get('match_engine', {})
-        shooting_config = me_config.get('shooting', {})
-        formulas = shooting_config.get('formulas', {})
-        params = shooting_config.get('params', {})
-        attr_pools = me_config.get('attr_pools', {})
+        # 1. 讀取編譯後的投籃設定
+        sp = plan.shooting
 
         # 2. 決定基礎命中率 (Base Rate)
-        base_rate = params.get('base_rate_3pt', 0.20) if is_3pt else params.get('base_rate_2pt', 0.40)
+        base_rate = sp.base_rate_3pt if is_3pt else sp.base_rate_2pt
 
-        # 3. 計算進攻總值 (Offensive Rating) - [Fix] 使用 get_team_attr_sum
-        base_off_keys = Calculator._resolve_formula_keys(formulas.get('off_total', 'off_13'), attr_pools)
-        off_sum = Calculator.get_team_attr_sum(off_players, base_off_keys, attr_pools)
+        # 3. 計算進攻總值 (Offensive Rating) - [Fix] 使用團隊總和
+        off_sum = Calculator.lineup_sum(off_team, sp.off_total)
 
         if is_3pt:
             # [Spec 5.2.A] 3分球特殊加成 (也是看團隊)
-            bonus_keys = Calculator._resolve_formula_keys(formulas.get('bonus_3pt_attrs', []), attr_pools)
-            bonus_sum = Calculator.get_team_attr_sum(off_players, bonus_keys, attr_pools)
-            mult = params.get('multiplier_3pt', 2.0)
-            off_sum += bonus_sum * (mult - 1.0)
+            bonus_sum = Calculator.lineup_sum(off_team, sp.bonus_3pt)
+            off_sum += bonus_sum * (sp.multiplier_3pt - 1.0)
 
         # 4. 計算防守總值 (Defensive Rating)
-        def_keys = Calculator._resolve_formula_keys(formulas.get('def_total', 'def_12'), attr_pools)
-        def_sum = Calculator.get_team_attr_sum(def_players, def_keys, attr_pools)
+        def_sum = Calculator.lineup_sum(def_team, sp.def_total)
         if def_sum == 0: def_sum = 1
 
         # 5. 計算技巧加成 (Skill Bonus) - [Fix] 針對 shooter 個人計算
-        skill_keys = Calculator._resolve_formula_keys(formulas.get('skill_bonus_attrs', ['shot_accuracy', 'shot_range', 'off_move']), attr_pools)
-        skill_sum = Calculator.get_player_attr_sum(shooter, skill_keys, attr_pools)
-        skill_divisor = params.get('skill_bonus_divisor', 800.0)
-        skill_multiplier = 1.0 + (skill_sum / skill_divisor)
+        skill_sum = Calculator.formula_sum(shooter, sp.skill_bonus)
+        skill_multiplier = 1.0 + (skill_sum / sp.skill_bonus_divisor)
 
         # 6. 最終公式計算
         stat_diff = (off_sum - def_sum) / def_sum
-        spacing_weight = params.get('spacing_weight', 0.1)
         
-        final_rate = (base_rate + stat_diff) * skill_multiplier * (1.0 + spacing_factor * spacing_weight) * (1.0 + quality_bonus)
+        final_rate = (base_rate + stat_diff) * skill_multiplier * (1.0 + spacing_factor * sp.spacing_weight) * (1.0 + quality_bonus)
         
-        return max(0.01, min(0.99, final_rate))
\ No newline at end of file
+        return max(0.01, min(0.99, final_rate))
@@ -0,0 +1,147 @@
+# app/services/match_engine/utils/pbp.py
+
+from array import array
+from typing import Iterator, List, Tuple, TYPE_CHECKING
+
+if TYPE_CHECKING:
+    from ..structures import EngineTeam
+
+# [Optimization] 文字轉播紀錄等級
+# off    : 不記錄 (大數據模擬)
+# events : 僅記錄結構化事件 (MatchResult.pbp_events)
+# text   : 記錄事件並於賽後轉為中文轉播文字 (MatchResult.pbp_log，預設)
+LOG_OFF = 'off'
+LOG_EVENTS = 'events'
+LOG_TEXT = 'text'
+LOG_LEVELS = (LOG_OFF, LOG_EVENTS, LOG_TEXT)
+
+# 每筆事件的欄位數: (code, quarter, clock, team, p1, p2, p3, value)
+STRIDE = 8
+
+# 換人原因 (SUB 事件的 value)
+SUB_REASONS = ("體力低", "時間到")
+# 關鍵時刻調度位置 (CLUTCH_SUB 事件的 value)
+CLUTCH_POSITIONS = ("C", "PF", "SF", "SG", "PG")
+
+
+class PbpEvent:
+    """
+    轉播事件代碼
+    team 為球隊 slot (0: 主隊, 1: 客隊)，p1~p3 為球員 slot (EnginePlayer.slot，-1 代表無)。
+    """
+    # --- 比賽流程 (無時間前綴) ---
+    QUARTER_START = 1     # team: 持球方
+    OT_START = 2
+    JUMP_BALL = 3         # team: 勝方
+    HALFTIME = 4          # value: 休息分鐘
+    QUARTER_BREAK = 5     # value: 休息分鐘
+    OT_BREAK = 6          # value: 休息分鐘
+
+    # --- 換人 (無時間前綴) ---
+    FOUL_OUT = 10         # p1: 犯滿球員, value: 犯規數
+    FOUL_OUT_NO_SUB = 11  # p1: 犯滿球員
+    FOUL_OUT_SUB = 12     # p1: 替補, p2: 犯滿球員
+    SUB = 13              # p1: 上場, p2: 下場, value: SUB_REASONS index
+    CLUTCH_SUB = 14       # p1: 上場, p2: 下場, value: CLUTCH_POSITIONS index
+
+    # --- 回合結果 (帶 [Q 時間] 前綴) ---
+    VIOLATION_8S = 20     # team: 進攻方
+    VIOLATION_24S = 21    # team: 進攻方
+    BLOCK = 22            # team: 防守方, p1: 封阻者, p2: 出手者
+    STEAL = 23            # team: 防守方, p1: 抄截者
+    FB_AND_ONE = 24       # team: 快攻方, p1: 推進者, value: 罰球命中數
+    FB_SCORE = 25         # team: 快攻方, p1: 推進者
+    FB_FOULED = 26        # team: 快攻方, p1: 推進者, value: 罰球命中數
+    FB_STOPPED = 27       # team: 快攻方, p1: 推進者, p2: 追防者
+    SHOT_MADE = 30        # team: 進攻方, p1: 出手者, p2: 助攻者, value: 分數 + 10 * (And-1)
+    SHOT_MISS_FOULED = 31 # team: 進攻方, p1: 出手者, value: 分數 + 10 * 罰球命中數
+    SHOT_MISS_DREB = 32   # team: 進攻方, p1: 出手者, p2: 籃板者
+    SHOT_MISS_OREB = 33   # team: 進攻方, p1: 出手者, p2: 籃板者
+
+    POSSESSION_MIN = 20   # 代碼 >= 此值者為回合事件
+
+
+class PbpBuffer:
+    """
+    [Optimization] 結構化轉播事件緩衝區
+    以單一 array('d') 連續儲存事件，熱迴圈中不產生任何字串。
+    """
+    __slots__ = ('data',)
+
+    def __init__(self):
+        self.data = array('d')
+
+    def add(self, code: int, quarter: int, clock: float, team: int = -1,
+            p1: int = -1, p2: int = -1, p3: int = -1, value: float = 0.0):
+        self.data.extend((code, quarter, clock, team, p1, p2, p3, value))
+
+    def __len__(self) -> int:
+        return len(self.data) // STRIDE
+
+    def __iter__(self) -> Iterator[Tuple[float, ...]]:
+        data = self.data
+        for i in range(0, len(data), STRIDE):
+            yield tuple(data[i:i + STRIDE])
+
+
+class PbpFormatter:
+    """
+    轉播文字產生器 (僅在需要時呼叫)
+    輸出格式與原本 MatchEngine 直接寫入 pbp_logs 的字串完全相同。
+    """
+
+    @staticmethod
+    def render(buffer: PbpBuffer, home_team: 'EngineTeam', away_team: 'EngineTeam') -> List[str]:
+        teams = (home_team, away_team)
+        players = home_team.roster + away_team.roster
+        return [PbpFormatter.format_event(ev, teams, players) for ev in buffer]
+
+    @staticmethod
+    def format_event(ev: Tuple[float, ...], teams, players) -> str:
+        code, quarter, clock, t, p1, p2, _, value = ev
+        code = int(code)
+        quarter = int(quarter)
+        team = teams[int(t)] if t >= 0 else None
+        a = players[int(p1)].name if p1 >= 0 else ""
+        b = players[int(p2)].name if p2 >= 0 else ""
+        v = int(value)
+        E = PbpEvent
+
+        # --- 比賽流程 ---
+        if code == E.QUARTER_START: return f"=== Q{quarter} Start (Possession: {team.id}) ==="
+        if code == E.OT_START: return f"=== OT{quarter-4} Start ==="
+        if code == E.JUMP_BALL: return f"Jump Ball: {team.name} wins"
+        if code == E.HALFTIME: return f"=== Halftime Break ({value} mins) ==="
+        if code == E.QUARTER_BREAK: return f"=== Quarter Break ({value} mins) ==="
+        if code == E.OT_BREAK: return f"=== Overtime Break ({value} mins) ==="
+
+        # --- 換人 ---
+        if code == E.FOUL_OUT: return f"{team.name} {a} Fouled Out ({v})"
+        if code == E.FOUL_OUT_NO_SUB: return f"WARNING: No available subs for {team.name}, {a} stays on court."
+        if code == E.FOUL_OUT_SUB: return f"Substitution: {a} replaces {b} (Foul Out)"
+        if code == E.SUB: return f"{team.name} 換人: {a} 替換 {b} ({SUB_REASONS[v]})"
+        if code == E.CLUTCH_SUB: return f"{team.name} 關鍵時刻調度: {a} ({CLUTCH_POSITIONS[v]}) 替換 {b}"
+
+        # --- 回合結果 ---
+        if code == E.VIOLATION_8S: desc = f"{team.name} 8-sec Violation"
+        elif code == E.VIOLATION_24S: desc = f"{team.name} 24秒進攻違例"
+        elif code == E.BLOCK: desc = f"{team.name} {a} 封阻成功 (Block {b})"
+        elif code == E.STEAL: desc = f"{team.name} {a} 前場抄截"
+        elif code == E.FB_AND_ONE: desc = f"{team.name} {a} 快攻進算加罰 (And-1, FT {v}/1)"
+        elif code == E.FB_SCORE: desc = f"{team.name} {a} 快攻得分"
+        elif code == E.FB_FOULED: desc = f"{team.name} {a} 快攻遭犯規 (FT {v}/2)"
+        elif code == E.FB_STOPPED: desc = f"{team.name} {a} 快攻失敗 (被 {b} 擋下)"
+        elif code == E.SHOT_MADE:
+            points = v % 10
+            desc = f"{team.name} {a} {points}pt Good"
+            if p2 >= 0: desc += f" (Ast {b})"
+            if v >= 10: desc += " (And-1)"
+        elif code == E.SHOT_MISS_FOULED:
+            points = v % 10
+            ft_count = 3 if points == 3 else 2
+            desc = f"{team.name} {a} {points}pt Miss (Foul {v // 10}/{ft_count})"
+        elif code == E.SHOT_MISS_DREB: desc = f"{team.name} {a} {v}pt Miss (Reb {b})"
+        elif code == E.SHOT_MISS_OREB: desc = f"{team.name} {a} {v}pt Miss (Off Reb {b})"
+        else: desc = f"Unknown Event ({code})"
+
+        return f"[{quarter}Q {clock:.1f}] {desc}"
@@ -0,0 +1,149 @@
+# app/services/match_engine/utils/profiler.py
+import time
+from typing import Dict, List, Optional
+
+# [New] 引擎分段計時與事件計數 (Engine Profiler)
+# MatchEngine(profiler=EngineProfiler()) 時，於建構當下把各階段方法替換為計時包裝 (僅該引擎實例)；
+# 未傳入 profiler 時引擎完全不變，熱迴圈沒有任何額外判斷或函式呼叫。
+# 計時採「自身時間」(exclusive): 巢狀呼叫 (如後場 -> 快攻、投籃 -> 罰球) 的時間只算在最內層階段，
+# 各階段加總即為整場時間；simulate() 中不屬於任何階段的部分記為 other (iter_events() 串流時不計 other)。
+# 事件計數於每場結束時 (_finish，simulate / iter_events 共用) 由 MatchResult 與 Box Score 彙總
+# (score_only 模式不累計個人數據，抄截 / 封阻為 0)。由快照還原的引擎可於 restore(profiler=...) 掛載。
+# 同一個 profiler 可跨場次 (engine.reset) 累計；多進程 / 多執行緒各自持有一個，最後以 merge() 合併。
+
+# 引擎方法 -> 階段名稱 (順序即報表順序)
+PHASES = (
+    ('_initialize_match', 'pregame'),
+    ('_run_backcourt', 'backcourt'),
+    ('_run_frontcourt', 'frontcourt'),
+    ('_run_fastbreak', 'fastbreak'),
+    ('_run_shooting', 'shooting'),
+    ('_run_free_throw', 'free_throw'),
+    ('_check_substitutions', 'substitution'),
+    ('_check_and_handle_foul_out', 'substitution'),
+    ('_update_stamina', 'stamina'),
+    ('_log', 'logging'),
+    ('_render_pbp', 'logging'),
+)
+ROOT_METHOD, ROOT_PHASE = 'simulate', 'other'
+
+COUNTERS = ('games', 'quarters', 'ot_periods', 'possessions', 'fastbreaks',
+            'steals', 'blocks', 'turnovers', 'fouls', 'violations')
+
+
+class EngineProfiler:
+    """分段計時 (ns) 與事件計數，可跨場次與跨 Worker 累計"""
+    __slots__ = ('times', 'calls', 'counts', '_stack')
+
+    def __init__(self):
+        phases = [p for _, p in PHASES] + [ROOT_PHASE]
+        self.times: Dict[str, int] = dict.fromkeys(phases, 0)
+        self.calls: Dict[str, int] = dict.fromkeys(phases, 0)
+        self.counts: Dict[str, int] = dict.fromkeys(COUNTERS, 0)
+        self._stack: List[int] = [] # 每層已被子階段佔用的時間
+
+    def __getstate__(self):
+        return {'times': self.times, 'calls': self.calls, 'counts': self.counts}
+
+    def __setstate__(self, state):
+        self.times, self.calls, self.counts = state['times'], state['calls'], state['counts']
+        self._stack = []
+
+    # -------------------------------------------------------------------------
+    # 掛載
+    # -------------------------------------------------------------------------
+    def attach(self, engine):
+        """將 engine 的各階段方法替換為計時包裝 (實例屬性，不影響其他引擎)"""
+        for method, phase in PHASES:
+            setattr(engine, method, self._timed(phase, getattr(engine, method)))
+        engine.simulate = self._timed(ROOT_PHASE, engine.simulate)
+        # 事件數於賽後回填 (_finish) 時累計: simulate() 與 iter_events() 皆經過此處
+        finish = engine._finish
+
+        def profiled_finish():
+            result = finish()
+            self.record_game(engine, result)
+            return result
+        engine._finish = profiled_finish
+
+    def _timed(self, phase: str, fn):
+        stack, times, calls, clock = self._stack, self.times, self.calls, time.perf_counter_ns
+
+        def timed(*args, **kwargs):
+            stack.append(0)
+            start = clock()
+            try:
+                return fn(*args, **kwargs)
+            finally:
+                total = clock() - start
+                times[phase] += total - stack.pop()
+                calls[phase] += 1
+                if stack:
+                    stack[-1] += total
+        return timed
+
+    # -------------------------------------------------------------------------
+    # 計數與彙總
+    # -------------------------------------------------------------------------
+    def record_game(self, engine, result):
+        """累計一場比賽的事件數"""
+        c = self.counts
+        c['games'] += 1
+        c['quarters'] += result.total_quarters
+        c['ot_periods'] += max(0, result.total_quarters - 4)
+        c['possessions'] += result.home_possessions + result.away_possessions
+        c['fastbreaks'] += result.home_fb_attempt + result.away_fb_attempt
+        c['violations'] += (result.home_violation_8s + result.home_violation_24s
+                            + result.away_violation_8s + result.away_violation_24s)
+        for team in (engine.home_team, engine.away_team):
+            for p in team.roster:
+                c['steals'] += p.stat_stl
+                c['blocks'] += p.stat_blk
+                c['turnovers'] += p.stat_tov
+                c['fouls'] += p.fouls
+
+    def merge(self, other: 'EngineProfiler') -> 'EngineProfiler':
+        """合併另一個 profiler (如各 Worker 回傳的結果)"""
+        for key, value in other.times.items():
+            self.times[key] = self.times.get(key, 0) + value
+        for key, value in other.calls.items():
+            self.calls[key] = self.calls.get(key, 0) + value
+        for key, value in other.counts.items():
+            self.counts[key] = self.counts.get(key, 0) + value
+        return self
+
+    def total_ns(self) -> int:
+        return sum(self.times.values())
+
+    def phase_rows(self) -> List[Dict]:
+        """各階段: 呼叫次數、總時間 (ms)、佔比、每場時間 (ms)、每次呼叫時間 (µs)"""
+        total = self.total_ns() or 1
+        games = self.counts['games'] or 1
+        rows = []
+        for phase, ns in self.times.items():
+            n = self.calls[phase]
+            rows.append({
+                'phase': phase,
+                'calls': n,
+                'total_ms': ns / 1e6,
+                'share': ns / total,
+                'ms_per_game': ns / 1e6 / games,
+                'us_per_call': ns / 1e3 / n if n else 0.0,
+            })
+        return rows
+
+    def format_table(self, title: Optional[str] = "Engine Profile") -> str:
+        """輸出文字表格 (階段計時 + 事件計數)"""
+        games = self.counts['games'] or 1
+        lines = []
+        if title:
+            lines.append(f"=== {title} ({self.counts['games']} games, {self.total_ns() / 1e9:.2f}s) ===")
+        lines.append(f"{'phase':<14}{'calls':>12}{'total(ms)':>12}{'share':>8}{'ms/game':>10}{'us/call':>10}")
+        for r in self.phase_rows():
+            lines.append(f"{r['phase']:<14}{r['calls']:>12,}{r['total_ms']:>12.1f}{r['share']:>7.1%}"
+                         f"{r['ms_per_game']:>10.3f}{r['us_per_call']:>10.2f}")
+        lines.append("")
+        lines.append(f"{'event':<14}{'count':>12}{'per game':>12}")
+        for key, value in self.counts.items():
+            lines.append(f"{key:<14}{value:>12,}{value / games:>12.2f}")
+        return "\n".join(lines)
@@ -1,58 +1,107 @@
 # app/services/match_engine/utils/rng.py
+import hashlib
 import random
+from itertools import chain
 from typing import List, Any, Optional
 
-# [Optimization] 將方法綁定移至模組層級 (Module Level)
-# 這避免了在 Python 3.13+ 中，將綁定方法(Bound Method)指派給類別屬性時可能發生的參數傳遞錯誤。
-# 同時保留了減少屬性查找(Attribute Lookup)的效能優勢。
-_sys_random = random.random
-_sys_uniform = random.uniform
-_sys_choice = random.choice
+try:
+    import numpy as np
+except ImportError: # numpy 為選用套件 (僅 BlockRNG / 批次模擬使用)
+    np = None
+
+# [New] 可注入、可重現的隨機數串流
+# 原本所有模組共用 process 全域的 random，無法單獨重現某一場比賽，多進程 Worker 之間也沒有一致的 seed 規則。
+# 現在每個 RNG 實例包裝一個獨立的隨機來源 (random.Random)：
+#   - RNG.for_game(run_seed, game_id): 由 (run_seed, game_id) 以 blake2b 雜湊衍生該場比賽專屬的 seed，
+#     任何一場比賽都能單獨重播，結果與 Worker 數量、執行順序無關。
+#   - 模組層級的 rng 仍包裝全域 random，未注入 RNG 的呼叫端行為與舊版完全相同。
+
+
+def derive_seed(run_seed: Any, *keys: Any) -> int:
+    """
+    由 run seed 與任意鍵值 (game_id、批次編號...) 衍生 128-bit 子串流 seed。
+    使用雜湊而非 run_seed + n 之類的線性組合，避免相鄰串流之間產生相關性。
+    """
+    payload = "\x1f".join(str(k) for k in (run_seed,) + keys)
+    digest = hashlib.blake2b(payload.encode("utf-8"), digest_size=16).digest()
+    return int.from_bytes(digest, "big")
+
 
 class RNG:
     """
     極致效能優化版的隨機數生成器。
     針對「單次、高頻率」呼叫場景優化 (Event-Driven Simulation)。
+    [Optimization] 建構時即把隨機來源的方法綁定在實例上 (slots)，熱迴圈呼叫只需一次屬性查找。
     """
-    __slots__ = () # 節省記憶體
-    
-    # 如果未來需要固定 Seed，可以在這裡實作初始化
+    __slots__ = ('source', 'choice', '_random')
+
+    def __init__(self, source: Optional[Any] = None):
+        # source: random.Random 實例或 random 模組本身 (兩者介面相同)
+        self.source = source if source is not None else random.Random()
+        self._random = self.source.random
+        # choice(items): 從列表中選擇一個項目
+        self.choice = self.source.choice
+
     @classmethod
-    def seed(cls, seed_val: Any):
-        random.seed(seed_val)
+    def from_seed(cls, seed_val: Any) -> 'RNG':
+        """建立以 seed_val 初始化的獨立串流"""
+        return cls(random.Random(seed_val))
+
+    @classmethod
+    def for_game(cls, run_seed: Any, game_id: Any) -> 'RNG':
+        """建立單場比賽專屬的串流 (由 run_seed 與 game_id 衍生)"""
+        return cls(random.Random(derive_seed(run_seed, game_id)))
+
+    def seed(self, seed_val: Any):
+        self.source.seed(seed_val)
 
-    @staticmethod
-    def get_float(min_val: float = 0.0, max_val: float = 1.0) -> float:
+    # [New] 串流位置快照 (MatchEngine.snapshot / restore)
+    def getstate(self) -> Any:
+        """回傳目前的串流狀態 (可 pickle)"""
+        return self.source.getstate()
+
+    def setstate(self, state: Any):
+        self.source.setstate(state)
+
+    @classmethod
+    def from_state(cls, state: Any) -> 'RNG':
+        """
+        以 getstate() 的結果建立新的獨立串流，之後的序列與原串流完全相同。
+        (共用 rng 的快照也會還原為獨立串流，不會改動全域 random)
+        BlockRNG 的狀態帶有標記，會還原為 BlockRNG。
+        """
+        if isinstance(state, tuple) and state and state[0] == BlockRNG.STATE_TAG:
+            return BlockRNG.from_state(state)
+        r = cls(random.Random())
+        r.setstate(state)
+        return r
+
+    def get_float(self, min_val: float = 0.0, max_val: float = 1.0) -> float:
         """
         回傳 [min_val, max_val] 之間的浮點數。
         """
-        # 直接呼叫模組層級的別名，避免類別屬性查找的開銷與綁定問題
-        return _sys_uniform(min_val, max_val)
+        # 與 random.uniform 相同的公式 (結果逐位元一致)，但省去一層函式呼叫
+        return min_val + (max_val - min_val) * self._random()
+
+    # 與 get_float 相同 (numpy 風格命名)
+    def uniform(self, min_val: float = 0.0, max_val: float = 1.0) -> float:
+        return min_val + (max_val - min_val) * self._random()
 
-    @staticmethod
-    def decision(probability: float) -> bool:
+    def decision(self, probability: float) -> bool:
         """
         判定事件是否發生。
         probability: 0.0 ~ 1.0
         """
         # 優化：減少邊界檢查，假設呼叫端會傳入合法數值
-        return _sys_random() < probability
-
-    @staticmethod
-    def choice(items: List[Any]) -> Any:
-        """
-        從列表中選擇一個項目。
-        """
-        return _sys_choice(items)
+        return self._random() < probability
 
-    @staticmethod
-    def weighted_index(weights: List[float]) -> int:
+    def weighted_index(self, weights: List[float]) -> int:
         """
         根據權重回傳索引值。
         這是效能瓶頸點，Python 原生迴圈較慢。
         如果 weights 長度固定且很短 (如 5個位置)，這段 Python code 夠快。
         """
-        r = _sys_random() * sum(weights)
+        r = self._random() * sum(weights)
         upto = 0.0
         for i, w in enumerate(weights):
             if w + upto >= r:
@@ -60,5 +109,105 @@ class RNG:
             upto += w
         return len(weights) - 1
 
-# 為了方便其他模組呼叫，直接暴露實例或類別
-rng = RNG
\ No newline at end of file
+# [New] 區塊預抽的隨機數串流 (Block-Buffered RNG)
+# 以 numpy Philox (counter-based) 一次產生 BLOCK_SIZE 個 [0, 1) 浮點數，
+# 再以 itertools.chain 的 C 層迭代器逐一取用：取值只是迭代器前進一格，區塊用完時才回到 Python 補下一塊。
+# 逐次呼叫 numpy Generator 每次都有數百奈秒的固定開銷，區塊預抽後與 random.random 同為 C 層呼叫。
+# 同一個 seed 產生的序列與 block_size 無關 (Philox 逐一輸出 64-bit 計數器值)，可與 derive_seed 的單場 seed 搭配重播。
+# 串流快照: 每個區塊以自行建立的 list 迭代器交給 chain，由其剩餘長度 (__length_hint__) 換算已取用的個數，
+# 狀態為 (key, 已取用個數)；還原時以相同 key 重建 Philox 並略過已取用的部分 (序列與區塊切分無關)。
+# 注意: 與 RNG (Mersenne Twister) 是不同的產生器，同一個 seed 的結果不會相同。
+# 區塊大小: 一場比賽約消耗 3~5 千個隨機數，過大的區塊 (如 64K) 在單場串流下大多被浪費。
+BLOCK_SIZE = 4096
+
+
+class BlockRNG(RNG):
+    """
+    區塊預抽版 RNG (需要 numpy)
+    介面與 RNG 相同，可直接注入 MatchEngine(rng=BlockRNG.for_game(run_seed, game_id))。
+    """
+    __slots__ = ('block_size', '_key', '_base', '_block', '_block_len')
+    STATE_TAG = 'philox'
+
+    def __init__(self, seed_val: int, block_size: int = BLOCK_SIZE):
+        if np is None:
+            raise ImportError("BlockRNG 需要 numpy 套件 (pip install numpy)")
+        self.block_size = block_size
+        self.seed(seed_val)
+        self.choice = self._choice
+
+    @classmethod
+    def from_seed(cls, seed_val: Any) -> 'BlockRNG':
+        return cls(seed_val)
+
+    @classmethod
+    def for_game(cls, run_seed: Any, game_id: Any) -> 'BlockRNG':
+        return cls(derive_seed(run_seed, game_id))
+
+    def seed(self, seed_val: Any):
+        # Philox 的 key 為 128-bit 整數，非整數 seed 先經雜湊轉換
+        key = seed_val if isinstance(seed_val, int) else derive_seed(seed_val)
+        self._start(key % (1 << 128), 0)
+
+    def _start(self, key: int, skip: int):
+        """以 key 建立 Philox 串流並略過前 skip 個數值"""
+        gen = np.random.Generator(np.random.Philox(key=key))
+        size = self.block_size
+        first = None
+        if skip:
+            if skip >= size:
+                gen.random(skip - skip % size) # 丟棄完整區塊
+            first = gen.random(size).tolist()[skip % size:]
+        self.source = gen
+        self._key = key
+        self._base = skip   # 目前區塊之前已取用的個數
+        self._block = None  # 目前區塊的迭代器 (尚未開始取用時為 None)
+        self._block_len = 0
+        self._random = chain.from_iterable(self._blocks(gen, first)).__next__
+
+    def _blocks(self, gen, first):
+        block = first
+        while True:
+            if block is None:
+                block = gen.random(self.block_size).tolist()
+            it = iter(block)
+            self._block, self._block_len = it, len(block)
+            yield it
+            # chain 取下一塊時 (目前區塊已用完) 才會執行到這裡
+            self._base += self._block_len
+            block = None
+
+    def consumed(self) -> int:
+        """已取用的隨機數個數"""
+        if self._block is None:
+            return self._base
+        return self._base + self._block_len - self._block.__length_hint__()
+
+    # [New] 串流位置快照 (MatchEngine.snapshot / restore)
+    def getstate(self) -> Any:
+        return (self.STATE_TAG, self._key, self.consumed(), self.block_size)
+
+    def setstate(self, state: Any):
+        tag, key, consumed, block_size = state
+        if tag != self.STATE_TAG:
+            raise ValueError("Not a BlockRNG state")
+        self.block_size = block_size
+        self._start(key, consumed)
+
+    @classmethod
+    def from_state(cls, state: Any) -> 'BlockRNG':
+        r = cls.__new__(cls)
+        if np is None:
+            raise ImportError("BlockRNG 需要 numpy 套件 (pip install numpy)")
+        r.setstate(state)
+        r.choice = r._choice
+        return r
+
+    def _choice(self, items: List[Any]) -> Any:
+        return items[int(self._random() * len(items))]
+
+
+# 為了方便其他模組呼叫，直接暴露共用實例 (包裝全域 random，與舊版行為相同)
+# 注意: 此實例為進程全域狀態，多執行緒同時使用時序列會互相交錯 (無法重現)。
+# 平行模擬 (threaded.simulate_games_threaded、SimulationJobs) 一律為每場注入獨立的 RNG，不使用此實例。
+rng = RNG(random)
@@ -0,0 +1,100 @@
+# app/services/match_engine/whatif.py
+import random
+from dataclasses import dataclass, field
+from typing import Dict, List, Optional, Sequence, Tuple, Union
+
+from .core import MatchEngine
+from .utils.pbp import LOG_OFF
+from .utils.rng import RNG, derive_seed
+from app.services.simulation_pool import SimulationPool
+
+# [New] What-if 分岔模擬 (Mid-Game Branching)
+# 由進行中的比賽 (例如 Q3 結束) 的快照出發，以 K 個獨立亂數串流各自跑完剩餘比賽，
+# 輸出最終分差分佈、延長賽機率與球員預估數據 (供比賽頁面的即時勝率圖使用)。
+#   - 賽前準備 (DB 轉換、身高修正、上場時間分配) 只在原比賽做一次，分岔只需還原快照。
+#   - 分岔送入常駐進程池 (SimulationPool) 執行，快照隨每個任務 (CHUNK_SIZE 個分岔) 傳送一次，
+#     不使用模組層級的共用狀態，多個請求同時分岔時互不影響。
+#   - 第 i 個分岔使用 RNG.for_game(seed, i)，結果與 Worker 數量、完成順序無關。
+
+# 球員預估數據欄位 (最終累計值的平均)
+LINE_FIELDS = ('stat_pts', 'stat_reb', 'stat_ast', 'stat_stl', 'stat_blk', 'stat_tov', 'fouls', 'seconds_played')
+
+# 每個 Worker 任務包含的分岔數
+CHUNK_SIZE = 25
+
+
+@dataclass(slots=True)
+class BranchSummary:
+    """分岔模擬結果 (分差皆為 主隊 - 客隊)"""
+    branches: int
+    # 分岔點狀態
+    quarter: int
+    clock: float
+    home_score: int
+    away_score: int
+    # 最終結果分佈
+    margins: List[int] = field(default_factory=list)
+    home_win_prob: float = 0.0
+    ot_prob: float = 0.0
+    mean_margin: float = 0.0
+    # player_id -> {LINE_FIELDS 欄位: 平均最終值}
+    player_lines: Dict[str, Dict[str, float]] = field(default_factory=dict)
+
+
+def _run_branches(blob: bytes, config: Dict, seed: int,
+                  indices: Sequence[int]) -> List[Tuple[int, bool, List[List[float]]]]:
+    """[Worker] 執行一批分岔，回傳 [(分差, 是否延長賽, 各球員 LINE_FIELDS 值), ...]"""
+    rows = []
+    for i in indices:
+        engine = MatchEngine.restore(blob, config, rng=RNG.for_game(seed, i), log_level=LOG_OFF)
+        result = engine.simulate()
+        lines = [[getattr(p, f) for f in LINE_FIELDS] for p in engine.home_team.roster + engine.away_team.roster]
+        rows.append((result.home_score - result.away_score, result.is_ot, lines))
+    return rows
+
+
+def simulate_branches(source: Union[MatchEngine, bytes], config: Dict, branches: int = 200,
+                      workers: Optional[int] = None, seed: Optional[int] = None) -> BranchSummary:
+    """
+    由進行中比賽的目前狀態平行模擬 branches 種後續發展。
+    source : 進行中的 MatchEngine (於回合之間，例如 iter_events 的事件之間) 或其 snapshot() 資料
+    workers: 常駐進程池的進程數 (None = CPU 核心數；<= 1 時於目前進程執行)
+    seed   : 分岔串流的 run seed (None 時隨機產生)
+    """
+    blob = source.snapshot() if isinstance(source, MatchEngine) else source
+    origin = MatchEngine.restore(blob, config, log_level=LOG_OFF)
+    players = origin.home_team.roster + origin.away_team.roster
+    if seed is None:
+        seed = random.SystemRandom().getrandbits(63)
+    seed = derive_seed(seed, origin.game_id, 'whatif')
+
+    chunks = [range(i, min(i + CHUNK_SIZE, branches)) for i in range(0, branches, CHUNK_SIZE)]
+    pool = SimulationPool.get(workers) if len(chunks) > 1 else None
+    if pool is None:
+        parts = [_run_branches(blob, config, seed, c) for c in chunks]
+    else:
+        # 依提交順序合併，結果與 Worker 排程無關
+        futures = [pool.submit(_run_branches, blob, config, seed, c) for c in chunks]
+        parts = [f.result() for f in futures]
+
+    rows = [row for part in parts for row in part]
+    n = len(rows)
+    state = origin.state
+    summary = BranchSummary(
+        branches=n, quarter=state.quarter, clock=state.time_remaining,
+        home_score=origin.home_team.score, away_score=origin.away_team.score,
+    )
+    if n == 0:
+        return summary
+
+    summary.margins = [margin for margin, _, _ in rows]
+    summary.home_win_prob = sum(1 for m in summary.margins if m > 0) / n
+    summary.ot_prob = sum(1 for _, is_ot, _ in rows if is_ot) / n
+    summary.mean_margin = sum(summary.margins) / n
+    for k, p in enumerate(players):
+        totals = [0.0] * len(LINE_FIELDS)
+        for _, _, lines in rows:
+            for j, v in enumerate(lines[k]):
+                totals[j] += v
+        summary.player_lines[p.id] = {f: totals[j] / n for j, f in enumerate(LINE_FIELDS)}
+    return summary
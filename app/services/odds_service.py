@@ -0,0 +1,167 @@
+# app/services/odds_service.py
+import copy
+import hashlib
+import math
+import threading
+from collections import OrderedDict
+from typing import Any, Dict, List, Optional, Tuple
+
+from app.models.tactics import TeamTactics
+from app.models.team import Team
+from app.services.match_engine.plan import EnginePlan
+from app.services.match_engine.service import DBToEngineAdapter
+from app.services.match_engine.structures import EngineTeam, PLAYER_TEMPLATE_FIELDS
+from app.services.match_engine.utils.rng import derive_seed
+from app.services.simulation_pool import SimulationJobs, SimulationPool, run_matchup_chunk
+from app.utils.game_config_loader import GameConfigLoader
+
+# [New] 勝率預測服務 (Odds Service)
+# 對任意兩隊 (可指定登錄名單) 以 score_only 模式模擬 N 場，回傳勝率、預期分差與其信賴區間。
+# 結果以 (名單組成雜湊, 屬性雜湊, 引擎 Config 版本, 場數) 為鍵快取：
+#   名單、角色或任何能力值變動，或 match_engine 設定變更時鍵值即不同，其餘重複查詢直接讀取快取。
+# 模擬 seed 也由鍵值衍生，同一個鍵的結果固定 (快取與否、Worker 數量皆不影響)。
+# API (/api/game/odds) 未命中快取時以 SimulationJobs 任務執行 (submit_odds)，不佔住請求執行緒，並計入 max_pending。
+
+
+class OddsService:
+    """勝率預測服務"""
+    _cache: 'OrderedDict[Tuple, Dict[str, Any]]' = OrderedDict()
+    _lock = threading.Lock()
+
+    @staticmethod
+    def get_odds(home_team_id: int, away_team_id: int,
+                 home_tactics: Optional[TeamTactics] = None, away_tactics: Optional[TeamTactics] = None,
+                 simulations: Optional[int] = None) -> Dict[str, Any]:
+        """
+        預測 home vs away 的勝率 (同步執行)。
+        tactics 未指定時讀取資料庫中該隊的 TeamTactics (與聯賽比賽相同的登錄名單)。
+        """
+        home, away = OddsService.load_matchup(home_team_id, away_team_id, home_tactics, away_tactics)
+        return OddsService.predict(home, away, GameConfigLoader.load(), simulations)
+
+    @staticmethod
+    def submit_odds(home_team_id: int, away_team_id: int,
+                    home_tactics: Optional[TeamTactics] = None, away_tactics: Optional[TeamTactics] = None,
+                    simulations: Optional[int] = None,
+                    job_settings: Optional[Dict] = None) -> Tuple[Optional[Dict[str, Any]], Optional[str]]:
+        """
+        [New] 非同步勝率預測: 命中快取時回傳 (結果, None)；
+        否則提交 SimulationJobs 任務 (於協調執行緒執行 predict) 並回傳 (None, job_id)。
+        進行中的任務已達上限 (simulation_jobs.max_pending) 時拋出 PoolBusyError。
+        """
+        home, away = OddsService.load_matchup(home_team_id, away_team_id, home_tactics, away_tactics)
+        config = GameConfigLoader.load()
+        n = OddsService.simulation_count(config, simulations)
+        cached = OddsService.lookup(home, away, config, n)
+        if cached is not None:
+            return cached, None
+        return None, SimulationJobs.submit(OddsService.predict, home, away, config, n,
+                                           settings=job_settings, local=True)
+
+    @staticmethod
+    def load_matchup(home_team_id: int, away_team_id: int, home_tactics: Optional[TeamTactics] = None,
+                     away_tactics: Optional[TeamTactics] = None) -> Tuple[EngineTeam, EngineTeam]:
+        """讀取兩隊並轉換為 EngineTeam (tactics 未指定時讀取資料庫中的 TeamTactics)"""
+        home_db = Team.query.get_or_404(home_team_id)
+        away_db = Team.query.get_or_404(away_team_id)
+        if home_tactics is None:
+            home_tactics = TeamTactics.query.filter_by(team_id=home_db.id).first()
+        if away_tactics is None:
+            away_tactics = TeamTactics.query.filter_by(team_id=away_db.id).first()
+        return (DBToEngineAdapter.convert_team(home_db, tactics=home_tactics),
+                DBToEngineAdapter.convert_team(away_db, tactics=away_tactics))
+
+    @staticmethod
+    def simulation_count(config: Dict, simulations: Optional[int] = None) -> int:
+        """模擬場數 (未指定時使用預設值，並限制於 1 ~ max_simulations)"""
+        settings = config.get('odds_service', {})
+        n = int(simulations or settings.get('simulations', 1000))
+        return max(1, min(n, settings.get('max_simulations', 5000)))
+
+    @staticmethod
+    def lookup(home: EngineTeam, away: EngineTeam, config: Dict, simulations: int) -> Optional[Dict[str, Any]]:
+        """讀取快取 (未命中時回傳 None)"""
+        key = OddsService.cache_key(home, away, config, simulations)
+        with OddsService._lock:
+            cached = OddsService._cache.get(key)
+            if cached is None:
+                return None
+            OddsService._cache.move_to_end(key)
+        return {**cached, 'cached': True}
+
+    @staticmethod
+    def predict(home: EngineTeam, away: EngineTeam, config: Dict, simulations: Optional[int] = None) -> Dict[str, Any]:
+        """對已轉換的 EngineTeam 計算勝率 (讀取 / 寫入快取)"""
+        settings = config.get('odds_service', {})
+        n = OddsService.simulation_count(config, simulations)
+        cached = OddsService.lookup(home, away, config, n)
+        if cached is not None:
+            return cached
+
+        key = OddsService.cache_key(home, away, config, n)
+        rows = OddsService._simulate(home, away, config, n, derive_seed(*key), settings)
+        odds = OddsService._summarize(rows, settings.get('confidence_z', 1.96))
+        odds.update(home_team_id=home.id, away_team_id=away.id, simulations=n, cache_key=key[0][:12])
+
+        with OddsService._lock:
+            OddsService._cache[key] = odds
+            OddsService._cache.move_to_end(key)
+            while len(OddsService._cache) > settings.get('cache_size', 512):
+                OddsService._cache.popitem(last=False)
+        return {**odds, 'cached': False}
+
+    @staticmethod
+    def cache_key(home: EngineTeam, away: EngineTeam, config: Dict, simulations: int) -> Tuple[str, str, str, int]:
+        """
+        快取鍵: (名單組成雜湊, 屬性雜湊, 引擎 Config 版本, 場數)
+        名單組成包含球員順序與角色 (會影響先發與上場時間分配)；屬性包含身高與全部能力值。
+        """
+        comp = hashlib.blake2b(digest_size=16)
+        attrs = hashlib.blake2b(digest_size=16)
+        for team in (home, away):
+            comp.update(f"{team.id}|".encode())
+            for p in team.roster:
+                comp.update(f"{p.id}:{p.role},".encode())
+                values = [p.height] + [getattr(p, name) for name in PLAYER_TEMPLATE_FIELDS]
+                attrs.update(repr(values).encode())
+            comp.update(b";")
+        return comp.hexdigest(), attrs.hexdigest(), EnginePlan.config_version(config), simulations
+
+    @staticmethod
+    def clear_cache():
+        with OddsService._lock:
+            OddsService._cache.clear()
+
+    @staticmethod
+    def _simulate(home: EngineTeam, away: EngineTeam, config: Dict, n: int, seed: int,
+                  settings: Dict) -> List[Tuple[int, bool]]:
+        """切分任務送入常駐進程池 (workers <= 1 時於目前進程執行)，依提交順序合併"""
+        chunk = max(1, settings.get('chunk_size', 100))
+        chunks = [range(i, min(i + chunk, n)) for i in range(0, n, chunk)]
+        pool = SimulationPool.get(config.get('simulation_pool', {}).get('workers'))
+        if pool is None:
+            # 模擬會就地修改球隊物件 (身高修正等)，於目前進程執行時改用副本，呼叫端的物件保持賽前狀態
+            home, away = copy.deepcopy(home), copy.deepcopy(away)
+            parts = [run_matchup_chunk(home, away, config, seed, c) for c in chunks]
+        else:
+            futures = [pool.submit(run_matchup_chunk, home, away, config, seed, c) for c in chunks]
+            parts = [f.result() for f in futures]
+        return [row for part in parts for row in part]
+
+    @staticmethod
+    def _summarize(rows: List[Tuple[int, bool]], z: float) -> Dict[str, Any]:
+        """勝率、預期分差 (主隊 - 客隊) 與常態近似信賴區間"""
+        n = len(rows)
+        margins = [m for m, _ in rows]
+        mean = sum(margins) / n
+        std = math.sqrt(sum((m - mean) ** 2 for m in margins) / (n - 1)) if n > 1 else 0.0
+        half = z * std / math.sqrt(n)
+        home_win = sum(1 for m in margins if m > 0) / n
+        return {
+            'home_win_prob': home_win,
+            'away_win_prob': 1.0 - home_win,
+            'expected_margin': mean,
+            'margin_std': std,
+            'margin_ci': [mean - half, mean + half],
+            'ot_prob': sum(1 for _, is_ot in rows if is_ot) / n,
+        }
@@ -176,12 +176,12 @@ class PlayerGenerator:
     # ===================================================================================
     
     @staticmethod
-    def _pick_weighted(items, k=1):
+    def _pick_weighted(items, k=1, rng=random):
         """[Helper] 根據 weight 屬性進行加權隨機抽取"""
         if not items: return []
         population = [x['content'] for x in items]
         weights = [x['weight'] for x in items]
-        return random.choices(population, weights=weights, k=k)
+        return rng.choices(population, weights=weights, k=k)
 
     @classmethod
     def _get_strategy_for_lang(cls, lang):
@@ -196,7 +196,7 @@ class PlayerGenerator:
         return 'A' # Default fallback
 
     @classmethod
-    def _generate_name_data(cls):
+    def _generate_name_data(cls, rng=random):
         """
         生成姓名與國籍
         Return: (full_name, nationality_code)
@@ -211,7 +211,7 @@ class PlayerGenerator:
             return "Unknown Player", "en"
             
         # 使用 random.choices 進行加權抽取 (O(1) after initialization)
-        selected_lang = random.choices(
+        selected_lang = rng.choices(
             dist['langs'], 
             weights=dist['weights'], 
             k=1
@@ -224,7 +224,7 @@ class PlayerGenerator:
         # 2. 依語系執行策略
         if strategy == 'A': # 歐美語系 (Western)
             # 規則: 不分 category，依照權重隨機抽取 3 個內容組合，用間隔號分隔
-            parts = cls._pick_weighted(lang_data['all'], k=3)
+            parts = cls._pick_weighted(lang_data['all'], k=3, rng=rng)
             full_name = "・".join(parts)
 
         elif strategy == 'B': # 東亞語系 (East Asian)
@@ -241,21 +241,21 @@ class PlayerGenerator:
             if not surnames: surnames = lang_data['all']
             if not given_names: given_names = lang_data['all']
 
-            sn = cls._pick_weighted(surnames, k=1)[0]
-            gn1 = cls._pick_weighted(given_names, k=1)[0]
+            sn = cls._pick_weighted(surnames, k=1, rng=rng)[0]
+            gn1 = cls._pick_weighted(given_names, k=1, rng=rng)[0]
             
             full_name = sn + gn1
             
             # 70% 機率雙字名
-            if random.random() < 0.7:
-                gn2 = cls._pick_weighted(given_names, k=1)[0]
+            if rng.random() < 0.7:
+                gn2 = cls._pick_weighted(given_names, k=1, rng=rng)[0]
                 full_name += gn2
 
         elif strategy == 'C': # 台灣原住民語系 (Indigenous)
             # 規則: 隨機抽取 2 個「不重複」的內容，用間隔號拼接
             pool = lang_data['all']
             if len(pool) < 2:
-                parts = cls._pick_weighted(pool, k=len(pool)) # 資料不足就全拿
+                parts = cls._pick_weighted(pool, k=len(pool), rng=rng) # 資料不足就全拿
             else:
                 # 抽取不重複邏輯
                 # 由於 random.choices 是取後放回，這裡手動處理不重複
@@ -264,7 +264,7 @@ class PlayerGenerator:
                 
                 while len(selected) < 2 and temp_pool:
                     # 重新計算權重並抽取
-                    pick_list = cls._pick_weighted(temp_pool, k=1)
+                    pick_list = cls._pick_weighted(temp_pool, k=1, rng=rng)
                     if not pick_list: break
                     
                     val = pick_list[0]
@@ -284,7 +284,7 @@ class PlayerGenerator:
     # 2. 天賦生成 (Untrainable Stats)
     # =========================================================================
     @classmethod
-    def _generate_untrainable_stats(cls, grade):
+    def _generate_untrainable_stats(cls, grade, rng=random):
         keys = cls._config_cache['untrainable_keys']
         rule = cls._config_cache['rules_by_grade'][grade]['untrainable']
         
@@ -294,18 +294,18 @@ class PlayerGenerator:
         while True:
             stats = {k: stat_min for k in keys}
             current_sum = sum(stats.values())
-            target_sum = random.randint(sum_min, sum_max)
+            target_sum = rng.randint(sum_min, sum_max)
             remaining = target_sum - current_sum
             
             valid_keys = list(keys)
             while remaining > 0 and valid_keys:
-                k = random.choice(valid_keys)
+                k = rng.choice(valid_keys)
                 space = stat_max - stats[k]
                 if space <= 0:
                     valid_keys.remove(k)
                     continue
                 
-                step = random.randint(1, min(remaining, space, 10))
+                step = rng.randint(1, min(remaining, space, 10))
                 stats[k] += step
                 remaining -= step
             
@@ -316,23 +316,23 @@ class PlayerGenerator:
     # 3. 身高與位置 (Height & Position) - Fully Configurable
     # =========================================================================
     @classmethod
-    def _generate_height(cls):
+    def _generate_height(cls, rng=random):
         conf = cls._config_cache['height_dist']
         mean, std_dev = conf['mean'], conf['std_dev']
         min_h, max_h = conf['min'], conf['max']
         
         while True:
-            u1, u2 = random.random(), random.random()
+            u1, u2 = rng.random(), rng.random()
             z = math.sqrt(-2.0 * math.log(max(u1, 1e-12))) * math.cos(2.0 * math.pi * u2)
             height = int(round(mean + z * std_dev))
             if min_h <= height <= max_h:
                 return height
 
     @classmethod
-    def _pick_position(cls, h):
+    def _pick_position(cls, h, rng=random):
         for rule in cls._config_cache['pos_matrix_optimized']:
             if h <= rule['threshold']:
-                return random.choices(rule['roles'], weights=rule['weights'], k=1)[0]
+                return rng.choices(rule['roles'], weights=rule['weights'], k=1)[0]
         return "C"
 
     # =========================================================================
@@ -363,12 +363,12 @@ class PlayerGenerator:
         return core_sum > (total_sum - core_sum)
 
     @staticmethod
-    def _safe_distribute(stats, target_keys, points_to_add):
+    def _safe_distribute(stats, target_keys, points_to_add, rng=random):
         """[Helper] 安全分配點數，包含防爆機制 (Max 99)"""
         if points_to_add <= 0: return
         valid_keys = list(target_keys)
         while points_to_add > 0 and valid_keys:
-            k = random.choice(valid_keys)
+            k = rng.choice(valid_keys)
             capacity = 99 - stats[k]
             if capacity <= 0:
                 valid_keys.remove(k)
@@ -377,7 +377,7 @@ class PlayerGenerator:
             points_to_add -= 1
 
     @classmethod
-    def _distribute_bonus_points(cls, stats, bonus, bonus_type, bonus_config=None):
+    def _distribute_bonus_points(cls, stats, bonus, bonus_type, bonus_config=None, rng=random):
         """[Spec 2.4.3] 執行加點邏輯 (Revised)"""
         if bonus <= 0: return stats
         
@@ -392,19 +392,19 @@ class PlayerGenerator:
             ratio_min = bonus_config.get('key_ratio_min', 0.5) if bonus_config else 0.5
             ratio_max = bonus_config.get('key_ratio_max', 1.0) if bonus_config else 1.0
             
-            ratio = random.uniform(ratio_min, ratio_max)
+            ratio = rng.uniform(ratio_min, ratio_max)
             key_pool = int(bonus * ratio)
             general_pool = bonus - key_pool
             
             high_p_keys = cls._config_cache['weighted_bonus_keys']['high_priority']
             
-            cls._safe_distribute(stats, high_p_keys, key_pool)
-            cls._safe_distribute(stats, all_keys, general_pool)
+            cls._safe_distribute(stats, high_p_keys, key_pool, rng)
+            cls._safe_distribute(stats, all_keys, general_pool, rng)
                     
         return stats
 
     @classmethod
-    def _generate_trainable_stats(cls, grade, height, position):
+    def _generate_trainable_stats(cls, grade, height, position, rng=random):
         keys = cls._config_cache['trainable_keys']
         cap = cls._config_cache['rules_by_grade'][grade]['trainable_cap']
         
@@ -429,7 +429,7 @@ class PlayerGenerator:
         # 2. 執行 Trials (分階段重骰)
         for _ in range(trials):
             while True:
-                temp_stats = {k: random.randint(1, 99) for k in keys}
+                temp_stats = {k: rng.randint(1, 99) for k in keys}
                 if sum(temp_stats.values()) > cap:
                     continue
                 # [Dynamic Check]
@@ -446,7 +446,7 @@ class PlayerGenerator:
             final_stats = min(candidates, key=lambda x: sum(x.values()))
             
         # 4. 應用身高獎勵
-        final_stats = cls._distribute_bonus_points(final_stats, bonus, bonus_type, rule)
+        final_stats = cls._distribute_bonus_points(final_stats, bonus, bonus_type, rule, rng)
         
         return final_stats
 
@@ -454,36 +454,42 @@ class PlayerGenerator:
     # 主流程 (Main Workflow)
     # =========================================================================
     @classmethod
-    def generate_payload(cls, specific_grade=None):
+    def generate_payload(cls, specific_grade=None, rng=None):
+        """
+        產生一名球員的資料 (尚未寫入 DB)
+        [New] rng: 可傳入 random.Random 實例 (例如 random.Random(derive_seed(run_seed, i)))，
+        使批次生成可重現且與 Worker 數量無關；未傳入時沿用全域 random。
+        """
         if not cls._is_initialized: cls.initialize_class()
+        if rng is None: rng = random
 
         # 1. Name & Nationality (Updated)
-        name, nationality = cls._generate_name_data()
+        name, nationality = cls._generate_name_data(rng)
 
         # 2. Grade
         if specific_grade:
             grade = specific_grade
         else:
-            grade = random.choices(
+            grade = rng.choices(
                 cls._config_cache['grades'], 
                 weights=cls._config_cache['grade_weights'], 
                 k=1
             )[0]
 
         # 3. Untrainable
-        untrainable = cls._generate_untrainable_stats(grade)
+        untrainable = cls._generate_untrainable_stats(grade, rng)
 
         # 4. Height & Position
-        height = cls._generate_height()
-        position = cls._pick_position(height)
+        height = cls._generate_height(rng)
+        position = cls._pick_position(height, rng)
 
         # 5. Trainable
-        trainable = cls._generate_trainable_stats(grade, height, position)
+        trainable = cls._generate_trainable_stats(grade, height, position, rng)
 
         # 6. Age
         age_base = 18
         age_offset = cls._config_cache['rules_by_grade'][grade]['age_offset']
-        age = age_base + random.randint(0, age_offset)
+        age = age_base + rng.randint(0, age_offset)
 
         # 7. Derived Data
         raw_stats = {**untrainable, **trainable}
@@ -0,0 +1,179 @@
+# app/services/schedule_service.py
+import threading
+from collections import OrderedDict
+from typing import Any, Callable, Dict, List, Tuple
+
+from sqlalchemy import case, func
+
+from app import db
+from app.models.league import PlayoffSeries, Schedule, SeasonStandingDay
+from app.models.match import Match
+from app.models.team import Team
+from app.services.standings_service import StandingsService
+from app.utils.game_config_loader import GameConfigLoader
+
+# [Optimization] 賽程頁面 (GET /api/league/schedule) 的每日資料
+# 原本每筆賽程各查 2 次 Team、1 次 Match，正式聯賽再各 2 次歷史戰績 join 查詢，季後賽再 1 次系列賽查詢 (單日上百次查詢)。
+# 改為固定的批次查詢: 賽程 / 球隊名稱 / 比分 / 該日之前戰績 (每日累計戰績) / 系列賽狀態。
+# 輸出的 JSON 以 (賽季, 天) 為鍵快取；每次請求以一次彙總查詢取得該日資料的版本，版本改變才重新產生:
+#   - 當日賽程: 場數、完賽數、取消數、對戰球隊
+#   - 該日之前的戰績: 之前已完賽的正式聯賽場數、每日累計戰績 (天數 / 勝敗 / 球隊)，前幾天完賽、重建、球隊接管後都會改變
+#   - 當日有季後賽時，另以一次查詢取得相關系列賽的逐場結果
+# 版本存於資料庫，換日 / 比賽作業 / 重建在其他進程執行時同樣有效。
+
+
+class ScheduleService:
+    """每日賽程資料 (批次查詢 + 回應快取)"""
+    _cache: 'OrderedDict[Tuple[int, int], Tuple[Tuple, str]]' = OrderedDict()
+    _lock = threading.Lock()
+
+    @staticmethod
+    def get_day_json(season_id: int, day: int, render: Callable[[List[Dict[str, Any]]], str]) -> str:
+        """回傳第 day 天賽程的 JSON 字串 (render: 將資料轉為 JSON 的函式)；該日資料版本未變動時直接讀取快取"""
+        key = (season_id, day)
+        version = ScheduleService.day_version(season_id, day)
+        with ScheduleService._lock:
+            cached = ScheduleService._cache.get(key)
+            if cached is not None and cached[0] == version:
+                ScheduleService._cache.move_to_end(key)
+                return cached[1]
+
+        body = render(ScheduleService.build_day(season_id, day))
+
+        cache_size = GameConfigLoader.get('league_system.schedule_view.cache_size', 256)
+        with ScheduleService._lock:
+            ScheduleService._cache[key] = (version, body)
+            ScheduleService._cache.move_to_end(key)
+            while len(ScheduleService._cache) > cache_size:
+                ScheduleService._cache.popitem(last=False)
+        return body
+
+    @staticmethod
+    def day_version(season_id: int, day: int) -> Tuple:
+        """
+        第 day 天賽程資料的版本:
+        當日賽程 (場數 / 已完賽數 / 已公布數 / 已取消數 / 最大 ID / 主客隊 ID 總和 / 季後賽場數)、
+        該日之前的戰績 (已完賽正式聯賽場數 / 每日累計戰績的列數、最後一天、勝敗與球隊加權總和)，
+        當日有季後賽時再加上系列賽逐場結果。
+        """
+        finished_before = (db.session.query(func.count(Schedule.id))
+                           .filter(Schedule.season_id == season_id, Schedule.day < day,
+                                   Schedule.game_type == 1, Schedule.status == 'FINISHED')
+                           .scalar_subquery())
+
+        def before(column):
+            # 該日之前的每日累計戰績彙總 (前幾天完賽、重建、球隊接管都會改變)
+            return (db.session.query(column)
+                    .filter(SeasonStandingDay.season_id == season_id, SeasonStandingDay.day < day)
+                    .scalar_subquery())
+        row = (db.session.query(
+            func.count(Schedule.id),
+            func.count(Schedule.match_id),
+            func.sum(case((Schedule.status == 'PUBLISHED', 1), else_=0)),
+            func.sum(case((Schedule.status == 'CANCELLED', 1), else_=0)),
+            func.max(Schedule.id),
+            func.sum(Schedule.home_team_id),
+            func.sum(Schedule.away_team_id),
+            func.sum(case((Schedule.game_type == 3, 1), else_=0)),
+            finished_before,
+            before(func.count(SeasonStandingDay.id)),
+            before(func.max(SeasonStandingDay.day)),
+            before(func.sum(SeasonStandingDay.wins)),
+            before(func.sum(SeasonStandingDay.losses)),
+            before(func.sum(SeasonStandingDay.team_id * (SeasonStandingDay.wins + 1))),
+            before(func.sum(SeasonStandingDay.team_id * (SeasonStandingDay.losses + 1))),
+        ).filter(Schedule.season_id == season_id, Schedule.day == day).one())
+        version = tuple(int(v or 0) for v in row)
+        if not version[7]:
+            return version
+
+        series_ids = (db.session.query(Schedule.series_id)
+                      .filter(Schedule.season_id == season_id, Schedule.day == day, Schedule.game_type == 3))
+        series = (db.session.query(PlayoffSeries.series_id, PlayoffSeries.team_a_id, PlayoffSeries.team_b_id,
+                                   PlayoffSeries.results)
+                  .filter(PlayoffSeries.season_id == season_id, PlayoffSeries.series_id.in_(series_ids))
+                  .order_by(PlayoffSeries.series_id).all())
+        return version + tuple((sid, a, b, tuple(results or ())) for sid, a, b, results in series)
+
+    @staticmethod
+    def clear_cache():
+        with ScheduleService._lock:
+            ScheduleService._cache.clear()
+
+    @staticmethod
+    def build_day(season_id: int, day: int) -> List[Dict[str, Any]]:
+        """組出第 day 天的賽程列表 (查詢數固定，與場數無關)"""
+        schedules = Schedule.query.filter_by(season_id=season_id, day=day).order_by(Schedule.id).all()
+        if not schedules:
+            return []
+
+        team_ids = {t for s in schedules for t in (s.home_team_id, s.away_team_id)}
+        names = dict(db.session.query(Team.id, Team.name).filter(Team.id.in_(team_ids)).all())
+
+        match_ids = [s.match_id for s in schedules if s.match_id]
+        matches = {m.id: m for m in db.session.query(
+            Match.id, Match.home_score, Match.away_score, Match.is_ot
+        ).filter(Match.id.in_(match_ids)).all()} if match_ids else {}
+
+        # [修正 5] 「該日之前」的歷史戰績 (Historical Record)，僅正式聯賽 (game_type=1)
+        records = StandingsService.records_before_day(season_id, day, [
+            t for s in schedules if s.game_type == 1 for t in (s.home_team_id, s.away_team_id)
+        ])
+
+        series_ids = {s.series_id for s in schedules if s.game_type == 3 and s.series_id}
+        series = {p.series_id: p for p in PlayoffSeries.query.filter(
+            PlayoffSeries.season_id == season_id, PlayoffSeries.series_id.in_(series_ids)
+        ).all()} if series_ids else {}
+
+        result = []
+        for s in schedules:
+            match = matches.get(s.match_id)
+            home_wins, home_losses = records.get(s.home_team_id, (0, 0)) if s.game_type == 1 else (0, 0)
+            away_wins, away_losses = records.get(s.away_team_id, (0, 0)) if s.game_type == 1 else (0, 0)
+
+            item = {
+                'id': s.id,
+                'day': s.day,
+                'game_type': s.game_type,
+                'status': s.status,
+                'match_id': s.match_id,
+                'home_team': {
+                    'id': s.home_team_id,
+                    'name': names.get(s.home_team_id),
+                    'wins': home_wins,     # 使用歷史戰績
+                    'losses': home_losses
+                },
+                'away_team': {
+                    'id': s.away_team_id,
+                    'name': names.get(s.away_team_id),
+                    'wins': away_wins,     # 使用歷史戰績
+                    'losses': away_losses
+                },
+                'match': {
+                    'home_score': match.home_score,
+                    'away_score': match.away_score,
+                    'is_ot': match.is_ot
+                } if match else None
+            }
+
+            # [修正 1] 季後賽系列賽資訊: 「本場比賽之前」的系列賽比分 (以該場主隊視角)
+            if s.game_type == 3 and s.series_id:
+                state = series.get(s.series_id)
+                item['series_info'] = {
+                    'round_label': ScheduleService.round_label(s.series_id),
+                    'game_number': s.game_number,
+                    'home_wins': StandingsService.series_wins_before(state, s.game_number or 0, s.home_team_id),
+                    'away_wins': StandingsService.series_wins_before(state, s.game_number or 0, s.away_team_id)
+                }
+
+            result.append(item)
+        return result
+
+    @staticmethod
+    def round_label(series_id: str) -> str:
+        if "R1" in series_id: return "Round 1"
+        if "R2" in series_id: return "Conf. Semis"
+        if "R3" in series_id: return "Conf. Finals"
+        if "Finals" in series_id: return "Finals"
+        if "3rdPlace" in series_id: return "3rd Place"
+        return "Playoffs"
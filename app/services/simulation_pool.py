@@ -0,0 +1,286 @@
+# app/services/simulation_pool.py
+import atexit
+import os
+import threading
+import time
+import uuid
+from concurrent.futures import Executor, Future, ProcessPoolExecutor, ThreadPoolExecutor
+from concurrent.futures import TimeoutError as FutureTimeoutError
+from typing import Any, Callable, Dict, List, Optional, Sequence, Tuple
+
+from app.services.match_engine.core import MatchEngine, MODE_SCORE_ONLY
+from app.services.match_engine.plan import EnginePlan
+from app.services.match_engine.structures import EngineTeam, MatchResult
+from app.services.match_engine.utils.pbp import LOG_OFF
+from app.services.match_engine.utils.rng import RNG
+from app.utils.game_config_loader import GameConfigLoader
+
+# [New] 常駐模擬進程池 (Persistent Simulation Pool)
+# 網站請求 (勝率預測等) 若每次都建立 ProcessPoolExecutor，進程啟動與模組匯入的成本會遠高於模擬本身。
+# 此模組在第一次使用時建立進程池，之後所有請求共用，程式結束時 (atexit) 才關閉。
+# workers <= 1 時不建立進程池，直接在呼叫端進程內執行 (開發環境 / 單核心主機)。
+# Worker 啟動時即載入 game_config.yaml 並編譯 EnginePlan (_warm_worker)，第一個任務不必再付這些成本。
+#
+# [New] 非同步模擬任務 (SimulationJobs)
+# 網站的單場模擬改為提交任務後立即回傳 job_id，由前端輪詢或等待結果，不再佔住 Flask 請求執行緒。
+# 同時進行中的任務數有上限 (max_pending)，超過時拋出 PoolBusyError (路由回傳 429)，
+# 突發的大量請求只會被拒絕，不會耗盡網站的 Worker。
+# 本身會再把模擬分送到進程池的任務 (勝率預測) 以 local=True 提交，於網站進程的協調執行緒等待各批結果，
+# 同樣計入 max_pending。
+
+# Worker 進程內預先載入的 Config (由 _warm_worker 設定)
+_WORKER_CONFIG: Optional[Dict] = None
+
+
+def _warm_worker():
+    """[Worker 初始化] 預先載入 Config 並編譯 EnginePlan"""
+    global _WORKER_CONFIG
+    _WORKER_CONFIG = GameConfigLoader.load()
+    EnginePlan.from_config(_WORKER_CONFIG)
+
+
+def _worker_config() -> Dict:
+    return _WORKER_CONFIG if _WORKER_CONFIG is not None else GameConfigLoader.load()
+
+
+class SimulationPool:
+    """常駐進程池 (單例，大小由 simulation_pool.workers 決定)"""
+    _executor: Optional[ProcessPoolExecutor] = None
+    _workers: int = 0
+    _warned: set = set()
+    _lock = threading.Lock()
+
+    @classmethod
+    def get(cls, workers: Optional[int] = None) -> Optional[Executor]:
+        """
+        取得共用進程池 (首次呼叫時建立)。
+        workers: None = 依 simulation_pool.workers (未設定時為 CPU 核心數)；<= 1 時回傳 None (呼叫端應於目前進程執行)。
+        進程池已以其他大小啟動時沿用既有的進程池並提出警告 (每種大小一次)。
+        """
+        if workers is None:
+            workers = GameConfigLoader.get('simulation_pool.workers')
+        workers = workers or os.cpu_count() or 1
+        if workers <= 1:
+            return None
+        with cls._lock:
+            if cls._executor is None:
+                cls._executor = ProcessPoolExecutor(max_workers=workers, initializer=_warm_worker)
+                cls._workers = workers
+                print(f"🧵 [SimulationPool] 啟動常駐進程池 ({workers} workers)")
+            elif workers != cls._workers and workers not in cls._warned:
+                cls._warned.add(workers)
+                print(f"⚠️ [SimulationPool] 進程池已以 {cls._workers} workers 啟動，忽略要求的 {workers} workers")
+            return cls._executor
+
+    @classmethod
+    def shutdown(cls):
+        with cls._lock:
+            if cls._executor is not None:
+                cls._executor.shutdown(wait=False, cancel_futures=True)
+                cls._executor = None
+                cls._workers = 0
+            cls._warned.clear()
+
+
+atexit.register(SimulationPool.shutdown)
+
+
+def run_matchup_chunk(home: EngineTeam, away: EngineTeam, config: Dict, seed: int,
+                      indices: Sequence[int]) -> List[Tuple[int, bool]]:
+    """
+    [Worker] 模擬同一組對戰的多場比賽 (score_only)，回傳每場 (分差 [主隊 - 客隊], 是否延長賽)。
+    第 i 場使用 RNG.for_game(seed, i)，結果與 Worker 數量、任務切分無關；
+    同一個引擎與球隊物件以 reset 逐場重複使用。
+    """
+    rows = []
+    engine = None
+    for i in indices:
+        game_id = f"ODDS_{i}"
+        game_rng = RNG.for_game(seed, i)
+        if engine is None:
+            engine = MatchEngine(home, away, config, game_id=game_id, log_level=LOG_OFF, mode=MODE_SCORE_ONLY, rng=game_rng)
+        else:
+            engine.reset(home, away, game_id=game_id, rng=game_rng)
+        result = engine.simulate()
+        rows.append((result.home_score - result.away_score, result.is_ot))
+    return rows
+
+
+def run_match_job(home: EngineTeam, away: EngineTeam, game_id: str, meta: Dict[str, Any]) -> Dict[str, Any]:
+    """
+    [Worker] 模擬單場比賽 (完整 PBP)，回傳 /api/game/simulate 的回應內容。
+    使用 Worker 預先載入的 Config；meta 帶入球隊名稱與 ID (Worker 內無資料庫連線)。
+    每場使用獨立的 RNG 串流 (背景執行緒模式下不與其他執行緒共用全域 random)。
+    """
+    engine = MatchEngine(home, away, _worker_config(), game_id=game_id, rng=RNG())
+    result = engine.simulate()
+
+    response = {
+        "game_id": result.game_id,
+        "home_team": meta['home_team'],
+        "away_team": meta['away_team'],
+        "home_score": result.home_score,
+        "away_score": result.away_score,
+        "is_ot": result.is_ot,
+        "pace": result.pace,
+        "logs": result.pbp_log,
+        "box_score": []
+    }
+    for team, team_id in ((home, meta['home_team_id']), (away, meta['away_team_id'])):
+        for p in team.roster:
+            if p.seconds_played > 0:
+                response['box_score'].append({
+                    "id": p.id,
+                    "name": p.name,
+                    "team_id": team_id,
+                    "pts": p.stat_pts,
+                    "reb": p.stat_reb,
+                    "ast": p.stat_ast,
+                    "stl": p.stat_stl,
+                    "blk": p.stat_blk,
+                    "min": round(p.seconds_played / 60, 1)
+                })
+    return response
+
+
+def run_league_game(home: EngineTeam, away: EngineTeam, game_id: str,
+                    run_seed: Any = None) -> Tuple[MatchResult, EngineTeam, EngineTeam]:
+    """
+    [Worker] 模擬聯賽正式比賽 (完整模式、文字轉播)，回傳 (結果, 賽後主隊, 賽後客隊)。
+    賽後的球隊物件帶回 Box Score 與體力，由呼叫端 (主執行緒) 寫回資料庫。
+    run_seed 與 game_id 決定亂數串流 (與 MatchEngine(run_seed=...) 相同)，結果與 Worker 數量無關。
+    """
+    engine = MatchEngine(home, away, _worker_config(), game_id=game_id, run_seed=run_seed)
+    result = engine.simulate()
+    result.pbp_events = None # 文字轉播已產生，結構化事件不需傳回主進程
+    return result, home, away
+
+
+class PoolBusyError(RuntimeError):
+    """進行中的任務已達上限 (max_pending)"""
+
+
+# 任務狀態
+JOB_PENDING = 'pending'
+JOB_DONE = 'done'
+JOB_FAILED = 'failed'
+
+
+class _Job:
+    """登記表項目: 任務的 Future 與完成時間 (完成時由 done callback 記錄)"""
+    __slots__ = ('future', 'done_at')
+
+    def __init__(self, future: Future):
+        self.future = future
+        self.done_at: Optional[float] = None
+        # 已完成的 Future 會在 add_done_callback 內立即回呼 (呼叫端持有鎖)，故回呼只設定欄位、不取鎖
+        future.add_done_callback(self._finished)
+
+    def _finished(self, _future: Future):
+        self.done_at = time.time()
+
+
+class SimulationJobs:
+    """
+    非同步模擬任務登記表。
+    任務送入 SimulationPool 的常駐進程池 (simulation_pool.workers <= 1 時改用單一背景執行緒)，
+    完成的結果自完成時起保留 result_ttl 秒供查詢，之後於下一次提交時清除；
+    登記表超過 max_jobs 筆時，先清除最早完成的任務 (進行中的任務另受 max_pending 限制)。
+    """
+    _jobs: Dict[str, _Job] = {}
+    _fallback: Optional[ThreadPoolExecutor] = None
+    _coordinator: Optional[ThreadPoolExecutor] = None
+    _lock = threading.Lock()
+
+    @classmethod
+    def submit(cls, fn: Callable, *args, settings: Optional[Dict] = None, local: bool = False) -> str:
+        """
+        提交任務並回傳 job_id；進行中的任務已達上限時拋出 PoolBusyError
+        settings: simulation_jobs 設定 (workers 可覆寫進程池大小，供測試 / 程式呼叫使用)
+        local: 於網站進程的協調執行緒執行 (fn 會自行把模擬分送到 SimulationPool，例如 OddsService.predict)
+        """
+        settings = settings or {}
+        max_pending = settings.get('max_pending', 16)
+        ttl = settings.get('result_ttl', 600)
+        max_jobs = max(settings.get('max_jobs', 256), max_pending)
+        now = time.time()
+
+        with cls._lock:
+            expired = [jid for jid, job in cls._jobs.items() if job.done_at is not None and now - job.done_at > ttl]
+            # 依完成時間清除最早完成的任務，使登記表 (含本次) 不超過 max_jobs 筆
+            overflow = len(cls._jobs) - len(expired) + 1 - max_jobs
+            if overflow > 0:
+                done = sorted((job.done_at, jid) for jid, job in cls._jobs.items()
+                              if job.done_at is not None and now - job.done_at <= ttl)
+                expired.extend(jid for _, jid in done[:overflow])
+            for jid in expired:
+                del cls._jobs[jid]
+            pending = sum(1 for job in cls._jobs.values() if not job.future.done())
+            if pending >= max_pending:
+                raise PoolBusyError(f"模擬佇列已滿 ({pending}/{max_pending})")
+
+            executor = cls._local_executor(max_pending) if local else cls._executor(settings.get('workers'))
+            future = executor.submit(fn, *args)
+            job_id = uuid.uuid4().hex
+            cls._jobs[job_id] = _Job(future)
+        return job_id
+
+    @classmethod
+    def status(cls, job_id: str, wait: float = 0.0) -> Optional[Dict[str, Any]]:
+        """
+        查詢任務狀態；wait > 0 時最多等待 wait 秒直到完成。
+        回傳 {'job_id', 'status', ['result' | 'error']}，找不到 (或已過期) 時回傳 None。
+        """
+        with cls._lock:
+            job = cls._jobs.get(job_id)
+        if job is None:
+            return None
+        future = job.future
+        if wait > 0:
+            try:
+                future.exception(timeout=wait)
+            except FutureTimeoutError:
+                pass
+
+        info = {'job_id': job_id, 'status': JOB_PENDING}
+        if future.done():
+            error = future.exception()
+            if error is None:
+                info.update(status=JOB_DONE, result=future.result())
+            else:
+                info.update(status=JOB_FAILED, error=str(error))
+        return info
+
+    @classmethod
+    def pending_count(cls) -> int:
+        with cls._lock:
+            return sum(1 for job in cls._jobs.values() if not job.future.done())
+
+    @classmethod
+    def clear(cls):
+        """清除所有任務紀錄 (並關閉背景執行緒)"""
+        with cls._lock:
+            cls._jobs.clear()
+            for executor in (cls._fallback, cls._coordinator):
+                if executor is not None:
+                    executor.shutdown(wait=False, cancel_futures=True)
+            cls._fallback = cls._coordinator = None
+
+    @classmethod
+    def _executor(cls, workers: Optional[int]) -> Executor:
+        pool = SimulationPool.get(workers)
+        if pool is not None:
+            return pool
+        if cls._fallback is None:
+            cls._fallback = ThreadPoolExecutor(max_workers=1, thread_name_prefix="sim-job")
+        return cls._fallback
+
+    @classmethod
+    def _local_executor(cls, max_pending: int) -> Executor:
+        # 協調執行緒大多在等待進程池的結果；進行中的任務數已受 max_pending 限制
+        if cls._coordinator is None:
+            cls._coordinator = ThreadPoolExecutor(max_workers=max_pending, thread_name_prefix="sim-coord")
+        return cls._coordinator
+
+
+atexit.register(SimulationJobs.clear)
@@ -0,0 +1,341 @@
+# app/services/standings_service.py
+from typing import Dict, Iterable, List, Optional, Tuple
+
+from sqlalchemy import and_, func, or_
+
+from app import db
+from app.models.league import (League, LeagueParticipant, PlayoffSeries, Schedule, Season,
+                               SeasonStanding, SeasonStandingDay)
+from app.models.match import Match
+from app.models.team import Team
+
+# [New] 賽季戰績服務 (Season Standings)
+# 取代 Team.update_season_stats 每場比賽後對整張 matches 表的 4 次 COUNT (且未依賽季過濾)。
+# 戰績存於 season_standings (每季每隊一列，含所屬聯賽)，只計例行賽 (game_type=1):
+#   - 寫入比賽時於同一個交易內以增量更新 (勝 / 敗 / 主客場數 / 得失分 / 連勝敗)
+#   - Team.season_wins 等欄位保留為本季戰績快取，隨戰績列同步
+#   - 每日累計戰績 (season_standing_days) 記錄各隊每個比賽日賽後的勝敗，查詢任一天之前的戰績只需一次查詢
+#   - 季後賽系列賽狀態 (playoff_series) 記錄各戰勝方
+#   - 資料不一致時以 rebuild() 從已完賽的 schedules / matches 重新計算
+
+
+class StandingsService:
+    """賽季戰績表的讀寫與重建"""
+
+    # =====================================================
+    # 寫入 (增量)
+    # =====================================================
+
+    @staticmethod
+    def create_row(season_id: int, league_id: Optional[int], team_id: int) -> SeasonStanding:
+        """建立一列空白戰績並加入 Session"""
+        row = SeasonStanding(season_id=season_id, league_id=league_id, team_id=team_id,
+                             wins=0, losses=0, home_games=0, away_games=0,
+                             points_for=0, points_against=0, streak=0)
+        db.session.add(row)
+        return row
+
+    @staticmethod
+    def load(season_id: int, team_ids: Iterable[int]) -> Dict[int, SeasonStanding]:
+        """
+        一次查詢取回多隊的戰績列 (team_id -> SeasonStanding)。
+        尚無戰績列的球隊 (季中才有資料、或舊資料) 依本季參賽名單補建。
+        """
+        ids = sorted({int(t) for t in team_ids})
+        if not ids:
+            return {}
+        rows = {s.team_id: s for s in SeasonStanding.query.filter(
+            SeasonStanding.season_id == season_id, SeasonStanding.team_id.in_(ids)
+        ).all()}
+
+        missing = [t for t in ids if t not in rows]
+        if missing:
+            leagues = StandingsService._league_map(season_id, missing)
+            for team_id in missing:
+                rows[team_id] = StandingsService.create_row(season_id, leagues.get(team_id), team_id)
+        return rows
+
+    @staticmethod
+    def record_game(standings: Dict[int, SeasonStanding], home: Team, away: Team,
+                    home_score: int, away_score: int):
+        """[Optimization] 以 +1 增量記錄一場例行賽，並同步兩隊的戰績快取欄位"""
+        home_row, away_row = standings[home.id], standings[away.id]
+        StandingsService._apply(home_row, True, home_score, away_score)
+        StandingsService._apply(away_row, False, away_score, home_score)
+        StandingsService.sync_team(home, home_row)
+        StandingsService.sync_team(away, away_row)
+
+    @staticmethod
+    def _apply(row: SeasonStanding, is_home: bool, scored: int, allowed: int):
+        if scored > allowed:
+            row.wins += 1
+            row.streak = row.streak + 1 if row.streak > 0 else 1
+        else:
+            row.losses += 1
+            row.streak = row.streak - 1 if row.streak < 0 else -1
+        if is_home:
+            row.home_games += 1
+        else:
+            row.away_games += 1
+        row.points_for += scored
+        row.points_against += allowed
+
+    @staticmethod
+    def sync_team(team: Team, row: Optional[SeasonStanding]):
+        """將戰績列寫回 Team 的本季戰績快取 (無戰績列時歸零)"""
+        team.season_wins = row.wins if row else 0
+        team.season_losses = row.losses if row else 0
+        team.home_games_played = row.home_games if row else 0
+        team.away_games_played = row.away_games if row else 0
+
+    @staticmethod
+    def write_daily(season_id: int, day: int, rows: Iterable[SeasonStanding]):
+        """
+        寫入各隊第 day 天賽後的累計戰績 (一次 DELETE + 一次 executemany INSERT)。
+        同一天重複寫入 (如分批 commit 時同隊出現在兩批) 以最後一次為準。
+        """
+        values = {r.team_id: dict(season_id=season_id, team_id=r.team_id, day=day, wins=r.wins, losses=r.losses)
+                  for r in rows}
+        if not values:
+            return
+        table = SeasonStandingDay.__table__
+        db.session.execute(table.delete().where(
+            table.c.season_id == season_id, table.c.day == day, table.c.team_id.in_(list(values))
+        ))
+        db.session.execute(table.insert(), list(values.values()))
+
+    # -----------------------------------------------------
+    # 季後賽系列賽
+    # -----------------------------------------------------
+
+    @staticmethod
+    def create_series(season_id: int, series_id: str, team_a_id: int, team_b_id: int,
+                      length: Optional[int]) -> PlayoffSeries:
+        """建立系列賽狀態 (team_a = 高種子) 並加入 Session"""
+        series = PlayoffSeries(season_id=season_id, series_id=series_id, team_a_id=team_a_id, team_b_id=team_b_id,
+                               length=length, team_a_wins=0, team_b_wins=0, results=[None] * (length or 0))
+        db.session.add(series)
+        return series
+
+    @staticmethod
+    def load_series(season_id: int, games: Iterable[Schedule]) -> Dict[str, PlayoffSeries]:
+        """
+        一次查詢取回多場季後賽所屬的系列賽狀態 (series_id -> PlayoffSeries)。
+        舊資料沒有狀態列時以該場對戰組合補建 (賽制長度未知)。
+        """
+        games = [g for g in games if g.series_id]
+        if not games:
+            return {}
+        ids = sorted({g.series_id for g in games})
+        series = {s.series_id: s for s in PlayoffSeries.query.filter(
+            PlayoffSeries.season_id == season_id, PlayoffSeries.series_id.in_(ids)
+        ).all()}
+        for g in games:
+            if g.series_id not in series:
+                series[g.series_id] = StandingsService.create_series(
+                    season_id, g.series_id, g.home_team_id, g.away_team_id, None)
+        return series
+
+    @staticmethod
+    def record_series_game(series: Dict[str, PlayoffSeries], game: Schedule, winner_id: int):
+        """記錄一場季後賽的勝方；任一方達到勝場門檻 (length 過半) 時標記系列賽勝方"""
+        state = series[game.series_id]
+        StandingsService._apply_series(state, game.game_number, winner_id)
+
+    @staticmethod
+    def _apply_series(state: PlayoffSeries, game_number: Optional[int], winner_id: int):
+        results = list(state.results or [])
+        index = (game_number or len(results) + 1) - 1
+        if index >= len(results):
+            results.extend([None] * (index + 1 - len(results)))
+        results[index] = winner_id
+        state.results = results # 重新指定以觸發 JSON 欄位更新
+        state.team_a_wins = sum(1 for w in results if w == state.team_a_id)
+        state.team_b_wins = sum(1 for w in results if w == state.team_b_id)
+        if state.length:
+            needed = state.length // 2 + 1
+            if state.team_a_wins >= needed:
+                state.winner_team_id = state.team_a_id
+            elif state.team_b_wins >= needed:
+                state.winner_team_id = state.team_b_id
+
+    @staticmethod
+    def series_wins_before(state: Optional[PlayoffSeries], game_number: int, team_id: int) -> int:
+        """系列賽中 team_id 在第 game_number 戰「之前」的勝場"""
+        if state is None or not state.results:
+            return 0
+        return sum(1 for w in state.results[:max(0, game_number - 1)] if w == team_id)
+
+    # -----------------------------------------------------
+    # 球隊接管
+    # -----------------------------------------------------
+
+    @staticmethod
+    def transfer(season_id: int, from_team: Team, to_team: Team):
+        """球隊接管: 本季戰績 (含每日累計與系列賽) 改由接手球隊繼承，原球隊戰績歸零"""
+        for model in (SeasonStanding, SeasonStandingDay):
+            model.query.filter_by(season_id=season_id, team_id=to_team.id).delete()
+            model.query.filter_by(season_id=season_id, team_id=from_team.id).update({'team_id': to_team.id})
+        for state in PlayoffSeries.query.filter(
+            PlayoffSeries.season_id == season_id,
+            or_(PlayoffSeries.team_a_id == from_team.id, PlayoffSeries.team_b_id == from_team.id)
+        ).all():
+            if state.team_a_id == from_team.id:
+                state.team_a_id = to_team.id
+            if state.team_b_id == from_team.id:
+                state.team_b_id = to_team.id
+            if state.winner_team_id == from_team.id:
+                state.winner_team_id = to_team.id
+            state.results = [to_team.id if w == from_team.id else w for w in (state.results or [])]
+        row = SeasonStanding.query.filter_by(season_id=season_id, team_id=to_team.id).first()
+        StandingsService.sync_team(to_team, row)
+        StandingsService.sync_team(from_team, None)
+
+    # =====================================================
+    # 重建 (修復用)
+    # =====================================================
+
+    @staticmethod
+    def rebuild(season_id: int) -> int:
+        """
+        依已完賽的比賽 (schedules + matches，依日期順序) 重新計算整季戰績、每日累計戰績與系列賽狀態，回傳戰績列數。
+        本季參賽名單中尚未出賽的球隊也會建立空白戰績；若為當前賽季則一併同步 Team 戰績快取。
+        不會 commit，由呼叫端決定。
+        """
+        leagues = StandingsService._league_map(season_id)
+        games = (db.session.query(Schedule.day, Schedule.home_team_id, Schedule.away_team_id,
+                                  Match.home_score, Match.away_score)
+                 .join(Match, Schedule.match_id == Match.id)
+                 .filter(Schedule.season_id == season_id,
+                         Schedule.game_type == 1,
+                         Schedule.status == 'FINISHED')
+                 .order_by(Schedule.day, Schedule.id)
+                 .all())
+
+        for model in (SeasonStanding, SeasonStandingDay, PlayoffSeries):
+            model.query.filter_by(season_id=season_id).delete()
+        rows = {team_id: StandingsService.create_row(season_id, league_id, team_id)
+                for team_id, league_id in leagues.items()}
+        daily = {}
+        for day, home_id, away_id, home_score, away_score in games:
+            for team_id, is_home, scored, allowed in ((home_id, True, home_score, away_score),
+                                                      (away_id, False, away_score, home_score)):
+                if team_id not in rows:
+                    rows[team_id] = StandingsService.create_row(season_id, None, team_id)
+                StandingsService._apply(rows[team_id], is_home, scored, allowed)
+                row = rows[team_id]
+                daily[(day, team_id)] = dict(season_id=season_id, team_id=team_id, day=day,
+                                             wins=row.wins, losses=row.losses)
+        if daily:
+            db.session.execute(SeasonStandingDay.__table__.insert(), list(daily.values()))
+        series_count = StandingsService._rebuild_series(season_id)
+        db.session.flush()
+
+        season = db.session.get(Season, season_id)
+        if season and season.is_active and rows:
+            for team in Team.query.filter(Team.id.in_(list(rows))).all():
+                StandingsService.sync_team(team, rows[team.id])
+        print(f"🔧 [戰績] 第 {season_id} 季戰績重建完成 ({len(rows)} 隊 / {len(games)} 場 / {series_count} 組系列賽)")
+        return len(rows)
+
+    @staticmethod
+    def _rebuild_series(season_id: int) -> int:
+        """依季後賽賽程重建系列賽狀態 (第 1 戰主隊為高種子，賽制長度 = 排定場數)"""
+        games = (db.session.query(Schedule, Match)
+                 .outerjoin(Match, Schedule.match_id == Match.id)
+                 .filter(Schedule.season_id == season_id,
+                         Schedule.game_type == 3,
+                         Schedule.series_id.isnot(None))
+                 .order_by(Schedule.series_id, Schedule.game_number)
+                 .all())
+        by_series = {}
+        for game, match in games:
+            by_series.setdefault(game.series_id, []).append((game, match))
+
+        for series_id, series_games in by_series.items():
+            first = series_games[0][0]
+            state = StandingsService.create_series(season_id, series_id, first.home_team_id, first.away_team_id,
+                                                   len(series_games))
+            for game, match in series_games:
+                if game.status == 'FINISHED' and match is not None:
+                    winner = match.home_team_id if match.home_score > match.away_score else match.away_team_id
+                    StandingsService._apply_series(state, game.game_number, winner)
+        return len(by_series)
+
+    # =====================================================
+    # 查詢
+    # =====================================================
+
+    @staticmethod
+    def get(season_id: int, team_id: int) -> Optional[SeasonStanding]:
+        return SeasonStanding.query.filter_by(season_id=season_id, team_id=team_id).first()
+
+    @staticmethod
+    def ranked(season_id: int, league_id: Optional[int]) -> List[SeasonStanding]:
+        """聯賽排名 (勝場 > 聲望 > 球隊 ID)"""
+        return (SeasonStanding.query
+                .join(Team, Team.id == SeasonStanding.team_id)
+                .filter(SeasonStanding.season_id == season_id,
+                        StandingsService._same_league(league_id))
+                .order_by(SeasonStanding.wins.desc(), Team.reputation.desc(), SeasonStanding.team_id)
+                .all())
+
+    @staticmethod
+    def rank_of(standing: SeasonStanding) -> Tuple[int, int]:
+        """回傳 (名次, 聯賽隊數)，排序規則同 ranked()"""
+        reputation = db.session.get(Team, standing.team_id).reputation
+        base = (SeasonStanding.query
+                .join(Team, Team.id == SeasonStanding.team_id)
+                .filter(SeasonStanding.season_id == standing.season_id,
+                        StandingsService._same_league(standing.league_id)))
+        better = base.filter(or_(
+            SeasonStanding.wins > standing.wins,
+            and_(SeasonStanding.wins == standing.wins, Team.reputation > reputation),
+            and_(SeasonStanding.wins == standing.wins, Team.reputation == reputation,
+                 SeasonStanding.team_id < standing.team_id)
+        )).count()
+        return better + 1, base.count()
+
+    @staticmethod
+    def records_before_day(season_id: int, day: int, team_ids: Iterable[int]) -> Dict[int, Tuple[int, int]]:
+        """
+        各隊在第 day 天「之前」的例行賽戰績 (team_id -> (勝, 敗))。
+        取每日累計戰績中各隊 day 之前的最後一列，單次查詢，與查看哪一天無關。
+        """
+        ids = sorted({int(t) for t in team_ids})
+        if not ids:
+            return {}
+        latest = (db.session.query(SeasonStandingDay.team_id, func.max(SeasonStandingDay.day).label('day'))
+                  .filter(SeasonStandingDay.season_id == season_id,
+                          SeasonStandingDay.day < day,
+                          SeasonStandingDay.team_id.in_(ids))
+                  .group_by(SeasonStandingDay.team_id)
+                  .subquery())
+        rows = (db.session.query(SeasonStandingDay.team_id, SeasonStandingDay.wins, SeasonStandingDay.losses)
+                .join(latest, and_(SeasonStandingDay.team_id == latest.c.team_id,
+                                   SeasonStandingDay.day == latest.c.day))
+                .filter(SeasonStandingDay.season_id == season_id)
+                .all())
+        records = {t: (0, 0) for t in ids}
+        records.update({team_id: (wins, losses) for team_id, wins, losses in rows})
+        return records
+
+    # =====================================================
+    # 內部工具
+    # =====================================================
+
+    @staticmethod
+    def _league_map(season_id: int, team_ids: Optional[List[int]] = None) -> Dict[int, int]:
+        """本季參賽名單: team_id -> league_id"""
+        q = (db.session.query(LeagueParticipant.team_id, LeagueParticipant.league_id)
+             .join(League, League.id == LeagueParticipant.league_id)
+             .filter(League.season_id == season_id))
+        if team_ids is not None:
+            q = q.filter(LeagueParticipant.team_id.in_(team_ids))
+        return dict(q.all())
+
+    @staticmethod
+    def _same_league(league_id: Optional[int]):
+        if league_id is None:
+            return SeasonStanding.league_id.is_(None)
+        return SeasonStanding.league_id == league_id
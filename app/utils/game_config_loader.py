@@ -1,6 +1,7 @@
 # app/utils/game_config_loader.py
 import yaml
 import os
+import threading
 from dotenv import load_dotenv
 
 # 載入 .env 檔案中的環境變數
@@ -12,64 +13,77 @@ class GameConfigLoader:
     優先順序:
     1. 環境變數 'GAME_CONFIG_PATH'
     2. 專案根目錄下的 config/game_config.yaml (自動推導)
+
+    [New] 執行緒安全: 首次載入與 reload 以鎖保護 (double-checked)，多執行緒同時呼叫只會讀檔一次。
+    回傳的 dict 由所有呼叫端共用，請視為唯讀 (需要修改時先 copy.deepcopy)。
     """
     _config = None
+    _lock = threading.RLock()
 
     @classmethod
     def load(cls):
         """
         載入設定檔 (Singleton 模式)
         """
-        if cls._config is None:
-            config_path = None
-            
-            # 1. 優先嘗試從環境變數讀取路徑
-            env_path = os.getenv('GAME_CONFIG_PATH')
-            if env_path:
-                # 支援相對路徑與絕對路徑
-                if os.path.isabs(env_path):
-                    potential_path = env_path
-                else:
-                    potential_path = os.path.abspath(env_path)
-                
-                if os.path.exists(potential_path):
-                    config_path = potential_path
-                else:
-                    print(f"[Warning] .env 設定的 GAME_CONFIG_PATH ({env_path}) 找不到檔案，將嘗試自動搜尋。")
+        config = cls._config
+        if config is not None:
+            return config
 
-            # 2. 若環境變數未設定或找不到，使用預設相對路徑搜尋
-            if not config_path:
-                # 定位到 app/utils/game_config_loader.py
-                current_dir = os.path.dirname(os.path.abspath(__file__))
-                # 往上兩層: app/utils -> app -> root
-                project_root = os.path.dirname(os.path.dirname(current_dir))
-                
-                # 預設路徑: root/config/game_config.yaml
-                default_path = os.path.join(project_root, 'config', 'game_config.yaml')
-                
-                if os.path.exists(default_path):
-                    config_path = default_path
-                else:
-                    # 最後嘗試: 當前工作目錄 (CWD) 下的 config
-                    cwd_path = os.path.join(os.getcwd(), 'config', 'game_config.yaml')
-                    if os.path.exists(cwd_path):
-                        config_path = cwd_path
+        with cls._lock:
+            if cls._config is None:
+                cls._config = cls._read()
+            return cls._config
 
-            # 3. 最終檢查
-            if not config_path or not os.path.exists(config_path):
-                raise FileNotFoundError(
-                    "Game config file not found. \n"
-                    "Please set 'GAME_CONFIG_PATH' in .env or ensure 'config/game_config.yaml' exists in project root."
-                )
+    @staticmethod
+    def _read():
+        """尋找並讀取設定檔"""
+        config_path = None
+        
+        # 1. 優先嘗試從環境變數讀取路徑
+        env_path = os.getenv('GAME_CONFIG_PATH')
+        if env_path:
+            # 支援相對路徑與絕對路徑
+            if os.path.isabs(env_path):
+                potential_path = env_path
+            else:
+                potential_path = os.path.abspath(env_path)
+            
+            if os.path.exists(potential_path):
+                config_path = potential_path
+            else:
+                print(f"[Warning] .env 設定的 GAME_CONFIG_PATH ({env_path}) 找不到檔案，將嘗試自動搜尋。")
 
-            # 4. 讀取 YAML
-            try:
-                with open(config_path, 'r', encoding='utf-8') as f:
-                    cls._config = yaml.safe_load(f)
-            except yaml.YAMLError as e:
-                raise ValueError(f"Error parsing YAML config at {config_path}: {e}")
+        # 2. 若環境變數未設定或找不到，使用預設相對路徑搜尋
+        if not config_path:
+            # 定位到 app/utils/game_config_loader.py
+            current_dir = os.path.dirname(os.path.abspath(__file__))
+            # 往上兩層: app/utils -> app -> root
+            project_root = os.path.dirname(os.path.dirname(current_dir))
+            
+            # 預設路徑: root/config/game_config.yaml
+            default_path = os.path.join(project_root, 'config', 'game_config.yaml')
+            
+            if os.path.exists(default_path):
+                config_path = default_path
+            else:
+                # 最後嘗試: 當前工作目錄 (CWD) 下的 config
+                cwd_path = os.path.join(os.getcwd(), 'config', 'game_config.yaml')
+                if os.path.exists(cwd_path):
+                    config_path = cwd_path
 
-        return cls._config
+        # 3. 最終檢查
+        if not config_path or not os.path.exists(config_path):
+            raise FileNotFoundError(
+                "Game config file not found. \n"
+                "Please set 'GAME_CONFIG_PATH' in .env or ensure 'config/game_config.yaml' exists in project root."
+            )
+
+        # 4. 讀取 YAML
+        try:
+            with open(config_path, 'r', encoding='utf-8') as f:
+                return yaml.safe_load(f)
+        except yaml.YAMLError as e:
+            raise ValueError(f"Error parsing YAML config at {config_path}: {e}")
 
     @classmethod
     def get(cls, key_path=None, default=None):
@@ -102,5 +116,6 @@ class GameConfigLoader:
     @classmethod
     def reload(cls):
         """強制重新讀取 (用於熱更或測試)"""
-        cls._config = None
-        return cls.load()
\ No newline at end of file
+        with cls._lock:
+            cls._config = None
+            return cls.load()
\ No newline at end of file
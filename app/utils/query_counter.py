@@ -0,0 +1,32 @@
+# app/utils/query_counter.py
+from sqlalchemy import event
+
+
+class QueryCounter:
+    """
+    [New] SQL 語句計數器 (效能量測 / 測試用)
+    以 SQLAlchemy before_cursor_execute 事件計算區塊內送往資料庫的語句數。
+    executemany (批次寫入) 只算一次，statements 保留每條 SQL 方便檢查。
+
+    用法:
+        with QueryCounter(db.engine) as qc:
+            ...
+        print(qc.count)
+    """
+
+    def __init__(self, engine):
+        self.engine = engine
+        self.count = 0
+        self.statements = []
+
+    def _on_execute(self, conn, cursor, statement, parameters, context, executemany):
+        self.count += 1
+        self.statements.append(statement)
+
+    def __enter__(self):
+        event.listen(self.engine, "before_cursor_execute", self._on_execute)
+        return self
+
+    def __exit__(self, *exc):
+        event.remove(self.engine, "before_cursor_execute", self._on_execute)
+        return False
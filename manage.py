@@ -1,6 +1,7 @@
 # manage.py
-from app import create_app
+from app import create_app, db
 from app.services.league_service import LeagueService
+from app.services.standings_service import StandingsService
 
 app = create_app()
 
@@ -11,9 +12,10 @@ def manual_trigger():
     print("1. 執行換日 (00:00) - 推進日期、生成賽程")
     print("2. 執行比賽 (19:00) - 模擬當日賽事")
     print("3. 自動模擬 (換日 + 比賽) 直到第 N 天")
+    print("4. 重建本季戰績表 (修復 season_standings)")
     print("========================================")
     
-    choice = input("請選擇操作 (1-3): ")
+    choice = input("請選擇操作 (1-4): ")
     
     with app.app_context():
         if choice == '1':
@@ -59,6 +61,13 @@ def manual_trigger():
                 import traceback
                 traceback.print_exc()
                 
+        elif choice == '4':
+            season = LeagueService.get_current_season()
+            print(f"🚀 [手動] 重建第 {season.season_number} 季戰績表...")
+            StandingsService.rebuild(season.id)
+            db.session.commit()
+            print("✅ 戰績表重建完成。")
+            
         else:
             print("❌ 無效的選擇")
 
@@ -0,0 +1,178 @@
+# tests/league_service_test/test_bulk_write.py
+# -*- coding: utf-8 -*-
+"""
+比賽結果批次寫入測試 (LeagueService._store_games)
+
+驗證:
+  1. 每批 (commit_chunk 場) 只需 4 條 INSERT (比賽主表 / 球隊數據 / 球員數據 / 每日累計戰績)
+  2. 批次寫入與逐場寫入 (回退路徑) 的資料完全相同
+  3. 資料庫不支援 RETURNING 時 (如 MySQL) 仍為單條多列 INSERT，由 lastrowid 推得 Match ID，結果相同
+     (含 MySQL 的 LAST_INSERT_ID 語意: lastrowid 為第一列 ID，以及 auto_increment_increment = 2)
+  4. 推得的 Match ID 與實際不符時回退為逐場寫入，關聯數據不會掛到錯誤的比賽
+
+執行方式:
+  python -m pytest -q tests/league_service_test/test_bulk_write.py
+  python tests/league_service_test/test_bulk_write.py
+"""
+
+import os
+import sys
+from contextlib import contextmanager
+
+PROJECT_ROOT = os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+sys.path.insert(0, PROJECT_ROOT)
+
+from sqlalchemy import func, select
+
+from app import db
+from app.models.match import Match, MatchPlayerStat, MatchTeamStat
+from app.services.league_service import LeagueService
+from app.services.standings_service import StandingsService
+from app.utils.query_counter import QueryCounter
+
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+from test_match_execution import league_settings, make_app, seed_league
+
+# 6 場 (含 1 場過渡聯賽)
+DAY_GAMES = [(0, 1, 1), (2, 3, 1), (4, 5, 2), (1, 2, 1), (3, 4, 1), (5, 0, 1)]
+
+
+def table_rows(model):
+    """各表內容 (match_id 換成比賽的寫入順序，與實際配發的 ID 無關)"""
+    order = {m.id: i for i, m in enumerate(Match.query.order_by(Match.id).all())}
+    cols = [c.name for c in model.__table__.columns if c.name not in ('id', 'date', 'created_at')]
+    return [tuple(order[v] if c == 'match_id' else v for c, v in ((c, getattr(r, c)) for c in cols))
+            for r in model.query.order_by(model.id).all()]
+
+
+def run_day(commit_chunk=50, patch=None):
+    """執行一天 (workers=1)，回傳 (INSERT 語句數, 各表內容)"""
+    flask_app = make_app()
+    with flask_app.app_context(), league_settings(1, commit_chunk=commit_chunk), (patch or nullpatch)():
+        season, teams = seed_league(n_teams=6, games=DAY_GAMES)
+        # 戰績列於開季分組時建立 (_reset_season_and_reseed)，不計入當日寫入
+        StandingsService.load(season.id, [t.id for t in teams])
+        db.session.commit()
+        with QueryCounter(db.engine) as qc:
+            LeagueService.process_match_execution_1900()
+        inserts = sum(1 for sql in qc.statements if sql.lstrip().upper().startswith('INSERT'))
+        tables = (table_rows(Match), table_rows(MatchTeamStat), table_rows(MatchPlayerStat))
+        db.session.remove()
+        return inserts, tables
+
+
+@contextmanager
+def nullpatch():
+    yield
+
+
+@contextmanager
+def force_fallback():
+    """批次寫入一律失敗 -> 逐場寫入"""
+    original = LeagueService._insert_matches
+
+    def broken(rows):
+        raise RuntimeError("bulk insert disabled")
+
+    LeagueService._insert_matches = staticmethod(broken)
+    try:
+        yield
+    finally:
+        LeagueService._insert_matches = staticmethod(original)
+
+
+@contextmanager
+def without_returning():
+    dialect = db.engine.dialect
+    saved = dialect.insert_returning
+    dialect.insert_returning = False
+    try:
+        yield
+    finally:
+        dialect.insert_returning = saved
+
+
+def test_bulk_write_statement_count():
+    inserts, tables = run_day(commit_chunk=50)
+    assert inserts == 4
+    assert [len(t) for t in tables] == [6, 12, 6 * 2 * 14]
+
+    inserts, chunked = run_day(commit_chunk=4)
+    assert inserts == 8 # 兩批
+    assert chunked == tables
+
+
+def test_bulk_matches_per_game_path():
+    _, bulk = run_day()
+    fallback_inserts, fallback = run_day(patch=force_fallback)
+    assert fallback == bulk
+    assert fallback_inserts > 6 * 3
+
+
+@contextmanager
+def mysql_server(step=1, reported=None):
+    """
+    模擬 MySQL: 不支援 RETURNING，多列 INSERT 的 lastrowid 為第一列 ID (LAST_INSERT_ID)，
+    比賽主表 ID 以 step 為步距配發 (auto_increment_increment)；reported: @@auto_increment_increment 回報值
+    """
+    session_execute = db.session.execute
+
+    class InsertResult:
+        def __init__(self, first, count):
+            self.lastrowid, self.rowcount = first, count
+
+    class Scalar:
+        def __init__(self, value):
+            self.value = value
+
+        def scalar(self):
+            return self.value
+
+    def execute(stmt, *args, **kwargs):
+        if '@@auto_increment_increment' in str(stmt):
+            return Scalar(step if reported is None else reported)
+        if getattr(stmt, 'is_insert', False) and stmt.table is Match.__table__ and stmt._multi_values:
+            rows = stmt._multi_values[0]
+            last = session_execute(select(func.coalesce(func.max(Match.id), 0))).scalar()
+            ids = [last + step * (i + 1) for i in range(len(rows))]
+            session_execute(Match.__table__.insert(), [dict(row, id=i) for row, i in zip(rows, ids)])
+            return InsertResult(ids[0], len(rows))
+        return session_execute(stmt, *args, **kwargs)
+
+    with without_returning():
+        dialect = db.engine.dialect
+        saved = dialect.name
+        dialect.name = 'mysql'
+        db.session.execute = execute
+        try:
+            yield
+        finally:
+            del db.session.execute
+            dialect.name = saved
+
+
+def test_bulk_without_returning():
+    inserts, bulk = run_day()
+    no_returning_inserts, no_returning = run_day(patch=without_returning)
+    assert no_returning == bulk
+    assert no_returning_inserts == inserts == 4
+
+    for step in (1, 2):
+        mysql_inserts, mysql = run_day(patch=lambda: mysql_server(step))
+        assert mysql == bulk
+        assert mysql_inserts == 4
+
+
+def test_bulk_rejects_wrong_match_ids():
+    """推得的 ID 與實際配發不符 (步距回報錯誤) 時不可寫入關聯數據，改為逐場寫入"""
+    _, bulk = run_day()
+    inserts, data = run_day(patch=lambda: mysql_server(step=2, reported=1))
+    assert data == bulk
+    assert inserts > 4
+
+
+if __name__ == "__main__":
+    for fn in (test_bulk_write_statement_count, test_bulk_matches_per_game_path, test_bulk_without_returning,
+               test_bulk_rejects_wrong_match_ids):
+        fn()
+        print(f"✅ {fn.__name__}")
@@ -0,0 +1,175 @@
+# tests/league_service_test/test_match_execution.py
+# -*- coding: utf-8 -*-
+"""
+每日比賽執行測試 (LeagueService.process_match_execution_1900)
+
+以 SQLite 記憶體資料庫建立最小聯賽 (球隊 / 球員 / 合約 / 戰術 / 賽程)，驗證:
+  1. 當日比賽全部寫入 (Match / MatchTeamStat / MatchPlayerStat)，賽程標記為 FINISHED，戰績更新
+  2. 固定 match_seed 時，單進程與進程池 (workers=2) 的比分逐場一致
+  3. 單場寫入失敗只略過該場 (維持 PUBLISHED)，同批其餘比賽回退為逐場寫入
+
+執行方式:
+  python -m pytest -q tests/league_service_test/test_match_execution.py
+  python tests/league_service_test/test_match_execution.py
+"""
+
+import os
+import random
+import sys
+from contextlib import contextmanager
+
+PROJECT_ROOT = os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+sys.path.insert(0, PROJECT_ROOT)
+
+from flask import Flask
+
+from app import db
+from app import models as _models  # noqa: F401  (註冊所有資料表)
+from app.models.contract import Contract
+from app.models.league import Season, Schedule
+from app.models.match import Match, MatchPlayerStat, MatchTeamStat
+from app.models.player import Player
+from app.models.tactics import TeamTactics
+from app.models.team import Team
+from app.models.user import User
+from app.services.league_service import LeagueService
+from app.services.simulation_pool import SimulationPool
+from app.utils.game_config_loader import GameConfigLoader
+
+ROLES = ["Star", "Star", "Starter", "Starter", "Starter", "Rotation", "Rotation", "Rotation",
+         "Role", "Role", "Bench", "Bench", "Bench", "Bench", "Bench"]
+POSITIONS = ["C", "PF", "SF", "SG", "PG"]
+STAT_KEYS = {
+    'physical': ['stamina', 'strength', 'speed', 'jumping', 'health'],
+    'offense': ['touch', 'release', 'accuracy', 'range', 'passing', 'dribble', 'handle', 'move'],
+    'defense': ['rebound', 'boxout', 'contest', 'disrupt'],
+    'mental': ['off_iq', 'def_iq', 'luck'],
+}
+# (主隊序號, 客隊序號, 比賽類型)
+DAY_GAMES = [(0, 1, 1), (2, 3, 1), (4, 5, 2)]
+MATCH_SEED = 20260301
+
+
+def make_app() -> Flask:
+    """建立僅含資料庫的 Flask App (SQLite 記憶體；略過 MySQL 專用的名稱庫資料表)"""
+    flask_app = Flask(__name__)
+    flask_app.config['SQLALCHEMY_DATABASE_URI'] = 'sqlite://'
+    flask_app.config['SQLALCHEMY_TRACK_MODIFICATIONS'] = False
+    db.init_app(flask_app)
+    with flask_app.app_context():
+        tables = [t for name, t in db.metadata.tables.items() if name != 'system_name_library']
+        db.metadata.create_all(bind=db.engine, tables=tables)
+    return flask_app
+
+
+def seed_league(n_teams: int = 6, day: int = 1, games=DAY_GAMES, seed: int = 7):
+    """建立賽季、球隊 (各 15 名球員含合約與戰術) 與當日賽程，回傳 (season, teams)"""
+    r = random.Random(seed)
+    season = Season(season_number=1, current_day=day, phase='REGULAR', is_active=True)
+    db.session.add(season)
+
+    teams = []
+    for t in range(n_teams):
+        user = User(username=f"user{t}", email=f"user{t}@asbl.test", password_hash="x")
+        db.session.add(user)
+        db.session.flush()
+        team = Team(user_id=user.id, name=f"Team{t}", reputation=r.randint(0, 200))
+        db.session.add(team)
+        db.session.flush()
+
+        player_ids = []
+        for i in range(15):
+            stats = {group: {k: r.randint(30, 99) for k in keys} for group, keys in STAT_KEYS.items()}
+            player = Player(
+                name=f"T{t}P{i}", nationality='zh', age=r.randint(19, 34), height=r.randint(175, 220),
+                position=POSITIONS[i % 5], grade='A', rating=sum(sum(g.values()) for g in stats.values()),
+                detailed_stats=stats, team_id=team.id,
+            )
+            db.session.add(player)
+            db.session.flush()
+            db.session.add(Contract(player_id=player.id, team_id=team.id, salary=1000, role=ROLES[i]))
+            player_ids.append(player.id)
+        # 登錄名單不含最後一名球員 (驗證戰術過濾)
+        db.session.add(TeamTactics(team_id=team.id, roster_list=player_ids[:-1]))
+        teams.append(team)
+
+    db.session.flush()
+    for h, a, game_type in games:
+        db.session.add(Schedule(season_id=season.id, day=day, game_type=game_type,
+                                home_team_id=teams[h].id, away_team_id=teams[a].id, status='PUBLISHED'))
+    db.session.commit()
+    return season, teams
+
+
+@contextmanager
+def league_settings(workers, match_seed=MATCH_SEED, **execution):
+    """暫時覆寫進程池大小與 league_system 的執行設定 (execution: match_execution 的參數，如 commit_chunk)"""
+    config = GameConfigLoader.load()
+    league = config['league_system']
+    saved = (league.get('match_seed'), dict(league.get('match_execution') or {}), config.get('simulation_pool'))
+    league['match_seed'] = match_seed
+    league['match_execution'] = {**saved[1], **execution}
+    config['simulation_pool'] = {'workers': workers}
+    try:
+        yield
+    finally:
+        league['match_seed'], league['match_execution'], config['simulation_pool'] = saved
+
+
+def run_day(workers, **execution):
+    """建立新資料庫並執行一天的比賽，回傳 ([(比賽ID, 狀態, 主隊得分, 客隊得分)], 各隊 (勝, 敗), 各表列數)"""
+    flask_app = make_app()
+    with flask_app.app_context(), league_settings(workers, **execution):
+        _, teams = seed_league()
+        LeagueService.process_match_execution_1900()
+        rows = []
+        for g in Schedule.query.order_by(Schedule.id).all():
+            m = db.session.get(Match, g.match_id) if g.match_id else None
+            rows.append((g.id, g.status, m.home_score if m else None, m.away_score if m else None))
+        records = [(t.season_wins, t.season_losses) for t in teams]
+        counts = (Match.query.count(), MatchTeamStat.query.count(), MatchPlayerStat.query.count())
+        db.session.remove()
+        return rows, records, counts
+
+
+def test_day_is_simulated_and_stored():
+    rows, records, counts = run_day(workers=1)
+    assert all(status == 'FINISHED' for _, status, _, _ in rows)
+    assert all(h != a for _, _, h, a in rows)
+    assert counts == (3, 6, 3 * 2 * 14)
+    # 正式比賽 (type 1) 更新戰績；過渡聯賽 (type 2) 不計入
+    assert [w + l for w, l in records] == [1, 1, 1, 1, 0, 0]
+
+
+def test_pool_matches_inline_results():
+    try:
+        assert run_day(workers=1)[0] == run_day(workers=2)[0]
+    finally:
+        SimulationPool.shutdown()
+
+
+def test_store_failure_is_isolated():
+    original = LeagueService._finish_game
+    target = 2 # 第二場比賽寫入時失敗: 該批回退為逐場寫入，其餘比賽照常寫入
+
+    def flaky_finish(game, *args):
+        if game.id == target:
+            raise RuntimeError("simulated write failure")
+        return original(game, *args)
+
+    LeagueService._finish_game = staticmethod(flaky_finish)
+    try:
+        rows, _, counts = run_day(workers=1)
+    finally:
+        LeagueService._finish_game = staticmethod(original)
+
+    status = {gid: s for gid, s, _, _ in rows}
+    assert status.pop(target) == 'PUBLISHED'
+    assert set(status.values()) == {'FINISHED'}
+    assert counts == (2, 4, 2 * 2 * 14)
+
+
+if __name__ == "__main__":
+    for fn in (test_day_is_simulated_and_stored, test_pool_matches_inline_results, test_store_failure_is_isolated):
+        fn()
+        print(f"✅ {fn.__name__}")
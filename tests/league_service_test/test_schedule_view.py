@@ -0,0 +1,216 @@
+# tests/league_service_test/test_schedule_view.py
+# -*- coding: utf-8 -*-
+"""
+賽程頁面測試 (GET /api/league/schedule -> ScheduleService)
+
+以 3 天例行賽 + 一組 BO3 季後賽驗證:
+  1. 批次版本與舊版逐筆計算 (歷史戰績 join 查詢、系列賽逐場統計) 的輸出一致
+  2. 查詢數固定: 重新產生 <= 6 次，快取命中只需 1 次 (資料版本；當日有季後賽時 2 次)
+  3. 當日比賽完賽後快取自動失效，回應帶出比分與新戰績
+     前幾天完賽 (之前戰績 / 系列賽比分改變) 或戰績重建後，之後日子的快取同樣失效
+  4. 系列賽狀態與每日累計戰績可由 rebuild() 重建出相同結果
+
+執行方式:
+  python -m pytest -q tests/league_service_test/test_schedule_view.py
+  python tests/league_service_test/test_schedule_view.py
+"""
+
+import json
+import os
+import sys
+
+PROJECT_ROOT = os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+sys.path.insert(0, PROJECT_ROOT)
+
+from app import db
+from app.models.league import PlayoffSeries, Schedule, Season, SeasonStandingDay
+from app.models.match import Match
+from app.models.team import Team
+from app.routes.league import league_bp
+from app.services.league_service import LeagueService
+from app.services.schedule_service import ScheduleService
+from app.services.standings_service import StandingsService
+from app.utils.query_counter import QueryCounter
+
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+from test_match_execution import league_settings, make_app, seed_league
+from test_standings import DAY2_GAMES
+
+DAY3_GAMES = [(0, 2, 1), (1, 3, 1), (4, 5, 2)]
+
+
+def legacy_day(season_id, day):
+    """舊版 get_schedule 的逐筆計算 (對照組)"""
+    result = []
+    for s in Schedule.query.filter_by(season_id=season_id, day=day).order_by(Schedule.id).all():
+        match = db.session.get(Match, s.match_id) if s.match_id else None
+        record = {}
+        for team_id in (s.home_team_id, s.away_team_id):
+            wins = losses = 0
+            if s.game_type == 1:
+                for g, m in (db.session.query(Schedule, Match).join(Match, Schedule.match_id == Match.id)
+                             .filter(Schedule.season_id == season_id, Schedule.day < day,
+                                     Schedule.game_type == 1, Schedule.status == 'FINISHED').all()):
+                    if team_id not in (g.home_team_id, g.away_team_id):
+                        continue
+                    winner = m.home_team_id if m.home_score > m.away_score else m.away_team_id
+                    wins, losses = (wins + 1, losses) if winner == team_id else (wins, losses + 1)
+            record[team_id] = (wins, losses)
+        item = {
+            'id': s.id, 'day': s.day, 'game_type': s.game_type, 'status': s.status, 'match_id': s.match_id,
+            'home_team': {'id': s.home_team_id, 'name': db.session.get(Team, s.home_team_id).name,
+                          'wins': record[s.home_team_id][0], 'losses': record[s.home_team_id][1]},
+            'away_team': {'id': s.away_team_id, 'name': db.session.get(Team, s.away_team_id).name,
+                          'wins': record[s.away_team_id][0], 'losses': record[s.away_team_id][1]},
+            'match': {'home_score': match.home_score, 'away_score': match.away_score,
+                      'is_ot': match.is_ot} if match else None,
+        }
+        if s.game_type == 3 and s.series_id:
+            home_wins = away_wins = 0
+            for g, m in (db.session.query(Schedule, Match).join(Match, Schedule.match_id == Match.id)
+                         .filter(Schedule.series_id == s.series_id, Schedule.status == 'FINISHED',
+                                 Schedule.game_number < s.game_number).all()):
+                winner = m.home_team_id if m.home_score > m.away_score else m.away_team_id
+                home_wins += winner == s.home_team_id
+                away_wins += winner == s.away_team_id
+            item['series_info'] = {'round_label': ScheduleService.round_label(s.series_id),
+                                   'game_number': s.game_number, 'home_wins': home_wins, 'away_wins': away_wins}
+        result.append(item)
+    return result
+
+
+def add_day(season, teams, day, games):
+    season.current_day = day
+    for h, a, game_type in games:
+        db.session.add(Schedule(season_id=season.id, day=day, game_type=game_type,
+                                home_team_id=teams[h].id, away_team_id=teams[a].id, status='PUBLISHED'))
+    db.session.commit()
+
+
+def play_season():
+    """Day 1-3 例行賽，Day 4-6 為 Team0 vs Team1 的 BO3 (Day 4、5 已賽，Day 6 尚未開賽)"""
+    season, teams = seed_league()
+    LeagueService.process_match_execution_1900()
+    for day, games in ((2, DAY2_GAMES), (3, DAY3_GAMES)):
+        add_day(season, teams, day, games)
+        LeagueService.process_match_execution_1900()
+
+    LeagueService._create_series_schedule(season, [(teams[0].id, teams[1].id)], 4, 3, "T0_R1")
+    db.session.commit()
+    for day in (4, 5):
+        season.current_day = day
+        db.session.commit()
+        LeagueService.process_match_execution_1900()
+    return season, teams
+
+
+def get_day(client, season_id, day):
+    resp = client.get(f"/api/league/schedule?season_id={season_id}&day={day}")
+    assert resp.status_code == 200
+    return json.loads(resp.data)
+
+
+def test_schedule_matches_legacy_view():
+    flask_app = make_app()
+    with flask_app.app_context(), league_settings(1):
+        season, _ = play_season()
+        for day in range(1, 7):
+            assert ScheduleService.build_day(season.id, day) == legacy_day(season.id, day)
+
+        series = PlayoffSeries.query.filter_by(season_id=season.id).one()
+        assert series.length == 3 and series.results[2] is None
+        assert series.team_a_wins + series.team_b_wins == 2
+        assert [i['series_info'] for i in ScheduleService.build_day(season.id, 6)][0]['game_number'] == 3
+
+        # 重建後系列賽狀態與每日累計戰績不變
+        before = (series.results, [(r.team_id, r.day, r.wins, r.losses) for r in
+                                   SeasonStandingDay.query.order_by(SeasonStandingDay.team_id, SeasonStandingDay.day)])
+        StandingsService.rebuild(season.id)
+        db.session.commit()
+        series = PlayoffSeries.query.filter_by(season_id=season.id).one()
+        after = (series.results, [(r.team_id, r.day, r.wins, r.losses) for r in
+                                  SeasonStandingDay.query.order_by(SeasonStandingDay.team_id, SeasonStandingDay.day)])
+        assert after == before
+        assert ScheduleService.build_day(season.id, 6) == legacy_day(season.id, 6)
+        db.session.remove()
+
+
+def test_schedule_endpoint_cache():
+    flask_app = make_app()
+    flask_app.register_blueprint(league_bp)
+    client = flask_app.test_client()
+    ScheduleService.clear_cache()
+    with flask_app.app_context(), league_settings(1):
+        season, teams = play_season()
+
+        with QueryCounter(db.engine) as qc:
+            first = get_day(client, season.id, 3)
+        assert 1 < qc.count <= 6
+        with QueryCounter(db.engine) as qc:
+            assert get_day(client, season.id, 3) == first
+        assert qc.count == 1
+
+        # Day 6 尚未開賽 -> 完賽後快取失效
+        pending = get_day(client, season.id, 6)
+        assert [g['status'] for g in pending] == ['PUBLISHED'] and pending[0]['match'] is None
+        season.current_day = 6
+        db.session.commit()
+        LeagueService.process_match_execution_1900()
+        db.session.remove()
+        finished = get_day(client, season.id, 6)
+        assert [g['status'] for g in finished] == ['FINISHED'] and finished[0]['match'] is not None
+        assert finished == legacy_day(season.id, 6)
+
+        assert get_day(client, season.id, 99) == []
+        assert client.get("/api/league/schedule?season_id=1").status_code == 400
+        db.session.remove()
+
+
+def test_cache_follows_earlier_days():
+    flask_app = make_app()
+    flask_app.register_blueprint(league_bp)
+    client = flask_app.test_client()
+    ScheduleService.clear_cache()
+    with flask_app.app_context(), league_settings(1):
+        season, teams = seed_league()
+        for h, a, game_type in DAY2_GAMES:
+            db.session.add(Schedule(season_id=season.id, day=2, game_type=game_type,
+                                    home_team_id=teams[h].id, away_team_id=teams[a].id, status='PUBLISHED'))
+        db.session.commit()
+        season_id, team_ids = season.id, [t.id for t in teams]
+
+        # Day 2 先被快取 (之前戰績皆為 0-0)，Day 1 完賽後需帶出新戰績
+        before = get_day(client, season_id, 2)
+        assert {(g['home_team']['wins'], g['home_team']['losses']) for g in before} == {(0, 0)}
+        LeagueService.process_match_execution_1900()
+        db.session.remove()
+        assert get_day(client, season_id, 2) == legacy_day(season_id, 2)
+        assert get_day(client, season_id, 2) != before
+
+        # 系列賽: 第 2 戰先被快取，第 1 戰完賽後系列賽比分需更新
+        season = db.session.get(Season, season_id)
+        LeagueService._create_series_schedule(season, [(team_ids[0], team_ids[1])], 4, 3, "T0_R1")
+        db.session.commit()
+        assert get_day(client, season_id, 5)[0]['series_info']['home_wins'] == 0
+        season.current_day = 4
+        db.session.commit()
+        LeagueService.process_match_execution_1900()
+        db.session.remove()
+        game2 = get_day(client, season_id, 5)
+        assert game2 == legacy_day(season_id, 5)
+        assert game2[0]['series_info']['home_wins'] + game2[0]['series_info']['away_wins'] == 1
+
+        # 戰績重建 (清空後重算) 後仍與逐筆計算一致
+        SeasonStandingDay.query.filter_by(season_id=season_id).delete()
+        db.session.commit()
+        assert get_day(client, season_id, 2) != legacy_day(season_id, 2)
+        StandingsService.rebuild(season_id)
+        db.session.commit()
+        assert get_day(client, season_id, 2) == legacy_day(season_id, 2)
+        db.session.remove()
+
+
+if __name__ == "__main__":
+    for fn in (test_schedule_matches_legacy_view, test_schedule_endpoint_cache, test_cache_follows_earlier_days):
+        fn()
+        print(f"✅ {fn.__name__}")
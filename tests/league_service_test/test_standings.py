@@ -0,0 +1,159 @@
+# tests/league_service_test/test_standings.py
+# -*- coding: utf-8 -*-
+"""
+賽季戰績表測試 (StandingsService / season_standings)
+
+驗證:
+  1. 連續兩天比賽後，增量更新的戰績 (勝敗 / 主客場 / 得失分 / 連勝敗) 與 rebuild() 重建結果一致，
+     且只計例行賽 (過渡聯賽不計)，Team 戰績快取同步
+  2. 寫入階段不再對 matches 執行 COUNT
+  3. records_before_day 回傳「該日之前」的戰績
+  4. ranked / rank_of 依 勝場 > 聲望 排序且彼此一致
+  5. 球隊接管 (transfer) 由接手球隊繼承戰績
+
+執行方式:
+  python -m pytest -q tests/league_service_test/test_standings.py
+  python tests/league_service_test/test_standings.py
+"""
+
+import os
+import sys
+
+PROJECT_ROOT = os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+sys.path.insert(0, PROJECT_ROOT)
+
+from app import db
+from app.models.league import Schedule, SeasonStanding
+from app.models.match import Match
+from app.services.league_service import LeagueService
+from app.services.standings_service import StandingsService
+from app.utils.query_counter import QueryCounter
+
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+from test_match_execution import league_settings, make_app, seed_league
+
+# Day 1 沿用 DAY_GAMES (含 1 場過渡聯賽)；Day 2 全為例行賽
+DAY2_GAMES = [(1, 0, 1), (3, 2, 1), (5, 4, 1)]
+
+
+def snapshot(season_id):
+    cols = ('team_id', 'league_id', 'wins', 'losses', 'home_games', 'away_games',
+            'points_for', 'points_against', 'streak')
+    rows = SeasonStanding.query.filter_by(season_id=season_id).order_by(SeasonStanding.team_id).all()
+    return [tuple(getattr(r, c) for c in cols) for r in rows]
+
+
+def play_two_days():
+    """執行 Day 1、Day 2，回傳 (season, teams, Day 2 寫入的 SQL)"""
+    season, teams = seed_league()
+    LeagueService.process_match_execution_1900()
+
+    season.current_day = 2
+    for h, a, game_type in DAY2_GAMES:
+        db.session.add(Schedule(season_id=season.id, day=2, game_type=game_type,
+                                home_team_id=teams[h].id, away_team_id=teams[a].id, status='PUBLISHED'))
+    db.session.commit()
+    with QueryCounter(db.engine) as qc:
+        LeagueService.process_match_execution_1900()
+    return season, teams, qc.statements
+
+
+def test_incremental_standings_match_rebuild():
+    flask_app = make_app()
+    with flask_app.app_context(), league_settings(1):
+        season, teams, _ = play_two_days()
+        incremental = snapshot(season.id)
+
+        # 以比賽紀錄逐隊核對 (只計例行賽)
+        games = (db.session.query(Schedule, Match).join(Match, Schedule.match_id == Match.id)
+                 .filter(Schedule.game_type == 1).order_by(Schedule.day).all())
+        by_team = {row[0]: row for row in incremental}
+        for t in teams:
+            played = [(g, m) for g, m in games if t.id in (g.home_team_id, g.away_team_id)]
+            pf = sum(m.home_score if g.home_team_id == t.id else m.away_score for g, m in played)
+            pa = sum(m.away_score if g.home_team_id == t.id else m.home_score for g, m in played)
+            won = [(m.home_score > m.away_score) == (g.home_team_id == t.id) for g, m in played]
+            row = by_team[t.id]
+            assert row[2:8] == (sum(won), len(won) - sum(won),
+                                sum(g.home_team_id == t.id for g, _ in played),
+                                sum(g.away_team_id == t.id for g, _ in played), pf, pa)
+            assert abs(row[8]) >= 1 and (row[8] > 0) == won[-1]
+            assert (t.season_wins, t.season_losses) == (row[2], row[3])
+        # Team4 / Team5 的 Day 1 為過渡聯賽，只計 Day 2 一場
+        assert [by_team[t.id][2] + by_team[t.id][3] for t in teams] == [2, 2, 2, 2, 1, 1]
+
+        # 弄亂後重建，結果與增量一致
+        SeasonStanding.query.filter_by(season_id=season.id).update({'wins': 99, 'streak': 0})
+        teams[0].season_wins = 99
+        assert StandingsService.rebuild(season.id) == len(teams)
+        db.session.commit()
+        assert snapshot(season.id) == incremental
+        assert teams[0].season_wins == by_team[teams[0].id][2]
+        db.session.remove()
+
+
+def test_write_stage_does_not_count_matches():
+    flask_app = make_app()
+    with flask_app.app_context(), league_settings(1):
+        _, _, statements = play_two_days()
+        assert not [sql for sql in statements if 'count(' in sql.lower()]
+        assert any(sql.lstrip().upper().startswith('UPDATE SEASON_STANDINGS') for sql in statements)
+        db.session.remove()
+
+
+def test_records_before_day():
+    flask_app = make_app()
+    with flask_app.app_context(), league_settings(1):
+        season, teams = seed_league()
+        LeagueService.process_match_execution_1900()
+        ids = [t.id for t in teams]
+        after_day1 = {t.id: (t.season_wins, t.season_losses) for t in teams}
+
+        season.current_day = 2
+        for h, a, game_type in DAY2_GAMES:
+            db.session.add(Schedule(season_id=season.id, day=2, game_type=game_type,
+                                    home_team_id=teams[h].id, away_team_id=teams[a].id, status='PUBLISHED'))
+        db.session.commit()
+        LeagueService.process_match_execution_1900()
+
+        assert StandingsService.records_before_day(season.id, 1, ids) == {t: (0, 0) for t in ids}
+        assert StandingsService.records_before_day(season.id, 2, ids) == after_day1
+        assert StandingsService.records_before_day(season.id, 3, ids) == {
+            t.id: (t.season_wins, t.season_losses) for t in teams}
+        db.session.remove()
+
+
+def test_ranking_order():
+    flask_app = make_app()
+    with flask_app.app_context(), league_settings(1):
+        season, teams, _ = play_two_days()
+        ranked = StandingsService.ranked(season.id, None)
+        reputation = {t.id: t.reputation for t in teams}
+        keys = [(-s.wins, -reputation[s.team_id], s.team_id) for s in ranked]
+        assert keys == sorted(keys) and len(ranked) == len(teams)
+        for i, s in enumerate(ranked):
+            assert StandingsService.rank_of(s) == (i + 1, len(teams))
+        db.session.remove()
+
+
+def test_transfer_on_takeover():
+    flask_app = make_app()
+    with flask_app.app_context(), league_settings(1):
+        season, teams, _ = play_two_days()
+        bot, newcomer = teams[0], teams[4]
+        before = next(r for r in snapshot(season.id) if r[0] == bot.id)
+        # 接手球隊原有的戰績列被取代
+        StandingsService.transfer(season.id, bot, newcomer)
+        db.session.commit()
+        rows = {r[0]: r for r in snapshot(season.id)}
+        assert bot.id not in rows
+        assert rows[newcomer.id][1:] == before[1:]
+        assert (newcomer.season_wins, bot.season_wins, bot.season_losses) == (before[2], 0, 0)
+        db.session.remove()
+
+
+if __name__ == "__main__":
+    for fn in (test_incremental_standings_match_rebuild, test_write_stage_does_not_count_matches,
+               test_records_before_day, test_ranking_order, test_transfer_on_takeover):
+        fn()
+        print(f"✅ {fn.__name__}")
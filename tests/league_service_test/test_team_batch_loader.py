@@ -0,0 +1,85 @@
+# tests/league_service_test/test_team_batch_loader.py
+# -*- coding: utf-8 -*-
+"""
+批次載入器測試 (TeamBatchLoader)
+
+驗證:
+  1. 載入任意數量球隊的球隊 / 戰術 / 球員 / 合約固定為 4 次查詢，轉換時不再查詢
+  2. 轉換結果 (登錄名單、角色、能力值) 與逐隊 convert_team 相同
+  3. 沒有戰術或球員的球隊可正常處理
+
+執行方式:
+  python -m pytest -q tests/league_service_test/test_team_batch_loader.py
+  python tests/league_service_test/test_team_batch_loader.py
+"""
+
+import os
+import sys
+
+PROJECT_ROOT = os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+sys.path.insert(0, PROJECT_ROOT)
+
+from app import db
+from app.models.tactics import TeamTactics
+from app.models.team import Team
+from app.services.match_engine.service import DBToEngineAdapter, TeamBatchLoader
+from app.services.match_engine.structures import PLAYER_TEMPLATE_FIELDS
+from app.utils.query_counter import QueryCounter
+
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+from test_match_execution import make_app, seed_league
+
+LOAD_QUERIES = 4
+
+
+def describe(team):
+    return [(p.id, p.role, p.height, tuple(getattr(p, f) for f in PLAYER_TEMPLATE_FIELDS)) for p in team.roster]
+
+
+def test_batch_load_uses_constant_queries():
+    for n_teams in (4, 12):
+        flask_app = make_app()
+        with flask_app.app_context():
+            _, teams = seed_league(n_teams=n_teams, games=[])
+            ids = [t.id for t in teams]
+            db.session.expire_all()
+
+            with QueryCounter(db.engine) as qc:
+                batch = TeamBatchLoader.load(ids + ids[:2])
+            assert qc.count == LOAD_QUERIES, qc.statements
+
+            with QueryCounter(db.engine) as qc:
+                converted = {tid: batch.convert_team(tid) for tid in ids}
+            assert qc.count == 0, qc.statements
+
+            # 逐隊轉換 (舊流程) 的結果相同，但查詢數隨球隊數與球員數成長
+            db.session.expire_all()
+            with QueryCounter(db.engine) as legacy:
+                for tid in ids:
+                    team = db.session.get(Team, tid)
+                    tactics = TeamTactics.query.filter_by(team_id=tid).first()
+                    assert describe(DBToEngineAdapter.convert_team(team, tactics=tactics)) == describe(converted[tid])
+            assert legacy.count > n_teams * 15
+            assert all(len(t.roster) == 14 for t in converted.values())
+            db.session.remove()
+
+
+def test_batch_load_handles_missing_tactics():
+    flask_app = make_app()
+    with flask_app.app_context():
+        _, teams = seed_league(n_teams=2, games=[])
+        TeamTactics.query.filter_by(team_id=teams[0].id).delete()
+        db.session.commit()
+
+        batch = TeamBatchLoader.load([teams[0].id, teams[1].id, 9999])
+        assert 9999 not in batch.teams
+        assert len(batch.convert_team(teams[0].id).roster) == 15
+        assert len(batch.convert_team(teams[1].id).roster) == 14
+        assert TeamBatchLoader.load([]).teams == {}
+        db.session.remove()
+
+
+if __name__ == "__main__":
+    for fn in (test_batch_load_uses_constant_queries, test_batch_load_handles_missing_tactics):
+        fn()
+        print(f"✅ {fn.__name__}")
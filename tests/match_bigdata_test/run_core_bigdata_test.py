@@ -25,7 +25,6 @@ sys.path.insert(0, PROJECT_ROOT)
 
 import argparse
 import datetime as _dt
-import gc
 import time
 import subprocess
 from itertools import combinations
@@ -39,7 +38,8 @@ from tqdm import tqdm
 # 引用既有引擎程式碼
 from app.services.match_engine.core import MatchEngine
 from app.services.match_engine.structures import EngineTeam, EnginePlayer
-from app.services.match_engine.utils.rng import rng
+from app.services.match_engine.utils.profiler import EngineProfiler
+from app.services.match_engine.utils.rng import RNG
 
 
 DEFAULT_PARQUET = "tests/match_bigdata_test/team/team_players.parquet"
@@ -93,6 +93,7 @@ def build_engine_player(row: Dict[str, Any]) -> EnginePlayer:
     return EnginePlayer(
         id=str(row["player_id"]),
         name=str(row["name"]),
+        nationality=str(row.get("nationality", "")),
         position=str(row["position"]),
         role=str(row.get("role", row.get("contract_role", "Bench"))),
         grade=str(row.get("grade", "G")),
@@ -145,23 +146,6 @@ def load_teams(parquet_rel: str) -> Dict[str, EngineTeam]:
     return teams
 
 
-def clone_team(src: EngineTeam) -> EngineTeam:
-    roster = []
-    for p in src.roster:
-        row = {
-            "player_id": p.id,
-            "name": p.name,
-            "position": p.position,
-            "role": p.role,
-            "grade": p.grade,
-            "height": p.height,
-        }
-        for k in STAT_20:
-            row[k] = getattr(p, k)
-        roster.append(build_engine_player(row))
-    return EngineTeam(id=src.id, name=src.name, roster=roster)
-
-
 def write_parquet(df: pd.DataFrame, path: str):
     os.makedirs(os.path.dirname(path), exist_ok=True)
     df.to_parquet(path, index=False)
@@ -767,13 +751,11 @@ def main():
     parser.add_argument("--parquet", type=str, default=DEFAULT_PARQUET)
     parser.add_argument("--cycles", type=int, default=500, help="每 cycle 6 場；總場數=cycles*6")
     parser.add_argument("--batch-size", type=int, default=50)
-    parser.add_argument("--seed", type=int, default=None)
+    parser.add_argument("--seed", type=int, default=None, help="固定後每場比賽由 (seed, 場次編號) 衍生獨立亂數串流，可單場重播")
     parser.add_argument("--output-root", type=str, default=DEFAULT_OUTPUT_ROOT)
+    parser.add_argument("--profile", action="store_true", help="記錄引擎各階段耗時與事件數，結束時輸出表格 (profile.txt)")
     args = parser.parse_args()
 
-    if args.seed is not None:
-        rng.seed(args.seed)
-
     run_id = now_id()
     output_dir = os.path.join(PROJECT_ROOT, args.output_root, run_id)
     os.makedirs(output_dir, exist_ok=True)
@@ -804,6 +786,8 @@ def main():
     mf, tf, bf, pf = [], [], [], []
     batch_idx = 0
     game_idx = 0
+    engine = None # [Optimization] 單一引擎物件，每場以 reset() 重新準備
+    profiler = EngineProfiler() if args.profile else None # [New] 跨場次累計的分段計時
 
     def flush():
         nonlocal batch_idx, matches_rows, team_game_rows, box_rows, poss_rows
@@ -840,9 +824,7 @@ def main():
             poss_rows = []
 
             batch_idx += 1
-            
-            # [Forensic] Aggressive GC to prevent OOM
-            gc.collect()
+            # [Optimization] 球隊/球員/引擎物件跨場重複使用 (reset_for_game)，不再每批強制 gc.collect()
             
         except Exception as e:
             # [Forensic] Flush Isolation - Log and discard batch, do NOT crash main loop
@@ -872,10 +854,16 @@ def main():
                 
                 while not success and retries < MAX_RETRIES_PER_GAME:
                     try:
-                        team_a = clone_team(teams_src[a_id])
-                        team_b = clone_team(teams_src[b_id])
-
-                        engine = MatchEngine(team_a, team_b, config, game_id=game_id)
+                        # [Optimization] 直接重複使用已載入的球隊物件，由 MatchEngine 於賽前就地還原 (reset_for_game)
+                        team_a = teams_src[a_id]
+                        team_b = teams_src[b_id]
+
+                        # 場次編號 (而非含時間戳的 game_id) 作為串流鍵值，同一 seed 的每場結果可跨次重現
+                        game_rng = RNG.for_game(args.seed, game_idx) if args.seed is not None else None
+                        if engine is None:
+                            engine = MatchEngine(team_a, team_b, config, game_id=game_id, log_level="off", rng=game_rng, profiler=profiler) # 大數據模擬不需轉播紀錄
+                        else:
+                            engine.reset(team_a, team_b, game_id=game_id, rng=game_rng)
                         result = engine.simulate()
                         
                         success = True
@@ -1051,6 +1039,15 @@ def main():
     else:
         print("\n[Warning] No data generated. Check error logs.")
 
+    # [New] 引擎分段計時報表
+    if profiler is not None:
+        table = profiler.format_table()
+        profile_path = os.path.join(output_dir, "profile.txt")
+        with open(profile_path, "w", encoding="utf-8") as f:
+            f.write(table + "\n")
+        print(f"\n{table}")
+        print(f"profile: {profile_path}")
+
 
 if __name__ == "__main__":
     try:
@@ -0,0 +1,94 @@
+# tests/match_engine_test/bench_rng.py
+# -*- coding: utf-8 -*-
+"""
+亂數層微基準測試 (RNG Microbenchmark)
+
+比較各隨機數來源在引擎熱迴圈呼叫型態下的每秒呼叫次數:
+  - shared : 全域共用 rng (包裝 random 模組，舊版行為)
+  - stream : RNG.for_game(run_seed, game_id) (獨立 Mersenne Twister 串流)
+  - philox : numpy Philox 逐次呼叫 (區塊預抽前)
+  - block  : BlockRNG.for_game(run_seed, game_id) (numpy Philox 區塊預抽後)
+並以整場比賽 (score_only) 量測 ms/game，同時確認單場重播逐位元一致。
+
+執行方式 (非 pytest 測試):
+  python tests/match_engine_test/bench_rng.py [--calls 2000000] [--games 200]
+"""
+
+import argparse
+import os
+import sys
+import time
+
+import numpy as np
+
+PROJECT_ROOT = os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+sys.path.insert(0, PROJECT_ROOT)
+
+from app.services.match_engine.core import MatchEngine, MODE_SCORE_ONLY
+from app.services.match_engine.utils.rng import BlockRNG, RNG, derive_seed, rng as shared_rng
+
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+from test_score_only_mode import load_config, make_team
+
+RUN_SEED = 20260301
+ITEMS = list(range(5))
+
+
+def make_sources():
+    return {
+        "shared": lambda game_id: shared_rng,
+        "stream": lambda game_id: RNG.for_game(RUN_SEED, game_id),
+        "philox": lambda game_id: RNG(np.random.Generator(np.random.Philox(key=derive_seed(RUN_SEED, game_id)))),
+        "block": lambda game_id: BlockRNG.for_game(RUN_SEED, game_id),
+    }
+
+
+def bench_calls(r, calls: int):
+    """回傳 {方法: 每秒呼叫次數}"""
+    decision, get_float, choice = r.decision, r.get_float, r.choice
+    out = {}
+    t0 = time.perf_counter()
+    for _ in range(calls): decision(0.5)
+    out["decision"] = calls / (time.perf_counter() - t0)
+    t0 = time.perf_counter()
+    for _ in range(calls): get_float(1.0, 8.0)
+    out["get_float"] = calls / (time.perf_counter() - t0)
+    t0 = time.perf_counter()
+    for _ in range(calls): choice(ITEMS)
+    out["choice"] = calls / (time.perf_counter() - t0)
+    return out
+
+
+def play(config, game_no: int, r):
+    home, away = make_team("H", game_no), make_team("A", 10_000 + game_no)
+    result = MatchEngine(home, away, config, game_id=f"G{game_no}", mode=MODE_SCORE_ONLY, rng=r).simulate()
+    return result.home_score, result.away_score, result.home_possessions, result.away_possessions
+
+
+def bench_games(config, factory, games: int):
+    t0 = time.perf_counter()
+    rows = [play(config, g, factory(f"G{g}")) for g in range(games)]
+    return (time.perf_counter() - t0) * 1000.0 / games, rows
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--calls", type=int, default=2_000_000)
+    parser.add_argument("--games", type=int, default=200)
+    args = parser.parse_args()
+    config = load_config()
+
+    print(f"🎲 RNG 微基準: {args.calls:,} calls / {args.games} games (score_only)")
+    print(f"{'source':<8} {'decision':>12} {'get_float':>12} {'choice':>12} {'ms/game':>9}  replay")
+    for name, factory in make_sources().items():
+        calls = bench_calls(factory("BENCH"), args.calls)
+        ms, rows = bench_games(config, factory, args.games)
+        # 單場重播: 任取一場以新的串流重跑，需與原結果一致 (shared 無法單場重播)
+        g = args.games // 2
+        replay = "-" if name == "shared" else ("✅" if play(config, g, factory(f"G{g}")) == rows[g] else "❌")
+        print(f"{name:<8} {calls['decision'] / 1e6:>10.2f}M/s {calls['get_float'] / 1e6:>10.2f}M/s "
+              f"{calls['choice'] / 1e6:>10.2f}M/s {ms:>9.2f}  {replay}")
+
+
+if __name__ == "__main__":
+    main()
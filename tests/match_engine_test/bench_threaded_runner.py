@@ -0,0 +1,86 @@
+# tests/match_engine_test/bench_threaded_runner.py
+# -*- coding: utf-8 -*-
+"""
+平行模擬吞吐量基準測試 (Thread Pool vs Process Pool)
+
+比較 score_only 模式下每秒可模擬的場數:
+  - serial  : 單執行緒 (simulate_games_threaded, workers=1)
+  - threads : 執行緒池 (simulate_games_threaded)，共用 Config / EnginePlan / 球隊範本
+  - process : 常駐進程池 (SimulationPool + run_matchup_chunk)，球隊與 Config 逐任務 pickle
+並確認三者逐場結果一致。
+一般 (有 GIL) 版本下執行緒池不會比單執行緒快；請以 free-threaded 版 (python3.13t) 執行以比較真正的平行吞吐量。
+
+執行方式 (非 pytest 測試):
+  python tests/match_engine_test/bench_threaded_runner.py [--games 400] [--workers 4]
+"""
+
+import argparse
+import copy
+import os
+import sys
+import time
+
+PROJECT_ROOT = os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+sys.path.insert(0, PROJECT_ROOT)
+
+from app.services.match_engine.threaded import gil_enabled, simulate_games_threaded
+from app.services.simulation_pool import SimulationPool, run_matchup_chunk
+
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+from test_score_only_mode import load_config, make_team
+
+RUN_SEED = 20260301
+CHUNK = 25
+
+
+def run_threads(home, away, config, games, workers):
+    results = simulate_games_threaded([(home, away)] * games, config, RUN_SEED, workers=workers, chunk_size=CHUNK)
+    return [(r.home_score - r.away_score, r.is_ot) for r in results]
+
+
+def run_process(home, away, config, games, workers):
+    chunks = [range(i, min(i + CHUNK, games)) for i in range(0, games, CHUNK)]
+    pool = SimulationPool.get(workers)
+    if pool is None:
+        # workers <= 1 (或單核心主機) 時不建立進程池，與 OddsService._simulate 相同改於目前進程執行 (使用球隊副本)
+        home, away = copy.deepcopy(home), copy.deepcopy(away)
+        return [row for c in chunks for row in run_matchup_chunk(home, away, config, RUN_SEED, c)]
+    futures = [pool.submit(run_matchup_chunk, home, away, config, RUN_SEED, c) for c in chunks]
+    return [row for f in futures for row in f.result()]
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--games", type=int, default=400)
+    parser.add_argument("--workers", type=int, default=os.cpu_count() or 4)
+    args = parser.parse_args()
+
+    config = load_config()
+    home, away = make_team("H", 1), make_team("A", 2)
+    print(f"🐍 Python {sys.version.split()[0]} | GIL: {'enabled' if gil_enabled() else 'disabled (free-threaded)'}"
+          f" | games={args.games} workers={args.workers}")
+
+    # 暖機: 編譯 EnginePlan、啟動進程池
+    run_threads(home, away, config, CHUNK, 1)
+    run_process(home, away, config, CHUNK * args.workers, args.workers)
+
+    runners = {
+        "serial": lambda: run_threads(home, away, config, args.games, 1),
+        "threads": lambda: run_threads(home, away, config, args.games, args.workers),
+        "process": lambda: run_process(home, away, config, args.games, args.workers),
+    }
+    reference = None
+    for name, fn in runners.items():
+        t0 = time.perf_counter()
+        rows = fn()
+        elapsed = time.perf_counter() - t0
+        if reference is None:
+            reference = rows
+        status = "✅" if rows == reference else "❌ 結果不一致"
+        print(f"   {name:<8} {args.games / elapsed:8.1f} games/s ({elapsed:6.2f}s) {status}")
+
+    SimulationPool.shutdown()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,169 @@
+# tests/match_engine_test/test_attribution_tables.py
+# -*- coding: utf-8 -*-
+"""
+數據歸屬累積權重表測試 (Attribution Cumulative Tables)
+
+AttributionSystem.determine_* 改為讀取依 lineup_epoch 快取的累積權重表 + bisect，
+此測試以原本「每次重算權重 + 排序 + 線性累積」的參考實作逐次比對:
+  1. 相同亂數下抽選結果完全一致 (含 2分/3分、攻/守籃板、各出手者的助攻表)
+  2. 換人或體力係數變動 (lineup_epoch + 1) 後表格重建，結果仍一致
+  3. 權重總和為 0 時的固定結果與亂數消耗不變
+
+執行方式:
+  python -m pytest -q tests/match_engine_test/test_attribution_tables.py
+  python tests/match_engine_test/test_attribution_tables.py
+"""
+
+import os
+import sys
+
+PROJECT_ROOT = os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+sys.path.insert(0, PROJECT_ROOT)
+
+from app.services.match_engine.core import MatchEngine
+from app.services.match_engine.systems.attribution import AttributionSystem
+from app.services.match_engine.utils.calculator import Calculator
+from app.services.match_engine.utils.rng import RNG
+
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+from test_score_only_mode import load_config, make_team
+
+DRAWS = 300
+
+
+# =========================================================================
+# 參考實作 (快取前的逐次計算版本)
+# =========================================================================
+
+def _walk(weights, total_weight, r, zero_pick):
+    if total_weight == 0: return zero_pick
+    current_prob = 0.0
+    for p, w in weights:
+        current_prob += w / total_weight
+        if r <= current_prob: return p
+    return weights[-1][0]
+
+
+def ref_shooter(team, is_3pt, plan, rng):
+    ap = plan.attribution
+    weights, total = [], 0.0
+    for p in team.on_court:
+        w = Calculator.formula_sum(p, ap.shot_base)
+        if is_3pt: w += Calculator.formula_sum(p, ap.shot_3pt_bonus)
+        if p.role == 'Star': w *= ap.shot_star_bonus
+        elif p.role == 'Starter': w *= ap.shot_starter_bonus
+        weights.append((p, w))
+        total += w
+    weights.sort(key=lambda x: x[1])
+    return _walk(weights, total, rng.get_float(0.0, 1.0), team.on_court[0])
+
+
+def ref_rebounder(off_team, def_team, is_defensive, plan, rng):
+    ap = plan.attribution
+    team = def_team if is_defensive else off_team
+    iq = ap.rebound_iq_def if is_defensive else ap.rebound_iq_off
+    weights, total = [], 0.0
+    for p in team.on_court:
+        w = Calculator.formula_sum(p, ap.rebound_base)
+        w += Calculator.formula_sum(p, ap.rebound_bonus) * ap.rebound_height_weight
+        w += p.height * ap.rebound_height_weight
+        w += Calculator.formula_sum(p, iq)
+        weights.append((p, w))
+        total += w
+    weights.sort(key=lambda x: x[1])
+    return _walk(weights, total, rng.get_float(0.0, 1.0), team.on_court[0])
+
+
+def ref_assist(off_team, shooter, plan, rng):
+    ap = plan.attribution
+    candidates = [p for p in off_team.on_court if p.id != shooter.id]
+    if not candidates: return None
+    weights = [(p, Calculator.formula_sum(p, ap.assist_weight)) for p in candidates]
+    total = 0.0
+    for _, w in weights: total += w
+    weights.sort(key=lambda x: ap.assist_position_order.get(x[0].position, -1))
+    return _walk(weights, total, rng.get_float(0.0, 1.0), candidates[-1])
+
+
+def ref_stealer(def_team, plan, rng):
+    weights, total = [], 0.0
+    for p in def_team.on_court:
+        w = Calculator.formula_sum(p, plan.attribution.steal_weight)
+        weights.append((p, w))
+        total += w
+    r = rng.get_float(0.0, 1.0) * total
+    upto = 0.0
+    for p, w in weights:
+        if upto + w >= r: return p
+        upto += w
+    return def_team.on_court[-1]
+
+
+# =========================================================================
+# 測試
+# =========================================================================
+
+def make_engine(game_no: int = 0):
+    home, away = make_team("H", game_no), make_team("A", 10_000 + game_no)
+    return MatchEngine(home, away, load_config(), game_id=f"G{game_no}")
+
+
+def assert_same_draws(engine, seed):
+    home, away, plan = engine.home_team, engine.away_team, engine.plan
+    fast, ref = RNG.from_seed(seed), RNG.from_seed(seed)
+    for i in range(DRAWS):
+        for is_3pt in (False, True):
+            assert AttributionSystem.determine_shooter(home, is_3pt, plan, fast) is ref_shooter(home, is_3pt, plan, ref)
+        for is_def in (False, True):
+            assert (AttributionSystem.determine_rebounder(home, away, is_def, plan, fast)
+                    is ref_rebounder(home, away, is_def, plan, ref))
+        shooter = home.on_court[i % len(home.on_court)]
+        assert AttributionSystem.determine_assist_provider(home, shooter, plan, fast) is ref_assist(home, shooter, plan, ref)
+        assert AttributionSystem.determine_stealer(away, plan, fast) is ref_stealer(away, plan, ref)
+    # 亂數消耗量一致
+    assert fast.get_float() == ref.get_float()
+
+
+def test_tables_match_reference_walk():
+    engine = make_engine()
+    assert_same_draws(engine, 1)
+    assert engine.home_team.pick_epoch == engine.home_team.lineup_epoch
+
+
+def test_tables_rebuild_on_lineup_and_stamina_change():
+    engine = make_engine(1)
+    home, away = engine.home_team, engine.away_team
+    assert_same_draws(engine, 2)
+
+    # 換人: 場上第一位與板凳第一位交換
+    bench = [p for p in home.roster if p not in home.on_court]
+    bench[0].position = home.on_court[0].position
+    home.on_court[0] = bench[0]
+    home.lineup_epoch += 1
+    assert_same_draws(engine, 3)
+
+    # 體力係數變動
+    for k, p in enumerate(away.on_court):
+        p.stamina_coeff = 0.5 + 0.1 * k
+    away.lineup_epoch += 1
+    assert_same_draws(engine, 4)
+
+
+def test_zero_weight_keeps_fixed_pick():
+    engine = make_engine(2)
+    for p in engine.away_team.on_court:
+        p.formula_raw = [0.0] * len(p.formula_raw)
+        p.formula_height = [0.0] * len(p.formula_height)
+    engine.away_team.lineup_epoch += 1
+    plan = engine.plan
+    fast, ref = RNG.from_seed(5), RNG.from_seed(5)
+    for _ in range(20):
+        assert AttributionSystem.determine_stealer(engine.away_team, plan, fast) is ref_stealer(engine.away_team, plan, ref)
+    assert fast.get_float() == ref.get_float()
+
+
+if __name__ == "__main__":
+    for fn in (test_tables_match_reference_walk, test_tables_rebuild_on_lineup_and_stamina_change,
+               test_zero_weight_keeps_fixed_pick):
+        fn()
+        print(f"✅ {fn.__name__}")
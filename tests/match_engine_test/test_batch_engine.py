@@ -0,0 +1,88 @@
+# tests/match_engine_test/test_batch_engine.py
+# -*- coding: utf-8 -*-
+"""
+批次引擎統計等價性測試 (BatchMatchEngine vs MatchEngine)
+
+BatchMatchEngine 以 NumPy 同步模擬多場比賽，隨機序列與 MatchEngine 不同，
+因此比照 score_only 測試，以大量場次比較比分、回合數與延長賽比例的分佈:
+  1. 平均值差異 < 4 個標準誤
+  2. 標準差比值介於 0.8 ~ 1.25
+  3. 雙樣本 KS 統計量 < 臨界值 (alpha = 0.001)
+另驗證相同 seed 結果可重現、分批 (chunk) 不影響結果的正確性。
+
+執行方式:
+  python -m pytest -q tests/match_engine_test/test_batch_engine.py
+  python tests/match_engine_test/test_batch_engine.py
+"""
+
+import os
+import sys
+import time
+
+PROJECT_ROOT = os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+sys.path.insert(0, PROJECT_ROOT)
+
+import numpy as np
+
+from app.services.match_engine.batch import BatchMatchEngine
+from app.services.match_engine.core import MatchEngine, MODE_SCORE_ONLY
+from app.services.match_engine.utils.rng import rng
+
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+from test_score_only_mode import N_GAMES, load_config, make_team, assert_equivalent
+
+
+def make_games(n: int):
+    return [(make_team("H", g), make_team("A", 10_000 + g)) for g in range(n)]
+
+
+def run_single(seed: int):
+    config = load_config()
+    rng.seed(seed)
+    rows = []
+    for g, (home, away) in enumerate(make_games(N_GAMES)):
+        r = MatchEngine(home, away, config, game_id=f"SINGLE_{g}", mode=MODE_SCORE_ONLY).simulate()
+        rows.append((r.home_score, r.away_score, r.home_possessions + r.away_possessions, r.is_ot))
+    return rows
+
+
+def run_batch(seed: int, chunk_size: int = 2000):
+    result = BatchMatchEngine(make_games(N_GAMES), load_config(), seed=seed, chunk_size=chunk_size).simulate()
+    poss = result.home_possessions + result.away_possessions
+    return [(int(h), int(a), int(p), bool(o)) for h, a, p, o in
+            zip(result.home_score, result.away_score, poss, result.is_ot)]
+
+
+def test_batch_matches_single_engine():
+    single = run_single(seed=2024)
+    batch = run_batch(seed=2025)
+
+    assert_equivalent("home", [r[0] for r in single], [r[0] for r in batch])
+    assert_equivalent("away", [r[1] for r in single], [r[1] for r in batch])
+    assert_equivalent("total", [r[0] + r[1] for r in single], [r[0] + r[1] for r in batch])
+    assert_equivalent("margin", [r[0] - r[1] for r in single], [r[0] - r[1] for r in batch])
+    assert_equivalent("possessions", [r[2] for r in single], [r[2] for r in batch])
+
+    ot_single = sum(r[3] for r in single) / N_GAMES
+    ot_batch = sum(r[3] for r in batch) / N_GAMES
+    assert abs(ot_single - ot_batch) < 0.08, f"OT rate {ot_single:.3f} vs {ot_batch:.3f}"
+
+
+def test_batch_is_reproducible():
+    a = BatchMatchEngine(make_games(20), load_config(), seed=7, chunk_size=8).simulate()
+    b = BatchMatchEngine(make_games(20), load_config(), seed=7, chunk_size=8).simulate()
+    assert np.array_equal(a.home_score, b.home_score) and np.array_equal(a.away_score, b.away_score)
+
+    results = a.to_match_results(["H"] * 20, ["A"] * 20)
+    assert len(results) == len(a) == 20
+    for r in results:
+        assert r.home_score != r.away_score
+        assert r.total_quarters >= 4 and r.is_ot == (r.total_quarters > 4)
+        assert r.pace > 0 and r.pbp_log == []
+
+
+if __name__ == "__main__":
+    for fn in (test_batch_is_reproducible, test_batch_matches_single_engine):
+        t0 = time.time()
+        fn()
+        print(f"✅ {fn.__name__} ({time.time() - t0:.1f}s)")
@@ -0,0 +1,115 @@
+# tests/match_engine_test/test_engine_profiler.py
+# -*- coding: utf-8 -*-
+"""
+引擎分段計時測試 (EngineProfiler)
+
+驗證:
+  1. 啟用 profiler 不影響比賽結果 (與未啟用時逐場一致)；未啟用時引擎方法未被替換
+  2. 各階段呼叫次數與事件數和 MatchResult 一致 (跨 reset 累計)
+  3. merge() 與 pickle (跨進程回傳) 後數值正確
+  4. 以 iter_events() 串流或由快照還原 (restore) 的比賽同樣累計場數與事件數
+
+執行方式:
+  python -m pytest -q tests/match_engine_test/test_engine_profiler.py
+  python tests/match_engine_test/test_engine_profiler.py
+"""
+
+import os
+import pickle
+import sys
+
+PROJECT_ROOT = os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+sys.path.insert(0, PROJECT_ROOT)
+
+from app.services.match_engine.core import MatchEngine
+from app.services.match_engine.structures import EVENT_PERIOD_END
+from app.services.match_engine.utils.profiler import EngineProfiler, PHASES
+from app.services.match_engine.utils.rng import RNG
+
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+from test_score_only_mode import load_config, make_team
+
+RUN_SEED = 20260301
+GAMES = 6
+
+
+def run_games(profiler=None, log_level="text"):
+    config = load_config()
+    home, away = make_team("H", 1), make_team("A", 2)
+    engine, results = None, []
+    for i in range(GAMES):
+        rng = RNG.for_game(RUN_SEED, i)
+        if engine is None:
+            engine = MatchEngine(home, away, config, game_id=f"G{i}", log_level=log_level, rng=rng, profiler=profiler)
+        else:
+            engine.reset(home, away, game_id=f"G{i}", rng=rng)
+        result = engine.simulate()
+        steals = sum(p.stat_stl for p in home.roster + away.roster)
+        results.append((result.home_score, result.away_score, result.total_quarters,
+                        result.home_possessions + result.away_possessions, steals, tuple(result.pbp_log)))
+    return engine, results
+
+
+def test_profiler_does_not_change_results():
+    plain_engine, plain = run_games()
+    profiler = EngineProfiler()
+    _, profiled = run_games(profiler)
+    assert plain == profiled
+    assert not any(method in vars(plain_engine) for method, _ in PHASES)
+
+    c = profiler.counts
+    assert c['games'] == GAMES
+    assert c['quarters'] == sum(r[2] for r in plain)
+    assert c['ot_periods'] == sum(r[2] - 4 for r in plain)
+    assert c['possessions'] == sum(r[3] for r in plain)
+    assert c['steals'] == sum(r[4] for r in plain)
+
+    calls, times = profiler.calls, profiler.times
+    assert calls['other'] == GAMES and calls['pregame'] == GAMES
+    assert calls['backcourt'] > 0 and calls['shooting'] > 0 and calls['logging'] > 0
+    assert all(ns >= 0 for ns in times.values())
+    assert profiler.total_ns() > 0
+    assert "backcourt" in profiler.format_table()
+
+
+def test_profiler_merge_and_pickle():
+    a, b = EngineProfiler(), EngineProfiler()
+    run_games(a, log_level="off")
+    run_games(b, log_level="off")
+    merged = pickle.loads(pickle.dumps(EngineProfiler().merge(a)))
+    merged.merge(b)
+    assert merged.counts['games'] == 2 * GAMES
+    assert merged.calls['backcourt'] == a.calls['backcourt'] + b.calls['backcourt']
+    assert merged.total_ns() == a.total_ns() + b.total_ns()
+    assert a.calls['logging'] > 0 and a.times['logging'] >= 0
+
+
+def test_profiler_counts_streamed_and_restored_games():
+    config = load_config()
+    simulated, streamed, restored = EngineProfiler(), EngineProfiler(), EngineProfiler()
+    engine = MatchEngine(make_team("H", 3), make_team("A", 4), config, game_id="P0",
+                         rng=RNG.for_game(RUN_SEED, 0), profiler=simulated)
+    expected = engine.simulate()
+
+    engine = MatchEngine(make_team("H", 3), make_team("A", 4), config, game_id="P0",
+                         rng=RNG.for_game(RUN_SEED, 0), profiler=streamed)
+    stream = engine.iter_events()
+    next(e for e in stream if e.kind == EVENT_PERIOD_END and e.quarter == 2)
+    blob = engine.snapshot()
+    final = list(stream)[-1].result
+    assert (final.home_score, final.away_score) == (expected.home_score, expected.away_score)
+    assert streamed.counts == simulated.counts
+    assert streamed.counts['games'] == 1 and streamed.counts['possessions'] > 0
+    assert streamed.calls['backcourt'] == simulated.calls['backcourt']
+
+    resumed = MatchEngine.restore(blob, config, profiler=restored)
+    resumed.simulate()
+    assert restored.counts == simulated.counts
+    assert 0 < restored.calls['backcourt'] < simulated.calls['backcourt']
+
+
+if __name__ == "__main__":
+    for fn in (test_profiler_does_not_change_results, test_profiler_merge_and_pickle,
+               test_profiler_counts_streamed_and_restored_games):
+        fn()
+        print(f"✅ {fn.__name__}")
@@ -0,0 +1,82 @@
+# tests/match_engine_test/test_engine_reset.py
+# -*- coding: utf-8 -*-
+"""
+引擎物件重複使用測試 (Engine / Team Reuse)
+
+驗證 EnginePlayer/EngineTeam.reset_for_game() 與 MatchEngine.reset():
+  1. 同一組球隊物件 + 同一個引擎連續比賽，結果與每場重建物件逐位元一致
+  2. reset_for_game 撤銷身高修正並還原位置、體力與所有統計數據
+  3. 上一場 MatchResult 的回合時間歷史不會被下一場覆寫
+
+執行方式:
+  python -m pytest -q tests/match_engine_test/test_engine_reset.py
+  python tests/match_engine_test/test_engine_reset.py
+"""
+
+import os
+import sys
+
+PROJECT_ROOT = os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+sys.path.insert(0, PROJECT_ROOT)
+
+from app.services.match_engine.core import MatchEngine
+from app.services.match_engine.structures import PLAYER_TEMPLATE_FIELDS
+
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+from test_score_only_mode import load_config, make_team
+
+RUN_SEED = 20260301
+N_GAMES = 6
+
+
+def fingerprint(result, home, away):
+    box = [(p.id, p.position, p.stat_pts, p.stat_reb, p.stat_ast, p.stat_stl, p.fouls, p.stat_plus_minus,
+            repr(p.seconds_played), repr(p.stat_remaining_stamina), p.is_starter, p.is_played)
+           for p in home.roster + away.roster]
+    return (result.home_score, result.away_score, result.total_quarters, repr(result.pace),
+            list(result.home_possession_history), result.pbp_log, box)
+
+
+def test_reused_objects_match_fresh_objects():
+    config = load_config()
+    # 每場重建球隊與引擎 (舊流程)
+    fresh = []
+    for g in range(N_GAMES):
+        home, away = make_team("H", g % 2), make_team("A", 10_000 + g % 3)
+        result = MatchEngine(home, away, config, game_id=f"G{g}", run_seed=RUN_SEED).simulate()
+        fresh.append(fingerprint(result, home, away))
+
+    # 球隊物件池 + 單一引擎 reset
+    homes = [make_team("H", k) for k in range(2)]
+    aways = [make_team("A", 10_000 + k) for k in range(3)]
+    engine = None
+    for g in range(N_GAMES):
+        home, away = homes[g % 2], aways[g % 3]
+        if engine is None:
+            engine = MatchEngine(home, away, config, game_id=f"G{g}", run_seed=RUN_SEED)
+        else:
+            engine.reset(home, away, game_id=f"G{g}", run_seed=RUN_SEED)
+        assert fingerprint(engine.simulate(), home, away) == fresh[g]
+
+
+def test_reset_restores_template():
+    config = load_config()
+    home, away = make_team("H", 7), make_team("A", 8)
+    home.roster[0].height, home.roster[1].height = 165.0, 228.0 # 觸發身高修正
+    original = [[getattr(p, k) for k in PLAYER_TEMPLATE_FIELDS] for p in home.roster]
+
+    result = MatchEngine(home, away, config, game_id="G0", run_seed=RUN_SEED).simulate()
+    history = list(result.home_possession_history)
+    assert [[getattr(p, k) for k in PLAYER_TEMPLATE_FIELDS] for p in home.roster] != original
+
+    home.reset_for_game()
+    assert [[getattr(p, k) for k in PLAYER_TEMPLATE_FIELDS] for p in home.roster] == original
+    assert all(p.stat_pts == 0 and p.fouls == 0 and p.seconds_played == 0.0 and not p.pos_scores for p in home.roster)
+    assert home.score == 0 and not home.on_court and not home.stat_possession_history
+    assert result.home_possession_history == history
+
+
+if __name__ == "__main__":
+    for fn in (test_reused_objects_match_fresh_objects, test_reset_restores_template):
+        fn()
+        print(f"✅ {fn.__name__}")
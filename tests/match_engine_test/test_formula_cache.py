@@ -0,0 +1,158 @@
+# tests/match_engine_test/test_formula_cache.py
+# -*- coding: utf-8 -*-
+"""
+公式總和快取一致性測試 (Formula Cache Parity)
+
+以測試內獨立的舊版逐項走訪 (reference_attr_sum: 每個屬性各自乘上體力係數後累加) 為基準，驗證:
+  1. EnginePlayer.formula_raw / formula_height 快取路徑 (Calculator.formula_sum / team_formula_sum)
+  2. Calculator.get_player_attr_sum (提出體力係數的因式分解版)
+兩者與基準的差異僅為浮點捨入 (math.isclose, rel_tol=1e-15；正負項相消時以各項絕對值總和為誤差尺度)。
+涵蓋:
+  1. EnginePlan 內所有已編譯公式
+  2. Config 原始定義 (含 pool 引用、巢狀 pool 與負號語法)
+  3. 任意體力係數 (含 1.0、min_multiplier 與隨機值)
+
+執行方式:
+  python -m pytest -q tests/match_engine_test/test_formula_cache.py
+  python tests/match_engine_test/test_formula_cache.py
+"""
+
+import math
+import os
+import random
+import sys
+
+PROJECT_ROOT = os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+sys.path.insert(0, PROJECT_ROOT)
+
+import yaml
+
+from app.services.match_engine.core import MatchEngine
+from app.services.match_engine.plan import compile_formula
+from app.services.match_engine.structures import EngineTeam, EnginePlayer
+from app.services.match_engine.utils.calculator import Calculator
+
+STAT_20 = [
+    "ath_stamina", "ath_strength", "ath_speed", "ath_jump",
+    "shot_touch", "shot_release", "talent_offiq", "talent_defiq", "talent_health", "talent_luck",
+    "shot_accuracy", "shot_range", "def_rebound", "def_boxout", "def_contest", "def_disrupt",
+    "off_move", "off_dribble", "off_pass", "off_handle",
+]
+ROLES = ["Star", "Star", "Starter", "Starter", "Starter", "Rotation", "Rotation", "Rotation",
+         "Role", "Role", "Bench", "Bench", "Bench", "Bench", "Bench"]
+COEFFS = [1.0, 0.21, 0.99, 0.5, 0.8333333333333334]
+REL_TOL = 1e-15
+
+
+def load_config():
+    with open(os.path.join(PROJECT_ROOT, "config", "game_config.yaml"), "r", encoding="utf-8") as f:
+        return yaml.safe_load(f)
+
+
+def make_team(tid: str, seed: int) -> EngineTeam:
+    r = random.Random(seed)
+    roster = []
+    for i in range(15):
+        attrs = {k: float(r.randint(1, 99)) for k in STAT_20}
+        roster.append(EnginePlayer(
+            id=f"{tid}_{i}", name=f"{tid}{i}", nationality="zh", position="SF",
+            role=ROLES[i], grade="A", height=float(r.randint(160, 230)), age=r.randint(18, 36),
+            attr_sum=int(sum(attrs.values())), **attrs,
+        ))
+    return EngineTeam(id=tid, name=tid, roster=roster)
+
+
+def build_players(seed: int):
+    """透過 MatchEngine 初始化 (含身高修正與快取建立) 取得測試球員"""
+    config = load_config()
+    home, away = make_team("H", seed), make_team("A", seed + 1)
+    engine = MatchEngine(home, away, config, game_id=f"CACHE_{seed}")
+    return config, engine.plan, home.roster + away.roster
+
+
+def reference_attr_sum(player, attrs, pools=None, magnitude=False):
+    """
+    基準: 舊版 Calculator.get_player_attr_sum 的逐項走訪 (每個非身高屬性各自乘上體力係數)
+    magnitude=True 時回傳各項絕對值的總和 (正負項相消時的捨入誤差尺度)
+    """
+    total = 0.0
+    for attr in attrs:
+        negative = attr.startswith('-')
+        name = attr[1:] if negative else attr
+        if hasattr(player, name):
+            val = getattr(player, name)
+            if name != 'height':
+                val *= player.stamina_coeff
+        elif pools and name in pools:
+            val = reference_attr_sum(player, pools[name], pools, magnitude)
+        else:
+            continue
+        if magnitude:
+            total += abs(val)
+        else:
+            total = total - val if negative else total + val
+    return total
+
+
+def assert_close(actual, expected, scale):
+    # 正負項相消時 (如 '-height') 結果遠小於各項，捨入誤差以各項絕對值總和 (scale) 為尺度
+    assert math.isclose(actual, expected, rel_tol=REL_TOL, abs_tol=REL_TOL * scale), (actual, expected)
+
+
+def config_formula_sources(config):
+    """列出 Config 中的原始公式定義 (未經編譯)"""
+    me = config["match_engine"]
+    pools = me["attr_pools"]
+
+    def resolve(val):
+        return pools.get(val, []) if isinstance(val, str) else val
+
+    sources = [me["positional_scoring"][pos] for pos in ["C", "PF", "SF", "SG", "PG"]]
+    for section in (me["backcourt"], me["backcourt"]["fastbreak"], me["frontcourt"],
+                    me["frontcourt"]["block"], me["frontcourt"]["steal"], me["shooting"],
+                    me["shooting"]["rebound"], me["shooting"]["ft"], me["shooting"]["assist"]):
+        sources.extend(resolve(v) for v in section.get("formulas", {}).values())
+    return sources, pools
+
+
+def test_cache_matches_reference_walk():
+    for seed in range(5):
+        config, plan, players = build_players(seed)
+        sources, pools = config_formula_sources(config)
+        by_terms = {f.terms: f for f in plan.formulas}
+        coeffs = COEFFS + [random.Random(seed).uniform(0.21, 1.0)]
+        for p in players:
+            for coeff in coeffs:
+                p.stamina_coeff = coeff
+                # EnginePlan 已編譯公式: 快取 vs 逐項走訪
+                for formula in plan.formulas:
+                    attrs = [("-" if n else "") + a for a, n, _ in formula.terms]
+                    assert_close(Calculator.formula_sum(p, formula), reference_attr_sum(p, attrs),
+                                 reference_attr_sum(p, attrs, magnitude=True))
+                # Config 原始定義 (含 pool / 巢狀 pool / 負號): 快取與 get_player_attr_sum vs 逐項走訪
+                for attrs in sources:
+                    expected = reference_attr_sum(p, attrs, pools)
+                    scale = reference_attr_sum(p, attrs, pools, magnitude=True)
+                    assert_close(Calculator.get_player_attr_sum(p, attrs, pools), expected, scale)
+                    formula = by_terms.get(compile_formula(attrs, pools).terms)
+                    if formula is None:
+                        continue # Config 中定義但引擎未使用的公式 (如 assist.distribution)
+                    assert_close(Calculator.formula_sum(p, formula), expected, scale)
+
+
+def test_team_sum_matches_player_sums():
+    _, plan, players = build_players(42)
+    five = players[:5]
+    for i, p in enumerate(five):
+        p.stamina_coeff = COEFFS[i]
+    for formula in plan.formulas:
+        attrs = [("-" if n else "") + a for a, n, _ in formula.terms]
+        expected = sum(reference_attr_sum(p, attrs) for p in five)
+        scale = sum(reference_attr_sum(p, attrs, magnitude=True) for p in five)
+        assert_close(Calculator.team_formula_sum(five, formula), expected, scale)
+
+
+if __name__ == "__main__":
+    for fn in (test_cache_matches_reference_walk, test_team_sum_matches_player_sums):
+        fn()
+        print(f"✅ {fn.__name__}")
@@ -0,0 +1,88 @@
+# tests/match_engine_test/test_iter_events.py
+# -*- coding: utf-8 -*-
+"""
+即時事件串流測試 (MatchEngine.iter_events)
+
+驗證:
+  1. 串流跑完的 MatchResult 與 simulate() 逐位元一致 (同一個 run_seed)
+  2. 每個事件附帶的轉播片段串接後等於完整轉播；比分單調遞增、最後一個事件為 final
+  3. 可在回合之間暫停 (部分讀取後比賽狀態停在該回合)
+  4. keep_pbp=False 時轉播緩衝區不累積
+
+執行方式:
+  python -m pytest -q tests/match_engine_test/test_iter_events.py
+  python tests/match_engine_test/test_iter_events.py
+"""
+
+import os
+import sys
+
+PROJECT_ROOT = os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+sys.path.insert(0, PROJECT_ROOT)
+
+from app.services.match_engine.core import MatchEngine
+from app.services.match_engine.structures import EVENT_FINAL, EVENT_PERIOD_END, EVENT_POSSESSION
+from app.services.match_engine.utils.pbp import PbpFormatter
+
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+from test_score_only_mode import load_config, make_team
+
+RUN_SEED = 20260301
+
+
+def make_engine(game_no: int = 0, **kwargs):
+    home, away = make_team("H", game_no), make_team("A", 10_000 + game_no)
+    return MatchEngine(home, away, load_config(), game_id=f"G{game_no}", run_seed=RUN_SEED, **kwargs)
+
+
+def test_stream_matches_simulate():
+    expected = make_engine().simulate()
+    engine = make_engine()
+    events = list(engine.iter_events())
+
+    final = events[-1]
+    assert final.kind == EVENT_FINAL and final.result is not None
+    assert (final.result.home_score, final.result.away_score) == (expected.home_score, expected.away_score)
+    assert final.result.pbp_log == expected.pbp_log
+
+    # 轉播片段串接後即為完整轉播
+    teams = (engine.home_team, engine.away_team)
+    players = engine.home_team.roster + engine.away_team.roster
+    streamed = [PbpFormatter.format_event(ev, teams, players) for e in events for ev in e.pbp]
+    assert streamed == expected.pbp_log
+
+    kinds = [e.kind for e in events]
+    assert kinds.count(EVENT_PERIOD_END) == expected.total_quarters
+    assert kinds.count(EVENT_POSSESSION) > 100
+    scores = [(e.home_score, e.away_score) for e in events]
+    assert all(a[0] <= b[0] and a[1] <= b[1] for a, b in zip(scores, scores[1:]))
+    assert events[0].lineup_changed and all(len(e.home_on_court) == 5 for e in events)
+
+
+def test_stream_can_pause_between_possessions():
+    engine = make_engine(1)
+    stream = engine.iter_events()
+    first = [next(stream) for _ in range(10)]
+    assert all(e.kind == EVENT_POSSESSION for e in first)
+    assert engine.state.game_time_elapsed == first[-1].game_time
+    assert engine.home_team.score == first[-1].home_score
+
+    rest = list(stream)
+    assert rest[-1].result.home_score == rest[-1].home_score
+
+
+def test_stream_without_keeping_pbp():
+    engine = make_engine(2)
+    peak = 0
+    count = 0
+    for e in engine.iter_events(keep_pbp=False):
+        peak = max(peak, len(engine.pbp))
+        count += len(e.pbp)
+    assert count > 100 and peak == 0
+    assert len(engine.pbp) == 0
+
+
+if __name__ == "__main__":
+    for fn in (test_stream_matches_simulate, test_stream_can_pause_between_possessions, test_stream_without_keeping_pbp):
+        fn()
+        print(f"✅ {fn.__name__}")
@@ -0,0 +1,108 @@
+# tests/match_engine_test/test_odds_service.py
+# -*- coding: utf-8 -*-
+"""
+勝率預測服務測試 (OddsService.predict)
+
+驗證:
+  1. 勝率 / 預期分差 / 信賴區間的基本性質
+  2. 重複查詢命中快取；名單角色、能力值或引擎 Config 變動時重新計算
+  3. 結果與 Worker 數量無關 (目前進程 vs 常駐進程池)，且不修改呼叫端的球隊物件
+  4. 以非同步任務 (SimulationJobs, local=True) 執行時結果相同、計入 max_pending；場數受 max_simulations 限制
+
+執行方式:
+  python -m pytest -q tests/match_engine_test/test_odds_service.py
+  python tests/match_engine_test/test_odds_service.py
+"""
+
+import copy
+import os
+import sys
+
+PROJECT_ROOT = os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+sys.path.insert(0, PROJECT_ROOT)
+
+from app.services.odds_service import OddsService
+from app.services.simulation_pool import JOB_DONE, PoolBusyError, SimulationJobs, SimulationPool
+
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+from test_score_only_mode import load_config, make_team
+
+N = 40
+
+
+def make_config(workers: int):
+    config = load_config()
+    config['simulation_pool'] = {'workers': workers}
+    config['odds_service']['chunk_size'] = 15
+    return config
+
+
+def test_odds_summary_and_cache():
+    OddsService.clear_cache()
+    config = make_config(1)
+    home, away = make_team("H", 1), make_team("A", 2)
+    before = [p.shot_accuracy for p in home.roster]
+
+    odds = OddsService.predict(home, away, config, N)
+    assert not odds['cached'] and odds['simulations'] == N
+    assert abs(odds['home_win_prob'] + odds['away_win_prob'] - 1.0) < 1e-12
+    lo, hi = odds['margin_ci']
+    assert lo <= odds['expected_margin'] <= hi
+    assert [p.shot_accuracy for p in home.roster] == before
+
+    assert OddsService.predict(home, away, config, N)['cached']
+
+    # 角色變動 -> 名單組成雜湊不同
+    home.roster[0].role = 'Bench'
+    assert not OddsService.predict(home, away, config, N)['cached']
+    # 能力值變動 -> 屬性雜湊不同
+    away.roster[3].off_pass += 1
+    assert not OddsService.predict(home, away, config, N)['cached']
+    # 引擎 Config 變動 -> Config 版本不同
+    changed = copy.deepcopy(config)
+    changed['match_engine']['general']['quarter_length'] = 600
+    assert not OddsService.predict(home, away, changed, N)['cached']
+
+
+def test_odds_are_worker_independent():
+    try:
+        OddsService.clear_cache()
+        inline = OddsService.predict(make_team("H", 3), make_team("A", 4), make_config(1), N)
+        OddsService.clear_cache()
+        pooled = OddsService.predict(make_team("H", 3), make_team("A", 4), make_config(2), N)
+        assert inline == pooled
+    finally:
+        SimulationPool.shutdown()
+        OddsService.clear_cache()
+
+
+def test_odds_as_simulation_job():
+    config = make_config(2)
+    settings = {'max_pending': 1}
+    home, away = make_team("H", 5), make_team("A", 6)
+    try:
+        OddsService.clear_cache()
+        job = SimulationJobs.submit(OddsService.predict, home, away, config, N, settings=settings, local=True)
+        try:
+            SimulationJobs.submit(OddsService.predict, home, away, config, N + 1, settings=settings, local=True)
+            busy = False
+        except PoolBusyError:
+            busy = True
+        info = SimulationJobs.status(job, wait=60)
+        assert info['status'] == JOB_DONE and not info['result']['cached']
+        # 未完成前第二個任務被拒絕 (預測 N 場不可能瞬間完成)
+        assert busy
+        assert OddsService.lookup(home, away, config, N) == {**info['result'], 'cached': True}
+
+        assert OddsService.simulation_count(config, 10 ** 9) == config['odds_service']['max_simulations']
+        assert OddsService.simulation_count(config, None) == config['odds_service']['simulations']
+    finally:
+        SimulationJobs.clear()
+        SimulationPool.shutdown()
+        OddsService.clear_cache()
+
+
+if __name__ == "__main__":
+    for fn in (test_odds_summary_and_cache, test_odds_are_worker_independent, test_odds_as_simulation_job):
+        fn()
+        print(f"✅ {fn.__name__}")
@@ -0,0 +1,83 @@
+# tests/match_engine_test/test_rng_streams.py
+# -*- coding: utf-8 -*-
+"""
+單場獨立亂數串流測試 (Per-Game RNG Streams)
+
+驗證 MatchEngine(run_seed=...) / MatchEngine(rng=RNG.for_game(...)):
+  1. 相同 (run_seed, game_id) 重播結果逐位元一致
+  2. 結果與模擬順序無關 (等同於任意 Worker 數量的分配方式)
+  3. 不消耗全域 random 的狀態
+  4. 不同 game_id 得到不同串流
+  5. BlockRNG (區塊預抽) 的序列與區塊大小無關，且可單場重播
+
+執行方式:
+  python -m pytest -q tests/match_engine_test/test_rng_streams.py
+  python tests/match_engine_test/test_rng_streams.py
+"""
+
+import os
+import random
+import sys
+
+PROJECT_ROOT = os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+sys.path.insert(0, PROJECT_ROOT)
+
+from app.services.match_engine.core import MatchEngine
+from app.services.match_engine.utils.rng import BlockRNG, RNG, derive_seed
+
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+from test_score_only_mode import load_config, make_team
+
+RUN_SEED = 20260301
+
+
+def play(game_no: int, config, **kwargs):
+    home, away = make_team("H", game_no), make_team("A", 10_000 + game_no)
+    result = MatchEngine(home, away, config, game_id=f"G{game_no}", **kwargs).simulate()
+    box = [(p.id, p.stat_pts, p.stat_reb, p.stat_ast, p.fouls, repr(p.seconds_played)) for p in home.roster + away.roster]
+    return result.home_score, result.away_score, result.total_quarters, result.pbp_log, box
+
+
+def test_replay_is_identical_and_order_independent():
+    config = load_config()
+    forward = {g: play(g, config, run_seed=RUN_SEED) for g in range(6)}
+    backward = {g: play(g, config, run_seed=RUN_SEED) for g in reversed(range(6))}
+    assert forward == backward
+
+    # 單獨重播其中一場 (顯式注入串流)
+    assert play(3, config, rng=RNG.for_game(RUN_SEED, "G3")) == forward[3]
+
+
+def test_streams_do_not_touch_global_random():
+    config = load_config()
+    random.seed(99)
+    expected = [random.random() for _ in range(3)]
+
+    random.seed(99)
+    play(0, config, run_seed=RUN_SEED)
+    assert [random.random() for _ in range(3)] == expected
+
+
+def test_game_ids_get_distinct_streams():
+    assert derive_seed(RUN_SEED, "G1") != derive_seed(RUN_SEED, "G2")
+    assert derive_seed(RUN_SEED, "G1") != derive_seed(RUN_SEED + 1, "G1")
+    a = RNG.for_game(RUN_SEED, "G1")
+    b = RNG.for_game(RUN_SEED, "G2")
+    assert [a.get_float() for _ in range(5)] != [b.get_float() for _ in range(5)]
+
+
+def test_block_rng_is_reproducible():
+    small = BlockRNG(derive_seed(RUN_SEED, "G1"), block_size=7)
+    large = BlockRNG.for_game(RUN_SEED, "G1")
+    assert [small.get_float() for _ in range(100)] == [large.get_float() for _ in range(100)]
+
+    config = load_config()
+    first = play(2, config, rng=BlockRNG.for_game(RUN_SEED, "G2"))
+    assert play(2, config, rng=BlockRNG.for_game(RUN_SEED, "G2")) == first
+
+
+if __name__ == "__main__":
+    for fn in (test_replay_is_identical_and_order_independent, test_streams_do_not_touch_global_random,
+               test_game_ids_get_distinct_streams, test_block_rng_is_reproducible):
+        fn()
+        print(f"✅ {fn.__name__}")
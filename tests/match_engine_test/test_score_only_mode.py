@@ -0,0 +1,130 @@
+# tests/match_engine_test/test_score_only_mode.py
+# -*- coding: utf-8 -*-
+"""
+Score-Only 模式統計等價性測試 (Statistical Equivalence)
+
+score_only 模式略過不影響比分的歸屬抽選 (助攻者/籃板者/抄截者)，
+因此隨機序列與完整模式不同，無法逐場比對；改以大量場次比較比分分佈:
+  1. 平均值差異 < 4 個標準誤
+  2. 標準差比值介於 0.8 ~ 1.25
+  3. 雙樣本 KS 統計量 < 臨界值 (alpha = 0.001)
+另驗證 score_only 不產生轉播與個人 Box Score。
+
+執行方式:
+  python -m pytest -q tests/match_engine_test/test_score_only_mode.py
+  python tests/match_engine_test/test_score_only_mode.py
+"""
+
+import math
+import os
+import random
+import sys
+import time
+
+PROJECT_ROOT = os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+sys.path.insert(0, PROJECT_ROOT)
+
+import yaml
+
+from app.services.match_engine.core import MatchEngine, MODE_FULL, MODE_SCORE_ONLY
+from app.services.match_engine.structures import EngineTeam, EnginePlayer
+from app.services.match_engine.utils.rng import rng
+
+STAT_20 = [
+    "ath_stamina", "ath_strength", "ath_speed", "ath_jump",
+    "shot_touch", "shot_release", "talent_offiq", "talent_defiq", "talent_health", "talent_luck",
+    "shot_accuracy", "shot_range", "def_rebound", "def_boxout", "def_contest", "def_disrupt",
+    "off_move", "off_dribble", "off_pass", "off_handle",
+]
+ROLES = ["Star", "Star", "Starter", "Starter", "Starter", "Rotation", "Rotation", "Rotation",
+         "Role", "Role", "Bench", "Bench", "Bench", "Bench", "Bench"]
+N_GAMES = 200
+KS_C_ALPHA = 1.95  # alpha = 0.001
+
+
+def load_config():
+    with open(os.path.join(PROJECT_ROOT, "config", "game_config.yaml"), "r", encoding="utf-8") as f:
+        return yaml.safe_load(f)
+
+
+def make_team(tid: str, seed: int) -> EngineTeam:
+    r = random.Random(seed)
+    roster = []
+    for i in range(15):
+        attrs = {k: float(r.randint(30, 99)) for k in STAT_20}
+        roster.append(EnginePlayer(
+            id=f"{tid}_{i}", name=f"{tid}{i}", nationality="zh", position="SF",
+            role=ROLES[i], grade="A", height=float(r.randint(175, 220)), age=r.randint(19, 34),
+            attr_sum=int(sum(attrs.values())), **attrs,
+        ))
+    return EngineTeam(id=tid, name=tid, roster=roster)
+
+
+def run_games(mode: str, seed: int):
+    config = load_config()
+    rng.seed(seed)
+    rows = []
+    for g in range(N_GAMES):
+        home, away = make_team("H", g), make_team("A", 10_000 + g)
+        result = MatchEngine(home, away, config, game_id=f"{mode}_{g}", mode=mode).simulate()
+        rows.append((result.home_score, result.away_score, result.is_ot))
+    return rows
+
+
+def mean_std(xs):
+    m = sum(xs) / len(xs)
+    return m, math.sqrt(sum((x - m) ** 2 for x in xs) / (len(xs) - 1))
+
+
+def ks_statistic(a, b):
+    """雙樣本 Kolmogorov-Smirnov 統計量 D"""
+    a, b = sorted(a), sorted(b)
+    i = j = 0
+    d = 0.0
+    while i < len(a) and j < len(b):
+        x = min(a[i], b[j])
+        while i < len(a) and a[i] == x: i += 1
+        while j < len(b) and b[j] == x: j += 1
+        d = max(d, abs(i / len(a) - j / len(b)))
+    return d
+
+
+def assert_equivalent(name, a, b):
+    ma, sa = mean_std(a)
+    mb, sb = mean_std(b)
+    se = math.sqrt(sa ** 2 / len(a) + sb ** 2 / len(b))
+    assert abs(ma - mb) < 4 * se, f"{name}: mean {ma:.2f} vs {mb:.2f} (se {se:.2f})"
+    assert 0.8 < sa / sb < 1.25, f"{name}: std {sa:.2f} vs {sb:.2f}"
+
+    d = ks_statistic(a, b)
+    crit = KS_C_ALPHA * math.sqrt((len(a) + len(b)) / (len(a) * len(b)))
+    assert d < crit, f"{name}: KS D={d:.3f} >= {crit:.3f}"
+
+
+def test_score_distribution_matches_full_mode():
+    full = run_games(MODE_FULL, seed=2024)
+    fast = run_games(MODE_SCORE_ONLY, seed=2025)
+
+    assert_equivalent("home", [r[0] for r in full], [r[0] for r in fast])
+    assert_equivalent("away", [r[1] for r in full], [r[1] for r in fast])
+    assert_equivalent("total", [r[0] + r[1] for r in full], [r[0] + r[1] for r in fast])
+    assert_equivalent("margin", [r[0] - r[1] for r in full], [r[0] - r[1] for r in fast])
+
+
+def test_score_only_skips_attribution():
+    home, away = make_team("H", 1), make_team("A", 2)
+    engine = MatchEngine(home, away, load_config(), game_id="SCORE_ONLY", log_level="text", mode=MODE_SCORE_ONLY)
+    result = engine.simulate()
+
+    assert result.pbp_log == [] and result.pbp_events is None
+    assert result.home_possession_history == [] and result.away_possession_history == []
+    assert result.home_score > 0 and result.away_score > 0 and result.pace > 0
+    for p in home.roster + away.roster:
+        assert p.stat_pts == p.stat_ast == p.stat_reb == p.stat_stl == p.stat_plus_minus == 0
+
+
+if __name__ == "__main__":
+    for fn in (test_score_only_skips_attribution, test_score_distribution_matches_full_mode):
+        t0 = time.time()
+        fn()
+        print(f"✅ {fn.__name__} ({time.time() - t0:.1f}s)")
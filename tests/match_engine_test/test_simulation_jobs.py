@@ -0,0 +1,145 @@
+# tests/match_engine_test/test_simulation_jobs.py
+# -*- coding: utf-8 -*-
+"""
+非同步模擬任務測試 (SimulationJobs)
+
+驗證:
+  1. 提交後立即回傳 job_id，等待後取得與 /api/game/simulate 相同格式的結果
+  2. 進行中的任務達 max_pending 時拋出 PoolBusyError，完成後可再提交
+  3. 任務失敗時狀態為 failed；未知的 job_id 回傳 None
+  4. 常駐進程池 (workers=2) 的 Worker 可直接使用預先載入的 Config；以其他大小取得時沿用同一個進程池並警告
+  5. 登記表超過 max_jobs 筆時清除最早完成的任務
+  6. 結果自「完成時」起保留 result_ttl 秒 (執行時間超過 TTL 的任務完成後仍可查詢)
+
+執行方式:
+  python -m pytest -q tests/match_engine_test/test_simulation_jobs.py
+  python tests/match_engine_test/test_simulation_jobs.py
+"""
+
+import io
+import os
+import sys
+import threading
+import time
+from contextlib import redirect_stdout
+
+PROJECT_ROOT = os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+sys.path.insert(0, PROJECT_ROOT)
+
+from app.services.simulation_pool import (
+    SimulationJobs, SimulationPool, PoolBusyError, JOB_PENDING, JOB_DONE, JOB_FAILED, run_match_job
+)
+
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+from test_score_only_mode import make_team
+
+META = {"home_team": "Home", "away_team": "Away", "home_team_id": 1, "away_team_id": 2}
+
+
+def check_result(result):
+    assert result['home_score'] != result['away_score']
+    assert result['logs']
+    home_pts = sum(row['pts'] for row in result['box_score'] if row['team_id'] == 1)
+    away_pts = sum(row['pts'] for row in result['box_score'] if row['team_id'] == 2)
+    assert (home_pts, away_pts) == (result['home_score'], result['away_score'])
+
+
+def fail():
+    raise ValueError("boom")
+
+
+def test_jobs_backpressure_and_status():
+    settings = {'workers': 1, 'max_pending': 1}
+    gate = threading.Event()
+    try:
+        blocker = SimulationJobs.submit(gate.wait, settings=settings)
+        assert SimulationJobs.status(blocker)['status'] == JOB_PENDING
+        try:
+            SimulationJobs.submit(gate.wait, settings=settings)
+            raise AssertionError("expected PoolBusyError")
+        except PoolBusyError:
+            pass
+
+        gate.set()
+        assert SimulationJobs.status(blocker, wait=5)['status'] == JOB_DONE
+
+        job = SimulationJobs.submit(run_match_job, make_team("H", 1), make_team("A", 2), "JOB_1", META,
+                                    settings=settings)
+        info = SimulationJobs.status(job, wait=60)
+        assert info['status'] == JOB_DONE
+        check_result(info['result'])
+
+        failed = SimulationJobs.submit(fail, settings=settings)
+        info = SimulationJobs.status(failed, wait=5)
+        assert info['status'] == JOB_FAILED and 'boom' in info['error']
+
+        assert SimulationJobs.status("missing") is None
+    finally:
+        gate.set()
+        SimulationJobs.clear()
+
+
+def test_jobs_on_warm_process_pool():
+    settings = {'workers': 2, 'max_pending': 4}
+    try:
+        jobs = [SimulationJobs.submit(run_match_job, make_team("H", 3 + i), make_team("A", 9 + i), f"JOB_{i}", META,
+                                      settings=settings) for i in range(2)]
+        for job in jobs:
+            info = SimulationJobs.status(job, wait=60)
+            assert info['status'] == JOB_DONE
+            check_result(info['result'])
+        assert SimulationJobs.pending_count() == 0
+
+        pool = SimulationPool.get(2)
+        buf = io.StringIO()
+        with redirect_stdout(buf):
+            assert SimulationPool.get(3) is pool
+            assert SimulationPool.get(3) is pool
+        assert buf.getvalue().count("忽略") == 1
+    finally:
+        SimulationJobs.clear()
+        SimulationPool.shutdown()
+
+
+def test_jobs_registry_is_bounded():
+    settings = {'workers': 1, 'max_pending': 2, 'max_jobs': 3}
+    gate = threading.Event()
+    try:
+        done = []
+        for _ in range(4):
+            done.append(SimulationJobs.submit(int, settings=settings))
+            assert SimulationJobs.status(done[-1], wait=5)['status'] == JOB_DONE
+        blocker = SimulationJobs.submit(gate.wait, settings=settings)
+        # 最多保留 3 筆: 進行中的任務保留，最早完成的任務先被清除
+        assert len(SimulationJobs._jobs) == 3
+        assert [SimulationJobs.status(j) is None for j in done] == [True, True, False, False]
+        assert SimulationJobs.status(blocker)['status'] == JOB_PENDING
+    finally:
+        gate.set()
+        SimulationJobs.clear()
+
+
+def test_result_ttl_counts_from_completion():
+    settings = {'workers': 1, 'max_pending': 4, 'result_ttl': 0.3}
+    gate = threading.Event()
+    try:
+        slow = SimulationJobs.submit(gate.wait, settings=settings)
+        time.sleep(0.5) # 執行時間超過 TTL
+        gate.set()
+        assert SimulationJobs.status(slow, wait=5)['status'] == JOB_DONE
+        SimulationJobs.submit(int, settings=settings) # 提交時清除過期任務
+        assert SimulationJobs.status(slow)['status'] == JOB_DONE
+
+        time.sleep(0.5)
+        SimulationJobs.submit(int, settings=settings)
+        assert SimulationJobs.status(slow) is None
+    finally:
+        gate.set()
+        SimulationJobs.clear()
+
+
+if __name__ == "__main__":
+    for fn in (test_jobs_backpressure_and_status, test_jobs_on_warm_process_pool, test_jobs_registry_is_bounded,
+               test_result_ttl_counts_from_completion):
+        fn()
+        print(f"✅ {fn.__name__}")
@@ -0,0 +1,123 @@
+# tests/match_engine_test/test_snapshot_restore.py
+# -*- coding: utf-8 -*-
+"""
+比賽快照與續跑測試 (MatchEngine.snapshot / restore)
+
+驗證:
+  1. 於節間 (Q3 結束) 或節中任一回合快照，還原後續跑的結果與未中斷的比賽逐位元一致
+  2. 還原的引擎與原引擎互不影響 (可反覆由同一個快照分岔)
+  3. 注入不同 rng 可由同一時間點產生不同的後續發展 (What-if)
+  4. Config 版本不符時拒絕還原
+  5. 注入 BlockRNG (區塊預抽) 的比賽同樣可快照續跑 (含跨區塊邊界)
+
+執行方式:
+  python -m pytest -q tests/match_engine_test/test_snapshot_restore.py
+  python tests/match_engine_test/test_snapshot_restore.py
+"""
+
+import copy
+import os
+import sys
+
+import pytest
+
+PROJECT_ROOT = os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+sys.path.insert(0, PROJECT_ROOT)
+
+from app.services.match_engine.core import MatchEngine
+from app.services.match_engine.structures import EVENT_PERIOD_END
+from app.services.match_engine.utils.rng import BlockRNG, RNG
+
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+from test_score_only_mode import load_config, make_team
+
+RUN_SEED = 20260301
+
+
+def make_engine(game_no: int = 0, config=None, rng=None):
+    home, away = make_team("H", game_no), make_team("A", 10_000 + game_no)
+    return MatchEngine(home, away, config or load_config(), game_id=f"G{game_no}", run_seed=RUN_SEED, rng=rng)
+
+
+def outcome(engine, result):
+    box = [(p.id, p.position, p.stat_pts, p.stat_reb, p.stat_ast, p.fouls, p.stat_plus_minus,
+            repr(p.seconds_played), repr(p.stat_remaining_stamina), p.is_played)
+           for p in engine.home_team.roster + engine.away_team.roster]
+    return (result.home_score, result.away_score, result.total_quarters, repr(result.pace),
+            result.home_possession_history, result.pbp_log, box)
+
+
+def snapshot_when(engine, stop):
+    """串流比賽直到 stop(event) 為真時快照，之後把原比賽跑完"""
+    blob = None
+    result = None
+    for event in engine.iter_events():
+        if blob is None and stop(event):
+            blob = engine.snapshot()
+        result = event.result
+    return blob, outcome(engine, result)
+
+
+def test_resume_from_quarter_break_is_identical():
+    config = load_config()
+    plain = make_engine(0, config)
+    expected = outcome(plain, plain.simulate())
+
+    blob, full = snapshot_when(make_engine(0, config), lambda e: e.kind == EVENT_PERIOD_END and e.quarter == 3)
+    assert full == expected
+    assert isinstance(blob, bytes)
+
+    resumed = MatchEngine.restore(blob, config)
+    assert resumed.state.quarter == 3
+    assert outcome(resumed, resumed.simulate()) == expected
+
+    # 同一個快照可重複還原
+    again = MatchEngine.restore(blob, config)
+    assert outcome(again, again.simulate()) == expected
+
+
+def test_resume_mid_quarter_is_identical():
+    config = load_config()
+    count = iter(range(10_000))
+    blob, full = snapshot_when(make_engine(1, config), lambda e: next(count) == 57)
+    resumed = MatchEngine.restore(blob, config)
+    assert outcome(resumed, resumed.simulate()) == full
+
+
+def test_branch_with_other_rng_and_config_check():
+    config = load_config()
+    blob, _ = snapshot_when(make_engine(2, config), lambda e: e.kind == EVENT_PERIOD_END and e.quarter == 3)
+    finals = set()
+    for k in range(8):
+        branch = MatchEngine.restore(blob, config, rng=RNG.for_game(k, "what-if"))
+        result = branch.simulate()
+        finals.add((result.home_score, result.away_score))
+    assert len(finals) > 1
+
+    changed = copy.deepcopy(config)
+    changed['match_engine']['general']['quarter_length'] = 600
+    with pytest.raises(ValueError):
+        MatchEngine.restore(blob, changed)
+
+
+def test_resume_with_block_rng():
+    config = load_config()
+    for block_size in (4096, 97):
+        def block_rng():
+            return BlockRNG(RUN_SEED, block_size=block_size)
+        plain = make_engine(3, config, rng=block_rng())
+        expected = outcome(plain, plain.simulate())
+
+        count = iter(range(10_000))
+        blob, full = snapshot_when(make_engine(3, config, rng=block_rng()), lambda e: next(count) == 120)
+        assert full == expected
+        resumed = MatchEngine.restore(blob, config)
+        assert isinstance(resumed.rng, BlockRNG) and resumed.rng.block_size == block_size
+        assert outcome(resumed, resumed.simulate()) == expected
+
+
+if __name__ == "__main__":
+    for fn in (test_resume_from_quarter_break_is_identical, test_resume_mid_quarter_is_identical,
+               test_branch_with_other_rng_and_config_check, test_resume_with_block_rng):
+        fn()
+        print(f"✅ {fn.__name__}")
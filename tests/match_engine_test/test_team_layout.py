@@ -0,0 +1,71 @@
+# tests/match_engine_test/test_team_layout.py
+# -*- coding: utf-8 -*-
+"""
+球隊資料佈局測試 (Team Layout: objects vs arrays)
+
+驗證 MatchEngine(layout='arrays') 的 Struct-of-Arrays 矩陣:
+  1. 與預設 layout='objects' 的比賽結果、轉播與 Box Score 逐位元一致
+  2. 矩陣的場上總和與 Calculator.team_formula_sum 相同
+  3. box_score_matrix 與球員物件上的統計一致
+
+執行方式:
+  python -m pytest -q tests/match_engine_test/test_team_layout.py
+  python tests/match_engine_test/test_team_layout.py
+"""
+
+import os
+import sys
+
+import pytest
+
+PROJECT_ROOT = os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+sys.path.insert(0, PROJECT_ROOT)
+
+from app.services.match_engine.core import MatchEngine
+from app.services.match_engine.layout import BOX_FIELDS, LAYOUT_ARRAYS, LAYOUT_OBJECTS, box_score_matrix
+from app.services.match_engine.utils.calculator import Calculator
+
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+from test_score_only_mode import load_config, make_team
+
+RUN_SEED = 20260301
+
+
+def play(game_no: int, layout: str):
+    home, away = make_team("H", game_no), make_team("A", 10_000 + game_no)
+    result = MatchEngine(home, away, load_config(), game_id=f"G{game_no}", run_seed=RUN_SEED, layout=layout).simulate()
+    box = [box_score_matrix(t).tolist() for t in (home, away)]
+    return result.home_score, result.away_score, repr(result.pace), result.pbp_log, box
+
+
+def test_arrays_layout_matches_objects_layout():
+    for g in range(4):
+        assert play(g, LAYOUT_ARRAYS) == play(g, LAYOUT_OBJECTS)
+
+
+def test_matrix_sums_match_team_formula_sum():
+    home, away = make_team("H", 1), make_team("A", 2)
+    engine = MatchEngine(home, away, load_config(), game_id="G0", run_seed=RUN_SEED, layout=LAYOUT_ARRAYS)
+    home.on_court[2].stamina_coeff = 0.73
+    home.lineup_epoch += 1
+    for formula in engine.plan.formulas:
+        assert Calculator.lineup_sum(home, formula) == Calculator.team_formula_sum(home.on_court, formula)
+        assert Calculator.backcourt_sum(home, formula) == Calculator.team_formula_sum(home.on_court[:3], formula)
+
+
+def test_box_score_matrix_and_layout_validation():
+    home, away = make_team("H", 3), make_team("A", 4)
+    MatchEngine(home, away, load_config(), game_id="G0", run_seed=RUN_SEED).simulate()
+    box = box_score_matrix(home)
+    assert box.shape == (len(home.roster), len(BOX_FIELDS))
+    assert box[:, BOX_FIELDS.index('stat_pts')].sum() == home.score
+
+    with pytest.raises(ValueError):
+        MatchEngine(home, away, load_config(), layout="columns")
+
+
+if __name__ == "__main__":
+    for fn in (test_arrays_layout_matches_objects_layout, test_matrix_sums_match_team_formula_sum,
+               test_box_score_matrix_and_layout_validation):
+        fn()
+        print(f"✅ {fn.__name__}")
@@ -0,0 +1,92 @@
+# tests/match_engine_test/test_threaded_runner.py
+# -*- coding: utf-8 -*-
+"""
+多執行緒批次模擬測試 (threaded.simulate_games_threaded)
+
+驗證:
+  1. 結果與執行緒數量無關 (1 vs 4 執行緒逐場一致)
+  2. 與進程池版 (simulation_pool.run_matchup_chunk) 在相同 seed 下逐場一致
+  3. 共用的 Config dict 與球隊範本在模擬後維持不變
+  4. GameConfigLoader 多執行緒同時載入只讀檔一次，所有執行緒取得同一個物件
+
+執行方式:
+  python -m pytest -q tests/match_engine_test/test_threaded_runner.py
+  python tests/match_engine_test/test_threaded_runner.py
+"""
+
+import copy
+import os
+import sys
+import threading
+
+PROJECT_ROOT = os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+sys.path.insert(0, PROJECT_ROOT)
+
+from app.services.match_engine.structures import PLAYER_TEMPLATE_FIELDS
+from app.services.match_engine.threaded import simulate_games_threaded
+from app.services.simulation_pool import run_matchup_chunk
+from app.utils.game_config_loader import GameConfigLoader
+
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+from test_score_only_mode import load_config, make_team
+
+RUN_SEED = 20260301
+GAMES = 24
+
+
+def outcomes(results):
+    return [(r.home_score, r.away_score, r.is_ot, r.pace, r.home_possessions) for r in results]
+
+
+def player_values(team):
+    return [[getattr(p, name) for name in PLAYER_TEMPLATE_FIELDS] + [p.height] for p in team.roster]
+
+
+def test_threaded_results_are_thread_independent():
+    config = load_config()
+    frozen = copy.deepcopy(config)
+    teams = [make_team(f"T{i}", 100 + i) for i in range(4)]
+    before = [player_values(t) for t in teams]
+    matchups = [(teams[i % 4], teams[(i + 1) % 4]) for i in range(GAMES)]
+
+    serial = simulate_games_threaded(matchups, config, RUN_SEED, workers=1, chunk_size=5)
+    threaded = simulate_games_threaded(matchups, config, RUN_SEED, workers=4, chunk_size=5)
+    assert outcomes(serial) == outcomes(threaded)
+    assert [r.game_id for r in threaded] == [f"THREAD_{i}" for i in range(GAMES)]
+
+    # 共用狀態未被修改
+    assert config == frozen
+    assert [player_values(t) for t in teams] == before
+
+
+def test_threaded_matches_process_pool_worker():
+    config = load_config()
+    home, away = make_team("H", 7), make_team("A", 8)
+    threaded = simulate_games_threaded([(home, away)] * 10, config, RUN_SEED, workers=3, chunk_size=2)
+    rows = run_matchup_chunk(copy.deepcopy(home), copy.deepcopy(away), config, RUN_SEED, range(10))
+    assert [(r.home_score - r.away_score, r.is_ot) for r in threaded] == rows
+
+
+def test_config_loader_is_thread_safe():
+    GameConfigLoader.reload()
+    GameConfigLoader._config = None
+    seen = []
+    barrier = threading.Barrier(8)
+
+    def worker():
+        barrier.wait()
+        seen.append(GameConfigLoader.load())
+
+    threads = [threading.Thread(target=worker) for _ in range(8)]
+    for t in threads:
+        t.start()
+    for t in threads:
+        t.join()
+    assert len(seen) == 8 and all(c is seen[0] for c in seen)
+
+
+if __name__ == "__main__":
+    for fn in (test_threaded_results_are_thread_independent, test_threaded_matches_process_pool_worker,
+               test_config_loader_is_thread_safe):
+        fn()
+        print(f"✅ {fn.__name__}")
@@ -0,0 +1,97 @@
+# tests/match_engine_test/test_whatif_branches.py
+# -*- coding: utf-8 -*-
+"""
+What-if 分岔模擬測試 (whatif.simulate_branches)
+
+驗證:
+  1. 由 Q3 結束的快照出發，分岔結果與 Worker 數量無關 (單進程 vs 進程池)
+  2. 勝率 / 延長賽機率 / 分差與逐分岔結果一致，比賽不會以平手結束
+  3. 球員預估數據: 得分總和的平均 = 最終比分的平均，且不低於分岔點的累計值
+  4. 分岔不影響原比賽 (原引擎可繼續跑完)
+  5. 多個請求同時分岔 (共用常駐進程池) 時各自的結果不受彼此影響
+
+執行方式:
+  python -m pytest -q tests/match_engine_test/test_whatif_branches.py
+  python tests/match_engine_test/test_whatif_branches.py
+"""
+
+import os
+import sys
+from concurrent.futures import ThreadPoolExecutor
+
+PROJECT_ROOT = os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+sys.path.insert(0, PROJECT_ROOT)
+
+from app.services.match_engine.core import MatchEngine
+from app.services.match_engine.structures import EVENT_PERIOD_END
+from app.services.match_engine.whatif import simulate_branches
+
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+from test_score_only_mode import load_config, make_team
+
+RUN_SEED = 20260301
+BRANCHES = 40
+
+
+def engine_at_end_of_q3(config):
+    home, away = make_team("H", 5), make_team("A", 10_005)
+    engine = MatchEngine(home, away, config, game_id="LIVE", run_seed=RUN_SEED)
+    stream = engine.iter_events()
+    for event in stream:
+        if event.kind == EVENT_PERIOD_END and event.quarter == 3:
+            return engine, stream
+    raise AssertionError("game ended before Q3")
+
+
+def test_branches_are_worker_independent():
+    config = load_config()
+    engine, stream = engine_at_end_of_q3(config)
+    pts_now = {p.id: p.stat_pts for p in engine.home_team.roster + engine.away_team.roster}
+
+    inline = simulate_branches(engine, config, branches=BRANCHES, workers=1, seed=7)
+    pooled = simulate_branches(engine.snapshot(), config, branches=BRANCHES, workers=2, seed=7)
+    assert inline.margins == pooled.margins
+    assert inline.player_lines == pooled.player_lines
+
+    s = inline
+    assert s.branches == BRANCHES and s.quarter == 3
+    assert (s.home_score, s.away_score) == (engine.home_team.score, engine.away_team.score)
+    assert 0 not in s.margins
+    assert s.home_win_prob == sum(m > 0 for m in s.margins) / BRANCHES
+    assert 0.0 <= s.ot_prob <= 1.0
+    assert abs(s.mean_margin - sum(s.margins) / BRANCHES) < 1e-9
+
+    home_ids = {p.id for p in engine.home_team.roster}
+    away_ids = {p.id for p in engine.away_team.roster}
+    home_pts = sum(line['stat_pts'] for pid, line in s.player_lines.items() if pid in home_ids)
+    away_pts = sum(line['stat_pts'] for pid, line in s.player_lines.items() if pid in away_ids)
+    assert abs((home_pts - away_pts) - s.mean_margin) < 1e-6
+    assert home_pts >= s.home_score and away_pts >= s.away_score
+    assert all(s.player_lines[pid]['stat_pts'] >= pts for pid, pts in pts_now.items())
+
+    # 原比賽不受分岔影響，可繼續跑完
+    final = list(stream)[-1]
+    assert final.result.home_score >= s.home_score
+
+
+def test_concurrent_branches_do_not_mix():
+    config = load_config()
+    blobs = []
+    for n in range(3):
+        engine = MatchEngine(make_team("H", 20 + n), make_team("A", 10_020 + n), config,
+                             game_id=f"LIVE{n}", run_seed=RUN_SEED)
+        stream = engine.iter_events()
+        next(e for e in stream if e.kind == EVENT_PERIOD_END and e.quarter == 2 + n % 2)
+        blobs.append(engine.snapshot())
+
+    expected = [simulate_branches(b, config, branches=BRANCHES, workers=1, seed=n).margins
+                for n, b in enumerate(blobs)]
+    with ThreadPoolExecutor(max_workers=len(blobs)) as threads:
+        futures = [threads.submit(simulate_branches, b, config, BRANCHES, 2, n) for n, b in enumerate(blobs)]
+        assert [f.result().margins for f in futures] == expected
+
+
+if __name__ == "__main__":
+    for fn in (test_branches_are_worker_independent, test_concurrent_branches_do_not_mix):
+        fn()
+        print(f"✅ {fn.__name__}")
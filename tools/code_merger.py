@@ -49,9 +49,14 @@ SPECIFIC_FILES = [
     "app/services/team_creator.py",
 
     # --- 比賽引擎核心 (Match Engine Core) ---
+    "app/services/match_engine/batch.py",
     "app/services/match_engine/core.py",
+    "app/services/match_engine/layout.py",
+    "app/services/match_engine/plan.py",
     "app/services/match_engine/service.py",
     "app/services/match_engine/structures.py",
+    "app/services/match_engine/threaded.py",
+    "app/services/match_engine/whatif.py",
 
     # --- 比賽引擎子系統 (Match Engine Systems) ---
     "app/services/match_engine/systems/attribution.py",
@@ -61,6 +66,8 @@ SPECIFIC_FILES = [
 
     # --- 比賽引擎工具 (Match Engine Utils) ---
     "app/services/match_engine/utils/calculator.py",
+    "app/services/match_engine/utils/pbp.py",
+    "app/services/match_engine/utils/profiler.py",
     "app/services/match_engine/utils/rng.py",
 
     # --- 測試工具 (Test Utils) ---